@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""Offline benchmark of the backup pipeline, against local stand-ins of the providers.
+
+This package is not loaded by Odoo: run `benchmarks/run.py` (see its documentation).
+"""
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""Reproducible synthetic database and filestore used by the benchmarks.
+
+The content only depends on the dataset specification (seed included): the same
+specification always produces the same tables and files, so the results of two
+benchmark runs can be compared.
+"""
+
+import hashlib
+import math
+import os
+import random
+import shutil
+
+import odoo
+from odoo.service import db
+from odoo.tools import config
+
+# Approximate size of a generated row, payload included
+ROW_SIZE = 400
+# Hexadecimal md5 digests repeated in the payload of each row
+PAYLOAD_DIGESTS = 10
+# PNG signature, so that the image files are detected as already compressed
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+FILE_KINDS = ("text", "random", "png")
+WORDS = (
+    "invoice partner product quantity price amount total tax order sale purchase "
+    "stock move picking journal entry account payment customer vendor delivery "
+    "warehouse location lot serial date due paid draft posted cancel"
+).split()
+
+
+def parse_file_mix(file_mix):
+    """Parse a file mix like "text=0.5,random=0.3,png=0.2" into weights by kind."""
+    weights = {}
+    for item in file_mix.split(","):
+        kind, _sep, weight = item.partition("=")
+        kind = kind.strip()
+        if kind not in FILE_KINDS:
+            raise ValueError(f"Unknown file kind {kind!r} (expected: {FILE_KINDS})")
+        weights[kind] = float(weight or 1)
+    return weights
+
+
+def _text_block(rng, size):
+    """Return a block of pseudo-random words, compressible like real documents."""
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words).encode()[:size]
+
+
+def _generate_tables(cr, spec, rng):
+    """Create the minimal Odoo tables read by the dump and the benchmark tables."""
+    cr.execute(
+        "CREATE TABLE ir_module_module "
+        "(id serial PRIMARY KEY, name varchar, latest_version varchar, state varchar)"
+    )
+    cr.execute(
+        "INSERT INTO ir_module_module (name, latest_version, state) "
+        "VALUES ('base', %s, 'installed')",
+        [odoo.release.version],
+    )
+    tables = max(spec["tables"], 1)
+    rows = max(int(spec["db_mb"] * 1024 * 1024 / ROW_SIZE / tables), 1)
+    for index in range(tables):
+        table = f"benchmark_table_{index}"
+        cr.execute(
+            f"CREATE TABLE {table} (id serial PRIMARY KEY, reference varchar, "
+            "amount numeric, created timestamp, payload text)"
+        )
+        # random() is deterministic within the session once seeded
+        cr.execute("SELECT setseed(%s)", [rng.uniform(-1, 1)])
+        cr.execute(
+            f"INSERT INTO {table} (reference, amount, created, payload) "
+            "SELECT md5(random()::text), round((random() * 10000)::numeric, 2), "
+            "timestamp '2024-01-01' + random() * interval '365 days', "
+            "(SELECT string_agg(md5(random()::text || g::text), ' ') "
+            "FROM generate_series(1, %s)) "
+            "FROM generate_series(1, %s) AS g",
+            [PAYLOAD_DIGESTS, rows],
+        )
+
+
+def _generate_filestore(db_name, spec, rng):
+    """Write the filestore files, named by their sha1 like Odoo attachments.
+
+    Returns:
+        tuple: Number of files and total size in bytes.
+    """
+    filestore = config.filestore(db_name)
+    weights = parse_file_mix(spec["file_mix"])
+    kinds, kind_weights = list(weights), list(weights.values())
+    min_size, max_size = (size * 1024 for size in spec["file_size_kb"])
+    text = _text_block(rng, max_size * 2)
+    target = spec["filestore_mb"] * 1024 * 1024
+    count = total = 0
+    while total < target:
+        kind = rng.choices(kinds, kind_weights)[0]
+        size = int(math.exp(rng.uniform(math.log(min_size), math.log(max_size))))
+        if kind == "text":
+            offset = rng.randrange(len(text) - size + 1)
+            content = text[offset : offset + size]
+        elif kind == "png":
+            content = PNG_SIGNATURE + rng.randbytes(max(size - len(PNG_SIGNATURE), 0))
+        else:
+            content = rng.randbytes(size)
+        sha1 = hashlib.sha1(content).hexdigest()
+        folder = os.path.join(filestore, sha1[:2])
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, sha1), "wb") as file:
+            file.write(content)
+        count += 1
+        total += len(content)
+    return count, total
+
+
+def create_dataset(db_name, spec):
+    """(Re)create the synthetic database and filestore described by `spec`.
+
+    Args:
+        db_name (str): Name of the benchmark database (dropped first if it exists).
+        spec (dict): "db_mb", "tables", "filestore_mb", "file_mix", "file_size_kb"
+            (minimum, maximum) and "seed".
+
+    Returns:
+        dict: Actual database size, filestore file count and size.
+    """
+    drop_dataset(db_name)
+    db._create_empty_database(db_name)
+    rng = random.Random(spec["seed"])
+    connection = odoo.sql_db.db_connect(db_name)
+    with connection.cursor() as cr:
+        _generate_tables(cr, spec, rng)
+        cr.commit()
+        cr.execute("SELECT pg_database_size(current_database())")
+        db_size = cr.fetchone()[0]
+    file_count, filestore_size = _generate_filestore(db_name, spec, rng)
+    return {
+        "db_bytes": db_size,
+        "filestore_files": file_count,
+        "filestore_bytes": filestore_size,
+    }
+
+
+def drop_dataset(db_name):
+    """Drop the benchmark database and its filestore, if they exist."""
+    if db_name in db.list_dbs(True):
+        db.exp_drop(db_name)
+    shutil.rmtree(config.filestore(db_name), ignore_errors=True)
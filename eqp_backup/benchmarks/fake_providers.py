@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""In-process stand-ins of the Dropbox and Google Drive HTTP APIs.
+
+The provider SDKs are used unchanged: only their HTTP transport is replaced (a
+`requests` adapter for Dropbox, an `httplib2`-like object for Google Drive) by
+handlers implementing the upload endpoints used by the backups. The uploaded data
+is discarded; an optional bandwidth limit and request latency simulate a remote
+provider.
+"""
+
+import json
+import threading
+import time
+import uuid
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+def _read_body(body):
+    if body is None:
+        return b""
+    if hasattr(body, "read"):
+        return body.read()
+    if isinstance(body, str):
+        return body.encode()
+    return bytes(body)
+
+
+class FakeProvider:
+    """Base of the fake endpoints: request latency and bandwidth limit."""
+
+    def __init__(self, bucket=None, latency=0.0):
+        """
+        Args:
+            bucket (TokenBucket): Limits the receiving bandwidth, if set.
+            latency (float): Seconds added to every request.
+        """
+        self.bucket = bucket
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes_received = 0
+
+    def _receive(self, data):
+        with self.lock:
+            self.requests += 1
+            self.bytes_received += len(data)
+        if self.latency:
+            time.sleep(self.latency)
+        if self.bucket and data:
+            self.bucket.consume(len(data))
+
+
+class FakeDropboxAdapter(FakeProvider, requests.adapters.BaseAdapter):
+    """`requests` transport adapter answering the Dropbox upload endpoints."""
+
+    def __init__(self, bucket=None, latency=0.0):
+        FakeProvider.__init__(self, bucket, latency)
+        requests.adapters.BaseAdapter.__init__(self)
+        # Size of the data received by each upload session
+        self.sessions = {}
+
+    def _file_metadata(self, path, size):
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return {
+            "name": path.rsplit("/", 1)[-1],
+            "id": f"id:{uuid.uuid4().hex[:22]}",
+            "client_modified": now,
+            "server_modified": now,
+            "rev": uuid.uuid4().hex[:16],
+            "size": size,
+            "path_lower": path.lower(),
+            "path_display": path,
+        }
+
+    def _handle(self, route, arg, data):
+        if route == "files/upload":
+            return self._file_metadata(arg["path"], len(data))
+        if route == "files/upload_session/start":
+            session_id = uuid.uuid4().hex
+            with self.lock:
+                self.sessions[session_id] = len(data)
+            return {"session_id": session_id}
+        if route == "files/upload_session/append_v2":
+            with self.lock:
+                self.sessions[arg["cursor"]["session_id"]] += len(data)
+            return None
+        if route == "files/upload_session/finish":
+            with self.lock:
+                size = self.sessions.pop(arg["cursor"]["session_id"]) + len(data)
+            return self._file_metadata(arg["commit"]["path"], size)
+        raise NotImplementedError(f"Dropbox route not simulated: {route}")
+
+    def send(
+        self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None
+    ):
+        data = _read_body(request.body)
+        self._receive(data)
+        route = urlparse(request.url).path.split("/", 2)[2]
+        arg = json.loads(request.headers.get("Dropbox-API-Arg") or "null")
+        result = self._handle(route, arg, data)
+
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        response._content = json.dumps(result).encode()
+        response._content_consumed = True
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+    def create_session(self, *args, **kwargs):
+        """Return a `requests` session sending every request to this adapter."""
+        session = requests.Session()
+        session.mount("https://", self)
+        return session
+
+
+class _DriveResponse(dict):
+    """`httplib2.Response` stand-in: a dict of lowercase headers with a status."""
+
+    def __init__(self, status, headers=None):
+        super().__init__(headers or {})
+        self.status = status
+        self.reason = "OK" if status < 300 else "Resume Incomplete"
+        self["status"] = str(status)
+
+
+class FakeDriveHttp(FakeProvider):
+    """`httplib2.Http` stand-in answering the Google Drive resumable upload protocol."""
+
+    upload_uri = "https://www.googleapis.com/upload/drive/v3/files?upload_id="
+
+    def __init__(self, bucket=None, latency=0.0):
+        super().__init__(bucket, latency)
+        self.timeout = None
+        self.redirect_codes = set()
+        # Metadata and size of the data received by each resumable session
+        self.sessions = {}
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        data = _read_body(body)
+        self._receive(data)
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        query = parse_qs(urlparse(uri).query)
+
+        if "upload_id" not in query:
+            # Start of a resumable upload: the body holds the file metadata
+            upload_id = uuid.uuid4().hex
+            with self.lock:
+                self.sessions[upload_id] = {
+                    "metadata": json.loads(data or b"{}"),
+                    "size": 0,
+                }
+            return _DriveResponse(200, {"location": self.upload_uri + upload_id}), b""
+
+        upload_id = query["upload_id"][0]
+        with self.lock:
+            session = self.sessions[upload_id]
+            session["size"] += len(data)
+            size = session["size"]
+        total = headers.get("content-range", "*/*").rsplit("/", 1)[-1]
+        if total != "*" and int(total) == size:
+            with self.lock:
+                del self.sessions[upload_id]
+            file = {
+                "id": uuid.uuid4().hex,
+                "name": session["metadata"].get("name"),
+                "size": str(size),
+            }
+            return _DriveResponse(200, {"content-type": "application/json"}), (
+                json.dumps(file).encode()
+            )
+        headers = {"range": f"bytes=0-{size - 1}"} if size else {}
+        return _DriveResponse(308, headers), b""
+
+
+@contextmanager
+def provider_client(server, bucket=None, latency=0.0):
+    """Connect to the benchmark stand-in of a backup server provider.
+
+    Args:
+        server (backup.server): Benchmark server (its SFTP settings target the fake
+            SFTP server).
+        bucket (TokenBucket): Limits the bandwidth of the fake HTTP endpoints.
+        latency (float): Seconds added to every fake HTTP request.
+
+    Yields:
+        object: Provider client, as yielded by `BackupServer.provider_client`.
+    """
+    backup_type = server.backup_type
+    if backup_type == "sftp":
+        with server.sftp_session() as sftp:
+            yield sftp
+    elif backup_type == "dropbox":
+        import dropbox
+
+        adapter = FakeDropboxAdapter(bucket, latency)
+        # Concurrent uploads clone the client with a new session: keep it fake
+        create_session = dropbox.create_session
+        dropbox.create_session = adapter.create_session
+        try:
+            yield dropbox.Dropbox(
+                oauth2_access_token="benchmark", session=adapter.create_session()
+            )
+        finally:
+            dropbox.create_session = create_session
+    elif backup_type == "drive":
+        from googleapiclient.discovery import build
+
+        yield build(
+            "drive",
+            "v3",
+            http=FakeDriveHttp(bucket, latency),
+            static_discovery=True,
+            cache_discovery=False,
+        )
+    else:
+        yield None
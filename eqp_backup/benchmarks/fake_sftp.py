@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""Local SFTP server discarding the uploaded data, used as the benchmark SFTP server.
+
+Only the file sizes are kept (in memory), so the measures do not include any disk
+write on the server side. An optional bandwidth limit simulates a remote server.
+"""
+
+import logging
+import os
+import posixpath
+import socket
+import stat
+import threading
+import time
+
+import paramiko
+from paramiko import (
+    AUTH_FAILED,
+    AUTH_SUCCESSFUL,
+    OPEN_SUCCEEDED,
+    SFTP_NO_SUCH_FILE,
+    SFTP_OK,
+    SFTPAttributes,
+    SFTPHandle,
+    SFTPServer,
+    SFTPServerInterface,
+    ServerInterface,
+)
+
+_logger = logging.getLogger(__name__)
+
+
+class _SinkStorage:
+    """Sizes of the files "stored" on the server, by path."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.files = {}
+        self.folders = {"/"}
+
+    def attributes(self, path):
+        attributes = SFTPAttributes()
+        attributes.filename = posixpath.basename(path)
+        attributes.st_mtime = attributes.st_atime = int(time.time())
+        if path in self.folders:
+            attributes.st_size = 0
+            attributes.st_mode = stat.S_IFDIR | 0o755
+        else:
+            attributes.st_size = self.files[path]
+            attributes.st_mode = stat.S_IFREG | 0o644
+        return attributes
+
+
+class _SinkHandle(SFTPHandle):
+    def __init__(self, storage, path, bucket, flags=0):
+        super().__init__(flags)
+        self.storage = storage
+        self.path = path
+        self.bucket = bucket
+
+    def write(self, offset, data):
+        if self.bucket:
+            self.bucket.consume(len(data))
+        with self.storage.lock:
+            size = self.storage.files.get(self.path, 0)
+            self.storage.files[self.path] = max(size, offset + len(data))
+        return SFTP_OK
+
+    def read(self, offset, length):
+        return b""
+
+    def stat(self):
+        with self.storage.lock:
+            return self.storage.attributes(self.path)
+
+    def chattr(self, attr):
+        return SFTP_OK
+
+
+class _SinkSFTPInterface(SFTPServerInterface):
+    def __init__(self, server, storage, bucket=None):
+        super().__init__(server)
+        self.storage = storage
+        self.bucket = bucket
+
+    def canonicalize(self, path):
+        return posixpath.normpath("/" + path.lstrip("/"))
+
+    def open(self, path, flags, attr):
+        path = self.canonicalize(path)
+        with self.storage.lock:
+            if flags & os.O_TRUNC or (
+                flags & os.O_CREAT and path not in self.storage.files
+            ):
+                self.storage.files[path] = 0
+            elif path not in self.storage.files:
+                return SFTP_NO_SUCH_FILE
+        return _SinkHandle(self.storage, path, self.bucket, flags)
+
+    def stat(self, path):
+        path = self.canonicalize(path)
+        with self.storage.lock:
+            if path not in self.storage.files and path not in self.storage.folders:
+                return SFTP_NO_SUCH_FILE
+            return self.storage.attributes(path)
+
+    lstat = stat
+
+    def list_folder(self, path):
+        path = self.canonicalize(path)
+        with self.storage.lock:
+            if path not in self.storage.folders:
+                return SFTP_NO_SUCH_FILE
+            children = [
+                child
+                for child in list(self.storage.files) + list(self.storage.folders)
+                if child != path and posixpath.dirname(child) == path
+            ]
+            return [self.storage.attributes(child) for child in children]
+
+    def remove(self, path):
+        with self.storage.lock:
+            if self.storage.files.pop(self.canonicalize(path), None) is None:
+                return SFTP_NO_SUCH_FILE
+        return SFTP_OK
+
+    def rename(self, oldpath, newpath):
+        with self.storage.lock:
+            size = self.storage.files.pop(self.canonicalize(oldpath), None)
+            if size is None:
+                return SFTP_NO_SUCH_FILE
+            self.storage.files[self.canonicalize(newpath)] = size
+        return SFTP_OK
+
+    posix_rename = rename
+
+    def mkdir(self, path, attr):
+        with self.storage.lock:
+            self.storage.folders.add(self.canonicalize(path))
+        return SFTP_OK
+
+    def rmdir(self, path):
+        with self.storage.lock:
+            self.storage.folders.discard(self.canonicalize(path))
+        return SFTP_OK
+
+    def chattr(self, path, attr):
+        return SFTP_OK
+
+
+class _PasswordServer(ServerInterface):
+    def __init__(self, username, password):
+        self.username = username
+        self.password = password
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        if (username, password) == (self.username, self.password):
+            return AUTH_SUCCESSFUL
+        return AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        return OPEN_SUCCEEDED
+
+
+class FakeSftpServer:
+    """SFTP server listening on the loopback interface, discarding uploaded data."""
+
+    def __init__(self, username="benchmark", password="benchmark", bucket=None):
+        """
+        Args:
+            username (str): Accepted user name.
+            password (str): Accepted password.
+            bucket (TokenBucket): Limits the receiving bandwidth, if set.
+        """
+        self.username = username
+        self.password = password
+        self.bucket = bucket
+        self.storage = _SinkStorage()
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self._socket = None
+        self._transports = []
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._socket.getsockname()[1]
+
+    def start(self):
+        """Listen on a free port of 127.0.0.1 and accept connections in a thread."""
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen(16)
+        self._thread = threading.Thread(
+            target=self._accept, name="eqp_backup_fake_sftp", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _address = self._socket.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(connection)
+            transport.add_server_key(self.host_key)
+            transport.set_subsystem_handler(
+                "sftp", SFTPServer, _SinkSFTPInterface, self.storage, self.bucket
+            )
+            try:
+                transport.start_server(
+                    server=_PasswordServer(self.username, self.password)
+                )
+            except (paramiko.SSHException, EOFError) as e:
+                _logger.warning("Benchmark SFTP connection failed: %s", e)
+                continue
+            self._transports.append(transport)
+
+    def stop(self):
+        """Stop accepting connections and close the open ones."""
+        if self._socket:
+            self._socket.close()
+        for transport in self._transports:
+            transport.close()
+        self._transports = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""Benchmark of the backup pipeline: throughput, peak memory and temporary disk.
+
+A synthetic database and filestore (see `dataset.py`) are backed up with every
+combination of the requested backup formats, codecs, providers, chunk sizes and
+upload modes. The providers are local stand-ins: a paramiko SFTP server on the
+loopback interface and fake Dropbox and Google Drive HTTP endpoints, all of them
+discarding the data they receive, so no account or network is needed.
+
+Each scenario runs in its own process (like the backup workers) so the peak memory
+of a scenario is not inherited from the previous ones. The dataset is generated from
+a seed and the results (medians of `--repeat` runs) are written as JSON with the
+environment they were measured in: two versions of the module are compared with
+`--compare previous.json`.
+
+Usage (with the Odoo server options, e.g. `-c odoo.conf`):
+
+    python benchmarks/run.py -c odoo.conf -d <database with eqp_backup installed>
+        [--db-size 200] [--filestore-size 500] [--codecs zip_store,tar_zstd]
+        [--providers local,sftp] [--output results.json] [--compare previous.json]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RESULT_PREFIX = "EQP_BACKUP_BENCHMARK_RESULT "
+FORMATS = ("plain", "directory")
+CODECS = ("zip_store", "zip_deflate", "tar_zstd", "native")
+PROVIDERS = ("local", "sftp", "dropbox", "drive")
+MODES = ("spool", "pipelined")
+# Providers uploading in chunks, whose chunk size is part of the scenario
+CHUNKED_PROVIDERS = ("dropbox", "drive")
+# Measures aggregated over the repeated runs
+MEASURES = (
+    "duration",
+    "dump_duration",
+    "archive_duration",
+    "upload_duration",
+    "throughput",
+    "size_in",
+    "size_out",
+    "peak_rss",
+    "peak_rss_delta",
+    "peak_temp_disk",
+)
+
+
+def _csv(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the eqp_backup pipeline against local providers. "
+        "Unknown options are passed to the Odoo configuration.",
+    )
+    parser.add_argument(
+        "-d",
+        "--database",
+        required=True,
+        help="Database with eqp_backup installed, hosting the benchmark records.",
+    )
+    parser.add_argument(
+        "--dataset-db",
+        default="eqp_backup_benchmark",
+        help="Name of the synthetic database (dropped and recreated).",
+    )
+    parser.add_argument("--db-size", type=float, default=100, help="Database MB.")
+    parser.add_argument("--tables", type=int, default=20, help="Number of tables.")
+    parser.add_argument(
+        "--filestore-size", type=float, default=200, help="Filestore MB."
+    )
+    parser.add_argument(
+        "--file-mix",
+        default="text=0.5,random=0.3,png=0.2",
+        help="Share of the filestore files by kind (text, random, png).",
+    )
+    parser.add_argument(
+        "--file-size",
+        default="4,4096",
+        help="Minimum and maximum filestore file size in KB.",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Dataset random seed.")
+    parser.add_argument("--formats", type=_csv, default=["plain"])
+    parser.add_argument("--codecs", type=_csv, default=list(CODECS))
+    parser.add_argument("--providers", type=_csv, default=["local", "sftp"])
+    parser.add_argument(
+        "--chunk-sizes",
+        type=lambda value: [int(size) for size in _csv(value)],
+        default=[8],
+        help="Chunk sizes in MB of the Dropbox and Google Drive uploads.",
+    )
+    parser.add_argument("--modes", type=_csv, default=list(MODES))
+    parser.add_argument("--dump-jobs", type=int, default=4)
+    parser.add_argument("--upload-workers", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario.")
+    parser.add_argument(
+        "--bandwidth",
+        type=float,
+        default=0,
+        help="Bandwidth of the fake providers in MB/s (0: unlimited).",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0,
+        help="Seconds added to every fake HTTP request.",
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Results JSON file of a previous run.")
+    parser.add_argument(
+        "--keep-dataset",
+        action="store_true",
+        help="Reuse the synthetic database if it exists and keep it afterwards.",
+    )
+    parser.add_argument("--scenario", help=argparse.SUPPRESS)
+    args, odoo_args = parser.parse_known_args(argv)
+
+    for name, values, allowed in (
+        ("format", args.formats, FORMATS),
+        ("codec", args.codecs, CODECS),
+        ("provider", args.providers, PROVIDERS),
+        ("mode", args.modes, MODES),
+    ):
+        unknown = set(values) - set(allowed)
+        if unknown:
+            parser.error(f"Unknown {name}(s): {', '.join(sorted(unknown))}")
+    return args, odoo_args
+
+
+def init_odoo(odoo_args):
+    import odoo
+    from odoo.tools import config
+
+    config.parse_config(odoo_args)
+    odoo.netsvc.init_logger()
+    odoo.modules.module.initialize_sys_path()
+    return odoo
+
+
+def dataset_spec(args):
+    file_size = [float(size) for size in _csv(args.file_size)]
+    return {
+        "db_mb": args.db_size,
+        "tables": args.tables,
+        "filestore_mb": args.filestore_size,
+        "file_mix": args.file_mix,
+        "file_size_kb": (file_size[0], file_size[-1]),
+        "seed": args.seed,
+    }
+
+
+def scenarios(args):
+    """Yield the scenario of every requested combination."""
+    for backup_format, codec, provider, mode in itertools.product(
+        args.formats, args.codecs, args.providers, args.modes
+    ):
+        chunk_sizes = args.chunk_sizes if provider in CHUNKED_PROVIDERS else [0]
+        for chunk_size in chunk_sizes:
+            name = f"{backup_format}/{codec}/{provider}/{mode}"
+            if provider in CHUNKED_PROVIDERS:
+                name += f"/{chunk_size}MB"
+            yield {
+                "name": name,
+                "format": backup_format,
+                "codec": codec,
+                "provider": provider,
+                "mode": mode,
+                "chunk_size": chunk_size,
+            }
+
+
+# ---------------------------------------------------------------------------
+# Scenario process
+# ---------------------------------------------------------------------------
+
+
+def run_scenario(args, scenario):
+    """Back up the dataset once as described by `scenario` and return the measures."""
+    from odoo import SUPERUSER_ID, api
+    from odoo.modules.registry import Registry
+
+    from odoo.addons.eqp_backup.benchmarks.fake_providers import provider_client
+    from odoo.addons.eqp_backup.tools.metrics import ResourceMonitor, current_rss
+    from odoo.addons.eqp_backup.tools.throttle import TokenBucket
+
+    bucket = TokenBucket(args.bandwidth * 1024 * 1024) if args.bandwidth else None
+    provider = scenario["provider"]
+    registry = Registry(args.database)
+    with registry.cursor() as cr, tempfile.TemporaryDirectory() as local_dir:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        server = env["backup.server"].new(
+            {
+                "name": "Benchmark",
+                "backup_type": provider,
+                "destination_path": local_dir if provider == "local" else "/benchmark/",
+                "server_address": "127.0.0.1",
+                "server_port": str(scenario.get("sftp_port") or 22),
+                "server_user": "benchmark",
+                "server_password": "benchmark",
+                "parent_folder": "benchmark",
+            }
+        )
+        record = env["backup.record"].new(
+            {
+                "name": "Benchmark",
+                "db_name": args.dataset_db,
+                "type": "full",
+                "backup_format": scenario["format"],
+                "dump_jobs": args.dump_jobs,
+                "compression": scenario["codec"],
+                "filestore_mode": "full",
+                "server_id": server.id,
+                "chunk_size": scenario["chunk_size"],
+                "upload_workers": args.upload_workers,
+                "pipelined_upload": scenario["mode"] == "pipelined",
+            }
+        )
+        extension = record._get_backup_extension()
+        file_name = f"Backup_Benchmark.{extension}"
+        stats = {}
+        rss_before = current_rss()
+        started = time.monotonic()
+        with provider_client(server, bucket, args.latency) as client, ResourceMonitor(
+            [tempfile.gettempdir(), local_dir]
+        ) as monitor:
+            artifact = record._backup_and_upload(
+                extension,
+                lambda stream: server.upload_backup(
+                    client,
+                    stream,
+                    file_name,
+                    chunk_size=scenario["chunk_size"],
+                    workers=args.upload_workers,
+                ),
+                client=client,
+                stats=stats,
+            )
+        duration = time.monotonic() - started
+        cr.rollback()
+
+    peak_temp_disk = monitor.peak_disk
+    if provider == "local":
+        # The backup itself is not temporary
+        peak_temp_disk = max(peak_temp_disk - artifact["size"], 0)
+    return {
+        "duration": duration,
+        "dump_duration": stats.get("dump_duration", 0.0),
+        "archive_duration": stats.get("archive_duration", 0.0),
+        "upload_duration": stats.get("upload_duration", 0.0),
+        "throughput": stats.get("bytes_in", 0) / 1024 / 1024 / max(duration, 1e-6),
+        "size_in": stats.get("bytes_in", 0),
+        "size_out": artifact["size"],
+        "peak_rss": monitor.peak_rss,
+        "peak_rss_delta": max(monitor.peak_rss - rss_before, 0),
+        "peak_temp_disk": peak_temp_disk,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Main process
+# ---------------------------------------------------------------------------
+
+
+def spawn_scenario(argv, scenario):
+    """Run a scenario in a new process and return its measures."""
+    process = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), *argv]
+        + ["--scenario", json.dumps(scenario)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    for line in process.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(
+        f"Scenario {scenario['name']} failed (exit code {process.returncode})"
+    )
+
+
+def describe_environment(odoo, args, dataset):
+    from odoo.modules.module import get_manifest
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "odoo": odoo.release.version,
+        "eqp_backup": get_manifest("eqp_backup").get("version"),
+        "dataset": {**dataset_spec(args), **dataset},
+        "repeat": args.repeat,
+        "dump_jobs": args.dump_jobs,
+        "upload_workers": args.upload_workers,
+        "bandwidth": args.bandwidth,
+        "latency": args.latency,
+    }
+
+
+def aggregate(runs):
+    """Return the median of each measure over the runs of a scenario."""
+    return {
+        measure: statistics.median(run[measure] for run in runs) for measure in MEASURES
+    }
+
+
+def print_report(results, previous=None):
+    previous = {
+        result["name"]: result["measures"]
+        for result in (previous or {}).get("results", [])
+    }
+    header = (
+        f"{'Scenario':<44} {'Time (s)':>9} {'MB/s':>8} {'Ratio':>6} "
+        f"{'Peak RSS':>10} {'Temp disk':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        measures = result["measures"]
+        ratio = measures["size_in"] / (measures["size_out"] or measures["size_in"] or 1)
+        line = (
+            f"{result['name']:<44} {measures['duration']:>9.2f} "
+            f"{measures['throughput']:>8.2f} {ratio:>6.2f} "
+            f"{measures['peak_rss'] / 1024 / 1024:>8.1f}MB "
+            f"{measures['peak_temp_disk'] / 1024 / 1024:>8.1f}MB"
+        )
+        before = previous.get(result["name"])
+        if before and before["duration"]:
+            change = (measures["duration"] - before["duration"]) / before["duration"]
+            line += f"  ({change:+.1%} time vs previous)"
+        print(line)
+
+
+def main(argv):
+    args, odoo_args = parse_args(argv)
+    odoo = init_odoo(odoo_args)
+
+    if args.scenario:
+        result = run_scenario(args, json.loads(args.scenario))
+        print(RESULT_PREFIX + json.dumps(result), flush=True)
+        return 0
+
+    from odoo.addons.eqp_backup.benchmarks import dataset as benchmark_dataset
+    from odoo.addons.eqp_backup.benchmarks.fake_sftp import FakeSftpServer
+    from odoo.addons.eqp_backup.tools.throttle import TokenBucket
+
+    from odoo.service import db
+
+    if args.keep_dataset and args.dataset_db in db.list_dbs(True):
+        dataset = {}
+    else:
+        print(f"Generating the dataset {args.dataset_db}...", flush=True)
+        dataset = benchmark_dataset.create_dataset(args.dataset_db, dataset_spec(args))
+
+    bucket = TokenBucket(args.bandwidth * 1024 * 1024) if args.bandwidth else None
+    results = []
+    try:
+        with FakeSftpServer(bucket=bucket) as sftp_server:
+            for scenario in scenarios(args):
+                scenario["sftp_port"] = sftp_server.port
+                runs = [spawn_scenario(argv, scenario) for _run in range(args.repeat)]
+                results.append(
+                    {
+                        "name": scenario.pop("name"),
+                        "scenario": {
+                            key: value
+                            for key, value in scenario.items()
+                            if key != "sftp_port"
+                        },
+                        "measures": aggregate(runs),
+                        "runs": runs,
+                    }
+                )
+                print(f"{results[-1]['name']}: done", flush=True)
+    finally:
+        if not args.keep_dataset:
+            benchmark_dataset.drop_dataset(args.dataset_db)
+
+    output = {
+        "environment": describe_environment(odoo, args, dataset),
+        "results": results,
+    }
+    previous = None
+    if args.compare:
+        with open(args.compare) as file:
+            previous = json.load(file)
+    print_report(results, previous)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(output, file, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 
+from . import backup_artifact
+from . import backup_chunk
+from . import backup_destination
+from . import backup_drive_upload
+from . import backup_execution
+from . import backup_job
 from . import backup_record
 from . import backup_server
+from . import backup_throttle_window
 from . import res_config_settings
 from . import res_company
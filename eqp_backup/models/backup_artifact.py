@@ -0,0 +1,541 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import os
+import re
+import odoo
+import time
+import shutil
+import logging
+import tempfile
+import subprocess
+
+from contextlib import ExitStack, closing
+
+from psycopg2 import sql
+
+from odoo import api, models, fields, tools, SUPERUSER_ID
+from odoo.exceptions import ValidationError
+from odoo.modules.neutralize import neutralize_database
+from odoo.service import db
+from odoo.tools import config, find_pg_tool, exec_pg_environ
+
+from ..tools.dedup import DEDUP_INDEX_EXTENSION
+from ..tools.pipe import run_pipeline
+from ..tools.restore import BackupExtractor, member_path
+from ..tools.retention import parse_backup_name
+
+_logger = logging.getLogger(__name__)
+
+# Characters of the restore tool messages reported when a restore fails
+RESTORE_LOG_TAIL = 2000
+
+
+def drop_database(db_name):
+    """Drop a database and its filestore, terminating its connections first.
+
+    Unlike `odoo.service.db.exp_drop`, it does not require the database manager to be
+    enabled (`list_db`), so the restores and drills clean up on hardened servers too.
+
+    Returns:
+        bool: Whether the database existed.
+    """
+    if db_name not in db.list_dbs(True):
+        return False
+    odoo.modules.registry.Registry.delete(db_name)
+    odoo.sql_db.close_db(db_name)
+    with closing(odoo.sql_db.db_connect("postgres").cursor()) as cr:
+        # DROP DATABASE cannot run inside a transaction
+        cr._cnx.autocommit = True
+        cr.execute(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+            "WHERE datname = %s AND pid != pg_backend_pid()",
+            [db_name],
+        )
+        cr.execute(sql.SQL("DROP DATABASE {}").format(sql.Identifier(db_name)))
+    filestore = config.filestore(db_name)
+    if os.path.exists(filestore):
+        shutil.rmtree(filestore)
+    return True
+
+
+def _restore_command(db_name, dump_kind, dump_path, jobs=1):
+    """Return the command restoring an extracted database dump into `db_name`.
+
+    Plain SQL dumps are replayed by psql, in a single session. The custom and
+    directory formats are restored by `pg_restore --jobs`, which needs the dump to
+    be a file (or a folder), hence the extraction before the restore.
+    """
+    if dump_kind == "sql":
+        return [
+            find_pg_tool("psql"),
+            f"--dbname={db_name}",
+            "--quiet",
+            # Without it psql goes on after a failed statement and exits with 0
+            "--variable=ON_ERROR_STOP=1",
+            f"--file={dump_path}",
+        ]
+    return [
+        find_pg_tool("pg_restore"),
+        "--no-owner",
+        f"--dbname={db_name}",
+        f"--jobs={max(jobs, 1)}",
+        dump_path,
+    ]
+
+
+class BackupArtifact(models.Model):
+    """Catalog of the backup archives stored on the backup servers."""
+
+    _name = "backup.artifact"
+    _description = "Backup Artifacts"
+    _order = "date desc, id desc"
+
+    name = fields.Char(string="File Name", required=True, readonly=True, index=True)
+    record_id = fields.Many2one(
+        "backup.record",
+        string="Backup Record",
+        required=True,
+        readonly=True,
+        index=True,
+        ondelete="cascade",
+    )
+    server_id = fields.Many2one(
+        "backup.server",
+        string="Server",
+        required=True,
+        readonly=True,
+        index=True,
+        ondelete="cascade",
+    )
+    company_id = fields.Many2one(related="record_id.company_id", store=True, index=True)
+    server_type = fields.Selection(related="server_id.backup_type", string="Server Type")
+    db_name = fields.Char(string="Database Name", readonly=True)
+    type = fields.Selection(
+        [
+            ("fs", "Only FileStore"),
+            ("db", "Only DataBase"),
+            ("full", "Full BackUp (DB + FileStore)"),
+        ],
+        string="Backup Type",
+        readonly=True,
+    )
+    date = fields.Datetime(
+        string="Date", required=True, readonly=True, index=True, help="Backup date."
+    )
+    path = fields.Char(
+        string="Path", readonly=True, help="Full path of the file on the server."
+    )
+    provider_file_id = fields.Char(
+        string="Provider File ID",
+        readonly=True,
+        help="File ID given by Google Drive or Dropbox.",
+    )
+    size = fields.Float(string="Size (MB)", digits=(16, 2), readonly=True)
+    checksum = fields.Char(string="Checksum", readonly=True)
+    checksum_type = fields.Selection(
+        [
+            ("sha256", "SHA-256"),
+            ("md5", "MD5"),
+            ("dropbox", "Dropbox Content Hash"),
+        ],
+        string="Checksum Type",
+        readonly=True,
+    )
+    integrity_state = fields.Selection(
+        [
+            ("verified", "Verified"),
+            ("size", "Size Only"),
+            ("mismatch", "Mismatch"),
+            ("unverified", "Not Verified"),
+        ],
+        string="Integrity",
+        readonly=True,
+        help="Check of the uploaded file against the backup generated:\n"
+        "- Verified: The checksum reported by the server (or the CRC of each member "
+        "of a local ZIP archive) matches.\n"
+        "- Size Only: The server reports no checksum, only the size was compared.\n"
+        "- Mismatch: The uploaded file differs from the generated backup.\n"
+        "- Not Verified: Nothing could be compared (e.g. resumed upload).",
+    )
+    integrity_msg = fields.Char(string="Integrity Check", readonly=True)
+    restore_date = fields.Datetime(
+        string="Last Restore", readonly=True, help="Date of the last restore."
+    )
+    restore_duration = fields.Float(
+        string="Time to Restore (s)",
+        readonly=True,
+        help="Duration of the last restore, from the start of the download until the "
+        "restored database was ready.",
+    )
+    duration = fields.Float(
+        string="Duration (s)",
+        readonly=True,
+        help="Time spent generating and uploading the backup.",
+    )
+    state = fields.Selection(
+        [
+            ("present", "Present"),
+            ("deleted", "Deleted"),
+            ("missing", "Missing"),
+        ],
+        string="State",
+        required=True,
+        default="present",
+        readonly=True,
+        index=True,
+        help="- Present: The file is stored on the server.\n"
+        "- Deleted: The file was deleted by the retention policy.\n"
+        "- Missing: The file was not found on the server by the last reconciliation.",
+    )
+
+    _sql_constraints = [
+        (
+            "name_server_unique",
+            "unique(name, server_id)",
+            "A backup file can only be cataloged once per server.",
+        ),
+    ]
+
+    def init(self):
+        # Retention and dashboards look for the latest artifacts of a record
+        tools.create_index(
+            self._cr,
+            "backup_artifact_record_date_index",
+            self._table,
+            ["record_id", "date DESC"],
+        )
+
+    @api.model
+    def _values_from_listing(self, record, backup, server=None):
+        """Return the catalog values of a backup listed by `BackupServer.list_backups`.
+
+        Args:
+            record (backup.record): Record owning the backup.
+            backup (dict): Listed backup.
+            server (backup.server): Server storing the backup (the record server by
+                default).
+
+        Returns:
+            dict: Values to create the artifact.
+        """
+        server = server or record.server_id
+        values = {
+            "name": backup["name"],
+            "record_id": record.id,
+            "server_id": server.id,
+            "db_name": record.db_name,
+            "type": record.type,
+            "date": backup.get("modified") or fields.Datetime.now(),
+            "path": backup.get("path"),
+            "size": (backup.get("size") or 0) / 1024 / 1024,
+            "state": "present",
+        }
+        if server.backup_type in ("drive", "dropbox"):
+            values["provider_file_id"] = backup.get("id")
+        return values
+
+    def _to_backup(self):
+        """Return the artifact as a `BackupServer.list_backups` entry."""
+        self.ensure_one()
+        parsed = parse_backup_name(self.name)
+        return {
+            "name": self.name,
+            "path": self.path,
+            "id": self.provider_file_id or self.path,
+            "size": self.size * 1024 * 1024,
+            "date": parsed[1] if parsed else self.date,
+            "artifact": self,
+        }
+
+    def reconcile_record(self, record, client, server=None):
+        """Synchronize the catalog of a record with the files stored on a server.
+
+        Files not cataloged yet are added; cataloged files no longer found are marked
+        as missing.
+
+        Args:
+            record (backup.record): Record to reconcile.
+            client (object): Connected provider client (None for Local servers).
+            server (backup.server): Destination to reconcile (the record server by
+                default).
+
+        Returns:
+            tuple: Number of added and missing artifacts.
+        """
+        server = server or record.server_id
+        remote_backups = {
+            backup["name"]: backup for backup in server.list_backups(client, record.db_name)
+        }
+        artifacts = self.search(
+            [("server_id", "=", server.id), ("name", "in", list(remote_backups))]
+        )
+        known_names = set(artifacts.mapped("name"))
+        # Files deleted outside Odoo, or archives listed again after being marked missing
+        artifacts.filtered(lambda artifact: artifact.state != "present").write(
+            {"state": "present"}
+        )
+        new_values = [
+            self._values_from_listing(record, backup, server)
+            for name, backup in remote_backups.items()
+            if name not in known_names
+        ]
+        self.create(new_values)
+
+        missing = self.search(
+            [
+                ("record_id", "=", record.id),
+                ("server_id", "=", server.id),
+                ("state", "=", "present"),
+                ("name", "not in", list(remote_backups)),
+            ]
+        )
+        missing.write({"state": "missing"})
+        return len(new_values), len(missing)
+
+    def action_restore(self):
+        """Open the wizard restoring the backup into a new database."""
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_window",
+            "name": "Restore Backup",
+            "res_model": "backup.restore.wizard",
+            "view_mode": "form",
+            "target": "new",
+            "context": {"default_artifact_id": self.id},
+        }
+
+    def _check_restore(self, db_name):
+        """Check the backup can be restored into the new database `db_name`.
+
+        Raises:
+            ValidationError: If the backup is not available or holds no database, or
+                if the database name is invalid or already used.
+        """
+        self.ensure_one()
+        if self.state != "present" or not parse_backup_name(self.name):
+            raise ValidationError(f"The backup {self.name} is not available.")
+        if self.type == "fs":
+            raise ValidationError("A filestore backup holds no database to restore.")
+        if not re.match(db.DBNAME_PATTERN, db_name or ""):
+            raise ValidationError(f"Invalid database name: {db_name}")
+        if db.exp_db_exist(db_name):
+            raise ValidationError(f"The database {db_name} already exists.")
+
+    def _restore(self, db_name, jobs=1, new_uuid=True, neutralize=False):
+        """Restore the backup into a new database, streaming it from its server.
+
+        TAR archives and Native dumps are extracted while they are downloaded; ZIP
+        archives are downloaded to the spool folder first (local ones are read in
+        place). The database dump is restored in the background while the filestore
+        is extracted into the filestore of the new database.
+
+        Args:
+            db_name (str): Name of the database to create.
+            jobs (int): `pg_restore` jobs and filestore extraction threads.
+            new_uuid (bool): Give the new database its own UUID (a copy, not a move).
+            neutralize (bool): Neutralize the new database (mail servers, crons...).
+
+        Returns:
+            dict: Restore statistics: total "duration", "transfer_duration" (download
+            and extraction), "database_duration", "files" and "filestore_bytes".
+
+        Raises:
+            ValidationError: If the backup cannot be restored. The new database is
+                dropped.
+        """
+        self.ensure_one()
+        self._check_restore(db_name)
+        parsed = parse_backup_name(self.name)
+
+        started = time.monotonic()
+        _logger.info("Restoring %s into the new database %s", self.name, db_name)
+        db._create_empty_database(db_name)
+        try:
+            stats = self._restore_backup(db_name, parsed[2], jobs)
+            registry = odoo.modules.registry.Registry.new(db_name)
+            with registry.cursor() as cr:
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                if new_uuid:
+                    env["ir.config_parameter"].init(force=True)
+                if neutralize:
+                    neutralize_database(cr)
+        except Exception:
+            _logger.exception("Restore of %s failed", self.name)
+            drop_database(db_name)
+            raise
+
+        stats["duration"] = time.monotonic() - started
+        self.write(
+            {
+                "restore_date": fields.Datetime.now(),
+                "restore_duration": stats["duration"],
+            }
+        )
+        return stats
+
+    def _restore_backup(self, db_name, extension, jobs):
+        """Download and extract the backup, restoring its dump into `db_name`."""
+        server = self.server_id
+        record = self.record_id
+        spool_dir = record._get_spool_dir()
+        filestore = config.filestore(db_name)
+        backup = self._to_backup()
+        download_options = {
+            "chunk_size": record.chunk_size,
+            "retries": record.upload_retries,
+        }
+        # The download runs in a thread, which cannot read the server settings
+        server.prefetch_upload_settings()
+        started = time.monotonic()
+        restore = {}
+
+        with ExitStack() as stack:
+            client = stack.enter_context(server.provider_client())
+            dump_dir = stack.enter_context(tempfile.TemporaryDirectory(dir=spool_dir))
+            restore_log = stack.enter_context(tempfile.TemporaryFile(dir=spool_dir))
+
+            def start_restore(dump_kind, dump_path):
+                restore["started"] = time.monotonic()
+                restore["process"] = subprocess.Popen(
+                    _restore_command(db_name, dump_kind, dump_path, jobs),
+                    env=exec_pg_environ(),
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=restore_log,
+                )
+
+            extractor = BackupExtractor(dump_dir, filestore, start_restore, jobs)
+            try:
+                if extension == DEDUP_INDEX_EXTENSION:
+                    # Reassembled (and verified) from the chunk store first
+                    zip_path = os.path.join(dump_dir, "archive.zip")
+                    with open(zip_path, "wb") as target:
+                        server.download_dedup_backup(client, backup, target)
+                    extractor.extract_zip(zip_path)
+                elif extension == "zip" and server.backup_type == "local":
+                    extractor.extract_zip(self.path)
+                elif extension == "zip":
+                    zip_path = os.path.join(dump_dir, self.name)
+                    with open(zip_path, "wb") as target:
+                        server.download_backup(
+                            client, backup, target, **download_options
+                        )
+                    extractor.extract_zip(zip_path)
+                else:
+                    run_pipeline(
+                        lambda target: server.download_backup(
+                            client, backup, target, **download_options
+                        ),
+                        lambda stream: extractor.extract_stream(stream, extension),
+                        record.pipe_buffer_size * 1024 * 1024,
+                    )
+                if extractor.snapshot is not None:
+                    self._restore_filestore_blobs(client, extractor.snapshot, filestore)
+                transfer_duration = time.monotonic() - started
+                if not extractor.dump_kind:
+                    raise ValidationError(
+                        f"The backup {self.name} holds no database dump."
+                    )
+                return_code = restore["process"].wait()
+            finally:
+                process = restore.get("process")
+                if process and process.poll() is None:
+                    process.kill()
+                    process.wait()
+
+            if return_code:
+                restore_log.seek(0, os.SEEK_END)
+                restore_log.seek(max(restore_log.tell() - RESTORE_LOG_TAIL, 0))
+                messages = restore_log.read().decode(errors="replace")
+                raise ValidationError(f"The database restore failed:\n{messages}")
+
+        return {
+            "transfer_duration": transfer_duration,
+            "database_duration": time.monotonic() - restore["started"],
+            "files": extractor.files,
+            "filestore_bytes": extractor.filestore_bytes,
+            "dump_kind": extractor.dump_kind,
+        }
+
+    def _restore_filestore_blobs(self, client, snapshot, filestore):
+        """Download the blobs of an incremental filestore snapshot into `filestore`.
+
+        Each blob is downloaded once, then copied to the other files sharing it.
+        """
+        server = self.server_id
+        location = server.get_blobs_location(client)
+        paths_by_blob = {}
+        for relative_path, blob_hash in snapshot["files"].items():
+            paths_by_blob.setdefault(blob_hash, []).append(
+                member_path(filestore, relative_path)
+            )
+        for blob_hash, paths in paths_by_blob.items():
+            for path in paths:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            server.download_filestore_blob(client, location, blob_hash, paths[0])
+            for path in paths[1:]:
+                shutil.copyfile(paths[0], path)
+
+    def _format_restore_stats(self, db_name, stats):
+        """Return a human readable summary of the restore statistics."""
+        self.ensure_one()
+        size = self.size
+        return (
+            f"Database {db_name} restored from {self.name} in {stats['duration']:.1f}s "
+            f"({size / max(stats['duration'], 1e-6):.2f} MB/s): download and "
+            f"extraction {stats['transfer_duration']:.1f}s, database restore "
+            f"{stats['database_duration']:.1f}s, {stats['files']} filestore files "
+            f"({stats['filestore_bytes'] / 1024 / 1024:.2f} MB)."
+        )
+
+    @api.model
+    def _cron_reconcile(self):
+        """Reconcile the catalog of every confirmed backup record with its servers."""
+        records = self.env["backup.record"].search([("state", "=", "confirmed")])
+        records_by_server = {}
+        for record in records:
+            for server in record._get_destination_servers():
+                records_by_server.setdefault(server, records.browse())
+                records_by_server[server] |= record
+        for server, server_records in records_by_server.items():
+            try:
+                with server.provider_client() as client:
+                    for record in server_records:
+                        added, missing = self.reconcile_record(record, client, server)
+                        if added or missing:
+                            _logger.info(
+                                "Backup catalog of record %s reconciled: "
+                                "%s artifacts added, %s missing",
+                                record.id,
+                                added,
+                                missing,
+                            )
+                self.env.cr.commit()
+            except Exception as e:
+                self.env.cr.rollback()
+                _logger.error(
+                    "Failed to reconcile the backup catalog of server %s: %s",
+                    server.name,
+                    e,
+                )
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import logging
+
+from psycopg2.extras import execute_values
+
+from odoo import api, models, fields
+
+_logger = logging.getLogger(__name__)
+
+
+class BackupChunk(models.Model):
+    """Chunks of the deduplicated backups, counting the backups referencing them."""
+
+    _name = "backup.chunk"
+    _description = "Backup Chunks"
+    _order = "id"
+
+    name = fields.Char(string="SHA-256", required=True, readonly=True)
+    server_id = fields.Many2one(
+        "backup.server",
+        string="Server",
+        required=True,
+        readonly=True,
+        ondelete="cascade",
+    )
+    store = fields.Char(
+        string="Chunk Store",
+        required=True,
+        readonly=True,
+        help="Folder of the chunk store, relative to the server destination path.",
+    )
+    size = fields.Integer(
+        string="Stored Size (bytes)",
+        readonly=True,
+        help="Compressed size of the chunk (0 if it was stored before being counted).",
+    )
+    ref_count = fields.Integer(
+        string="References",
+        readonly=True,
+        help="Number of stored backups made of this chunk. The chunk is deleted from "
+        "the server once no backup references it.",
+    )
+
+    _sql_constraints = [
+        (
+            "name_store_unique",
+            "unique(server_id, store, name)",
+            "A chunk can only be counted once per chunk store.",
+        ),
+    ]
+
+    @api.model
+    def _add_references(self, server, index):
+        """Count a new backup referencing the chunks of its snapshot index.
+
+        Args:
+            server (backup.server): Server storing the backup.
+            index (dict): Snapshot index returned by `BackupServer.upload_dedup_backup`.
+        """
+        new_chunks = index.get("new_chunks") or {}
+        chunks = {
+            chunk_hash: new_chunks.get(chunk_hash, 0)
+            for chunk_hash, _size in index["chunks"]
+        }
+        if not chunks:
+            return
+        now = fields.Datetime.now()
+        uid = self.env.uid
+        execute_values(
+            self.env.cr._obj,
+            """
+            INSERT INTO backup_chunk
+                (server_id, store, name, size, ref_count,
+                 create_uid, create_date, write_uid, write_date)
+            VALUES %s
+            ON CONFLICT (server_id, store, name) DO UPDATE
+            SET ref_count = backup_chunk.ref_count + 1,
+                size = GREATEST(backup_chunk.size, EXCLUDED.size),
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+            """,
+            [
+                (server.id, index["store"], chunk_hash, size, 1, uid, now, uid, now)
+                for chunk_hash, size in chunks.items()
+            ],
+            page_size=1000,
+        )
+        self.invalidate_model(["size", "ref_count"])
+
+    @api.model
+    def _release_references(self, server, client, index):
+        """Uncount a deleted backup and delete the chunks no backup references anymore.
+
+        Args:
+            server (backup.server): Server which stored the backup.
+            client (object): Connected provider client (None for Local servers).
+            index (dict): Snapshot index of the deleted backup.
+
+        Returns:
+            tuple: Number and stored size of the deleted chunks.
+        """
+        store = index["store"]
+        chunk_hashes = list({chunk_hash for chunk_hash, _size in index["chunks"]})
+        self.env.cr.execute(
+            """
+            UPDATE backup_chunk SET ref_count = ref_count - 1
+            WHERE server_id = %s AND store = %s AND name = ANY(%s) AND ref_count > 0
+            """,
+            [server.id, store, chunk_hashes],
+        )
+        self.invalidate_model(["ref_count"])
+        # Chunks left over by an interrupted collection are deleted as well
+        garbage = self.search(
+            [
+                ("server_id", "=", server.id),
+                ("store", "=", store),
+                ("ref_count", "<=", 0),
+            ]
+        )
+        if not garbage:
+            return 0, 0
+        server.delete_chunks(
+            client, server.get_destination_path() + store, garbage.mapped("name")
+        )
+        freed = sum(garbage.mapped("size"))
+        count = len(garbage)
+        garbage.unlink()
+        _logger.info(
+            "Chunk store %s of %s: %s unreferenced chunks deleted (%s bytes)",
+            store,
+            server.name,
+            count,
+            freed,
+        )
+        return count, freed
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+from odoo import api, models, fields
+from odoo.exceptions import ValidationError
+
+
+class BackupDestination(models.Model):
+    """Additional servers receiving the backups of a record."""
+
+    _name = "backup.destination"
+    _description = "Backup Record Additional Destinations"
+    _order = "sequence, id"
+
+    sequence = fields.Integer(string="Sequence", default=10)
+    record_id = fields.Many2one(
+        "backup.record",
+        string="Backup Record",
+        required=True,
+        index=True,
+        ondelete="cascade",
+    )
+    server_id = fields.Many2one(
+        "backup.server",
+        string="Server",
+        required=True,
+        index=True,
+        ondelete="restrict",
+        help="Select a Backup server (Only Confirmed Servers can be used).",
+    )
+    server_type = fields.Selection(
+        related="server_id.backup_type", string="Server Type"
+    )
+    company_id = fields.Many2one(
+        related="record_id.company_id", string="Company", store=True, index=True
+    )
+    last_result_type = fields.Selection(
+        [("success", "Success"), ("danger", "Failure")],
+        string="Last Result",
+        readonly=True,
+        copy=False,
+        help="Result of the last upload of a backup to this destination.",
+    )
+    last_result_msg = fields.Text(
+        string="Last Result Details", readonly=True, copy=False
+    )
+    last_attempts = fields.Integer(
+        string="Last Attempts",
+        readonly=True,
+        copy=False,
+        help="Number of upload attempts made by the last backup.",
+    )
+    last_success_date = fields.Datetime(
+        string="Last Success", readonly=True, copy=False
+    )
+
+    _sql_constraints = [
+        (
+            "record_server_unique",
+            "unique(record_id, server_id)",
+            "A server can only be added once as a destination of a record.",
+        ),
+    ]
+
+    @api.constrains("record_id", "server_id")
+    def _check_server(self):
+        for destination in self:
+            if destination.server_id == destination.record_id.server_id:
+                raise ValidationError(
+                    f"The server {destination.server_id.name} is already the main "
+                    "server of the record."
+                )
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+from odoo import api, models, fields
+
+
+class BackupDriveUpload(models.Model):
+    """Resumable Google Drive uploads left unfinished by a backup run."""
+
+    _name = "backup.drive.upload"
+    _description = "Backup Google Drive Resumable Uploads"
+
+    record_id = fields.Many2one(
+        "backup.record",
+        string="Backup Record",
+        required=True,
+        readonly=True,
+        ondelete="cascade",
+    )
+    session_uri = fields.Char(
+        string="Resumable Session",
+        readonly=True,
+        help="Resumable session URI, set once Google Drive accepted the first chunk.",
+    )
+    spool_path = fields.Char(
+        string="Spool File",
+        readonly=True,
+        help="Local copy of the backup being uploaded.",
+    )
+    file_name = fields.Char(string="File Name", readonly=True)
+
+    _sql_constraints = [
+        (
+            "record_unique",
+            "unique(record_id)",
+            "A backup record has a single unfinished Google Drive upload.",
+        ),
+    ]
+
+    @api.model
+    def _save_state(self, record, session_uri=False, spool_path=False, file_name=False):
+        """Save (or clear, without spool file) the upload state of a backup record.
+
+        The state is written and committed by its own cursor. The transaction of the
+        backup run never updates these rows, so both transactions cannot conflict,
+        and the run can still be rolled back as a whole.
+
+        Args:
+            record (backup.record): Backup record being uploaded.
+            session_uri (str): Resumable session URI, if already created.
+            spool_path (str): Path of the spooled backup.
+            file_name (str): Name of the backup file.
+        """
+        with self.env.registry.cursor() as cr:
+            uploads = self.env(cr=cr)[self._name].sudo()
+            upload = uploads.search([("record_id", "=", record.id)])
+            if not spool_path:
+                upload.unlink()
+                return
+            values = {
+                "session_uri": session_uri,
+                "spool_path": spool_path,
+                "file_name": file_name,
+            }
+            if upload:
+                upload.write(values)
+            else:
+                uploads.create(dict(values, record_id=record.id))
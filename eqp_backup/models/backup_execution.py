@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import logging
+
+from datetime import timedelta
+
+from odoo import api, models, fields, tools
+from odoo.exceptions import ValidationError
+
+_logger = logging.getLogger(__name__)
+
+# Default number of days the execution history is kept
+DEFAULT_EXECUTION_RETENTION_DAYS = 90
+
+
+class BackupExecution(models.Model):
+    """History of the backup executions, with their timings and resource usage."""
+
+    _name = "backup.execution"
+    _description = "Backup Executions"
+    _order = "date_start desc, id desc"
+
+    name = fields.Char(string="Name", compute="_compute_name")
+    kind = fields.Selection(
+        [("backup", "Backup"), ("restore_drill", "Restore Drill")],
+        string="Kind",
+        required=True,
+        default="backup",
+        readonly=True,
+        index=True,
+    )
+    record_id = fields.Many2one(
+        "backup.record",
+        string="Backup Record",
+        required=True,
+        readonly=True,
+        index=True,
+        ondelete="cascade",
+    )
+    server_id = fields.Many2one(
+        "backup.server",
+        string="Server",
+        readonly=True,
+        index=True,
+        ondelete="set null",
+        help="Main server of the record when the backup was executed.",
+    )
+    company_id = fields.Many2one(related="record_id.company_id", store=True, index=True)
+    job_id = fields.Many2one(
+        "backup.job", string="Job", readonly=True, ondelete="set null"
+    )
+    artifact_id = fields.Many2one(
+        "backup.artifact",
+        string="Restored Backup",
+        readonly=True,
+        ondelete="set null",
+        help="Backup restored by the restore drill.",
+    )
+    date_start = fields.Datetime(
+        string="Started on", required=True, readonly=True, index=True
+    )
+    date_end = fields.Datetime(string="Finished on", readonly=True)
+    result_type = fields.Selection(
+        [("success", "Success"), ("warning", "Warning"), ("danger", "Failure")],
+        string="Result Type",
+        readonly=True,
+        index=True,
+    )
+    result_msg = fields.Text(string="Result", readonly=True)
+    codec = fields.Char(string="Compression", readonly=True)
+    destination_count = fields.Integer(
+        string="Destinations", readonly=True, group_operator="avg"
+    )
+    duration = fields.Float(
+        string="Duration (s)",
+        readonly=True,
+        group_operator="avg",
+        help="Total duration of the execution.",
+    )
+    dump_duration = fields.Float(
+        string="Dump (s)",
+        readonly=True,
+        group_operator="avg",
+        help="Time spent dumping the database into the archive.",
+    )
+    archive_duration = fields.Float(
+        string="Archive (s)",
+        readonly=True,
+        group_operator="avg",
+        help="Time spent archiving the filestore and finalizing the archive.",
+    )
+    upload_duration = fields.Float(
+        string="Upload (s)",
+        readonly=True,
+        group_operator="avg",
+        help="Time spent uploading the archive. With the Pipelined Upload it overlaps "
+        "the dump and archive phases.",
+    )
+    prune_duration = fields.Float(
+        string="Prune (s)",
+        readonly=True,
+        group_operator="avg",
+        help="Time spent applying the retention policy.",
+    )
+    transfer_duration = fields.Float(
+        string="Download & Extraction (s)",
+        readonly=True,
+        group_operator="avg",
+        help="Time spent downloading and extracting the restored backup.",
+    )
+    database_duration = fields.Float(
+        string="Database Restore (s)",
+        readonly=True,
+        group_operator="avg",
+        help="Time spent restoring the dump into the scratch database.",
+    )
+    rto_baseline = fields.Float(
+        string="RTO Baseline (s)",
+        readonly=True,
+        help="Median time to restore of the previous drills, the regressions are "
+        "measured against it.",
+    )
+    size_in = fields.Float(
+        string="Data Size (MB)",
+        digits=(16, 2),
+        readonly=True,
+        help="Uncompressed size of the archived data.",
+    )
+    size_out = fields.Float(
+        string="Archive Size (MB)",
+        digits=(16, 2),
+        readonly=True,
+        help="Size of the generated archive.",
+    )
+    compression_ratio = fields.Float(
+        string="Compression Ratio",
+        digits=(16, 2),
+        readonly=True,
+        group_operator="avg",
+    )
+    throughput = fields.Float(
+        string="Throughput (MB/s)",
+        digits=(16, 2),
+        readonly=True,
+        group_operator="avg",
+        help="Data size processed per second over the whole execution.",
+    )
+    stored_size = fields.Float(
+        string="New Chunks (MB)",
+        digits=(16, 2),
+        readonly=True,
+        help="Size of the chunks a deduplicated backup had to store, the others being "
+        "already held by the chunk store.",
+    )
+    checksum = fields.Char(
+        string="SHA-256",
+        readonly=True,
+        help="SHA-256 of the generated backup, computed while it was written.",
+    )
+    peak_temp_disk = fields.Float(
+        string="Peak Temporary Disk (MB)",
+        digits=(16, 2),
+        readonly=True,
+        group_operator="max",
+        help="Largest drop of the free space of the temporary and spool folders.",
+    )
+    peak_rss = fields.Float(
+        string="Peak Memory (MB)",
+        digits=(16, 2),
+        readonly=True,
+        group_operator="max",
+        help="Largest resident memory of the process executing the backup.",
+    )
+
+    def init(self):
+        # Graphs and regressions look at the history of a record over time
+        tools.create_index(
+            self._cr,
+            "backup_execution_record_date_index",
+            self._table,
+            ["record_id", "date_start DESC"],
+        )
+
+    def _compute_name(self):
+        for execution in self:
+            execution.name = f"{execution.record_id.name} #{execution.id}"
+
+    def _get_artifacts(self):
+        """Return the backups uploaded by the execution, the main server one first.
+
+        A restore drill returns the backup it restored. The others are found by the
+        SHA-256 of the backup, or by their date for the executions logged without it.
+        """
+        self.ensure_one()
+        if self.artifact_id:
+            return self.artifact_id
+        domain = [("record_id", "=", self.record_id.id), ("state", "=", "present")]
+        if self.checksum:
+            domain.append(("checksum", "=", self.checksum))
+        else:
+            domain += [
+                ("date", ">=", self.date_start),
+                ("date", "<=", self.date_end or fields.Datetime.now()),
+            ]
+        artifacts = self.env["backup.artifact"].search(domain)
+        return artifacts.sorted(lambda artifact: artifact.server_id != self.server_id)
+
+    def action_restore(self):
+        """Open the wizard restoring the backup of the execution."""
+        self.ensure_one()
+        artifacts = self._get_artifacts()
+        if not artifacts:
+            raise ValidationError("No stored backup was found for this execution.")
+        return artifacts[0].action_restore()
+
+    @api.model
+    def _get_retention_days(self):
+        """Return the number of days the executions are kept (0 keeps them forever)."""
+        return int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param(
+                "eqp_backup.execution_retention_days", DEFAULT_EXECUTION_RETENTION_DAYS
+            )
+        )
+
+    @api.model
+    def _cron_prune(self):
+        """Delete the executions older than the configured retention."""
+        days = self._get_retention_days()
+        if days <= 0:
+            return
+        limit_date = fields.Datetime.now() - timedelta(days=days)
+        executions = self.search([("date_start", "<", limit_date)])
+        executions.unlink()
+        if executions:
+            _logger.info(
+                "Backup execution history: %s executions older than %s days deleted",
+                len(executions),
+                days,
+            )
@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import os
+import sys
+import json
+import socket
+import logging
+import subprocess
+
+from datetime import timedelta
+from functools import partial
+
+from odoo import api, models, fields
+from odoo.exceptions import ValidationError
+from odoo.tools import config, plaintext2html
+
+from ..tools.throttle import throttle_command
+from ..tools.worker import CONFIG_ENVIRON
+from .backup_artifact import drop_database
+
+_logger = logging.getLogger(__name__)
+
+# Key of the PostgreSQL advisory lock serializing the job dispatchers
+DISPATCH_LOCK_ID = 0x45515042
+# Jobs dispatched but whose worker never started are failed after this delay
+WORKER_START_TIMEOUT = timedelta(minutes=5)
+WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "..", "tools", "worker.py")
+
+
+class BackupJob(models.Model):
+    """Backup executions and restores queued for the isolated backup workers."""
+
+    _name = "backup.job"
+    _description = "Backup Jobs"
+    _order = "id desc"
+
+    name = fields.Char(string="Name", compute="_compute_name")
+    record_id = fields.Many2one(
+        "backup.record",
+        string="Backup Record",
+        required=True,
+        readonly=True,
+        index=True,
+        ondelete="cascade",
+    )
+    server_id = fields.Many2one(
+        related="record_id.server_id", store=True, index=True, string="Server"
+    )
+    company_id = fields.Many2one(related="record_id.company_id", store=True, index=True)
+    kind = fields.Selection(
+        [
+            ("backup", "Backup"),
+            ("restore", "Restore"),
+            ("restore_drill", "Restore Drill"),
+        ],
+        string="Kind",
+        required=True,
+        default="backup",
+        readonly=True,
+        index=True,
+    )
+    user_id = fields.Many2one(
+        "res.users",
+        string="Requested by",
+        readonly=True,
+        default=lambda self: self.env.user,
+        help="User notified of the result of a restore.",
+    )
+    artifact_id = fields.Many2one(
+        "backup.artifact",
+        string="Backup to Restore",
+        readonly=True,
+        ondelete="cascade",
+    )
+    restore_db_name = fields.Char(string="New Database Name", readonly=True)
+    restore_jobs = fields.Integer(string="Restore Jobs", readonly=True)
+    restore_new_uuid = fields.Boolean(string="Generate a New UUID", readonly=True)
+    restore_neutralize = fields.Boolean(string="Neutralize", readonly=True)
+    state = fields.Selection(
+        [
+            ("queued", "Queued"),
+            ("running", "Running"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+        ],
+        string="State",
+        required=True,
+        default="queued",
+        readonly=True,
+        index=True,
+    )
+    host = fields.Char(
+        string="Host", readonly=True, help="Host running the backup worker."
+    )
+    pid = fields.Integer(
+        string="Process ID", readonly=True, help="Process ID of the backup worker."
+    )
+    enqueued_at = fields.Datetime(
+        string="Queued on", readonly=True, default=fields.Datetime.now
+    )
+    started_at = fields.Datetime(string="Started on", readonly=True)
+    finished_at = fields.Datetime(string="Finished on", readonly=True)
+    duration = fields.Float(string="Duration (s)", readonly=True)
+    result_type = fields.Selection(
+        [("success", "Success"), ("warning", "Warning"), ("danger", "Failure")],
+        string="Result Type",
+        readonly=True,
+    )
+    result_msg = fields.Text(string="Result", readonly=True)
+
+    def _compute_name(self):
+        for job in self:
+            job.name = f"{job.record_id.name} #{job.id}"
+
+    @api.model
+    def enqueue(self, record, kind="backup"):
+        """Queue a backup (or a restore drill) of `record`, unless one is already
+        waiting or running.
+
+        Args:
+            record (backup.record): Record to back up.
+            kind (str): "backup" or "restore_drill".
+
+        Returns:
+            backup.job: The queued (or already pending) job.
+        """
+        job = self.search(
+            [
+                ("record_id", "=", record.id),
+                ("kind", "=", kind),
+                ("state", "in", ("queued", "running")),
+            ],
+            limit=1,
+        )
+        if not job:
+            job = self.create({"record_id": record.id, "kind": kind})
+        self._dispatch()
+        return job
+
+    @api.model
+    def enqueue_restore(self, artifact, db_name, jobs, new_uuid, neutralize):
+        """Queue the restore of a backup into a new database.
+
+        The restore runs in a backup worker: downloading and restoring a real database
+        takes far longer than the time limits of the Odoo workers.
+
+        Args:
+            artifact (backup.artifact): Backup to restore.
+            db_name (str): Name of the database to create.
+            jobs (int): `pg_restore` jobs and filestore extraction threads.
+            new_uuid (bool): Give the new database its own UUID.
+            neutralize (bool): Neutralize the new database.
+
+        Returns:
+            backup.job: The queued job.
+        """
+        artifact._check_restore(db_name)
+        if self.search_count(
+            [
+                ("kind", "=", "restore"),
+                ("restore_db_name", "=", db_name),
+                ("state", "in", ("queued", "running")),
+            ]
+        ):
+            raise ValidationError(f"A restore into {db_name} is already queued.")
+        job = self.create(
+            {
+                "record_id": artifact.record_id.id,
+                "kind": "restore",
+                "artifact_id": artifact.id,
+                "restore_db_name": db_name,
+                "restore_jobs": jobs,
+                "restore_new_uuid": new_uuid,
+                "restore_neutralize": neutralize,
+            }
+        )
+        self._dispatch()
+        return job
+
+    @api.model
+    def _get_max_workers(self):
+        """Return the maximum number of backup workers running at once on a host."""
+        return int(
+            self.env["ir.config_parameter"].sudo().get_param("eqp_backup.max_workers", 2)
+        )
+
+    @api.model
+    def _dispatch(self):
+        """Start a worker for each queued job allowed by the concurrency limits.
+
+        The limits are the maximum number of workers of the current host and the
+        maximum number of simultaneous jobs of each server. The workers are started once
+        the current transaction is committed.
+        """
+        # Only one dispatcher at a time among every Odoo process; the others skip
+        self.env.cr.execute("SELECT pg_try_advisory_xact_lock(%s)", [DISPATCH_LOCK_ID])
+        if not self.env.cr.fetchone()[0]:
+            return self.browse()
+
+        host = socket.gethostname()
+        self._fail_dead_workers(host)
+        running = self.search([("state", "=", "running")])
+        free_slots = self._get_max_workers() - len(
+            running.filtered(lambda job: job.host == host)
+        )
+        if free_slots <= 0:
+            return self.browse()
+
+        server_jobs = {}
+        for job in running:
+            server_jobs[job.server_id] = server_jobs.get(job.server_id, 0) + 1
+
+        to_start = self.browse()
+        for job in self.search([("state", "=", "queued")], order="id"):
+            if len(to_start) >= free_slots:
+                break
+            server = job.server_id
+            if server_jobs.get(server, 0) >= (server.max_concurrent_jobs or 1):
+                continue
+            server_jobs[server] = server_jobs.get(server, 0) + 1
+            to_start |= job
+
+        to_start.write(
+            {
+                "state": "running",
+                "host": host,
+                "pid": 0,
+                "started_at": fields.Datetime.now(),
+            }
+        )
+        for job in to_start:
+            limits = job.record_id._get_throttle_limits()
+            priority = {key: limits[key] for key in ("cpu_nice", "io_priority")}
+            self.env.cr.postcommit.add(
+                partial(self._spawn_worker, self.env.cr.dbname, job.id, priority)
+            )
+        return to_start
+
+    @api.model
+    def _spawn_worker(self, db_name, job_id, priority=None):
+        """Start the worker process of a job, detached from the current process.
+
+        `priority` holds the `cpu_nice` and `io_priority` the worker runs with.
+        """
+        environ = dict(os.environ)
+        environ["PYTHONPATH"] = os.pathsep.join(path for path in sys.path if path)
+        environ[CONFIG_ENVIRON] = json.dumps(
+            {
+                key: value
+                for key, value in config.options.items()
+                if value is None or isinstance(value, (str, int, float, bool))
+            }
+        )
+        try:
+            subprocess.Popen(
+                throttle_command(
+                    [
+                        sys.executable,
+                        os.path.abspath(WORKER_SCRIPT),
+                        db_name,
+                        str(job_id),
+                    ],
+                    **(priority or {}),
+                ),
+                env=environ,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except Exception as e:
+            # The job is failed by the next dispatch once WORKER_START_TIMEOUT elapsed
+            _logger.error("Failed to start the worker of backup job %s: %s", job_id, e)
+
+    @api.model
+    def _fail_dead_workers(self, host):
+        """Fail the running jobs of `host` whose worker process no longer exists."""
+        start_deadline = fields.Datetime.now() - WORKER_START_TIMEOUT
+        for job in self.search([("state", "=", "running"), ("host", "=", host)]):
+            if job.pid:
+                try:
+                    os.kill(job.pid, 0)
+                    continue
+                except ProcessLookupError:
+                    pass
+                except PermissionError:
+                    # Process of another user: still alive
+                    continue
+            elif job.started_at > start_deadline:
+                continue
+            job._finish("danger", "The backup worker process stopped unexpectedly.")
+            job._clean_up()
+            job._report()
+
+    def _finish(self, result_type, result_msg):
+        self.ensure_one()
+        finished_at = fields.Datetime.now()
+        self.write(
+            {
+                "state": "done" if result_type == "success" else "failed",
+                "result_type": result_type,
+                "result_msg": result_msg,
+                "finished_at": finished_at,
+                "duration": (finished_at - (self.started_at or finished_at)).total_seconds(),
+            }
+        )
+
+    def _run(self):
+        """Run the backup or the restore of the job.
+
+        Returns:
+            tuple: Result type (success, warning, danger) and result details.
+        """
+        self.ensure_one()
+        if self.kind == "restore":
+            artifact = self.artifact_id
+            stats = artifact._restore(
+                self.restore_db_name,
+                self.restore_jobs,
+                self.restore_new_uuid,
+                self.restore_neutralize,
+            )
+            return "success", artifact._format_restore_stats(
+                self.restore_db_name, stats
+            )
+        record = self.record_id.with_context(backup_job_id=self.id)
+        record.check_valid_state()
+        if self.kind == "restore_drill":
+            return record._execute_restore_drill()
+        return record._execute_backup()
+
+    def _clean_up(self):
+        """Drop what a job whose worker died left behind.
+
+        A restore creates its database once the name was checked to be free: a
+        database left with that name is the half-restored one.
+        """
+        self.ensure_one()
+        if self.kind == "restore_drill":
+            self.record_id._drop_drill_databases()
+        elif self.kind == "restore" and drop_database(self.restore_db_name):
+            _logger.info("Dropped the half-restored database %s", self.restore_db_name)
+
+    def _report(self):
+        """Report the result of the finished job where its requester expects it."""
+        self.ensure_one()
+        if self.kind == "restore":
+            self.record_id.message_post(
+                subject=f"Restore of {self.artifact_id.name}",
+                body=plaintext2html(self.result_msg or ""),
+                partner_ids=self.user_id.partner_id.ids,
+            )
+        elif self.kind == "restore_drill":
+            self.record_id._report_drill_result(self.result_type, self.result_msg)
+        else:
+            self.record_id._report_result(self.result_type, self.result_msg)
+
+    def _execute(self):
+        """Run the job; called in the worker process."""
+        self.ensure_one()
+        self.write({"pid": os.getpid(), "host": socket.gethostname()})
+        self.env.cr.commit()
+
+        try:
+            result_type, result_msg = self._run()
+        except Exception as e:
+            self.env.cr.rollback()
+            result_type, result_msg = "danger", f"Backup worker exception: {e}"
+            _logger.exception("Backup job %s failed", self.id)
+
+        self._finish(result_type, result_msg)
+        self._report()
+        self.env.cr.commit()
+
+        # Start the jobs waiting for this worker slot
+        self._dispatch()
+        self.env.cr.commit()
+
+    @api.model
+    def _cron_dispatch(self):
+        """Start the queued jobs and fail the ones whose worker died."""
+        self._dispatch()
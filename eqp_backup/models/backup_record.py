@@ -21,25 +21,75 @@
 #
 ##############################################################################
 
-import io
 import os
+import re
 import odoo
-import glob
 import json
+import pytz
+import time
+import hashlib
+import statistics
+import collections
 import shutil
 import logging
 import tempfile
 import subprocess
 
-from odoo import models, fields, _
+from odoo import api, models, fields, _
 from odoo.service import db
 from odoo.exceptions import ValidationError
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime, timezone
-
-from odoo.tools import config, osutil, find_pg_tool, exec_pg_environ
+from dateutil.relativedelta import relativedelta
+
+from odoo.tools import config, find_pg_tool, exec_pg_environ, plaintext2html
+
+from ..tools.archive import (
+    ARCHIVE_EXTENSIONS,
+    ARCHIVE_MIMETYPES,
+    COPY_BUFFER_SIZE,
+    IGNORED_EXTENSIONS,
+    NATIVE_DUMP_EXTENSION,
+    open_archive_writer,
+)
+from ..tools.checksum import HashingWriter, find_corrupt_zip_member
+from ..tools.dedup import DEDUP_ARCHIVE_CODEC, DEDUP_INDEX_EXTENSION
+from ..tools.metrics import ResourceMonitor
+from ..tools.pipe import copy_stream, run_fanout, run_pipeline
+from ..tools.retention import select_backups_to_keep
+from ..tools.throttle import (
+    ThrottledReader,
+    TokenBucket,
+    limits_at,
+    throttle_command,
+)
+from .backup_artifact import drop_database
+from .backup_server import DEDUP_BACKUP_TYPES
+from .backup_throttle_window import IO_PRIORITY_SELECTION
 
 _logger = logging.getLogger(__name__)
 
+# `pg_dump --verbose` messages used to time the dump of each table
+PG_DUMP_TABLE_START = re.compile(r'dumping contents of table "(?:[^"]*\.)?([^"]+)"')
+PG_DUMP_TABLE_END = re.compile(r"finished item \d+ TABLE DATA (\S+)")
+# Backup formats written through an archive writer (the others are raw pg_dump pipes)
+ARCHIVE_FORMATS = set(ARCHIVE_EXTENSIONS.values())
+# Google Drive resumable upload sessions expire after one week
+DRIVE_RESUME_MAX_AGE = 6 * 24 * 3600
+# Safety margin applied to the estimated backup sizes by the preflight check
+PREFLIGHT_MARGIN = 1.1
+# Prefix of the scratch databases created by the restore drills
+DRILL_DB_PREFIX = "eqp_backup_drill_"
+# Number of previous successful drills whose median is the RTO baseline
+DRILL_RTO_BASELINE_SIZE = 5
+DEFAULT_DRILL_QUERIES = (
+    "SELECT count(*) > 0 FROM res_users\n"
+    "SELECT count(*) > 0 FROM ir_module_module WHERE state = 'installed'"
+)
+# Odoo already stores the attachments under "<sha1[:2]>/<sha1>" in the filestore
+FILESTORE_BLOB_PATH = re.compile(r"^[0-9a-f]{2}/([0-9a-f]{40})$")
+
 
 # Overwriting the "db functions" to prevent that list_db=False will block the process
 
@@ -62,89 +112,346 @@ def dump_db_manifest(cr):
     return manifest
 
 
-def _dump_filestore(db_name, dump_dir):
-    """Copy the filestore to the given dump directory."""
+def _dump_filestore(db_name, archive):
+    """Add the filestore files to the archive, reading them in place."""
     filestore = config.filestore(db_name)
     if os.path.exists(filestore):
-        shutil.copytree(filestore, os.path.join(dump_dir, "filestore"))
+        archive.add_tree(filestore, "filestore")
 
 
-def _dump_database(db_name, dump_dir, backup_format):
-    """Dump the database to the given dump directory."""
-    cmd = [find_pg_tool("pg_dump"), "--no-owner", db_name]
-    env = exec_pg_environ()
+def _filestore_blob_hash(path, relative_path):
+    """Return the content hash of a filestore file, trusting Odoo's sha1 file names."""
+    match = FILESTORE_BLOB_PATH.match(relative_path)
+    if match:
+        return match.group(1)
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(COPY_BUFFER_SIZE), b""):
+            sha1.update(block)
+    return sha1.hexdigest()
 
-    if backup_format == "zip":
-        dump_file = os.path.join(dump_dir, "dump.sql")
-        cmd.insert(-1, f"--file={dump_file}")
 
-        with open(os.path.join(dump_dir, "manifest.json"), "w") as fh:
-            db = odoo.sql_db.db_connect(db_name)
-            with db.cursor() as cr:
-                json.dump(dump_db_manifest(cr), fh, indent=4)
+def filestore_snapshot(db_name):
+    """Describe the current filestore as a set of content-addressed blobs.
 
-        subprocess.run(
-            cmd,
-            env=env,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.STDOUT,
-            check=True,
+    Returns:
+        tuple: The snapshot manifest (filestore relative path -> blob hash) and a
+        dictionary with the local path of every blob (blob hash -> file path).
+    """
+    filestore = config.filestore(db_name)
+    files, sources = {}, {}
+    if os.path.exists(filestore):
+        for dir_path, dir_names, file_names in os.walk(filestore):
+            for file_name in file_names:
+                base_name, ext = os.path.splitext(file_name)
+                path = os.path.join(dir_path, file_name)
+                if (ext or base_name) in IGNORED_EXTENSIONS or not os.path.isfile(path):
+                    continue
+                relative_path = os.path.relpath(path, filestore).replace(os.sep, "/")
+                blob_hash = _filestore_blob_hash(path, relative_path)
+                files[relative_path] = blob_hash
+                sources.setdefault(blob_hash, path)
+
+    snapshot = {
+        "odoo_filestore_snapshot": "1",
+        "db_name": db_name,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "files": files,
+    }
+    return snapshot, sources
+
+
+def _run_timed_pg_dump(cmd, env, sequential=False):
+    """Run a verbose pg_dump and time the dump of every table from its messages.
+
+    Args:
+        cmd (list): pg_dump command, including `--verbose`.
+        env (dict): Environment of the pg_dump process.
+        sequential (bool): True for single job dumps, which do not report finished items.
+
+    Returns:
+        dict: Seconds spent dumping each table, by table name.
+    """
+    process = subprocess.Popen(
+        cmd,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    starts, timings = {}, {}
+    messages = collections.deque(maxlen=20)
+    for line in process.stderr:
+        now = time.monotonic()
+        messages.append(line)
+        start_match = PG_DUMP_TABLE_START.search(line)
+        end_match = PG_DUMP_TABLE_END.search(line)
+        if start_match:
+            # Without finished items, a table ends when the next one starts
+            if sequential:
+                for table, started in starts.items():
+                    timings.setdefault(table, round(now - started, 3))
+            starts[start_match.group(1)] = now
+        elif end_match and end_match.group(1) in starts:
+            table = end_match.group(1)
+            timings[table] = round(now - starts[table], 3)
+    return_code = process.wait()
+    if return_code:
+        raise subprocess.CalledProcessError(return_code, cmd, stderr="".join(messages))
+
+    now = time.monotonic()
+    for table, started in starts.items():
+        timings.setdefault(table, round(now - started, 3))
+    return timings
+
+
+def _dump_database_directory(
+    db_name, archive, jobs, manifest, priority=None, spool_dir=None
+):
+    """Run a parallel directory-format pg_dump and pack its files into the archive.
+
+    The directory format cannot be written to a pipe, so pg_dump writes the per-table
+    files to a temporary directory (of `spool_dir` if set). The dump can be restored
+    with `pg_restore --jobs=N --dbname=<db> dump/` once extracted.
+    """
+    env = exec_pg_environ()
+    with tempfile.TemporaryDirectory(dir=spool_dir) as dump_dir:
+        dump_path = os.path.join(dump_dir, "dump")
+        cmd = [
+            find_pg_tool("pg_dump"),
+            "--no-owner",
+            "--verbose",
+            "--format=directory",
+            f"--jobs={jobs}",
+            f"--file={dump_path}",
+            db_name,
+        ]
+        cmd = throttle_command(cmd, **(priority or {}))
+        started = time.monotonic()
+        table_timings = _run_timed_pg_dump(cmd, env, sequential=jobs == 1)
+        manifest.update(
+            {
+                "dump_jobs": jobs,
+                "dump_duration": round(time.monotonic() - started, 3),
+                "dump_table_timings": table_timings,
+            }
+        )
+        archive.add_tree(dump_path, "dump")
+
+
+def _dump_database(
+    db_name,
+    archive,
+    backup_format,
+    dump_format="plain",
+    dump_jobs=1,
+    cpu_nice=0,
+    io_priority="normal",
+    spool_dir=None,
+):
+    """Dump the database into the given archive.
+
+    `cpu_nice` and `io_priority` lower the priority of the pg_dump process. The
+    temporary files of the directory format are written to `spool_dir`. The Native
+    archives ("tar") always hold a custom-format dump, streamed as "dump.dump" parts.
+    """
+    native = backup_format == ARCHIVE_EXTENSIONS["native"]
+    cmd = [find_pg_tool("pg_dump"), "--no-owner", db_name]
+    env = exec_pg_environ()
+    priority = {"cpu_nice": cpu_nice, "io_priority": io_priority}
+
+    db = odoo.sql_db.db_connect(db_name)
+    with db.cursor() as cr:
+        manifest = dump_db_manifest(cr)
+    manifest["dump_format"] = "custom" if native else dump_format
+    # Let restores detect how the archive was compressed
+    manifest["compression"] = archive.describe()
+
+    if dump_format == "directory" and not native:
+        _dump_database_directory(
+            db_name, archive, dump_jobs, manifest, priority, spool_dir
         )
-
     else:
-        cmd.insert(-1, "--format=c")
-        return subprocess.Popen(
-            cmd, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE
-        ).stdout
+        member = "dump.sql"
+        if native:
+            cmd = _custom_dump_command(cmd, archive.level)
+            member = "dump.dump"
+        # Stream the pg_dump output straight into the archive member
+        process = subprocess.Popen(
+            throttle_command(cmd, **priority),
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            archive.add_stream(process.stdout, member, text=not native)
+        finally:
+            process.stdout.close()
+            return_code = process.wait()
+        if return_code:
+            raise subprocess.CalledProcessError(return_code, cmd)
+
+    archive.add_bytes(json.dumps(manifest, indent=4), "manifest.json")
+
+
+def _custom_dump_command(cmd, compression_level=0):
+    """Return the pg_dump command `cmd` switched to the custom format.
+
+    Args:
+        cmd (list): pg_dump command, ending with the database name.
+        compression_level (int): pg_dump compression level (0 for its default).
+    """
+    options = ["--format=custom"]
+    if compression_level:
+        options.append(f"--compress={compression_level}")
+    return cmd[:-1] + options + cmd[-1:]
+
+
+def _dump_database_custom(
+    db_name,
+    stream,
+    compression_level=0,
+    cpu_nice=0,
+    io_priority="normal",
+    stats=None,
+    **dump_options,
+):
+    """Stream a custom-format pg_dump of the database into `stream`.
+
+    This is the Native format of the database-only backups: the file can be given as
+    is to `pg_restore`. The other dump options (archive codec, spool directory...) do
+    not apply to it.
+    """
+    cmd = _custom_dump_command(
+        [find_pg_tool("pg_dump"), "--no-owner", db_name], compression_level
+    )
+    started = time.monotonic()
+    process = subprocess.Popen(
+        throttle_command(cmd, cpu_nice=cpu_nice, io_priority=io_priority),
+        env=exec_pg_environ(),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        size = copy_stream(process.stdout, stream, COPY_BUFFER_SIZE)
+    finally:
+        process.stdout.close()
+        return_code = process.wait()
+    if return_code:
+        raise subprocess.CalledProcessError(return_code, cmd)
+
+    if stats is not None:
+        duration = time.monotonic() - started
+        # The dump is compressed by pg_dump: its uncompressed size is unknown
+        stats.update(
+            codec="native",
+            level=compression_level or None,
+            threads=1,
+            members=1,
+            stored_members=0,
+            bytes_in=size,
+            bytes_out=size,
+            duration=duration,
+            dump_duration=duration,
+            archive_duration=0.0,
+        )
+    return stream
 
 
-def _create_zip(dump_dir, stream=None):
-    """Create a ZIP archive of the given directory and write it to the stream or return a temp file."""
+def _create_archive(
+    db_name,
+    stream=None,
+    with_db=True,
+    with_filestore=True,
+    filestore_snapshot=None,
+    compression="zip_deflate",
+    compression_level=0,
+    compression_threads=0,
+    stats=None,
+    spool_dir=None,
+    **dump_options,
+):
+    """Write an archive of the database and/or filestore to the stream or return a temp file.
+
+    The temporary files (the returned one included) are created in `spool_dir`, or in
+    the system temporary folder if not set.
+
+    With an incremental filestore snapshot, only its manifest ("filestore.json") is
+    archived: the blobs it lists are stored separately on the destination.
+
+    If a `stats` dictionary is given, it receives the codec, the uncompressed and
+    compressed sizes and the duration of the archive creation, split between the
+    database dump and the rest of the archive.
+    """
     if not stream:
-        stream = tempfile.TemporaryFile()
-
-    osutil.zip_dir(
-        dump_dir,
-        stream,
-        include_dir=False,
-        fnct_sort=lambda file_name: file_name != "dump.sql",
-    )
-    stream.seek(0)
+        stream = tempfile.TemporaryFile(dir=spool_dir)
+
+    started = time.monotonic()
+    dump_duration = 0.0
+    backup_format = ARCHIVE_EXTENSIONS[compression]
+    with open_archive_writer(
+        stream, compression, compression_level, compression_threads
+    ) as archive:
+        if with_db:
+            _dump_database(
+                db_name, archive, backup_format, spool_dir=spool_dir, **dump_options
+            )
+            dump_duration = time.monotonic() - started
+        if with_filestore and filestore_snapshot is not None:
+            archive.add_bytes(json.dumps(filestore_snapshot, indent=4), "filestore.json")
+        elif with_filestore:
+            _dump_filestore(db_name, archive)
+
+    if stats is not None:
+        duration = time.monotonic() - started
+        stats.update(
+            archive.describe(),
+            members=archive.members,
+            stored_members=archive.stored_members,
+            bytes_in=archive.bytes_in,
+            bytes_out=archive.bytes_out,
+            duration=duration,
+            dump_duration=dump_duration,
+            archive_duration=duration - dump_duration,
+        )
+    if stream.seekable():
+        stream.seek(0)
     return stream
 
 
-def dump_filestore(db_name, stream=None, backup_format="zip"):
+def dump_filestore(db_name, stream=None, backup_format="zip", **dump_options):
     """Dump the database Filestore into a file-like object `stream`."""
     _logger.info("Backing up Filestore: %s (format: %s)", db_name, backup_format)
 
-    with tempfile.TemporaryDirectory() as dump_dir:
-        _dump_filestore(db_name, dump_dir)
-        return _create_zip(dump_dir, stream)
+    if backup_format not in ARCHIVE_FORMATS:
+        raise ValidationError(
+            f"The filestore cannot be backed up as '{backup_format}'."
+        )
+    return _create_archive(db_name, stream, with_db=False, **dump_options)
 
 
-def dump_db(db_name, stream=None, backup_format="zip"):
+def dump_db(db_name, stream=None, backup_format="zip", **dump_options):
     """Dump the database into a file-like object `stream`."""
     _logger.info("Backing up DB: %s (format: %s)", db_name, backup_format)
 
-    if backup_format == "zip":
-        with tempfile.TemporaryDirectory() as dump_dir:
-            _dump_database(db_name, dump_dir, backup_format)
-            return _create_zip(dump_dir, stream)
+    if backup_format in ARCHIVE_FORMATS:
+        return _create_archive(db_name, stream, with_filestore=False, **dump_options)
     else:
-        return _dump_database(db_name, None, backup_format)
+        return _dump_database_custom(db_name, stream, **dump_options)
 
 
-def dump_db_full(db_name, stream=None, backup_format="zip"):
+def dump_db_full(db_name, stream=None, backup_format="zip", **dump_options):
     """Dump both the database and Filestore into a file-like object `stream`."""
     _logger.info("Backing up DB & Filestore: %s (format: %s)", db_name, backup_format)
 
-    if backup_format == "zip":
-        with tempfile.TemporaryDirectory() as dump_dir:
-            _dump_filestore(db_name, dump_dir)
-            _dump_database(db_name, dump_dir, backup_format)
-            return _create_zip(dump_dir, stream)
-    else:
-        return _dump_database(db_name, None, backup_format)
+    if backup_format not in ARCHIVE_FORMATS:
+        raise ValidationError(
+            f"The filestore cannot be backed up as '{backup_format}'."
+        )
+    return _create_archive(db_name, stream, **dump_options)
 
 
 class BackupRecord(models.Model):
@@ -214,6 +521,139 @@ class BackupRecord(models.Model):
         "- Database Only: Backs up only the database.\n"
         "- File Store Only: Backs up only the file storage (attachments and other media).",
     )
+    backup_format = fields.Selection(
+        [("plain", "Plain SQL"), ("directory", "Parallel Directory")],
+        string="Database Dump Format",
+        default="plain",
+        required=True,
+        tracking=True,
+        help="Select how the database is dumped:\n"
+        "- Plain SQL: Single-threaded pg_dump to a 'dump.sql' file (Odoo standard format).\n"
+        "- Parallel Directory: pg_dump in directory format using several jobs, packed in "
+        "the 'dump' folder of the archive. Restore it with 'pg_restore --jobs=N'.",
+    )
+    dump_jobs = fields.Integer(
+        string="Dump Jobs",
+        default=4,
+        required=True,
+        tracking=True,
+        help="Number of tables dumped simultaneously by the Parallel Directory format "
+        "(each job uses one database connection and one CPU core).",
+    )
+    execution_mode = fields.Selection(
+        [("cron", "Scheduled Action"), ("worker", "Backup Worker")],
+        string="Execution Mode",
+        default="cron",
+        required=True,
+        tracking=True,
+        help="Select where the backup is executed:\n"
+        "- Scheduled Action: Inside the Odoo cron worker (subject to its time and "
+        "memory limits, and holding a cron thread for the whole backup).\n"
+        "- Backup Worker: The scheduled action (or manual execution) only queues a job; "
+        "the backup runs in a dedicated process, within the worker limits set in the "
+        "settings and the server 'Max Concurrent Jobs'.",
+    )
+    compression = fields.Selection(
+        [
+            ("zip_store", "ZIP (No Compression)"),
+            ("zip_deflate", "ZIP (Deflate)"),
+            ("tar_zstd", "TAR + zstd (Multithreaded)"),
+            ("native", "Native (pg_dump Custom + TAR)"),
+        ],
+        string="Compression",
+        default="zip_deflate",
+        required=True,
+        tracking=True,
+        help="Select how the backup archive is compressed:\n"
+        "- ZIP (No Compression): Fastest, the archive is as big as the data.\n"
+        "- ZIP (Deflate): Standard ZIP archive, compressed on a single CPU core.\n"
+        "- TAR + zstd (Multithreaded): '.tar.zst' archive compressed on several CPU "
+        "cores; faster and smaller than Deflate. Requires the 'zstandard' Python "
+        "package. With the Plain SQL format the dump is streamed in 64MB "
+        "'dump.sql.NNNNNN' parts (to concatenate), as TAR members must declare their "
+        "size.\n"
+        "- Native (pg_dump Custom + TAR): The database is dumped in the pg_dump custom "
+        "format (compressed by pg_dump) and the backup is always streamed to the "
+        "server, without any temporary file. Database-only backups are a '.dump' file "
+        "for 'pg_restore'; the others are an uncompressed '.tar' holding the dump (in "
+        "64MB 'dump.dump.NNNNNN' parts, to concatenate), the filestore and the "
+        "manifest.",
+    )
+    compression_level = fields.Integer(
+        string="Compression Level",
+        default=0,
+        tracking=True,
+        help="Compression level (Deflate: 1-9, zstd: 1-22, Native: pg_dump 1-9). "
+        "Put '0' to use the default level (Deflate: 6, zstd: 3, Native: pg_dump's).",
+    )
+    compression_threads = fields.Integer(
+        string="Compression Threads",
+        default=0,
+        tracking=True,
+        help="Number of CPU cores used by the zstd compression. "
+        "Put '0' to use all the cores of the server.",
+    )
+    cpu_nice = fields.Integer(
+        string="CPU Niceness",
+        default=0,
+        tracking=True,
+        help="Niceness (0-19) of the pg_dump process: the higher, the less CPU it takes "
+        "from the other processes. With the Backup Worker execution mode, the whole "
+        "worker (compression and uploads included) runs with this niceness.",
+    )
+    io_priority = fields.Selection(
+        IO_PRIORITY_SELECTION,
+        string="I/O Priority",
+        default="normal",
+        required=True,
+        tracking=True,
+        help="Disk priority (ionice) of the pg_dump process, or of the whole worker "
+        "with the Backup Worker execution mode.",
+    )
+    upload_bandwidth = fields.Float(
+        string="Upload Bandwidth (MB/s)",
+        default=0,
+        tracking=True,
+        help="Maximum upload throughput to SFTP, Google Drive and Dropbox servers, "
+        "shared by all the uploads of a backup (destinations and parallel chunks). "
+        "Put '0' for no limit.",
+    )
+    throttle_window_ids = fields.One2many(
+        "backup.throttle.window",
+        "record_id",
+        string="Throttle Windows",
+        help="Daily time windows during which the resource limits are tightened. The "
+        "bandwidth limit follows the windows while uploading; the other limits are "
+        "set when the backup starts.",
+    )
+    filestore_mode = fields.Selection(
+        [("full", "Full Archive"), ("incremental", "Incremental (Content Addressed)")],
+        string="Filestore Mode",
+        default="full",
+        required=True,
+        tracking=True,
+        help="Select how the filestore is backed up:\n"
+        "- Full Archive: Every backup archives and uploads the whole filestore.\n"
+        "- Incremental: Filestore files are stored once on the destination (in the "
+        "'blobs' folder, named by their content hash) and only the new ones are uploaded. "
+        "Each backup archive holds a 'filestore.json' manifest listing the blobs needed to "
+        "rebuild its filestore.",
+    )
+    storage_mode = fields.Selection(
+        [("archive", "Archive Files"), ("dedup", "Deduplicated Chunks")],
+        string="Storage Mode",
+        default="archive",
+        required=True,
+        tracking=True,
+        help="Select how the backups are stored on the servers:\n"
+        "- Archive Files: Every backup is a complete archive file.\n"
+        "- Deduplicated Chunks: Local and SFTP servers only. The backup is an "
+        "uncompressed ZIP archive cut into content-defined chunks, stored once in the "
+        "'chunks/<database>' folder (named by their SHA-256, compressed as set in "
+        "'Compression'). Each backup is a small '.idx' index of its chunks, so only "
+        "the chunks changed since the previous backups are uploaded and stored. Chunks "
+        "are deleted once the retention policy deleted every backup using them.",
+    )
     backup_lifespan_qty = fields.Integer(
         string="Backup Lifespan qty",
         required=True,
@@ -224,6 +664,42 @@ class BackupRecord(models.Model):
         "specified number of backups are retained.\n"
         "To DISABLE this functionality put '-1'.",
     )
+    retention_policy = fields.Selection(
+        [("count", "Keep Last Backups"), ("gfs", "Grandfather-Father-Son")],
+        string="Retention Policy",
+        required=True,
+        default="count",
+        tracking=True,
+        help="Select which old backups are deleted after each backup:\n"
+        "- Keep Last Backups: Only the 'Backup Lifespan qty' most recent backups are kept.\n"
+        "- Grandfather-Father-Son: The most recent backup of each of the last N hours, "
+        "days, weeks and months is also kept (on top of the 'Backup Lifespan qty' most "
+        "recent ones, if set).",
+    )
+    keep_hourly = fields.Integer(
+        string="Keep Hourly",
+        default=0,
+        tracking=True,
+        help="Number of hours for which the latest backup is kept.",
+    )
+    keep_daily = fields.Integer(
+        string="Keep Daily",
+        default=7,
+        tracking=True,
+        help="Number of days for which the latest backup is kept.",
+    )
+    keep_weekly = fields.Integer(
+        string="Keep Weekly",
+        default=4,
+        tracking=True,
+        help="Number of weeks for which the latest backup is kept.",
+    )
+    keep_monthly = fields.Integer(
+        string="Keep Monthly",
+        default=12,
+        tracking=True,
+        help="Number of months for which the latest backup is kept.",
+    )
     success_mail_send = fields.Boolean(
         string="Email when Success",
         copy=False,
@@ -270,6 +746,23 @@ class BackupRecord(models.Model):
     server_type = fields.Selection(
         related="server_id.backup_type", string="Server Type"
     )
+    destination_ids = fields.One2many(
+        "backup.destination",
+        "record_id",
+        string="Additional Destinations",
+        help="Other servers receiving a copy of each backup. The backup is generated "
+        "once and uploaded to every server simultaneously; the result and the "
+        "retention policy are applied to each server separately.",
+    )
+    destination_retries = fields.Integer(
+        string="Destination Retries",
+        required=True,
+        tracking=True,
+        default=2,
+        help="Number of times the upload to a server is attempted again when the "
+        "backup has Additional Destinations. Retries need the spooled backup: they "
+        "are not possible with the Pipelined Upload.",
+    )
     chunk_size = fields.Integer(
         string="Chunk Size (MB)",
         required=True,
@@ -280,7 +773,118 @@ class BackupRecord(models.Model):
         "Smaller files: For smaller files (up to a few hundred megabytes), a chunk size of 1MB to 5MB can be suitable.\n"
         "Medium-sized files: For files ranging from a few hundred megabytes to a few gigabytes, a chunk size of 5MB to 10MB is often appropriate.\n"
         "Large files: For very large files (several gigabytes or more), you may still want to use smaller chunk sizes (e.g., 5MB to 10MB) to ensure smoother handling and better resilience to network issues.\n"
-        "Note: If set to 0 ('zero'), the system will use the default 'files_upload' method (without chunks).",
+        "Note: If set to 0 ('zero'), Dropbox uploads use 32MB chunks: smaller files are sent in a "
+        "single request. Dropbox chunks are capped to its 150MB request limit.\n"
+        "Google Drive: Size of the resumable upload chunks (0 uses the 100MB library default).",
+    )
+    upload_workers = fields.Integer(
+        string="Upload Workers",
+        required=True,
+        tracking=True,
+        default=4,
+        help="Number of chunks uploaded simultaneously through a Dropbox concurrent upload "
+        "session (chunk sizes are then rounded up to a multiple of 4 MB). The memory used by "
+        "the upload is at most Upload Workers x Chunk Size.\n"
+        "Set it to 1 to upload the chunks one after another.",
+    )
+    upload_retries = fields.Integer(
+        string="Upload Retries",
+        required=True,
+        tracking=True,
+        default=5,
+        help="Number of times a Google Drive chunk is sent again (with an exponential "
+        "backoff) after a network or server error before the upload is abandoned. An "
+        "abandoned upload is resumed by the next run from the last confirmed chunk.",
+    )
+    drive_resume_uri = fields.Char(
+        string="Drive Resumable Session",
+        compute="_compute_drive_resume",
+        help="Resumable session of the Google Drive upload left unfinished by the last run.",
+    )
+    drive_resume_spool = fields.Char(
+        string="Drive Resume Spool File",
+        compute="_compute_drive_resume",
+        help="Local copy of the backup whose Google Drive upload is left unfinished.",
+    )
+    drive_resume_file_name = fields.Char(
+        string="Drive Resume File Name",
+        compute="_compute_drive_resume",
+        help="Name of the backup whose Google Drive upload is left unfinished.",
+    )
+    pipelined_upload = fields.Boolean(
+        string="Pipelined Upload",
+        tracking=True,
+        help="Upload the backup while it is being generated: the archive bytes go through a "
+        "bounded memory buffer straight to the provider, so no temporary file is written and "
+        "the total time approaches the longest of the dump and the upload.\n"
+        "Local backups are always written directly to their destination.",
+    )
+    pipe_buffer_size = fields.Integer(
+        string="Pipe Buffer Size (MB)",
+        required=True,
+        tracking=True,
+        default=64,
+        help="Memory reserved for the buffer between the backup generation and the upload "
+        "when the Pipelined Upload is enabled.",
+    )
+
+    drill_active = fields.Boolean(
+        string="Restore Drills",
+        tracking=True,
+        copy=False,
+        help="Periodically restore the latest backup into a scratch database, run the "
+        "sanity queries on it and drop it, to measure the real time to restore.",
+    )
+    drill_interval_number = fields.Integer(
+        string="Drill Every", default=1, tracking=True
+    )
+    drill_interval_type = fields.Selection(
+        [("days", "Days"), ("weeks", "Weeks"), ("months", "Months")],
+        string="Drill Interval Unit",
+        default="weeks",
+        tracking=True,
+    )
+    drill_next_date = fields.Datetime(
+        string="Next Restore Drill",
+        copy=False,
+        help="The drill runs with the first check of the drills scheduled action after "
+        "this date.",
+    )
+    drill_jobs = fields.Integer(
+        string="Drill Restore Jobs",
+        default=4,
+        tracking=True,
+        help="Parallel jobs of pg_restore during the drills.",
+    )
+    drill_queries = fields.Text(
+        string="Sanity Queries",
+        default=DEFAULT_DRILL_QUERIES,
+        tracking=True,
+        groups="eqp_backup.group_eqp_backup_admin",
+        help="SQL queries run on the restored database, one per line (lines starting "
+        "with '--' are ignored), in a read-only transaction. Each query must return a "
+        "row whose first value is true (or non zero), e.g. "
+        "'SELECT count(*) > 0 FROM res_users'.",
+    )
+    drill_rto_threshold = fields.Float(
+        string="RTO Regression Threshold (%)",
+        default=50,
+        tracking=True,
+        help="Alert when a drill takes longer than the median of the previous "
+        f"{DRILL_RTO_BASELINE_SIZE} successful drills by more than this percentage "
+        "(0 to disable).",
+    )
+    drill_mail_send = fields.Boolean(
+        string="Email on Drill Alert",
+        default=True,
+        tracking=True,
+        help="Send an email when a restore drill fails or regresses.",
+    )
+    last_drill_result = fields.Text(
+        string="Last Drill Result",
+        readonly=True,
+        copy=False,
+        help="Details of the most recent restore drill.",
     )
 
     cron_id = fields.Many2one(
@@ -299,6 +903,13 @@ class BackupRecord(models.Model):
         readonly=True,
         help="Access the details of the most recent execution here.",
     )
+    artifact_ids = fields.One2many(
+        "backup.artifact", "record_id", string="Artifacts", readonly=True
+    )
+    job_ids = fields.One2many("backup.job", "record_id", string="Jobs", readonly=True)
+    execution_ids = fields.One2many(
+        "backup.execution", "record_id", string="Executions", readonly=True
+    )
 
     _sql_constraints = [
         ("name_unique", "unique(name, company_id)", "A unique name per company."),
@@ -312,147 +923,1360 @@ class BackupRecord(models.Model):
             "CHECK(backup_lifespan_qty = -1 OR backup_lifespan_qty > 1)",
             "The Backup span qty must be either -1 or greater than 1",
         ),
+        (
+            "check_gfs_retention",
+            "CHECK(keep_hourly >= 0 AND keep_daily >= 0 AND keep_weekly >= 0 "
+            "AND keep_monthly >= 0)",
+            "The Grandfather-Father-Son retention counts cannot be negative.",
+        ),
+        (
+            "check_compression_threads",
+            "CHECK(compression_level >= 0 AND compression_threads >= 0)",
+            "The Compression Level and Threads cannot be negative.",
+        ),
+        (
+            "check_upload_bandwidth",
+            "CHECK(upload_bandwidth >= 0)",
+            "The Upload Bandwidth cannot be negative.",
+        ),
+        (
+            "check_dump_jobs",
+            "CHECK(dump_jobs > 0)",
+            "The number of Dump Jobs must be greater than 0.",
+        ),
+        (
+            "check_upload_workers",
+            "CHECK(upload_workers > 0)",
+            "The number of Upload Workers must be greater than 0.",
+        ),
+        (
+            "check_upload_retries",
+            "CHECK(upload_retries >= 0)",
+            "The number of Upload Retries cannot be negative.",
+        ),
+        (
+            "check_destination_retries",
+            "CHECK(destination_retries >= 0)",
+            "The number of Destination Retries cannot be negative.",
+        ),
+        (
+            "check_pipe_buffer_size",
+            "CHECK(pipe_buffer_size > 0)",
+            "The Pipe Buffer Size must be greater than 0.",
+        ),
     ]
 
     # Static Methods
     @staticmethod
-    def _generate_backup(db_name, file, extension, bu_type):
+    def _generate_backup(
+        db_name, file, extension, bu_type, checksum_algorithms=(), **dump_options
+    ):
+        # The backup is hashed while written, its checksums are added to the stats
+        stats = dump_options.get("stats")
+        hasher = None
+        if file and checksum_algorithms and stats is not None:
+            file = hasher = HashingWriter(file, checksum_algorithms)
         # Determine backup type and generate backup
         if bu_type == "fs":
-            bu_file = dump_filestore(db_name, file, extension)
+            bu_file = dump_filestore(db_name, file, extension, **dump_options)
         elif bu_type == "db":
-            bu_file = dump_db(db_name, file, extension)
+            bu_file = dump_db(db_name, file, extension, **dump_options)
         else:
-            bu_file = dump_db_full(db_name, file, extension)
+            bu_file = dump_db_full(db_name, file, extension, **dump_options)
+        if hasher:
+            hasher.flush()
+            stats["checksums"] = hasher.hexdigests()
+            stats["backup_size"] = hasher.size
+            bu_file = hasher.raw
         return bu_file
 
-    def update_cron_state(self, state):
-        """Update the state of the associated cron job.
+    def _get_dump_options(self):
+        """Return the dump settings of the record as `_generate_backup` keyword arguments.
 
-        Args:
-            state (bool): New state for the cron job (active/inactive).
+        Returns:
+            dict: Dump options.
         """
-        for record in self:
-            if record.cron_id:
-                record.cron_id.write({"active": state})
+        self.ensure_one()
+        limits = self._get_throttle_limits()
+        dump_options = {
+            "dump_format": self.backup_format,
+            "dump_jobs": self.dump_jobs,
+            "compression": self.compression,
+            "compression_level": self.compression_level,
+            "compression_threads": limits["compression_threads"],
+            "spool_dir": self._get_spool_dir(),
+            "checksum_algorithms": self._get_checksum_algorithms(),
+        }
+        # Deduplicated backups compress each new chunk, not the archive
+        if self.storage_mode == "dedup":
+            dump_options["compression"] = DEDUP_ARCHIVE_CODEC
+        # A backup worker already runs entirely with the lowered priorities
+        if not self.env.context.get("backup_job_id"):
+            dump_options["cpu_nice"] = limits["cpu_nice"]
+            dump_options["io_priority"] = limits["io_priority"]
+        return dump_options
+
+    def _get_checksum_algorithms(self):
+        """Return the checksums computed while generating the backup.
+
+        The SHA-256 is always computed; the MD5 and the Dropbox content hash are added
+        when a destination reports them, so the upload can be verified against it.
+        """
+        self.ensure_one()
+        backup_types = set(self._get_destination_servers().mapped("backup_type"))
+        algorithms = ["sha256"]
+        if "drive" in backup_types:
+            algorithms.append("md5")
+        if "dropbox" in backup_types:
+            algorithms.append("dropbox")
+        return tuple(algorithms)
 
-    def write(self, vals):
-        """Override write method to handle state updates.
+    @staticmethod
+    def _get_local_hour(tz_name, moment=None):
+        """Return the hour of the day (e.g. 13.5 for 13:30) in a time zone.
 
         Args:
-            vals (dict): Values to be written.
-
-        Returns:
-            dict: Written values.
+            tz_name (str): Time zone name (UTC if not set).
+            moment (datetime): Naive UTC date (now by default).
         """
-        if "active" in vals:
-            if vals["active"] is True:
-                vals["state"] = "draft"
-            else:
-                vals["state"] = "archived"
-                self.update_cron_state(False)
-        return super(BackupRecord, self).write(vals)
+        moment = pytz.utc.localize(moment or datetime.utcnow())
+        local = moment.astimezone(pytz.timezone(tz_name or "UTC"))
+        return local.hour + local.minute / 60
 
-    def copy(self, default=None):
-        """Create a copy of the backup record.
+    def _get_base_limits(self):
+        """Return the resource limits of the record outside its throttle windows."""
+        self.ensure_one()
+        return {
+            "upload_bandwidth": self.upload_bandwidth,
+            "compression_threads": self.compression_threads,
+            "cpu_nice": self.cpu_nice,
+            "io_priority": self.io_priority,
+        }
+
+    def _get_throttle_limits(self, moment=None):
+        """Return the resource limits in force, tightened by the current windows.
 
         Args:
-            default (dict): Default values for the new record.
+            moment (datetime): Naive UTC date (now by default).
 
         Returns:
-            models.Model: New backup record.
+            dict: "upload_bandwidth", "compression_threads", "cpu_nice" and
+            "io_priority" limits.
         """
         self.ensure_one()
-        chosen_name = default.get("name") if default else ""
-        new_name = chosen_name or _("%s (copy)", self.name)
-        default = dict(default or {}, name=new_name)
-        return super(BackupRecord, self).copy(default)
+        windows = [
+            (window.hour_from, window.hour_to, window._get_limits())
+            for window in self.throttle_window_ids
+        ]
+        hour = self._get_local_hour(self.user_id.tz, moment)
+        return limits_at(self._get_base_limits(), windows, hour)
 
-    def check_valid_state(self, just_server=False):
-        """Check if the backup record is in a valid state for certain operations.
+    def _get_upload_throttle(self):
+        """Return the token bucket limiting the upload bandwidth, if any.
 
-        Args:
-            just_server (bool): If True, only check the state of the associated server.
+        The bucket evaluates the windows itself (without the ORM), so it can be shared
+        by the upload threads and follows the windows during long uploads.
 
-        Raises:
-            ValidationError: If the state is not valid.
+        Returns:
+            TokenBucket: Bandwidth limiter, or None when the uploads are never limited.
         """
+        self.ensure_one()
+        limits = self._get_base_limits()
+        windows = [
+            (window.hour_from, window.hour_to, window._get_limits())
+            for window in self.throttle_window_ids
+        ]
+        if not limits["upload_bandwidth"] and not any(
+            window_limits["upload_bandwidth"] for _f, _t, window_limits in windows
+        ):
+            return None
+        tz_name = self.user_id.tz
+        get_local_hour = self._get_local_hour
+
+        def rate():
+            bandwidth = limits_at(limits, windows, get_local_hour(tz_name))
+            return bandwidth["upload_bandwidth"] * 1024 * 1024
+
+        return TokenBucket(rate)
+
+    @api.constrains("drill_interval_number", "drill_jobs", "drill_rto_threshold")
+    def _check_drill_settings(self):
         for record in self:
-            if not just_server and record.state != "confirmed":
+            if record.drill_interval_number < 1 or record.drill_jobs < 1:
                 raise ValidationError(
-                    'This method can only be executed on a Backup record in the "confirmed" state.'
+                    "The drill interval and restore jobs must be at least 1."
                 )
-            if record.server_id.state != "confirmed":
+            if record.drill_rto_threshold < 0:
                 raise ValidationError(
-                    'This method can only be executed with a Backup Server in the "confirmed" state.'
+                    "The RTO regression threshold cannot be negative."
                 )
 
-    def revert_state(self):
-        """Revert the state of the backup record to 'draft'.
+    @api.constrains("cpu_nice")
+    def _check_cpu_nice(self):
+        for record in self:
+            if not 0 <= record.cpu_nice <= 19:
+                raise ValidationError("The CPU Niceness must be between 0 and 19.")
 
-        If the record is in the 'confirmed' state, it will be reverted to 'draft',
-         and the associated cron job state will be updated if applicable.
+    def _get_backup_extension(self):
+        """Return the file extension of the backups produced by the record."""
+        self.ensure_one()
+        if self.storage_mode == "dedup":
+            return DEDUP_INDEX_EXTENSION
+        if self.compression == "native" and self.type == "db":
+            return NATIVE_DUMP_EXTENSION
+        return ARCHIVE_EXTENSIONS[self.compression]
+
+    def _get_archive_extension(self):
+        """Return the format of the archive generated by the record.
+
+        It is the backup extension, except for the deduplicated backups: their archive
+        is cut into chunks and the stored file is its index.
         """
-        for record in self:
-            if record.cron_id:
-                self.update_cron_state(False)
-            if record.state == "confirmed":
-                record.write({"state": "draft", "db_names": ""})
+        self.ensure_one()
+        if self.storage_mode == "dedup":
+            return ARCHIVE_EXTENSIONS[DEDUP_ARCHIVE_CODEC]
+        return self._get_backup_extension()
 
-    def validate_db(self):
-        """Validate database credentials and confirm backup record.
+    def _streams_backup(self):
+        """Tell whether the backup is uploaded while being generated, never spooled.
+
+        It is the case with the Pipelined Upload, and always with the Native format and
+        the deduplicated backups.
+        """
+        self.ensure_one()
+        return (
+            self.pipelined_upload
+            or self.compression == "native"
+            or self.storage_mode == "dedup"
+        )
+
+    def _get_destination_servers(self):
+        """Return the record server followed by the additional destination servers."""
+        self.ensure_one()
+        return self.server_id | self.destination_ids.server_id
+
+    def _prepare_dump_options(self, client, stats=None):
+        """Return the dump options, uploading the new blobs of an incremental filestore.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+            stats (dict): Receives the archive statistics once the backup is generated.
 
         Returns:
-            dict: Action to display notification with validation result.
+            dict: Dump options, including the incremental filestore snapshot if any.
         """
         self.ensure_one()
-        dbs = db.list_dbs(force=True)
+        dump_options = self._get_dump_options()
+        dump_options["stats"] = stats
+        if self.type != "db" and self.filestore_mode == "incremental":
+            dump_options["filestore_snapshot"] = self._upload_filestore_blobs(client)
+        return dump_options
 
-        # Set a Success values by default.
-        result_type = "success"
-        result_msg = "Database validation executed Successfully."
+    def _get_chunk_compression(self):
+        """Return the codec and level compressing the chunks of deduplicated backups.
 
-        db_name = self.db_name
-        # Validates if the database exists
-        if db_name not in dbs:
-            # Set a warning notification values by default (Display just on a strange case).
-            result_type = "warning"
-            result_msg = f'The specified Database Name "{db_name}" does not exist. Please verify and try again.'
+        Returns:
+            tuple: `tools.dedup.compress_chunk` codec and level (None for the default).
+        """
+        self.ensure_one()
+        codec = {"zip_store": "none", "zip_deflate": "zlib", "tar_zstd": "zstd"}
+        return codec[self.compression], self.compression_level or None
 
-        if result_type == "success" and self.env.context.get("confirm", False):
+    def _dedup_uploader(self, server, client, file_name):
+        """Return a callable storing a generated archive as a deduplicated backup.
 
-            # Validate confirmed state
-            self.check_valid_state(True)
-            # Create/update Cron
-            vals = {"state": "confirmed"}
+        The settings are read here, so the callable can run in another thread. The
+        bandwidth limit applies to the uploaded chunks, not to the whole archive.
 
-            # Define the Cron values
-            model_id = self.env["ir.model"]._get_id("backup.record")
-            cron_values = {
-                "active": True,
-                "name": f"{self.name} - Cron",
-                "model_id": model_id,
-                "state": "code",
-                "code": f"model._scheduled_backup_process(record_id={self.id})",
-                "numbercall": -1,
-                "doall": False,
-            }
+        Args:
+            server (backup.server): Server storing the backup.
+            client (object): Connected provider client (None for Local servers).
+            file_name (str): Name of the index file.
 
-            if self.cron_id:
-                # Re-Write Existing Cron
-                self.cron_id.write(cron_values)
-            else:
-                # Default interval_number and interval_type on the cron then the user can modify it if required.
-                cron_values["interval_number"] = 1 if self.frequency != "years" else 12
-                cron_values["interval_type"] = (
-                    self.frequency if self.frequency != "years" else "months"
+        Returns:
+            callable: Receives the archive stream, returns the `upload_dedup_backup`
+            values.
+        """
+        self.ensure_one()
+        codec, level = self._get_chunk_compression()
+        bucket = self._get_upload_throttle() if server.backup_type != "local" else None
+        server.prefetch_upload_settings()
+        return lambda stream: server.upload_dedup_backup(
+            client, stream, file_name, codec, level, bucket
+        )
+
+    @api.constrains("storage_mode", "compression", "server_id", "destination_ids")
+    def _check_storage_mode(self):
+        for record in self.filtered(lambda record: record.storage_mode == "dedup"):
+            if record.compression == "native":
+                raise ValidationError(
+                    "The deduplicated backups cannot use the Native format: its "
+                    "compressed dump would change entirely from one backup to another."
+                )
+            servers = record._get_destination_servers()
+            unsupported = servers.filtered(
+                lambda server: server.backup_type not in DEDUP_BACKUP_TYPES
+            )
+            if unsupported:
+                raise ValidationError(
+                    "The deduplicated backups can only be stored on Local and SFTP "
+                    f"servers ({', '.join(unsupported.mapped('name'))})."
                 )
-                # Create new Cron
-                cron_job = self.env["ir.cron"].create(cron_values)
-                # Reference the cron with the Backup record
-                vals["cron_id"] = cron_job and cron_job.id
 
-            # Update State if the confirmation flag is true
+    @api.constrains("compression", "compression_level")
+    def _check_compression(self):
+        for record in self:
+            level = record.compression_level
+            if record.compression == "zip_deflate" and level > 9:
+                raise ValidationError("The Deflate compression level must be between 1 and 9.")
+            if record.compression == "native" and level > 9:
+                raise ValidationError(
+                    "The pg_dump compression level must be between 1 and 9."
+                )
+            if record.compression == "tar_zstd":
+                if level > 22:
+                    raise ValidationError(
+                        "The zstd compression level must be between 1 and 22."
+                    )
+                try:
+                    import zstandard  # noqa: F401
+                except ImportError:
+                    raise ValidationError(
+                        "The zstd compression requires the 'zstandard' Python package.\n"
+                        "Please install it by running: `sudo pip3 install zstandard`"
+                    )
+
+    @staticmethod
+    def _format_archive_stats(stats):
+        """Return a human readable summary of the archive statistics.
+
+        Args:
+            stats (dict): Statistics filled by the archive creation.
+
+        Returns:
+            str: Codec, compression ratio and throughput.
+        """
+        megabytes_in = stats["bytes_in"] / 1024 / 1024
+        ratio = stats["bytes_in"] / stats["bytes_out"] if stats["bytes_out"] else 0
+        throughput = megabytes_in / max(stats["duration"], 1e-6)
+        message = (
+            f"Compression: {stats['codec']} (level {stats['level'] or 'default'}, "
+            f"{stats['threads']} thread(s)). {megabytes_in:.2f} MB archived in "
+            f"{stats['duration']:.1f}s ({throughput:.2f} MB/s), ratio {ratio:.2f}:1."
+        )
+        if stats.get("stored_members"):
+            message += (
+                f" {stats['stored_members']} of {stats['members']} files were already "
+                "compressed and stored as is."
+            )
+        if "dedup_bytes" in stats:
+            message += (
+                f" Deduplication: {stats['dedup_bytes'] / 1024 / 1024:.2f} MB of new "
+                "chunks stored."
+            )
+        return message
+
+    def _upload_filestore_blobs(self, client, server=None, snapshot=None):
+        """Upload the filestore blobs the destination does not have yet.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+            server (backup.server): Destination (the record server by default).
+            snapshot (tuple): Snapshot manifest and blob sources returned by
+                `filestore_snapshot`, computed if not given.
+
+        Returns:
+            dict: Snapshot manifest listing the blobs needed by this backup.
+        """
+        self.ensure_one()
+        server = server or self.server_id
+        snapshot, sources = snapshot or filestore_snapshot(self.db_name)
+
+        location = server.get_blobs_location(client)
+        existing_blobs = server.list_filestore_blobs(client, location)
+        missing_blobs = [blob for blob in sources if blob not in existing_blobs]
+        uploaded_bytes = 0
+        for blob_hash in missing_blobs:
+            server.upload_filestore_blob(
+                client, location, sources[blob_hash], blob_hash, self.chunk_size
+            )
+            uploaded_bytes += os.path.getsize(sources[blob_hash])
+
+        _logger.info(
+            "Incremental filestore of %s on %s: %s blobs referenced, %s uploaded "
+            "(%s bytes)",
+            self.db_name,
+            server.name,
+            len(sources),
+            len(missing_blobs),
+            uploaded_bytes,
+        )
+        return snapshot
+
+    def _backup_and_upload(self, extension, upload, client=None, stats=None):
+        """Generate the record backup and hand it over to the `upload` callable.
+
+        With the Pipelined Upload the backup is generated in a background thread while
+        `upload` consumes it, otherwise it is spooled to a temporary file first.
+
+        Args:
+            extension (str): Backup format.
+            upload (callable): Receives a readable file-like object with the backup.
+            client (object): Connected provider client, used by the incremental filestore.
+            stats (dict): Receives the archive statistics.
+
+        Returns:
+            object: The value returned by `upload`.
+        """
+        self.ensure_one()
+        db_name = self.db_name
+        bu_type = self.type
+        dump_options = self._prepare_dump_options(client, stats)
+        # The deduplicated backups throttle the upload of their chunks instead
+        bucket = self.storage_mode != "dedup" and self._get_upload_throttle()
+
+        def throttled_upload(stream):
+            upload_started = time.monotonic()
+            try:
+                return upload(ThrottledReader(stream, bucket) if bucket else stream)
+            finally:
+                if stats is not None:
+                    stats["upload_duration"] = time.monotonic() - upload_started
+
+        if self._streams_backup():
+            return run_pipeline(
+                lambda stream: self._generate_backup(
+                    db_name, stream, extension, bu_type, **dump_options
+                ),
+                throttled_upload,
+                self.pipe_buffer_size * 1024 * 1024,
+            )
+
+        with tempfile.TemporaryFile(dir=dump_options["spool_dir"]) as bu_file_obj:
+            self._generate_backup(
+                db_name, bu_file_obj, extension, bu_type, **dump_options
+            )
+            bu_file_obj.seek(0)
+            return throttled_upload(bu_file_obj)
+
+    def _register_artifact(self, file_name, started, size=0, server=None, **values):
+        """
+        Adds the backup just uploaded to the artifacts catalog.
+
+        Args:
+            file_name (str): Name of the backup file.
+            started (float): `time.monotonic()` value when the backup started.
+            size (int): Size of the backup file in bytes.
+            server (backup.server): Server storing the backup (the record server by
+                default).
+            **values: Other `backup.artifact` values (path, provider_file_id, checksum).
+
+        Returns:
+            backup.artifact: The cataloged artifact.
+        """
+        self.ensure_one()
+        server = server or self.server_id
+        values = dict(
+            values,
+            name=file_name,
+            record_id=self.id,
+            server_id=server.id,
+            db_name=self.db_name,
+            type=self.type,
+            date=fields.Datetime.now(),
+            size=(size or 0) / 1024 / 1024,
+            duration=time.monotonic() - started,
+            state="present",
+        )
+        artifact_model = self.env["backup.artifact"]
+        artifact = artifact_model.search(
+            [("server_id", "=", server.id), ("name", "=", file_name)], limit=1
+        )
+        if artifact:
+            artifact.write(values)
+            return artifact
+        return artifact_model.create(values)
+
+    def _verify_upload(self, server, client, values, stats=None):
+        """Compare an uploaded backup with the checksums computed while generating it.
+
+        The checksum reported by the destination is compared with the matching inline
+        checksum, so the backup is never downloaded again. The members of a local ZIP
+        archive have their CRC checked instead; without any checksum to compare, the
+        size of the uploaded file is checked. A deduplicated backup compares the SHA-256
+        of its chunked archive; its size is the archive one.
+
+        Args:
+            server (backup.server): Server storing the backup.
+            client (object): Connected provider client (None for Local servers).
+            values (dict): `BackupServer.upload_backup` values of the uploaded file.
+            stats (dict): Archive statistics of the run, with the inline checksums.
+
+        Returns:
+            dict: `values` with the SHA-256 of the backup as checksum and the result of
+            the integrity check.
+        """
+        self.ensure_one()
+        values = dict(values)
+        stats = stats or {}
+        checksums = stats.get("checksums") or {}
+        dedup = values.pop("dedup", None)
+        remote_type, remote_checksum = (
+            (None, None) if dedup else server.get_remote_checksum(client, values)
+        )
+        if checksums.get("sha256"):
+            values.update(checksum=checksums["sha256"], checksum_type="sha256")
+
+        if dedup:
+            # The chunks were checked while stored, the index against the archive
+            new_bytes = sum(dedup["new_chunks"].values())
+            stats["dedup_bytes"] = stats.get("dedup_bytes", 0) + new_bytes
+            values["size"] = dedup["size"]
+            matches = dedup["sha256"] == checksums.get("sha256", dedup["sha256"])
+            state = "verified" if matches else "mismatch"
+            message = (
+                f"{len(dedup['chunks'])} chunks"
+                + (" matching" if matches else " not matching")
+                + f" the generated backup, {len(dedup['new_chunks'])} new ones "
+                f"stored ({new_bytes / 1024 / 1024:.2f} MB)."
+            )
+        elif server.backup_type == "local" and values["name"].endswith(".zip"):
+            corrupt = find_corrupt_zip_member(values["path"])
+            state = "mismatch" if corrupt else "verified"
+            message = (
+                f"CRC check failed: {corrupt}"
+                if corrupt
+                else "CRC of every archive member checked."
+            )
+        elif remote_checksum and checksums.get(remote_type):
+            matches = remote_checksum == checksums[remote_type]
+            state = "verified" if matches else "mismatch"
+            message = (
+                f"{remote_type} checksum {remote_checksum}"
+                + (" matches" if matches else " does not match")
+                + f" the generated backup ({checksums[remote_type]})."
+            )
+        elif stats.get("backup_size") is not None and values.get("size") is not None:
+            state = "size" if values["size"] == stats["backup_size"] else "mismatch"
+            message = (
+                f"Uploaded size {values['size']} bytes, generated size "
+                f"{stats['backup_size']} bytes."
+            )
+        else:
+            state = "unverified"
+            message = "No checksum of the generated backup to compare with."
+        values.update(integrity_state=state, integrity_msg=message)
+        return values
+
+    def _register_uploaded_backup(self, server, client, values, started, stats=None):
+        """Verify the integrity of an uploaded backup, then catalog it.
+
+        Args:
+            server (backup.server): Server storing the backup.
+            client (object): Connected provider client (None for Local servers).
+            values (dict): `BackupServer.upload_backup` values of the uploaded file.
+            started (float): `time.monotonic()` value when the backup started.
+            stats (dict): Archive statistics of the run, with the inline checksums.
+
+        Returns:
+            backup.artifact: The cataloged artifact.
+
+        Raises:
+            ValidationError: The uploaded file does not match the generated backup. It
+                is cataloged anyway, marked as such.
+        """
+        self.ensure_one()
+        dedup = values.get("dedup")
+        values = self._verify_upload(server, client, values, stats)
+        name = values.pop("name")
+        size = values.pop("size")
+        artifact = self._register_artifact(
+            name, started, size=size, server=server, **values
+        )
+        if dedup:
+            # Counted even on a mismatch: the retention deletes the backup anyway
+            self.env["backup.chunk"].sudo()._add_references(server, dedup)
+        if artifact.integrity_state == "mismatch":
+            raise ValidationError(
+                f"The integrity check of {name} failed: {artifact.integrity_msg}"
+            )
+        return artifact
+
+    def _apply_retention(self, client, file_name, server=None, stats=None):
+        """
+        Deletes the old backups of the record according to its retention policy.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+            file_name (str): Name of the backup just generated, which is always kept.
+            server (backup.server): Server whose backups are pruned (the record server
+                by default).
+            stats (dict): Receives the time spent in "prune_duration" (added to the
+                time already spent on other servers).
+
+        Returns:
+            list: The deleted backups.
+        """
+        self.ensure_one()
+        started = time.monotonic()
+        try:
+            return self._prune_backups(client, file_name, server or self.server_id)
+        finally:
+            if stats is not None:
+                stats["prune_duration"] = (
+                    stats.get("prune_duration", 0) + time.monotonic() - started
+                )
+
+    def _prune_backups(self, client, file_name, server):
+        """Delete the backups of `server` not kept by the retention policy.
+
+        See `_apply_retention`.
+        """
+        self.ensure_one()
+        keep_last = max(self.backup_lifespan_qty, 0)
+        keep_periods = {}
+        if self.retention_policy == "gfs":
+            keep_periods = {
+                "hourly": self.keep_hourly,
+                "daily": self.keep_daily,
+                "weekly": self.keep_weekly,
+                "monthly": self.keep_monthly,
+            }
+        if not keep_last and not any(keep_periods.values()):
+            return []
+
+        artifact_model = self.env["backup.artifact"]
+        domain = [
+            ("record_id", "=", self.id),
+            ("server_id", "=", server.id),
+            ("state", "=", "present"),
+        ]
+        artifacts = artifact_model.search(domain)
+        if not artifacts.filtered(lambda artifact: artifact.name != file_name):
+            # The catalog does not know yet the backups made before it existed
+            artifact_model.reconcile_record(self, client, server)
+            artifacts = artifact_model.search(domain)
+        backups = [artifact._to_backup() for artifact in artifacts]
+
+        to_keep, to_delete = select_backups_to_keep(backups, keep_last, **keep_periods)
+        to_delete = [backup for backup in to_delete if backup["name"] != file_name]
+        indexes = self._read_dedup_indexes(client, server, to_delete)
+        server.delete_backups(client, to_delete)
+        artifact_model.union(*(backup["artifact"] for backup in to_delete)).write(
+            {"state": "deleted"}
+        )
+        for index in indexes:
+            self.env["backup.chunk"].sudo()._release_references(server, client, index)
+        if to_delete:
+            _logger.info(
+                "Retention of backup record %s on %s: %s backups kept, %s deleted",
+                self.id,
+                server.name,
+                len(to_keep),
+                len(to_delete),
+            )
+        return to_delete
+
+    def _read_dedup_indexes(self, client, server, backups):
+        """Return the indexes of the deduplicated backups among `backups`.
+
+        They are read before the backups are deleted, to release their chunks. An
+        unreadable index is skipped: its chunks are kept, never deleted by mistake.
+        """
+        self.ensure_one()
+        indexes = []
+        for backup in backups:
+            if not backup["name"].endswith(f".{DEDUP_INDEX_EXTENSION}"):
+                continue
+            try:
+                indexes.append(server.read_dedup_index(client, backup))
+            except Exception as e:
+                _logger.warning(
+                    "Index of %s unreadable, its chunks are kept: %s", backup["name"], e
+                )
+        return indexes
+
+    def _get_spool_path(self, file_name):
+        """Return a persistent spool path for a backup file of this record.
+
+        Args:
+            file_name (str): Name of the backup file.
+
+        Returns:
+            str: Path of the spool file (its folder is created if needed).
+        """
+        self.ensure_one()
+        return os.path.join(self._get_spool_dir(), f"{self.id}_{file_name}")
+
+    def _get_spool_dir(self):
+        """Return the folder of the spooled backups and temporary dump files.
+
+        It is the "Spool Directory" of the settings, `<data_dir>/eqp_backup/spool` by
+        default (created if needed).
+        """
+        spool_dir = self.env["ir.config_parameter"].sudo().get_param(
+            "eqp_backup.spool_dir"
+        ) or os.path.join(config["data_dir"], "eqp_backup", "spool")
+        os.makedirs(spool_dir, exist_ok=True)
+        return spool_dir
+
+    def _estimate_backup_size(self):
+        """Estimate the sizes involved in the next backup of the record.
+
+        The database size is `pg_database_size` and the filestore footprint the total
+        size of its files. The archive size applies the compression ratio of the last
+        successful execution to them (no compression is assumed without history).
+
+        Returns:
+            dict: "db" and "filestore" bytes to archive, and the estimated "archive"
+            bytes (the incremental filestore blobs excluded).
+        """
+        self.ensure_one()
+        db_size = filestore_size = 0
+        if self.type != "fs":
+            self.env.cr.execute("SELECT pg_database_size(%s)", [self.db_name])
+            db_size = self.env.cr.fetchone()[0]
+        if self.type != "db" and self.filestore_mode == "full":
+            for dir_path, _dir_names, file_names in os.walk(
+                config.filestore(self.db_name)
+            ):
+                for file_name in file_names:
+                    try:
+                        filestore_size += os.path.getsize(
+                            os.path.join(dir_path, file_name)
+                        )
+                    except OSError:
+                        continue
+
+        ratio = 1.0
+        if self.compression != "zip_store":
+            last_execution = self.env["backup.execution"].search(
+                [
+                    ("record_id", "=", self.id),
+                    ("kind", "=", "backup"),
+                    ("result_type", "=", "success"),
+                    ("compression_ratio", ">", 0),
+                ],
+                order="date_start desc",
+                limit=1,
+            )
+            ratio = max(last_execution.compression_ratio, 1.0)
+        return {
+            "db": db_size,
+            "filestore": filestore_size,
+            "archive": int((db_size + filestore_size) / ratio),
+        }
+
+    def _get_spool_space_needed(self, estimate):
+        """Return the bytes the backup writes to the spool directory.
+
+        Args:
+            estimate (dict): Sizes returned by `_estimate_backup_size`.
+        """
+        self.ensure_one()
+        needed = 0
+        # The Native format streams the custom-format dump without temporary files
+        if self.type != "fs" and self.compression != "native":
+            if self.backup_format == "directory":
+                # pg_dump writes the whole directory dump before it is archived
+                needed += estimate["db"]
+        # Without the Pipelined Upload, the archive is spooled before being uploaded,
+        # except for a single Local server which receives it directly
+        if not self._streams_backup() and (
+            self.destination_ids or self.server_id.backup_type != "local"
+        ):
+            needed += estimate["archive"]
+        return needed
+
+    def _preflight_check(self):
+        """Check there is room for the backup, before anything is dumped.
+
+        The estimated sizes (with a `PREFLIGHT_MARGIN` safety margin) are compared to
+        the free space of the spool directory and of every destination whose provider
+        reports it.
+
+        Raises:
+            ValidationError: If the backup is not expected to fit somewhere.
+        """
+        self.ensure_one()
+        estimate = self._estimate_backup_size()
+
+        spool_dir = self._get_spool_dir()
+        spool_needed = self._get_spool_space_needed(estimate) * PREFLIGHT_MARGIN
+        spool_free = shutil.disk_usage(spool_dir).free
+        if spool_needed > spool_free:
+            raise ValidationError(
+                f"Not enough space in the spool directory {spool_dir}: about "
+                f"{spool_needed / 1024 / 1024:.0f} MB needed, "
+                f"{spool_free / 1024 / 1024:.0f} MB free. "
+                "Free some space or choose another Spool Directory in the settings."
+            )
+
+        archive_needed = estimate["archive"] * PREFLIGHT_MARGIN
+        for server in self._get_destination_servers():
+            with server.provider_client() as client:
+                server_free = server.get_free_space(client)
+            if server_free is not None and archive_needed > server_free:
+                raise ValidationError(
+                    f"Not enough space on the server {server.name}: about "
+                    f"{archive_needed / 1024 / 1024:.0f} MB needed, "
+                    f"{server_free / 1024 / 1024:.0f} MB free."
+                )
+        _logger.info(
+            "Preflight check of %s passed (estimated archive: %s bytes)",
+            self.name,
+            estimate["archive"],
+        )
+
+    def _compute_drive_resume(self):
+        uploads = self.env["backup.drive.upload"].sudo().search(
+            [("record_id", "in", self.ids)]
+        )
+        upload_by_record = {upload.record_id: upload for upload in uploads}
+        for record in self:
+            upload = upload_by_record.get(record)
+            record.drive_resume_uri = upload.session_uri if upload else False
+            record.drive_resume_spool = upload.spool_path if upload else False
+            record.drive_resume_file_name = upload.file_name if upload else False
+
+    def _set_drive_resume_state(self, session_uri=False, spool_path=False, file_name=False):
+        """Save (or clear, without arguments) the resumable Google Drive upload state.
+
+        The state is committed right away so it survives a crash of the current run,
+        through its own transaction: the transaction of the run (of the caller, for a
+        manual run) is left untouched.
+        """
+        self.ensure_one()
+        self.env["backup.drive.upload"]._save_state(
+            self, session_uri, spool_path, file_name
+        )
+
+    def _drive_upload_backup(self, service, extension, file_name, stats=None):
+        """Generate the backup and upload it to Google Drive in resumable chunks.
+
+        The spooled backup and the resumable session URI are kept until the upload
+        succeeds, so a later run continues from the last offset confirmed by Google
+        Drive instead of generating and uploading the whole backup again.
+
+        Args:
+            service (googleapiclient.discovery.Resource): Google Drive service.
+            extension (str): Backup format.
+            file_name (str): Name of the new backup file.
+
+        Returns:
+            dict: Metadata (id) of the uploaded file.
+        """
+        self.ensure_one()
+        server = self.server_id
+
+        # Pipelined uploads cannot be resumed as the backup is never stored
+        if self._streams_backup():
+            mimetype = ARCHIVE_MIMETYPES[extension]
+
+            def upload(bu_file_obj):
+                media = server.get_drive_file_media(
+                    bu_file_obj, mimetype, self.chunk_size * 1024 * 1024 or None
+                )
+                return server.drive_upload_chunks(
+                    server.drive_create_request(service, media, file_name, mimetype),
+                    self.upload_retries,
+                )
+
+            return self._backup_and_upload(
+                extension, upload, client=service, stats=stats
+            )
+
+        # Resume the upload of the backup spooled by a previous run, if recent enough
+        spool_path, session_uri, resumed_name = self._get_drive_resume_state()
+        if spool_path:
+            file_name = resumed_name
+            _logger.info("Resuming the Google Drive upload of %s", file_name)
+        else:
+            spool_path = self._get_spool_path(file_name)
+            dump_options = self._prepare_dump_options(service, stats)
+            try:
+                with open(spool_path, "wb") as spool:
+                    self._generate_backup(
+                        self.db_name, spool, extension, self.type, **dump_options
+                    )
+            except Exception:
+                # No resume state points at the partial spool yet: nothing would
+                # ever remove it
+                if os.path.exists(spool_path):
+                    os.remove(spool_path)
+                raise
+            self._set_drive_resume_state(False, spool_path, file_name)
+
+        upload_started = time.monotonic()
+        file = self._drive_upload_spool(
+            service, extension, spool_path, file_name, session_uri
+        )
+        if stats is not None:
+            stats["upload_duration"] = time.monotonic() - upload_started
+
+        self._set_drive_resume_state()
+        os.remove(spool_path)
+        return file
+
+    def _get_drive_resume_state(self):
+        """Return the Google Drive upload left unfinished by a previous run.
+
+        A spooled backup older than `DRIVE_RESUME_MAX_AGE` is removed: the run
+        generates a new backup instead of resuming it.
+
+        Returns:
+            tuple: Spool path, resumable session URI and file name of the upload to
+            resume (all False if there is none).
+        """
+        self.ensure_one()
+        spool_path = self.drive_resume_spool
+        if not spool_path:
+            return False, False, False
+        if (
+            os.path.exists(spool_path)
+            and time.time() - os.path.getmtime(spool_path) <= DRIVE_RESUME_MAX_AGE
+        ):
+            return spool_path, self.drive_resume_uri, self.drive_resume_file_name
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+        return False, False, False
+
+    def _drive_upload_spool(
+        self, service, extension, spool_path, file_name, session_uri=False
+    ):
+        """Upload a spooled backup to Google Drive, resuming a session if given.
+
+        The URI of a new resumable session is saved as soon as it is created. A
+        session which expired or was lost is replaced by a new one.
+
+        Args:
+            service (googleapiclient.discovery.Resource): Google Drive service.
+            extension (str): Backup format.
+            spool_path (str): Path of the spooled backup.
+            file_name (str): Name of the backup file.
+            session_uri (str): Resumable session URI of a previous run.
+
+        Returns:
+            dict: Metadata (id) of the uploaded file.
+        """
+        from googleapiclient.errors import HttpError
+
+        from ..tools.drive import resume_upload_request
+
+        self.ensure_one()
+        server = self.server_id
+        mimetype = ARCHIVE_MIMETYPES[extension]
+        bucket = self._get_upload_throttle()
+        stream = open(spool_path, "rb")
+        if bucket:
+            stream = ThrottledReader(stream, bucket)
+        try:
+            media = server.get_drive_file_media(
+                stream, mimetype, self.chunk_size * 1024 * 1024 or None
+            )
+            request = server.drive_create_request(service, media, file_name, mimetype)
+            if session_uri:
+                resume_upload_request(request, session_uri)
+            return server.drive_upload_chunks(
+                request,
+                self.upload_retries,
+                on_session=lambda uri: self._set_drive_resume_state(
+                    uri, spool_path, file_name
+                ),
+            )
+        except HttpError as e:
+            # The resumable session expired or was lost: start a new one
+            if not session_uri or e.resp.status not in (404, 410):
+                raise
+            _logger.warning("Google Drive resumable session is no longer valid: %s", e)
+        finally:
+            stream.close()
+        return self._drive_upload_spool(service, extension, spool_path, file_name)
+
+    def _upload_to_destinations(self, clients, extension, file_name, dump_options):
+        """Generate the backup once and upload it to several servers simultaneously.
+
+        With the Pipelined Upload the backup is teed to one upload thread per server,
+        each through its own bounded buffer (the slowest server sets the pace).
+        Otherwise it is spooled once and each server uploads its own handle of the
+        spool file, which allows retrying a failed upload.
+
+        Args:
+            clients (dict): Connected provider client of each `backup.server`.
+            extension (str): Backup format.
+            file_name (str): Name of the backup file.
+            dump_options (dict): `_generate_backup` keyword arguments.
+
+        Returns:
+            dict: Artifact values (None on failure), error and number of attempts of
+            each server.
+        """
+        self.ensure_one()
+        db_name = self.db_name
+        bu_type = self.type
+        servers = list(clients)
+        upload_options = {
+            "chunk_size": self.chunk_size,
+            "workers": self.upload_workers,
+            "retries": self.upload_retries,
+        }
+        # The uploads run in threads, which cannot read the settings from the database
+        self.env["backup.server"].union(*servers).prefetch_upload_settings()
+        # Local copies are not network uploads: they are never throttled
+        bucket = self._get_upload_throttle()
+
+        def generate(stream):
+            self._generate_backup(db_name, stream, extension, bu_type, **dump_options)
+
+        dedup_uploaders = {}
+        if self.storage_mode == "dedup":
+            dedup_uploaders = {
+                server: self._dedup_uploader(server, clients[server], file_name)
+                for server in servers
+            }
+
+        def uploader(server):
+            if server in dedup_uploaders:
+                return dedup_uploaders[server]
+            throttled = bucket and server.backup_type != "local"
+            return lambda stream: server.upload_backup(
+                clients[server],
+                ThrottledReader(stream, bucket) if throttled else stream,
+                file_name,
+                **upload_options,
+            )
+
+        stats = dump_options.get("stats")
+        if self._streams_backup():
+            upload_started = time.monotonic()
+            outcomes = run_fanout(
+                generate,
+                [uploader(server) for server in servers],
+                self.pipe_buffer_size * 1024 * 1024,
+            )
+            if stats is not None:
+                stats["upload_duration"] = time.monotonic() - upload_started
+            return {
+                server: (values, error, 1)
+                for server, (values, error) in zip(servers, outcomes)
+            }
+
+        retries = self.destination_retries
+        spool_path = self._get_spool_path(file_name)
+
+        def upload_spool(server, server_name):
+            upload = uploader(server)
+            attempt = 1
+            while True:
+                try:
+                    with open(spool_path, "rb") as spool:
+                        return upload(spool), None, attempt
+                except Exception as e:
+                    _logger.warning(
+                        "Upload of %s to %s failed (attempt %s): %s",
+                        file_name,
+                        server_name,
+                        attempt,
+                        e,
+                    )
+                    if attempt > retries:
+                        return None, e, attempt
+                    time.sleep(min(2**attempt, 60))
+                    attempt += 1
+
+        try:
+            with open(spool_path, "wb") as spool:
+                generate(spool)
+            upload_started = time.monotonic()
+            with ThreadPoolExecutor(
+                len(servers), thread_name_prefix="eqp_backup_upload"
+            ) as pool:
+                futures = {
+                    server: pool.submit(upload_spool, server, server.name)
+                    for server in servers
+                }
+            if stats is not None:
+                stats["upload_duration"] = time.monotonic() - upload_started
+            return {server: future.result() for server, future in futures.items()}
+        finally:
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+
+    def _fanout_backup(self, extension, file_name, started, stats):
+        """Upload the backup to the record server and its additional destinations.
+
+        Each server gets its own result, catalog entry and retention, so a failing
+        server does not prevent the others from receiving the backup.
+
+        Args:
+            extension (str): Backup format.
+            file_name (str): Name of the backup file.
+            started (float): `time.monotonic()` value when the backup started.
+            stats (dict): Receives the archive statistics.
+
+        Returns:
+            tuple: Result type (success when every server received the backup, danger
+            otherwise) and result details per server.
+        """
+        self.ensure_one()
+        servers = self._get_destination_servers()
+        destinations = {line.server_id: line for line in self.destination_ids}
+        dump_options = self._get_dump_options()
+        dump_options["stats"] = stats
+        snapshot = None
+        if self.type != "db" and self.filestore_mode == "incremental":
+            # The filestore is hashed once, every server gets the same archive
+            snapshot = filestore_snapshot(self.db_name)
+            dump_options["filestore_snapshot"] = snapshot[0]
+        details = []
+        failures = 0
+
+        with ExitStack() as stack:
+            clients, outcomes = self._connect_destinations(stack, servers, snapshot)
+            if clients:
+                try:
+                    outcomes.update(
+                        self._upload_to_destinations(
+                            clients, extension, file_name, dump_options
+                        )
+                    )
+                except Exception as e:
+                    # The backup generation itself failed
+                    outcomes.update({server: (None, e, 1) for server in clients})
+
+            for server in servers:
+                error, message = self._finish_destination(
+                    server,
+                    clients.get(server),
+                    outcomes[server],
+                    destinations.get(server),
+                    started,
+                    stats,
+                )
+                if error:
+                    failures += 1
+                details.append(f"- {server.name}: {message}")
+
+        if failures:
+            result_type = "danger"
+            result_msg = (
+                f"Backup process failed on {failures} of {len(servers)} servers."
+            )
+        else:
+            result_type = "success"
+            result_msg = (
+                f"Backup process executed successfully on {len(servers)} servers."
+            )
+        _logger.info(result_msg)
+        return result_type, "\n".join([result_msg] + details)
+
+    def _connect_destinations(self, stack, servers, snapshot=None):
+        """Connect to the servers of a fan-out backup.
+
+        Args:
+            stack (ExitStack): Receives the provider clients, closed when it exits.
+            servers (backup.server): Servers receiving the backup.
+            snapshot (tuple): Incremental filestore snapshot returned by
+                `filestore_snapshot`: the blobs each server misses are uploaded first.
+
+        Returns:
+            tuple: Connected provider client of each server, and the outcome (see
+            `_upload_to_destinations`) of the servers which could not be prepared.
+        """
+        self.ensure_one()
+        clients = {}
+        outcomes = {}
+        for server in servers:
+            try:
+                client = stack.enter_context(server.provider_client())
+                if snapshot:
+                    self._upload_filestore_blobs(client, server, snapshot)
+                clients[server] = client
+            except Exception as e:
+                outcomes[server] = (None, e, 1)
+        return clients, outcomes
+
+    def _finish_destination(self, server, client, outcome, destination, started, stats):
+        """Catalog the backup uploaded to a server and apply its retention policy.
+
+        Args:
+            server (backup.server): Server which received the backup.
+            client (object): Connected provider client of the server.
+            outcome (tuple): Artifact values, error and attempts of the upload.
+            destination (backup.destination): Destination line of the server, if any,
+                updated with the result.
+            started (float): `time.monotonic()` value when the backup started.
+            stats (dict): Archive statistics of the backup.
+
+        Returns:
+            tuple: Error of the server (None on success) and result details.
+        """
+        self.ensure_one()
+        values, error, attempts = outcome
+        if error:
+            message = f"Failed after {attempts} attempt(s): {error}"
+        else:
+            name = values["name"]
+            message = f"Uploaded in {attempts} attempt(s)"
+            if values.get("provider_file_id"):
+                message += f", the file ID is: {values['provider_file_id']}"
+            try:
+                self._register_uploaded_backup(server, client, values, started, stats)
+            except Exception as e:
+                # The backups kept by the retention may be the only sound ones
+                error = e
+                values = None
+                message += f", but {e}"
+            else:
+                try:
+                    self._apply_retention(client, name, server, stats)
+                except Exception as e:
+                    error = e
+                    message += f", but the retention policy failed: {e}"
+
+        if error:
+            _logger.error("Backup to %s: %s", server.name, message)
+        if destination:
+            destination_values = {
+                "last_result_type": "danger" if error else "success",
+                "last_result_msg": message,
+                "last_attempts": attempts,
+            }
+            if values:
+                destination_values["last_success_date"] = fields.Datetime.now()
+            destination.write(destination_values)
+        return error, message
+
+    def update_cron_state(self, state):
+        """Update the state of the associated cron job.
+
+        Args:
+            state (bool): New state for the cron job (active/inactive).
+        """
+        for record in self:
+            if record.cron_id:
+                record.cron_id.write({"active": state})
+
+    def write(self, vals):
+        """Override write method to handle state updates.
+
+        Args:
+            vals (dict): Values to be written.
+
+        Returns:
+            dict: Written values.
+        """
+        if "active" in vals:
+            if vals["active"] is True:
+                vals["state"] = "draft"
+            else:
+                vals["state"] = "archived"
+                self.update_cron_state(False)
+        return super(BackupRecord, self).write(vals)
+
+    def copy(self, default=None):
+        """Create a copy of the backup record.
+
+        Args:
+            default (dict): Default values for the new record.
+
+        Returns:
+            models.Model: New backup record.
+        """
+        self.ensure_one()
+        chosen_name = default.get("name") if default else ""
+        new_name = chosen_name or _("%s (copy)", self.name)
+        default = dict(default or {}, name=new_name)
+        return super(BackupRecord, self).copy(default)
+
+    def check_valid_state(self, just_server=False):
+        """Check if the backup record is in a valid state for certain operations.
+
+        Args:
+            just_server (bool): If True, only check the state of the associated server.
+
+        Raises:
+            ValidationError: If the state is not valid.
+        """
+        for record in self:
+            if not just_server and record.state != "confirmed":
+                raise ValidationError(
+                    'This method can only be executed on a Backup record in the "confirmed" state.'
+                )
+            if any(
+                server.state != "confirmed"
+                for server in record._get_destination_servers()
+            ):
+                raise ValidationError(
+                    'This method can only be executed with a Backup Server in the "confirmed" state.'
+                )
+
+    def revert_state(self):
+        """Revert the state of the backup record to 'draft'.
+
+        If the record is in the 'confirmed' state, it will be reverted to 'draft',
+         and the associated cron job state will be updated if applicable.
+        """
+        for record in self:
+            if record.cron_id:
+                self.update_cron_state(False)
+            if record.state == "confirmed":
+                record.write({"state": "draft", "db_names": ""})
+
+    def validate_db(self):
+        """Validate database credentials and confirm backup record.
+
+        Returns:
+            dict: Action to display notification with validation result.
+        """
+        self.ensure_one()
+        dbs = db.list_dbs(force=True)
+
+        # Set a Success values by default.
+        result_type = "success"
+        result_msg = "Database validation executed Successfully."
+
+        db_name = self.db_name
+        # Validates if the database exists
+        if db_name not in dbs:
+            # Set a warning notification values by default (Display just on a strange case).
+            result_type = "warning"
+            result_msg = f'The specified Database Name "{db_name}" does not exist. Please verify and try again.'
+
+        if result_type == "success" and self.env.context.get("confirm", False):
+
+            # Validate confirmed state
+            self.check_valid_state(True)
+            # Create/update Cron
+            vals = {"state": "confirmed"}
+
+            # Define the Cron values
+            model_id = self.env["ir.model"]._get_id("backup.record")
+            cron_values = {
+                "active": True,
+                "name": f"{self.name} - Cron",
+                "model_id": model_id,
+                "state": "code",
+                "code": f"model._scheduled_backup_process(record_id={self.id})",
+                "numbercall": -1,
+                "doall": False,
+            }
+
+            if self.cron_id:
+                # Re-Write Existing Cron
+                self.cron_id.write(cron_values)
+            else:
+                # Default interval_number and interval_type on the cron then the user can modify it if required.
+                cron_values["interval_number"] = 1 if self.frequency != "years" else 12
+                cron_values["interval_type"] = (
+                    self.frequency if self.frequency != "years" else "months"
+                )
+                # Create new Cron
+                cron_job = self.env["ir.cron"].create(cron_values)
+                # Reference the cron with the Backup record
+                vals["cron_id"] = cron_job and cron_job.id
+
+            # Update State if the confirmation flag is true
             self.write(vals)
 
         # Display the test result
@@ -506,276 +2330,660 @@ class BackupRecord(models.Model):
     def _scheduled_backup_process(self, record_id):
         """Perform the scheduled backup process.
 
+        With the Backup Worker execution mode, the backup is only queued here and is
+        executed later by a `backup.job` worker process.
+
         Args:
             record_id (int): ID of the backup record.
 
         Returns:
             bool: True if the process was successful, False otherwise.
         """
-        # Instantiate both record and server
         record = self.browse(record_id)
-        server = record.server_id
+        manual_execution = self.env.context.get("manual_execution", False)
 
         # Validate confirmed state
         record.check_valid_state()
 
-        # Set the backup file unique name
-        db_name = record.db_name
-        extension = "zip"
+        if record.execution_mode == "worker" and not self.env.context.get(
+            "backup_job_id"
+        ):
+            job = self.env["backup.job"].enqueue(record)
+            result_type = "info"
+            result_msg = (
+                f"The backup was queued (job {job.id}): it will be executed by a backup "
+                "worker and its result will be available on the record."
+            )
+            _logger.info(result_msg)
+            return (result_type, result_msg) if manual_execution else True
 
-        # Get file path details
-        destination_path, file_name = server.get_file_path_details(db_name, extension)
-        file_path = destination_path + file_name
+        result_type, result_msg = record._execute_backup()
 
-        backup_type = server.backup_type
+        # Display an alert window for manual execution, or alternatively, send an email if applicable.
+        if not manual_execution:
+            record._report_result(result_type, result_msg)
+            return True
+        else:
+            return result_type, result_msg
 
-        # Local backup
-        if backup_type == "local":
-            try:
-                # Check if the file path exists
-                if not os.path.isdir(destination_path):
-                    # Try to create it if it does not exist
-                    os.makedirs(destination_path)
-                # Open with write permissions the file on the file path
-                file = open(file_path, "wb")
-                # Generate backup using the dump_db function
-                self._generate_backup(db_name, file, extension, self.type)
-                # Closing the file
-                file.close()
-
-                # Process which deletes old backups
-                if record.backup_lifespan_qty > 0:
-                    # Retrieve a list of all backup files in the destination_path
-                    backup_files = glob.glob(
-                        os.path.join(destination_path, "Backup_*.zip")
-                    )
-                    # Sort backup files based on creation date
-                    backup_files.sort(key=os.path.getctime, reverse=True)
-                    # Check if file_path is in the backup_files
-                    if any(bu_file == file_path for bu_file in backup_files):
-                        desired_qty = record.backup_lifespan_qty
-                    else:
-                        desired_qty = record.backup_lifespan_qty - 1
-                    # Calculate the number of backups to keep
-                    backups_to_keep = min(desired_qty, len(backup_files))
-                    # Iterate over the extra files and remove them
-                    for old_backup in backup_files[backups_to_keep:]:
-                        os.remove(old_backup)
+    def _report_result(self, result_type, result_msg):
+        """Save the result of a backup execution and notify it by email if applicable.
 
-                result_type = "success"
-                result_msg = "Local Backup process executed successfully."
-                _logger.info(result_msg)
+        Args:
+            result_type (str): Result type (success, warning, danger).
+            result_msg (str): Result details.
+        """
+        self.ensure_one()
+        execution_time = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        self.last_execution_result = (
+            f"RESULT TYPE: {result_type}\nDATE (yyyy-mm-dd hh:mm:ss): {execution_time}\n"
+            f"DETAILS: {result_msg}"
+        )
+        self.notify_result(result_type)
 
-            except Exception as e:
-                result_type = "danger"
-                result_msg = f"FTP Exception: {e}"
-                _logger.error(result_msg)
+    def _execute_backup(self):
+        """Generate the backup, upload it to the server and apply the retention policy.
 
-        # SFTP backup
-        elif backup_type == "sftp":
-            try:
-                sftp, transport = server.establish_sftp_connection()
-                # Generate backup using the dump_db function
-                bu_file_obj = self._generate_backup(db_name, None, extension, self.type)
-                # Upload the Backup file object to the remote folder
-                sftp.putfo(bu_file_obj, file_path)
-
-                # Process which deletes old backups
-                if record.backup_lifespan_qty > 0:
-                    # Retrieve a list of all backup files in the destination_path on the remote server
-                    backup_files = sftp.listdir(destination_path)
-                    # Filter files with names starting with 'Backup_' and having the '.zip' extension
-                    backup_files = [
-                        file
-                        for file in backup_files
-                        if file.startswith("Backup_") and file.endswith(".zip")
-                    ]
-                    # Sort backup files based on modification time (latest first)
-                    backup_files.sort(
-                        key=lambda bu_file: sftp.stat(
-                            os.path.join(destination_path, bu_file)
-                        ).st_mtime,
-                        reverse=True,
-                    )
-                    # Check if file_name is in the backup_files
-                    if any(bu_file == file_name for bu_file in backup_files):
-                        desired_qty = record.backup_lifespan_qty
-                    else:
-                        desired_qty = record.backup_lifespan_qty - 1
-                    # Calculate the number of backups to keep
-                    backups_to_keep = min(desired_qty, len(backup_files))
-                    # Iterate over the extra files and remove them
-                    for old_backup in backup_files[backups_to_keep:]:
-                        sftp.remove(os.path.join(destination_path, old_backup))
+        The execution is logged in the history with its timings and resource usage.
 
-                sftp.close()
-                transport.close()
+        Returns:
+            tuple: Result type (success, warning, danger) and result details.
+        """
+        self.ensure_one()
+        # Filled with the compression statistics and phase timings of the run
+        archive_stats = {}
+        date_start = fields.Datetime.now()
+        started = time.monotonic()
+        with ResourceMonitor([tempfile.gettempdir(), self._get_spool_dir()]) as monitor:
+            result_type, result_msg = self._run_backup(archive_stats)
+        self._log_execution(
+            result_type,
+            result_msg,
+            archive_stats,
+            date_start,
+            time.monotonic() - started,
+            monitor,
+        )
+        return result_type, result_msg
 
-                result_type = "success"
-                result_msg = "SFTP Backup transference process executed successfully."
-                _logger.info(result_msg)
+    def _log_execution(
+        self, result_type, result_msg, stats, date_start, duration, monitor
+    ):
+        """Add an execution to the history of the record.
 
-            except Exception as e:
-                result_type = "danger"
-                result_msg = f"Failed to create and send backup file.\nError: {e}"
-                _logger.error(result_msg)
+        Args:
+            result_type (str): Result type (success, warning, danger).
+            result_msg (str): Result details.
+            stats (dict): Archive statistics and phase timings of the run.
+            date_start (datetime): Start date of the execution.
+            duration (float): Duration of the execution in seconds.
+            monitor (ResourceMonitor): Stopped monitor of the execution.
 
-        # Google Drive backup
-        elif backup_type == "drive":
-            try:
-                # Get Google Drive Service
-                service = server.provider_authenticate()
-                # Generate backup using the dump_db function
-                bu_file_obj = self._generate_backup(db_name, None, extension, self.type)
-                # Create a MediaIoBaseUpload object from the io.BufferedRandom object
-                media = server.get_drive_file_media(bu_file_obj, "application/zip")
-                # Get the current UTC time in ISO format
-                current_time = datetime.now(timezone.utc).isoformat()
-
-                file_metadata = {
-                    "name": file_name,
-                    "parents": [server.parent_folder],
-                    "description": "Uploaded from Odoo",
-                    "mimeType": "application/zip",
-                    "createdTime": current_time,
-                    "modifiedTime": current_time,
+        Returns:
+            backup.execution: The logged execution.
+        """
+        self.ensure_one()
+        megabyte = 1024 * 1024
+        bytes_in = stats.get("bytes_in", 0)
+        bytes_out = stats.get("bytes_out", 0)
+        return (
+            self.env["backup.execution"]
+            .sudo()
+            .create(
+                {
+                    "record_id": self.id,
+                    "server_id": self.server_id.id,
+                    "job_id": self.env.context.get("backup_job_id", False),
+                    "date_start": date_start,
+                    "date_end": fields.Datetime.now(),
+                    "result_type": result_type,
+                    "result_msg": result_msg,
+                    "codec": stats.get("codec"),
+                    "destination_count": len(self._get_destination_servers()),
+                    "duration": duration,
+                    "dump_duration": stats.get("dump_duration", 0),
+                    "archive_duration": stats.get("archive_duration", 0),
+                    "upload_duration": stats.get("upload_duration", 0),
+                    "prune_duration": stats.get("prune_duration", 0),
+                    "size_in": bytes_in / megabyte,
+                    "size_out": bytes_out / megabyte,
+                    "compression_ratio": bytes_in / bytes_out if bytes_out else 0,
+                    "throughput": bytes_in / megabyte / max(duration, 1e-6),
+                    "checksum": stats.get("checksums", {}).get("sha256"),
+                    "stored_size": stats.get("dedup_bytes", 0) / megabyte,
+                    "peak_temp_disk": monitor.peak_disk / megabyte,
+                    "peak_rss": monitor.peak_rss / megabyte,
                 }
+            )
+        )
 
-                # Create the file
-                file = (
-                    service.files()
-                    .create(body=file_metadata, media_body=media, fields="id")
-                    .execute()
-                )
+    def _get_drill_artifact(self):
+        """Return the latest stored backup of the record holding a database.
+
+        The copy of the record server is preferred over the additional destinations.
+        """
+        self.ensure_one()
+        artifacts = self.env["backup.artifact"].search(
+            [
+                ("record_id", "=", self.id),
+                ("state", "=", "present"),
+                ("type", "!=", "fs"),
+                ("integrity_state", "!=", "mismatch"),
+            ],
+            order="date desc, id desc",
+        )
+        latest = artifacts.filtered(
+            lambda artifact: artifact.name == artifacts[:1].name
+        )
+        main = latest.filtered(lambda artifact: artifact.server_id == self.server_id)
+        return (main or latest)[:1]
+
+    def _get_drill_queries(self):
+        """Return the sanity queries of the restore drills."""
+        self.ensure_one()
+        lines = (line.strip() for line in (self.drill_queries or "").splitlines())
+        return [line for line in lines if line and not line.startswith("--")]
+
+    def _run_sanity_queries(self, db_name):
+        """Run the sanity queries of the record on a restored database.
+
+        Args:
+            db_name (str): Name of the restored database.
+
+        Returns:
+            list: Failed queries with the reason of the failure (empty if all passed).
+        """
+        self.ensure_one()
+        failures = []
+        with odoo.sql_db.db_connect(db_name).cursor() as cr:
+            # The queries only check the database, they must never change it (nor
+            # act on the cluster): a rollback would not undo every side effect. Each
+            # query runs in a savepoint, where the transaction cannot be made
+            # read-write again.
+            cr.execute("SET TRANSACTION READ ONLY")
+            for query in self._get_drill_queries():
+                try:
+                    with cr.savepoint():
+                        cr.execute(query)
+                        row = cr.fetchone()
+                except Exception as e:
+                    failures.append(f"{query}: {e}")
+                    continue
+                if not row or not row[0]:
+                    failures.append(f"{query}: returned {row}")
+            cr.rollback()
+        return failures
+
+    def _drop_drill_databases(self):
+        """Drop the scratch databases of the record drills, if any are left."""
+        self.ensure_one()
+        prefix = f"{DRILL_DB_PREFIX}{self.id}_"
+        for db_name in db.list_dbs(True):
+            if db_name.startswith(prefix):
+                _logger.info("Dropping the restore drill database %s", db_name)
+                drop_database(db_name)
+
+    def _get_rto_baseline(self):
+        """Return the median time to restore of the latest drills (0 without any)."""
+        self.ensure_one()
+        executions = self.env["backup.execution"].search(
+            [
+                ("record_id", "=", self.id),
+                ("kind", "=", "restore_drill"),
+                ("result_type", "in", ("success", "warning")),
+            ],
+            order="date_start desc",
+            limit=DRILL_RTO_BASELINE_SIZE,
+        )
+        durations = executions.mapped("duration")
+        return statistics.median(durations) if durations else 0.0
 
-                # Process which deletes old backups
-                if record.backup_lifespan_qty > 0:
-                    # Retrieve a list of all backup files in the parent folder on Google Drive
-                    results = (
-                        service.files()
-                        .list(
-                            q=f"'{server.parent_folder}' in parents and mimeType='application/zip'",
-                            fields="files(id, name, createdTime)",
+    def _execute_restore_drill(self):
+        """Restore the latest backup into a scratch database, check it and drop it.
+
+        The drill is logged in the execution history with its time to restore. It is a
+        warning when the time to restore regresses beyond the threshold of the record.
+
+        Returns:
+            tuple: Result type (success, warning, danger) and result details.
+        """
+        self.ensure_one()
+        artifact = self._get_drill_artifact()
+        baseline = self._get_rto_baseline()
+        date_start = fields.Datetime.now()
+        started = time.monotonic()
+        stats = {}
+
+        with ResourceMonitor([tempfile.gettempdir(), self._get_spool_dir()]) as monitor:
+            if not artifact:
+                result_type = "danger"
+                result_msg = "No stored backup of the database to restore."
+            else:
+                db_name = f"{DRILL_DB_PREFIX}{self.id}_{date_start:%Y%m%d%H%M%S}"
+                try:
+                    stats = artifact._restore(db_name, self.drill_jobs, neutralize=True)
+                    failures = self._run_sanity_queries(db_name)
+                    result_msg = artifact._format_restore_stats(db_name, stats)
+                    if failures:
+                        result_type = "danger"
+                        result_msg = (
+                            f"{len(failures)} sanity queries failed:\n"
+                            + "\n".join(failures)
+                            + f"\n{result_msg}"
                         )
-                        .execute()
-                    )
-                    backup_files = results.get("files", [])
-                    # Sort backup files based on creation time (latest first)
-                    backup_files.sort(
-                        key=lambda current_file: current_file["createdTime"],
-                        reverse=True,
-                    )
-                    # Check if file['id'] is in the backup_files
-                    if any(bu_file.get("id") == file["id"] for bu_file in backup_files):
-                        desired_qty = record.backup_lifespan_qty
                     else:
-                        desired_qty = record.backup_lifespan_qty - 1
-                    # Define the number of backups to keep
-                    backups_to_keep = min(desired_qty, len(backup_files))
-                    # Iterate over the extra files and remove them
-                    for old_backup in backup_files[backups_to_keep:]:
-                        service.files().delete(fileId=old_backup["id"]).execute()
+                        result_type = "success"
+                        result_msg += (
+                            f"\n{len(self._get_drill_queries())} sanity queries passed."
+                        )
+                except Exception as e:
+                    result_type = "danger"
+                    result_msg = f"Restore Drill Exception: {e}"
+                finally:
+                    self._drop_drill_databases()
+
+        duration = stats.get("duration") or time.monotonic() - started
+        threshold = self.drill_rto_threshold
+        if (
+            result_type == "success"
+            and baseline
+            and threshold
+            and duration > baseline * (1 + threshold / 100)
+        ):
+            result_type = "warning"
+            result_msg = (
+                f"RTO regression: the restore took {duration:.1f}s, "
+                f"{(duration / baseline - 1) * 100:.0f}% more than the {baseline:.1f}s "
+                f"median of the previous drills.\n{result_msg}"
+            )
+        _logger.info("Restore drill of %s: %s", self.name, result_msg)
+
+        megabyte = 1024 * 1024
+        size = artifact.size
+        self.env["backup.execution"].sudo().create(
+            {
+                "kind": "restore_drill",
+                "record_id": self.id,
+                "server_id": (artifact.server_id or self.server_id).id,
+                "artifact_id": artifact.id,
+                "date_start": date_start,
+                "date_end": fields.Datetime.now(),
+                "result_type": result_type,
+                "result_msg": result_msg,
+                "destination_count": 1 if artifact else 0,
+                "duration": duration,
+                "transfer_duration": stats.get("transfer_duration", 0),
+                "database_duration": stats.get("database_duration", 0),
+                "size_out": size,
+                "throughput": size / max(duration, 1e-6) if stats else 0,
+                "rto_baseline": baseline,
+                "peak_temp_disk": monitor.peak_disk / megabyte,
+                "peak_rss": monitor.peak_rss / megabyte,
+            }
+        )
+        return result_type, result_msg
 
-                result_type = "success"
-                result_msg = f"Google Drive Backup process executed successfully.\nThe file ID is: {file['id']}"
-                _logger.info(result_msg)
+    def _report_drill_result(self, result_type, result_msg):
+        """Save the result of a restore drill and alert on a failure or a regression.
 
-            except Exception as e:
-                result_type = "danger"
-                result_msg = f"Google Drive Exception: {e}"
-                _logger.error(result_msg)
+        Args:
+            result_type (str): Result type (success, warning, danger).
+            result_msg (str): Result details.
+        """
+        self.ensure_one()
+        execution_time = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        self.last_drill_result = (
+            f"RESULT TYPE: {result_type}\nDATE (yyyy-mm-dd hh:mm:ss): {execution_time}\n"
+            f"DETAILS: {result_msg}"
+        )
+        if result_type == "success":
+            return
+        self.message_post(
+            subject="Restore Drill Alert", body=plaintext2html(result_msg)
+        )
+        if self.drill_mail_send and self.failure_mail_policy:
+            template = self.env.ref(
+                "eqp_backup.email_template_data_restore_drill_alert"
+            )
+            template.send_mail(self.id, force_send=True)
 
-        # Google Drive backup
-        elif backup_type == "dropbox":
-            try:
-                # Get Dropbox Client
-                dbx = server.provider_authenticate()
-                # Generate backup using the dump_db function
-                bu_file_obj = self._generate_backup(db_name, None, extension, self.type)
-
-                # Upload the file to Dropbox
-                if record.chunk_size:
-                    import dropbox
-
-                    chunk_size = record.chunk_size * 1024 * 1024  # MB chunk size
-                    with io.BytesIO() as stream:
-                        while True:
-                            chunk = bu_file_obj.read(chunk_size)
-                            if not chunk:
-                                break
-
-                            upload_session_start_result = (
-                                dbx.files_upload_session_start(chunk)
-                            )
-                            cursor = dropbox.files.UploadSessionCursor(
-                                session_id=upload_session_start_result.session_id,
-                                offset=len(chunk),
-                            )
-                            commit = dropbox.files.CommitInfo(path=file_path)
-
-                            while True:
-                                chunk = bu_file_obj.read(chunk_size)
-                                if not chunk:
-                                    file = dbx.files_upload_session_finish(
-                                        chunk, cursor, commit
-                                    )
-                                    break
-                                dbx.files_upload_session_append_v2(chunk, cursor)
-                                cursor.offset += len(chunk)
-                else:
-                    # Upload the entire file in one request if no chunking is specified
-                    file = dbx.files_upload(bu_file_obj.read(), file_path)
-
-                # Process which deletes old backups
-                if record.backup_lifespan_qty > 0:
-                    # Retrieve a list of all backup files in the Dropbox folder
-                    results = dbx.files_list_folder(path=destination_path)
-                    backup_files = results.entries
-                    # Sort backup files based on server_modified timestamp (latest first)
-                    backup_files.sort(
-                        key=lambda bu_file: bu_file.server_modified.timestamp(),
-                        reverse=True,
-                    )
-                    # Check if file['id'] is in the backup_files
-                    if any(bu_file.id == file.id for bu_file in backup_files):
-                        desired_qty = record.backup_lifespan_qty
-                    else:
-                        desired_qty = record.backup_lifespan_qty - 1
-                    # Calculate the number of backups to keep
-                    backups_to_keep = min(desired_qty, len(backup_files))
-                    # Iterate over the extra files and remove them
-                    for old_backup in backup_files[backups_to_keep:]:
-                        dbx.files_delete_v2(path=old_backup.path_display)
+    def _schedule_next_drill(self):
+        """Set the date of the next restore drill from the drill interval."""
+        for record in self:
+            record.drill_next_date = fields.Datetime.now() + relativedelta(
+                **{record.drill_interval_type or "weeks": record.drill_interval_number}
+            )
 
-                result_type = "success"
-                result_msg = f"Dropbox Backup process executed successfully.\nThe file ID is: {file.id}"
-                _logger.info(result_msg)
+    def action_restore_drill(self):
+        """Queue a restore drill now.
 
-            except Exception as e:
-                result_type = "danger"
-                result_msg = f"Dropbox Exception: {e}"
-                _logger.error(result_msg)
+        Returns:
+            dict: Action to display notification with the queued job.
+        """
+        self.ensure_one()
+        self.check_valid_state()
+        job = self.env["backup.job"].enqueue(self, kind="restore_drill")
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "context": dict(self._context, active_ids=self.ids),
+            "params": {
+                "message": _(
+                    "The restore drill was queued (job %s): it will be executed by a "
+                    "backup worker and its result will be available on the record.",
+                    job.id,
+                ),
+                "type": "info",
+                "sticky": False,
+            },
+        }
 
-        # Unrecognized Backup type scenario
+    @api.model
+    def _cron_restore_drills(self):
+        """Queue the restore drills which are due.
+
+        The drills restore whole databases: like the backups, they run in backup
+        workers, never in the cron thread.
+        """
+        records = self.search(
+            [
+                ("state", "=", "confirmed"),
+                ("drill_active", "=", True),
+                "|",
+                ("drill_next_date", "=", False),
+                ("drill_next_date", "<=", fields.Datetime.now()),
+            ]
+        )
+        for record in records:
+            # Scheduled when queued, so a drill crashing its worker is not retried
+            record._schedule_next_drill()
+            self.env["backup.job"].enqueue(record, kind="restore_drill")
+
+    def _run_backup(self, archive_stats):
+        """Generate the backup, upload it and apply the retention policy.
+
+        Args:
+            archive_stats (dict): Receives the archive statistics and phase timings.
+
+        Returns:
+            tuple: Result type (success, warning, danger) and result details.
+        """
+        self.ensure_one()
+        # Instantiate both record and server
+        record = self
+        server = record.server_id
+
+        # Set the backup file unique name
+        extension = record._get_backup_extension()
+        # Deduplicated backups generate a ZIP archive, stored as chunks and an index
+        archive_extension = record._get_archive_extension()
+        file_name = server.get_file_path_details(record.db_name, extension)[1]
+        started = time.monotonic()
+
+        # Fail fast, before dumping anything, if the backup is not expected to fit
+        try:
+            record._preflight_check()
+        except Exception as e:
+            result_msg = f"Preflight Check Failed: {e}"
+            _logger.error(result_msg)
+            return "danger", result_msg
+
+        # Method generating and uploading the backup, and the message of its failures
+        if record.destination_ids:
+            # Several servers: the backup is generated once and uploaded to all of them
+            backup, error_msg = record._fanout_backup, "Backup Exception: {}"
+        elif record.storage_mode == "dedup":
+            backup, error_msg = (
+                record._dedup_backup,
+                "Failed to store the deduplicated backup.\nError: {}",
+            )
         else:
-            result_type = "danger"
+            backup, error_msg = {
+                "local": (record._local_backup, "Local Backup Exception: {}"),
+                "sftp": (
+                    record._sftp_backup,
+                    "Failed to create and send backup file.\nError: {}",
+                ),
+                "drive": (record._drive_backup, "Google Drive Exception: {}"),
+                "dropbox": (record._dropbox_backup, "Dropbox Exception: {}"),
+            }.get(server.backup_type, (None, None))
+
+        # Unrecognized Backup type scenario
+        if not backup:
             result_msg = (
                 f"Failed to execute the automatic backup process for record ID {record.id} due to an "
                 f"unrecognized backup type."
             )
             _logger.error(result_msg)
+            return "danger", result_msg
 
-        # Display an alert window for manual execution, or alternatively, send an email if applicable.
-        if not self.env.context.get("manual_execution", False):
-            time = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-            record.last_execution_result = (
-                f"RESULT TYPE: {result_type}\nDATE (yyyy-mm-dd hh:mm:ss): {time}\n"
-                f"DETAILS: {result_msg}"
+        try:
+            result_type, result_msg = backup(
+                archive_extension, file_name, started, archive_stats
             )
-            record.notify_result(result_type)
-            return True
-        else:
-            return result_type, result_msg
+        except Exception as e:
+            result_type = "danger"
+            result_msg = error_msg.format(e)
+            _logger.error(result_msg)
+
+        # Report the compression ratio and throughput of the run
+        if result_type == "success" and archive_stats:
+            stats_msg = record._format_archive_stats(archive_stats)
+            _logger.info(stats_msg)
+            result_msg = f"{result_msg}\n{stats_msg}"
+
+        return result_type, result_msg
+
+    def _dedup_backup(self, extension, file_name, started, stats):
+        """Store the backup as deduplicated chunks: only the new ones are uploaded.
+
+        Args:
+            extension (str): Format of the archive cut into chunks.
+            file_name (str): Name of the backup index.
+            started (float): `time.monotonic()` value when the backup started.
+            stats (dict): Receives the archive statistics.
+
+        Returns:
+            tuple: Result type and result details.
+        """
+        self.ensure_one()
+        server = self.server_id
+        with server.provider_client() as client:
+            values = self._backup_and_upload(
+                extension,
+                self._dedup_uploader(server, client, file_name),
+                client=client,
+                stats=stats,
+            )
+            self._register_uploaded_backup(server, client, values, started, stats)
+
+            # Process which deletes old backups and releases their chunks
+            self._apply_retention(client, file_name, stats=stats)
+
+        result_msg = "Deduplicated Backup process executed successfully."
+        _logger.info(result_msg)
+        return "success", result_msg
+
+    def _local_backup(self, extension, file_name, started, stats):
+        """Write the backup to the folder of a Local server.
+
+        Args:
+            extension (str): Backup format.
+            file_name (str): Name of the backup file.
+            started (float): `time.monotonic()` value when the backup started.
+            stats (dict): Receives the archive statistics.
+
+        Returns:
+            tuple: Result type and result details.
+        """
+        self.ensure_one()
+        server = self.server_id
+        destination_path = server.get_destination_path()
+        file_path = destination_path + file_name
+        # Check if the file path exists
+        if not os.path.isdir(destination_path):
+            # Try to create it if it does not exist
+            os.makedirs(destination_path)
+        dump_options = self._prepare_dump_options(None, stats)
+        # Open with write permissions the file on the file path
+        with open(file_path, "wb") as file:
+            # Generate backup using the dump_db function
+            self._generate_backup(
+                self.db_name, file, extension, self.type, **dump_options
+            )
+        self._register_uploaded_backup(
+            server,
+            None,
+            {
+                "name": file_name,
+                "path": file_path,
+                "size": os.path.getsize(file_path),
+            },
+            started,
+            stats,
+        )
+
+        # Process which deletes old backups
+        self._apply_retention(None, file_name, stats=stats)
+
+        result_msg = "Local Backup process executed successfully."
+        _logger.info(result_msg)
+        return "success", result_msg
+
+    def _sftp_backup(self, extension, file_name, started, stats):
+        """Upload the backup to the remote folder of an SFTP server.
+
+        Args:
+            extension (str): Backup format.
+            file_name (str): Name of the backup file.
+            started (float): `time.monotonic()` value when the backup started.
+            stats (dict): Receives the archive statistics.
+
+        Returns:
+            tuple: Result type and result details.
+        """
+        self.ensure_one()
+        server = self.server_id
+        file_path = server.get_destination_path() + file_name
+        with server.sftp_session() as sftp:
+            # Generate the backup and upload it to the remote folder
+            attributes = self._backup_and_upload(
+                extension,
+                lambda bu_file_obj: server.sftp_upload(sftp, bu_file_obj, file_path),
+                client=sftp,
+                stats=stats,
+            )
+            self._register_uploaded_backup(
+                server,
+                sftp,
+                {
+                    "name": file_name,
+                    "path": file_path,
+                    "size": attributes.st_size,
+                },
+                started,
+                stats,
+            )
+
+            # Process which deletes old backups
+            self._apply_retention(sftp, file_name, stats=stats)
+
+        result_msg = "SFTP Backup transference process executed successfully."
+        _logger.info(result_msg)
+        return "success", result_msg
+
+    def _drive_backup(self, extension, file_name, started, stats):
+        """Upload the backup to the Google Drive folder of the server.
+
+        Args:
+            extension (str): Backup format.
+            file_name (str): Name of the backup file.
+            started (float): `time.monotonic()` value when the backup started.
+            stats (dict): Receives the archive statistics.
+
+        Returns:
+            tuple: Result type and result details.
+        """
+        self.ensure_one()
+        server = self.server_id
+        # Get Google Drive Service
+        service = server.provider_authenticate()
+
+        # Generate the backup and upload it to Google Drive
+        file = self._drive_upload_backup(service, extension, file_name, stats=stats)
+        self._register_uploaded_backup(
+            server,
+            service,
+            {
+                "name": file["name"],
+                "provider_file_id": file["id"],
+                "size": int(file.get("size") or 0),
+                "checksum": file.get("md5Checksum"),
+                "checksum_type": "md5" if file.get("md5Checksum") else False,
+            },
+            started,
+            stats,
+        )
+
+        # Process which deletes old backups
+        self._apply_retention(service, file["name"], stats=stats)
+
+        result_msg = f"Google Drive Backup process executed successfully.\nThe file ID is: {file['id']}"
+        _logger.info(result_msg)
+        return "success", result_msg
+
+    def _dropbox_backup(self, extension, file_name, started, stats):
+        """Upload the backup to the Dropbox folder of the server.
+
+        Args:
+            extension (str): Backup format.
+            file_name (str): Name of the backup file.
+            started (float): `time.monotonic()` value when the backup started.
+            stats (dict): Receives the archive statistics.
+
+        Returns:
+            tuple: Result type and result details.
+        """
+        self.ensure_one()
+        server = self.server_id
+        file_path = server.get_destination_path() + file_name
+        # Get Dropbox Client
+        dbx = server.provider_authenticate()
+
+        # Generate the backup and upload it to Dropbox
+        file = self._backup_and_upload(
+            extension,
+            lambda bu_file_obj: server.dropbox_upload(
+                dbx,
+                bu_file_obj,
+                file_path,
+                self.chunk_size,
+                self.upload_workers,
+            ),
+            client=dbx,
+            stats=stats,
+        )
+        self._register_uploaded_backup(
+            server,
+            dbx,
+            {
+                "name": file.name,
+                "path": file.path_display,
+                "provider_file_id": file.id,
+                "size": file.size,
+                "checksum": file.content_hash,
+                "checksum_type": "dropbox",
+            },
+            started,
+            stats,
+        )
+
+        # Process which deletes old backups
+        self._apply_retention(dbx, file.name, stats=stats)
+
+        result_msg = f"Dropbox Backup process executed successfully.\nThe file ID is: {file.id}"
+        _logger.info(result_msg)
+        return "success", result_msg
 
     def manual_execution(self):
         """Execute backup manually.
@@ -23,14 +23,30 @@
 
 import os
 import io
+import posixpath
 import json
+import hashlib
 import base64
+import tempfile
+import time
+import shutil
 import logging
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
 
 from odoo import api, models, fields, _
 from odoo.exceptions import ValidationError
 from datetime import datetime, timezone
 
+from ..tools.archive import ARCHIVE_MIMETYPES, COPY_BUFFER_SIZE, CountingWriter
+from ..tools.client_cache import provider_clients
+from ..tools.dedup import reassemble_chunks, store_chunks
+from ..tools.pipe import ChunkReader, copy_stream
+from ..tools.retention import BACKUP_EXTENSIONS, parse_backup_name
+from ..tools.sftp_pool import BORROW_TIMEOUT, sftp_pool
+
 _logger = logging.getLogger(__name__)
 
 try:
@@ -45,6 +61,64 @@ except ImportError:
 
 # Constants Declaration
 SCOPES = ["https://www.googleapis.com/auth/drive"]
+DRIVE_FOLDER_MIMETYPE = "application/vnd.google-apps.folder"
+# Size of the probe file uploaded to measure the SFTP throughput
+SFTP_SPEED_TEST_SIZE = 8 * 1024 * 1024
+# Server fields used to open the pooled SFTP connections
+SFTP_CONNECTION_FIELDS = {
+    "server_address",
+    "server_port",
+    "server_user",
+    "server_password",
+    "sftp_window_size",
+    "sftp_max_packet_size",
+    "sftp_max_channels",
+}
+# Server fields used to build the cached Google Drive and Dropbox clients
+PROVIDER_CREDENTIALS_FIELDS = {
+    "backup_type",
+    "drive_credentials_type",
+    "drive_credentials_file",
+    "drive_credentials_input",
+    "dropbox_app_key",
+    "dropbox_app_secret",
+    "dropbox_app_token",
+}
+# Maximum requests per Google Drive batch and paths per Dropbox delete batch
+DRIVE_BATCH_SIZE = 100
+DROPBOX_BATCH_SIZE = 1000
+# Dropbox concurrent upload sessions require chunks multiple of 4 MB
+DROPBOX_CHUNK_MB = 4
+# Largest Dropbox upload request (single file upload or session chunk): 150 MB, rounded
+# down to a multiple of DROPBOX_CHUNK_MB
+DROPBOX_MAX_CHUNK_MB = 148
+# Chunk size of the Dropbox uploads without a configured chunk size: smaller files are
+# still sent in a single request, bigger ones switch to an upload session
+DROPBOX_DEFAULT_CHUNK_MB = 32
+# Destination sub-folder holding the incremental filestore blobs
+BLOBS_FOLDER = "blobs"
+# Destination sub-folder holding the chunk stores of the deduplicated backups
+CHUNKS_FOLDER = "chunks"
+# Server types able to hold a chunk store: many small files, read and written directly
+DEDUP_BACKUP_TYPES = ("local", "sftp")
+# Server fields read by `upload_backup`, loaded before uploading from other threads
+UPLOAD_FIELDS = [
+    "name",
+    "backup_type",
+    "destination_path",
+    "parent_folder",
+    "sftp_transfer_mode",
+    "sftp_window_size",
+    "sftp_max_packet_size",
+    "sftp_request_size",
+    "sftp_parallel_streams",
+    # Parallel range writes borrow their extra channels from the SFTP pool
+    "server_address",
+    "server_port",
+    "server_user",
+    "server_password",
+    "sftp_max_channels",
+]
 
 
 # Static Functions
@@ -140,6 +214,64 @@ class BackupServer(models.Model):
     server_port = fields.Char(string="Port", tracking=True, size=5, help="Server Port")
     server_user = fields.Char(string="User", tracking=True, help="Server User")
     server_password = fields.Char(string="Password", help="Server Password")
+    sftp_transfer_mode = fields.Selection(
+        [
+            ("standard", "Standard"),
+            ("pipelined", "Pipelined Writes"),
+            ("parallel", "Parallel Range Writes"),
+        ],
+        string="SFTP Transfer Mode",
+        default="pipelined",
+        tracking=True,
+        help="Select how the backups are written on the SFTP server:\n"
+        "- Standard: paramiko 'putfo' with its default settings.\n"
+        "- Pipelined Writes: Write requests of 'SFTP Request Size' are sent without "
+        "waiting for each acknowledgement, reusing a single read buffer.\n"
+        "- Parallel Range Writes: The backup is split in 'SFTP Parallel Streams' offset "
+        "ranges written simultaneously over several SFTP channels (pipelined writes are "
+        "used when the backup is streamed, as its size is unknown).",
+    )
+    sftp_window_size = fields.Integer(
+        string="SFTP Window Size (MB)",
+        default=16,
+        tracking=True,
+        help="SSH channel window: amount of data sent before waiting for the server. "
+        "Larger windows are faster on high-latency links (paramiko default: 2MB).",
+    )
+    sftp_max_packet_size = fields.Integer(
+        string="SFTP Max Packet Size (KB)",
+        default=32,
+        tracking=True,
+        help="Maximum SSH packet size (paramiko default: 32KB).",
+    )
+    sftp_request_size = fields.Integer(
+        string="SFTP Request Size (KB)",
+        default=32,
+        tracking=True,
+        help="Size of each SFTP write request. Most servers (e.g. OpenSSH) accept up to "
+        "255KB; the paramiko default is 32KB.",
+    )
+    sftp_parallel_streams = fields.Integer(
+        string="SFTP Parallel Streams",
+        default=4,
+        tracking=True,
+        help="Number of SFTP channels writing simultaneously with Parallel Range Writes.",
+    )
+    sftp_max_channels = fields.Integer(
+        string="SFTP Max Sessions",
+        default=8,
+        tracking=True,
+        help="The SFTP connection is kept open and shared by every backup record of "
+        "this server. This is the maximum number of SFTP sessions (backups, tests) "
+        "using it at the same time; further ones wait for a free session.",
+    )
+    max_concurrent_jobs = fields.Integer(
+        string="Max Concurrent Jobs",
+        default=1,
+        tracking=True,
+        help="Maximum number of backups executed by the backup workers at the same time "
+        "on this server.",
+    )
     # GOOGLE DRIVE FIELDS
     drive_credentials_type = fields.Selection(
         [("file", "Upload Credentials File"), ("text", "Enter Credentials Directly")],
@@ -185,7 +317,20 @@ class BackupServer(models.Model):
     record_ids = fields.One2many("backup.record", "server_id", string="Related Records")
 
     _sql_constraints = [
-        ("name_unique", "unique(name, company_id)", "A unique name per company.")
+        ("name_unique", "unique(name, company_id)", "A unique name per company."),
+        (
+            "check_max_concurrent_jobs",
+            "CHECK(max_concurrent_jobs > 0)",
+            "The Max Concurrent Jobs must be greater than 0.",
+        ),
+        (
+            "check_sftp_tuning",
+            "CHECK(sftp_window_size > 0 AND sftp_max_packet_size > 0 "
+            "AND sftp_request_size > 0 AND sftp_parallel_streams > 0 "
+            "AND sftp_max_channels > 0)",
+            "The SFTP window, packet, request sizes, parallel streams and max sessions "
+            "must be greater than 0.",
+        ),
     ]
 
     def write(self, vals):
@@ -201,7 +346,18 @@ class BackupServer(models.Model):
         # Update State.
         if "active" in vals:
             vals["state"] = "draft" if vals["active"] is True else "archived"
-        return super(BackupServer, self).write(vals)
+        res = super(BackupServer, self).write(vals)
+        # Close the pooled connections opened with the previous settings
+        if SFTP_CONNECTION_FIELDS.intersection(vals) or "active" in vals:
+            self._invalidate_sftp_pool()
+        if PROVIDER_CREDENTIALS_FIELDS.intersection(vals) or "active" in vals:
+            self._invalidate_provider_clients()
+        return res
+
+    def unlink(self):
+        self._invalidate_sftp_pool()
+        self._invalidate_provider_clients()
+        return super(BackupServer, self).unlink()
 
     def copy(self, default=None):
         self.ensure_one()
@@ -379,19 +535,250 @@ class BackupServer(models.Model):
             tuple: Tuple containing SFTP connection and transport objects.
         """
         for server in self:
-            # Set SFTP connection parameters
-            sftp_host = server.server_address
-            sftp_port = int(server.server_port)
-            sftp_user = server.server_user
-            sftp_password = server.server_password
+            transport = server._connect_sftp_transport()
+            sftp_connection = server._open_sftp_channel(transport)
 
-            # Establish an SFTP connection
-            transport = Transport((sftp_host, sftp_port))
-            transport.connect(username=sftp_user, password=sftp_password)
+            return sftp_connection, transport
 
-            sftp_connection = SFTPClient.from_transport(transport)
+    def _connect_sftp_transport(self):
+        """
+        Opens and authenticates a new SSH transport to the SFTP server.
 
-            return sftp_connection, transport
+        Returns:
+            paramiko.Transport: Authenticated transport.
+        """
+        self.ensure_one()
+        transport = Transport(
+            (self.server_address, int(self.server_port)),
+            default_window_size=self._get_sftp_window_size(),
+            default_max_packet_size=self._get_sftp_max_packet_size(),
+        )
+        try:
+            transport.connect(username=self.server_user, password=self.server_password)
+        except Exception:
+            transport.close()
+            raise
+        return transport
+
+    def _get_sftp_pool_key(self):
+        """
+        Returns the key of the server connection in the SFTP transport pool.
+
+        The connection settings are hashed into the key, so a transport opened with
+        outdated credentials is never reused.
+        """
+        self.ensure_one()
+        settings = "\0".join(
+            str(value)
+            for value in (
+                self.server_address,
+                self.server_port,
+                self.server_user,
+                self.server_password,
+                self.sftp_window_size,
+                self.sftp_max_packet_size,
+            )
+        )
+        return (
+            self.env.cr.dbname,
+            self.id,
+            hashlib.sha256(settings.encode("utf-8")).hexdigest(),
+        )
+
+    def sftp_session(self, timeout=BORROW_TIMEOUT):
+        """
+        Borrows an SFTP session on the pooled connection of the server.
+
+        Usage: `with server.sftp_session() as sftp: ...`. The SFTP channel is closed
+        when the block exits, while the authenticated connection is kept open for the
+        next backup or test of the server.
+
+        Args:
+            timeout (float): Seconds to wait for a free session.
+
+        Returns:
+            contextmanager: Context manager yielding a `paramiko.SFTPClient`.
+        """
+        self.ensure_one()
+        return sftp_pool.borrow(
+            self._get_sftp_pool_key(),
+            self._connect_sftp_transport,
+            self._open_sftp_channel,
+            self.sftp_max_channels or 1,
+            timeout=timeout,
+        )
+
+    def _invalidate_sftp_pool(self):
+        dbname = self.env.cr.dbname
+        server_ids = set(self.ids)
+        sftp_pool.invalidate(lambda key: key[0] == dbname and key[1] in server_ids)
+
+    def _invalidate_provider_clients(self):
+        dbname = self.env.cr.dbname
+        server_ids = set(self.ids)
+        provider_clients.invalidate(
+            lambda key: key[0] == dbname and key[1] in server_ids
+        )
+
+    def _get_sftp_window_size(self):
+        return (self.sftp_window_size or 2) * 1024 * 1024
+
+    def _get_sftp_max_packet_size(self):
+        return (self.sftp_max_packet_size or 32) * 1024
+
+    def _open_sftp_channel(self, transport):
+        """
+        Opens a new SFTP session (SSH channel) on an authenticated transport.
+
+        Args:
+            transport (paramiko.Transport): Authenticated transport.
+
+        Returns:
+            paramiko.SFTPClient: SFTP client of the new channel.
+        """
+        return SFTPClient.from_transport(
+            transport,
+            window_size=self._get_sftp_window_size(),
+            max_packet_size=self._get_sftp_max_packet_size(),
+        )
+
+    def sftp_upload(self, sftp, f_content, remote_path):
+        """
+        Uploads a file-like object to the SFTP server using the server transfer mode.
+
+        Args:
+            sftp (paramiko.SFTPClient): Connected SFTP client.
+            f_content (io.RawIOBase): File-like object containing the file content.
+            remote_path (str): Destination path on the SFTP server.
+
+        Returns:
+            paramiko.SFTPAttributes: Attributes of the uploaded file.
+        """
+        self.ensure_one()
+        transfer_mode = self.sftp_transfer_mode
+        if transfer_mode == "standard":
+            return sftp.putfo(f_content, remote_path)
+
+        # Ranges can only be read in parallel from a regular (seekable) file
+        if (
+            transfer_mode == "parallel"
+            and self.sftp_parallel_streams > 1
+            and f_content.seekable()
+        ):
+            try:
+                f_content.fileno()
+            except (AttributeError, OSError):
+                pass
+            else:
+                return self._sftp_parallel_upload(sftp, f_content, remote_path)
+
+        return self._sftp_pipelined_upload(sftp, f_content, remote_path)
+
+    def _sftp_pipelined_upload(self, sftp, f_content, remote_path):
+        """
+        Writes a stream to the SFTP server with pipelined requests.
+
+        A single buffer is filled with `readinto` and sent without waiting for each write
+        acknowledgement; the acknowledgements are all checked when the file is closed.
+        """
+        request_size = self.sftp_request_size * 1024
+        buffer = bytearray(request_size * 8)
+        view = memoryview(buffer)
+        size = 0
+        with sftp.open(remote_path, "wb", bufsize=0) as remote_file:
+            remote_file.set_pipelined(True)
+            remote_file.MAX_REQUEST_SIZE = request_size
+            while True:
+                count = f_content.readinto(buffer)
+                if not count:
+                    break
+                remote_file.write(view[:count])
+                size += count
+
+        attributes = sftp.stat(remote_path)
+        if attributes.st_size != size:
+            raise IOError(f"size mismatch in put!  {attributes.st_size} != {size}")
+        return attributes
+
+    def _sftp_parallel_upload(self, sftp, f_content, remote_path):
+        """
+        Writes a file to the SFTP server as several offset ranges in parallel.
+
+        Each range is written with pipelined requests on its own SFTP channel, reading
+        the local file with positional reads into a buffer reused for the whole range.
+        The extra channels are borrowed from the SFTP pool, so they count against the
+        SFTP Max Sessions of the server: only the sessions free right now are used
+        (along with `sftp`), the upload never waits for more.
+        """
+        request_size = self.sftp_request_size * 1024
+        file_descriptor = f_content.fileno()
+        size = os.fstat(file_descriptor).st_size
+
+        # Create (or truncate) the remote file so every channel can open it for update
+        with sftp.open(remote_path, "wb"):
+            pass
+
+        def write_range(channel, start, end):
+            view = memoryview(bytearray(min(request_size * 8, end - start)))
+            with channel.open(remote_path, "r+b", bufsize=0) as remote_file:
+                remote_file.set_pipelined(True)
+                remote_file.MAX_REQUEST_SIZE = request_size
+                remote_file.seek(start)
+                offset = start
+                while offset < end:
+                    count = os.preadv(file_descriptor, [view[: end - offset]], offset)
+                    if not count:
+                        break
+                    remote_file.write(view[:count])
+                    offset += count
+
+        with ExitStack() as stack:
+            channels = [sftp]
+            for _stream in range(self.sftp_parallel_streams - 1):
+                try:
+                    channels.append(stack.enter_context(self.sftp_session(timeout=0)))
+                except TimeoutError:
+                    break
+            range_size = max(-(-size // len(channels)), request_size)
+            ranges = [
+                (start, min(start + range_size, size))
+                for start in range(0, size, range_size)
+            ]
+            with ThreadPoolExecutor(
+                len(channels), thread_name_prefix="eqp_backup_sftp"
+            ) as pool:
+                futures = [
+                    pool.submit(write_range, channel, *bounds)
+                    for channel, bounds in zip(channels, ranges)
+                ]
+                for future in futures:
+                    future.result()
+
+        attributes = sftp.stat(remote_path)
+        if attributes.st_size != size:
+            raise IOError(f"size mismatch in put!  {attributes.st_size} != {size}")
+        return attributes
+
+    def measure_sftp_throughput(self, sftp):
+        """
+        Measures the SFTP upload throughput with a temporary probe file.
+
+        Args:
+            sftp (paramiko.SFTPClient): Connected SFTP client.
+
+        Returns:
+            float: Achieved upload throughput in MB/s.
+        """
+        self.ensure_one()
+        probe_path = f"{self.get_destination_path()}.eqp_backup_speed_test"
+        with tempfile.TemporaryFile() as probe:
+            probe.write(os.urandom(SFTP_SPEED_TEST_SIZE))
+            probe.seek(0)
+            started = time.monotonic()
+            self.sftp_upload(sftp, probe, probe_path)
+            elapsed = time.monotonic() - started
+        sftp.remove(probe_path)
+        return SFTP_SPEED_TEST_SIZE / 1024 / 1024 / max(elapsed, 1e-6)
 
     def get_file_path_details(self, name, extension):
         """
@@ -405,52 +792,1150 @@ class BackupServer(models.Model):
             tuple: Tuple containing destination path and formatted file name.
         """
         # Validate the extension
-        if extension not in ("txt", "zip"):
-            _logger.error("Unsupported file extension (supported formats: txt, zip)")
-            raise ValidationError(
-                "Unsupported file extension (supported formats: txt, zip)"
+        supported_extensions = ("txt",) + BACKUP_EXTENSIONS
+        if extension not in supported_extensions:
+            message = (
+                "Unsupported file extension (supported formats: "
+                f"{', '.join(supported_extensions)})"
             )
+            _logger.error(message)
+            raise ValidationError(message)
         # Catching and formatting timestamp
         now = fields.Datetime.context_timestamp(self, fields.Datetime.now())
         formatted_date = now.strftime("%Y-%m-%d_%H.%M.%S")
         file_name = f"Backup_{name}_{formatted_date}.{extension}"
-        destination_path = (
+
+        return self.get_destination_path(), file_name
+
+    def get_destination_path(self):
+        """
+        Returns the destination path, always ending with a slash.
+
+        Returns:
+            str: Destination path.
+        """
+        return (
             self.destination_path
             if self.destination_path and self.destination_path.endswith("/")
             else (self.destination_path or "") + "/"
         )
 
-        return destination_path, file_name
+    def get_free_space(self, client):
+        """
+        Returns the space left on the destination, as reported by the provider.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+
+        Returns:
+            int: Free bytes, or None if unknown or unlimited (SFTP servers without the
+            `statvfs@openssh.com` extension, Google Drive without quota...).
+        """
+        self.ensure_one()
+        backup_type = self.backup_type
+        if backup_type == "local":
+            # The destination folder may not exist yet: measure its closest parent
+            path = os.path.abspath(self.get_destination_path())
+            while not os.path.exists(path):
+                path = os.path.dirname(path)
+            return shutil.disk_usage(path).free
+
+        if backup_type == "sftp":
+            from paramiko.sftp import CMD_EXTENDED, CMD_EXTENDED_REPLY
+
+            for path in (self.get_destination_path(), "."):
+                try:
+                    reply_type, msg = client._request(
+                        CMD_EXTENDED, "statvfs@openssh.com", path
+                    )
+                except IOError:
+                    continue
+                if reply_type != CMD_EXTENDED_REPLY:
+                    return None
+                # f_bsize, f_frsize, f_blocks, f_bfree, f_bavail
+                _bsize, frsize, _blocks, _bfree, bavail = (
+                    msg.get_int64() for _field in range(5)
+                )
+                return bavail * frsize
+            return None
+
+        if backup_type == "drive":
+            quota = client.about().get(fields="storageQuota").execute()["storageQuota"]
+            if not quota.get("limit"):
+                return None
+            return int(quota["limit"]) - int(quota.get("usage") or 0)
+
+        if backup_type == "dropbox":
+            space = client.users_get_space_usage()
+            allocation = space.allocation
+            if allocation.is_individual():
+                return allocation.get_individual().allocated - space.used
+            if allocation.is_team():
+                team = allocation.get_team()
+                free = team.allocated - team.used
+                # Member quota inside the team space (0 when not limited)
+                if team.user_within_team_space_allocated:
+                    free = min(
+                        free,
+                        team.user_within_team_space_allocated
+                        - team.user_within_team_space_used_cached,
+                    )
+                return free
+            return None
+
+        return None
+
+    def dropbox_upload(self, dbx, f_content, file_path, chunk_size, workers=1):
+        """
+        Uploads a file-like object to Dropbox in bounded memory.
+
+        The file is read chunk by chunk into a single preallocated buffer. A file
+        fitting in the first chunk is sent in a single request, a bigger one through an
+        upload session.
+
+        The Dropbox SDK only accepts `bytes` request bodies: each chunk is copied once
+        from the buffer when sent, so at most two chunks are held in memory.
+
+        Args:
+            dbx (dropbox.Dropbox): Dropbox client.
+            f_content (io.RawIOBase): File-like object containing the file content.
+            file_path (str): Dropbox destination path.
+            chunk_size (int): Chunk size in MB (0 for the default size, capped to the
+                150 MB limit of a Dropbox request).
+            workers (int): Number of chunks uploaded simultaneously.
+
+        Returns:
+            dropbox.files.FileMetadata: Metadata of the uploaded file.
+        """
+        chunk_size = min(chunk_size or DROPBOX_DEFAULT_CHUNK_MB, DROPBOX_MAX_CHUNK_MB)
+        if workers > 1:
+            return self._dropbox_concurrent_upload(
+                dbx, f_content, file_path, chunk_size, workers
+            )
+
+        import dropbox
+
+        reader = ChunkReader(f_content, chunk_size * 1024 * 1024)
+        chunk = reader.read_chunk()
+        if len(chunk) < reader.chunk_size:
+            return dbx.files_upload(chunk.tobytes(), file_path)
+
+        upload_session_start_result = dbx.files_upload_session_start(chunk.tobytes())
+        cursor = dropbox.files.UploadSessionCursor(
+            session_id=upload_session_start_result.session_id,
+            offset=len(chunk),
+        )
+        commit = dropbox.files.CommitInfo(path=file_path)
+
+        while True:
+            chunk = reader.read_chunk()
+            if not chunk:
+                return dbx.files_upload_session_finish(b"", cursor, commit)
+            dbx.files_upload_session_append_v2(chunk.tobytes(), cursor)
+            cursor.offset += len(chunk)
+
+    def _dropbox_concurrent_upload(self, dbx, f_content, file_path, chunk_size, workers):
+        """
+        Uploads a file-like object through a Dropbox concurrent upload session.
+
+        Chunks are appended by `workers` threads at their own offset. At most `workers`
+        chunks are held in memory at once (plus the read buffer): reading the next
+        chunk waits until one of the uploads finishes. The last chunk, closing the
+        session, is only appended once all the others were.
+
+        Args:
+            dbx (dropbox.Dropbox): Dropbox client.
+            f_content (io.RawIOBase): File-like object containing the file content.
+            file_path (str): Dropbox destination path.
+            chunk_size (int): Chunk size in MB (rounded up to a multiple of 4 MB).
+            workers (int): Number of chunks uploaded simultaneously.
+
+        Returns:
+            dropbox.files.FileMetadata: Metadata of the uploaded file.
+        """
+        import dropbox
+
+        # Concurrent sessions only accept chunks multiple of 4 MB (except the last one)
+        chunk_size = -(-chunk_size // DROPBOX_CHUNK_MB) * DROPBOX_CHUNK_MB * 1024 * 1024
+        reader = ChunkReader(f_content, chunk_size)
+        # Share a connection pool big enough for all the workers
+        dbx = dbx.clone(session=dropbox.create_session(max_connections=workers))
+        session_id = dbx.files_upload_session_start(
+            b"", session_type=dropbox.files.UploadSessionType.concurrent
+        ).session_id
+
+        slots = threading.BoundedSemaphore(workers)
+
+        def append(chunk, offset, close):
+            try:
+                cursor = dropbox.files.UploadSessionCursor(
+                    session_id=session_id, offset=offset
+                )
+                dbx.files_upload_session_append_v2(chunk, cursor, close=close)
+            finally:
+                slots.release()
+
+        futures = []
+        offset = 0
+        with ThreadPoolExecutor(workers, thread_name_prefix="eqp_backup_dbx") as pool:
+            try:
+                # The chunk is only sent once the next one is read, to flag the last one
+                slots.acquire()
+                pending = reader.read_chunk().tobytes()
+                while True:
+                    slots.acquire()
+                    chunk = reader.read_chunk()
+                    if not chunk:
+                        slots.release()
+                        break
+                    futures.append(pool.submit(append, pending, offset, False))
+                    offset += len(pending)
+                    pending = chunk.tobytes()
+                    # Fail fast if an upload already failed
+                    running = []
+                    for future in futures:
+                        if future.done():
+                            future.result()
+                        else:
+                            running.append(future)
+                    futures = running
+                # The last append closes the session: Dropbox rejects any append
+                # processed after it, so all the others must have succeeded first
+                while futures:
+                    futures.pop().result()
+                append(pending, offset, True)
+                offset += len(pending)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        cursor = dropbox.files.UploadSessionCursor(session_id=session_id, offset=offset)
+        commit = dropbox.files.CommitInfo(path=file_path)
+        return dbx.files_upload_session_finish(b"", cursor, commit)
+
+    def drive_create_request(self, service, media, file_name, mimetype):
+        """
+        Returns the Google Drive request creating a backup file in the parent folder.
+
+        Args:
+            service (googleapiclient.discovery.Resource): Google Drive service.
+            media (MediaUpload): Media of the file content.
+            file_name (str): Name of the backup file.
+            mimetype (str): Mime type of the backup file.
+
+        Returns:
+            googleapiclient.http.HttpRequest: Request returning the id, name, size and
+            MD5 checksum of the created file.
+        """
+        # Get the current UTC time in ISO format
+        current_time = datetime.now(timezone.utc).isoformat()
+        file_metadata = {
+            "name": file_name,
+            "parents": [self.parent_folder],
+            "description": "Uploaded from Odoo",
+            "mimeType": mimetype,
+            "createdTime": current_time,
+            "modifiedTime": current_time,
+        }
+        return service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields="id, name, size, md5Checksum",
+        )
+
+    def prefetch_upload_settings(self):
+        """
+        Loads the server settings read by `upload_backup`.
+
+        Uploads running in other threads cannot query the database: the settings must
+        be in the cache before the threads start.
+        """
+        self.fetch(UPLOAD_FIELDS)
+
+    def upload_backup(
+        self, client, f_content, file_name, chunk_size=0, workers=1, retries=0
+    ):
+        """
+        Uploads a backup file to the destination, whatever its provider.
+
+        Only the provider client and the (prefetched) server settings are used, so it
+        can run outside the thread owning the environment.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+            f_content (io.RawIOBase): File-like object containing the backup.
+            file_name (str): Name of the backup file.
+            chunk_size (int): Google Drive / Dropbox chunk size in MB.
+            workers (int): Number of Dropbox chunks uploaded simultaneously.
+            retries (int): Attempts per Google Drive chunk.
+
+        Returns:
+            dict: `backup.artifact` values of the uploaded file ("name", "path",
+            "provider_file_id", "checksum", "checksum_type") and its "size" in bytes.
+        """
+        self.ensure_one()
+        backup_type = self.backup_type
+        destination_path = self.get_destination_path()
+        file_path = destination_path + file_name
+
+        if backup_type == "local":
+            os.makedirs(destination_path, exist_ok=True)
+            with open(file_path, "wb") as file:
+                copy_stream(f_content, file, COPY_BUFFER_SIZE)
+            return {
+                "name": file_name,
+                "path": file_path,
+                "size": os.path.getsize(file_path),
+            }
+
+        if backup_type == "sftp":
+            attributes = self.sftp_upload(client, f_content, file_path)
+            return {"name": file_name, "path": file_path, "size": attributes.st_size}
+
+        if backup_type == "drive":
+            parsed = parse_backup_name(file_name)
+            mimetype = ARCHIVE_MIMETYPES.get(
+                parsed and parsed[2], "application/octet-stream"
+            )
+            media = self.get_drive_file_media(
+                f_content, mimetype, chunk_size * 1024 * 1024 or None
+            )
+            file = self.drive_upload_chunks(
+                self.drive_create_request(client, media, file_name, mimetype), retries
+            )
+            return {
+                "name": file["name"],
+                "provider_file_id": file["id"],
+                "size": int(file.get("size") or 0),
+                "checksum": file.get("md5Checksum"),
+                "checksum_type": "md5" if file.get("md5Checksum") else False,
+            }
+
+        if backup_type == "dropbox":
+            file = self.dropbox_upload(client, f_content, file_path, chunk_size, workers)
+            return {
+                "name": file.name,
+                "path": file.path_display,
+                "provider_file_id": file.id,
+                "size": file.size,
+                "checksum": file.content_hash,
+                "checksum_type": "dropbox",
+            }
+
+        raise ValidationError(f"Unsupported backup type: {backup_type}")
+
+    def get_remote_checksum(self, client, values):
+        """
+        Returns the checksum of an uploaded backup, as computed by the destination.
+
+        Google Drive and Dropbox report the MD5 and the content hash of the created
+        file. An SFTP server is asked for the SHA-256 through the "check-file"
+        extension, which many servers (OpenSSH included) do not implement. Local files
+        are checked directly, they have no remote checksum.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+            values (dict): `upload_backup` values of the uploaded file.
+
+        Returns:
+            tuple: Checksum type (`checksum_type` of the artifacts) and hexadecimal
+            checksum, (None, None) if the destination does not provide one.
+        """
+        self.ensure_one()
+        if self.backup_type in ("drive", "dropbox") and values.get("checksum"):
+            return values["checksum_type"], values["checksum"]
+        if self.backup_type == "sftp":
+            try:
+                with client.open(values["path"], "rb") as remote_file:
+                    return "sha256", remote_file.check("sha256").hex()
+            except IOError as e:
+                _logger.info("The SFTP server cannot compute the checksum: %s", e)
+        return None, None
+
+    def download_backup(self, client, backup, target, chunk_size=0, retries=0):
+        """
+        Downloads a backup file from the destination into a writable stream.
+
+        Only the provider client and the (prefetched) server settings are used, so it
+        can run outside the thread owning the environment.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+            backup (dict): Backup returned by `list_backups` (or
+                `BackupArtifact._to_backup`).
+            target (io.RawIOBase): Writable file-like object receiving the backup.
+            chunk_size (int): Google Drive download chunk size in MB.
+            retries (int): Attempts per Google Drive chunk.
+
+        Returns:
+            int: Number of bytes downloaded.
+        """
+        self.ensure_one()
+        backup_type = self.backup_type
+
+        if backup_type == "local":
+            with open(backup["path"], "rb") as source:
+                return copy_stream(source, target, COPY_BUFFER_SIZE)
+
+        if backup_type == "sftp":
+            with client.open(backup["path"], "rb") as source:
+                # Request the following blocks while the current ones are written
+                source.prefetch()
+                return copy_stream(source, target, COPY_BUFFER_SIZE)
+
+        if backup_type == "drive":
+            from googleapiclient.http import DEFAULT_CHUNK_SIZE, MediaIoBaseDownload
+
+            counter = CountingWriter(target)
+            downloader = MediaIoBaseDownload(
+                counter,
+                client.files().get_media(fileId=backup["id"]),
+                chunksize=chunk_size * 1024 * 1024 or DEFAULT_CHUNK_SIZE,
+            )
+            done = False
+            while not done:
+                _status, done = downloader.next_chunk(num_retries=retries)
+            return counter.bytes_written
+
+        if backup_type == "dropbox":
+            _metadata, response = client.files_download(backup["path"])
+            size = 0
+            try:
+                for chunk in response.iter_content(COPY_BUFFER_SIZE):
+                    target.write(chunk)
+                    size += len(chunk)
+            finally:
+                response.close()
+            return size
+
+        raise ValidationError(f"Unsupported backup type: {backup_type}")
+
+    @contextmanager
+    def provider_client(self):
+        """
+        Connects to the backup provider for the duration of a `with` block.
+
+        Yields:
+            object: SFTP session, Google Drive service or Dropbox client (None for Local
+            servers).
+        """
+        self.ensure_one()
+        if self.backup_type == "sftp":
+            with self.sftp_session() as sftp:
+                yield sftp
+        elif self.backup_type in ("drive", "dropbox"):
+            yield self.provider_authenticate()
+        else:
+            yield None
+
+    def list_backups(self, client, name):
+        """
+        Lists the backup archives of a database stored on the destination.
+
+        A single listing request (page) is done per 1000 files: SFTP attributes come with
+        the directory listing and Google Drive / Dropbox listings are paginated.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+            name (str): Database name used in the backup file names.
+
+        Returns:
+            list: Dicts with the "name", "path", "id" and "size" of the backups, their
+            "date" (from the file name, in the user timezone) and "modified" date (UTC).
+        """
+        self.ensure_one()
+        backup_type = self.backup_type
+        destination_path = self.get_destination_path()
+        # (file name, path or provider id, size, modification date)
+        entries = []
+
+        def from_timestamp(timestamp):
+            return datetime.fromtimestamp(timestamp or 0, timezone.utc).replace(
+                tzinfo=None
+            )
+
+        if backup_type == "local":
+            if os.path.isdir(destination_path):
+                with os.scandir(destination_path) as it:
+                    for entry in it:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            entries.append(
+                                (
+                                    entry.name,
+                                    entry.path,
+                                    stat.st_size,
+                                    from_timestamp(stat.st_mtime),
+                                )
+                            )
+
+        elif backup_type == "sftp":
+            from stat import S_ISREG
+
+            entries = [
+                (
+                    attr.filename,
+                    destination_path + attr.filename,
+                    attr.st_size,
+                    from_timestamp(attr.st_mtime),
+                )
+                for attr in client.listdir_attr(destination_path)
+                if S_ISREG(attr.st_mode or 0)
+            ]
+
+        elif backup_type == "drive":
+            page_token = None
+            while True:
+                results = (
+                    client.files()
+                    .list(
+                        q=f"'{self.parent_folder}' in parents and trashed=false "
+                        f"and mimeType!='{DRIVE_FOLDER_MIMETYPE}'",
+                        fields="nextPageToken, files(id, name, size, createdTime)",
+                        pageSize=1000,
+                        pageToken=page_token,
+                    )
+                    .execute()
+                )
+                entries.extend(
+                    (
+                        file["name"],
+                        file["id"],
+                        int(file.get("size") or 0),
+                        datetime.fromisoformat(
+                            file["createdTime"].replace("Z", "+00:00")
+                        ).replace(tzinfo=None),
+                    )
+                    for file in results.get("files", [])
+                )
+                page_token = results.get("nextPageToken")
+                if not page_token:
+                    break
+
+        elif backup_type == "dropbox":
+            import dropbox
+
+            results = client.files_list_folder(destination_path.rstrip("/"))
+            while True:
+                # Skip sub-folders (e.g. the incremental filestore blobs)
+                entries.extend(
+                    (entry.name, entry.path_display, entry.size, entry.server_modified)
+                    for entry in results.entries
+                    if isinstance(entry, dropbox.files.FileMetadata)
+                )
+                if not results.has_more:
+                    break
+                results = client.files_list_folder_continue(results.cursor)
+
+        backups = []
+        for file_name, location, size, modified in entries:
+            parsed = parse_backup_name(file_name)
+            if not parsed or parsed[0] != name:
+                continue
+            backups.append(
+                {
+                    "name": file_name,
+                    "path": location,
+                    "id": location,
+                    "size": size,
+                    "date": parsed[1],
+                    "modified": modified,
+                }
+            )
+        return backups
+
+    def delete_backups(self, client, backups):
+        """
+        Deletes backup archives from the destination, batching the remote requests.
+
+        Google Drive deletions are sent in batch requests of 100 and Dropbox ones with
+        `files_delete_batch`; SFTP has no batch operation, the files are removed one by
+        one on the already open session.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+            backups (list): Backups returned by `list_backups`.
+
+        Raises:
+            ValidationError: If some backups could not be deleted.
+        """
+        self.ensure_one()
+        if not backups:
+            return
+        backup_type = self.backup_type
+        errors = []
+
+        if backup_type == "local":
+            self._delete_local(backups)
+        elif backup_type == "sftp":
+            self._delete_sftp(client, backups)
+        elif backup_type == "drive":
+            errors = self._delete_drive_batch(client, backups)
+        elif backup_type == "dropbox":
+            errors = self._delete_dropbox_batch(client, backups)
+
+        if errors:
+            raise ValidationError(
+                "Some old backups could not be deleted:\n" + "\n".join(errors)
+            )
+
+    def _delete_local(self, backups):
+        """Deletes Local backups, ignoring the ones already gone."""
+        for backup in backups:
+            try:
+                os.remove(backup["path"])
+            except FileNotFoundError:
+                pass
+
+    def _delete_sftp(self, sftp, backups):
+        """Deletes SFTP backups one by one on the open session."""
+        for backup in backups:
+            sftp.remove(backup["path"])
+
+    def _delete_drive_batch(self, service, backups):
+        """
+        Deletes Google Drive backups in batch requests of `DRIVE_BATCH_SIZE`.
+
+        Returns:
+            list: Errors of the failed deletions.
+        """
+        errors = []
+
+        def on_delete(request_id, response, exception):
+            if exception is not None:
+                errors.append(f"{request_id}: {exception}")
+
+        for start in range(0, len(backups), DRIVE_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=on_delete)
+            for backup in backups[start : start + DRIVE_BATCH_SIZE]:
+                batch.add(
+                    service.files().delete(fileId=backup["id"]),
+                    request_id=backup["name"],
+                )
+            batch.execute()
+        return errors
+
+    def _delete_dropbox_batch(self, dbx, backups):
+        """
+        Deletes Dropbox backups with `files_delete_batch`, by `DROPBOX_BATCH_SIZE`.
+
+        Returns:
+            list: Errors of the failed deletions.
+        """
+        import dropbox
+
+        errors = []
+        for start in range(0, len(backups), DROPBOX_BATCH_SIZE):
+            launch = dbx.files_delete_batch(
+                [
+                    dropbox.files.DeleteArg(backup["path"])
+                    for backup in backups[start : start + DROPBOX_BATCH_SIZE]
+                ]
+            )
+            # Large batches are processed asynchronously by Dropbox
+            if launch.is_async_job_id():
+                job_id = launch.get_async_job_id()
+                while True:
+                    status = dbx.files_delete_batch_check(job_id)
+                    if not status.is_in_progress():
+                        break
+                    time.sleep(1)
+                if status.is_failed():
+                    errors.append(str(status.get_failed()))
+            else:
+                status = launch
+            if status.is_complete():
+                errors.extend(
+                    str(entry.get_failure())
+                    for entry in status.get_complete().entries
+                    if entry.is_failure()
+                )
+        return errors
+
+    def get_blobs_location(self, client):
+        """
+        Returns the location of the incremental filestore blobs on the destination.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+
+        Returns:
+            str: Blobs folder path, or the blobs folder ID for Google Drive (created if needed).
+        """
+        self.ensure_one()
+        if self.backup_type != "drive":
+            return f"{self.get_destination_path()}{BLOBS_FOLDER}/"
+
+        query = (
+            f"'{self.parent_folder}' in parents and name='{BLOBS_FOLDER}' "
+            f"and mimeType='{DRIVE_FOLDER_MIMETYPE}' and trashed=false"
+        )
+        folders = client.files().list(q=query, fields="files(id)").execute()["files"]
+        if folders:
+            return folders[0]["id"]
+        folder_metadata = {
+            "name": BLOBS_FOLDER,
+            "parents": [self.parent_folder],
+            "mimeType": DRIVE_FOLDER_MIMETYPE,
+        }
+        return client.files().create(body=folder_metadata, fields="id").execute()["id"]
+
+    def list_filestore_blobs(self, client, location):
+        """
+        Lists the incremental filestore blobs already stored on the destination.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+            location (str): Blobs location returned by `get_blobs_location`.
+
+        Returns:
+            set: Hashes of the stored blobs.
+        """
+        self.ensure_one()
+        backup_type = self.backup_type
+        blobs = set()
+
+        if backup_type == "local":
+            for dir_path, dir_names, file_names in os.walk(location):
+                blobs.update(file_names)
+
+        elif backup_type == "sftp":
+            try:
+                prefixes = client.listdir(location)
+            except IOError:
+                prefixes = []
+            for prefix in prefixes:
+                blobs.update(client.listdir(f"{location}{prefix}"))
+
+        elif backup_type == "drive":
+            page_token = None
+            while True:
+                results = (
+                    client.files()
+                    .list(
+                        q=f"'{location}' in parents and trashed=false",
+                        fields="nextPageToken, files(name)",
+                        pageSize=1000,
+                        pageToken=page_token,
+                    )
+                    .execute()
+                )
+                blobs.update(blob["name"] for blob in results.get("files", []))
+                page_token = results.get("nextPageToken")
+                if not page_token:
+                    break
+
+        elif backup_type == "dropbox":
+            import dropbox
+
+            try:
+                results = client.files_list_folder(location.rstrip("/"), recursive=True)
+            except dropbox.exceptions.ApiError:
+                # The blobs folder does not exist yet
+                return blobs
+            while True:
+                blobs.update(
+                    entry.name
+                    for entry in results.entries
+                    if isinstance(entry, dropbox.files.FileMetadata)
+                )
+                if not results.has_more:
+                    break
+                results = client.files_list_folder_continue(results.cursor)
+
+        # Ignore partially uploaded blobs
+        return {blob for blob in blobs if not blob.endswith(".part")}
+
+    def upload_filestore_blob(self, client, location, source_path, blob_hash, chunk_size):
+        """
+        Uploads one incremental filestore blob to the destination.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+            location (str): Blobs location returned by `get_blobs_location`.
+            source_path (str): Path of the filestore file.
+            blob_hash (str): Content hash naming the blob.
+            chunk_size (int): Dropbox chunk size in MB.
+        """
+        self.ensure_one()
+        backup_type = self.backup_type
+        # Blobs are spread in sub-folders like the Odoo filestore does
+        blob_folder = f"{location}{blob_hash[:2]}"
+        blob_path = f"{blob_folder}/{blob_hash}"
+
+        if backup_type == "local":
+            os.makedirs(blob_folder, exist_ok=True)
+            # Copy under a temporary name so an interrupted copy is never taken as a blob
+            shutil.copyfile(source_path, f"{blob_path}.part")
+            os.replace(f"{blob_path}.part", blob_path)
+
+        elif backup_type == "sftp":
+            for folder in (location, blob_folder):
+                try:
+                    client.stat(folder)
+                except IOError:
+                    client.mkdir(folder)
+            client.put(source_path, f"{blob_path}.part")
+            client.posix_rename(f"{blob_path}.part", blob_path)
+
+        elif backup_type == "drive":
+            from googleapiclient.http import MediaFileUpload
 
-    def get_drive_file_media(self, f_content, m_type):
+            media = MediaFileUpload(
+                source_path, mimetype="application/octet-stream", resumable=True
+            )
+            client.files().create(
+                body={"name": blob_hash, "parents": [location]},
+                media_body=media,
+                fields="id",
+            ).execute()
+
+        elif backup_type == "dropbox":
+            with open(source_path, "rb") as f_content:
+                self.dropbox_upload(client, f_content, blob_path, chunk_size)
+
+    def download_filestore_blob(self, client, location, blob_hash, target_path):
         """
-        Returns a MediaIoBaseUpload object for Google Drive file upload.
+        Downloads one incremental filestore blob from the destination to a file.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+            location (str): Blobs location returned by `get_blobs_location`.
+            blob_hash (str): Content hash naming the blob.
+            target_path (str): Path of the file to write.
+        """
+        self.ensure_one()
+        backup_type = self.backup_type
+        blob_path = f"{location}{blob_hash[:2]}/{blob_hash}"
+
+        if backup_type == "local":
+            shutil.copyfile(blob_path, target_path)
+
+        elif backup_type == "sftp":
+            client.get(blob_path, target_path)
+
+        elif backup_type == "drive":
+            query = f"'{location}' in parents and name='{blob_hash}' and trashed=false"
+            blobs = client.files().list(q=query, fields="files(id)").execute()["files"]
+            if not blobs:
+                raise ValidationError(f"The filestore blob {blob_hash} is missing.")
+            with open(target_path, "wb") as target:
+                self.download_backup(client, {"id": blobs[0]["id"]}, target)
+
+        elif backup_type == "dropbox":
+            client.files_download_to_file(target_path, blob_path)
+
+    def get_chunks_location(self, store):
+        """
+        Returns the folder of a chunk store of the deduplicated backups.
+
+        Args:
+            store (str): Name of the store: the database name, so only the backups of
+                the same database share their chunks.
+
+        Returns:
+            str: Chunk store path, ending with a slash.
+        """
+        self.ensure_one()
+        return f"{self.get_destination_path()}{CHUNKS_FOLDER}/{store}/"
+
+    def upload_dedup_backup(
+        self, client, f_content, file_name, codec="zlib", level=None, bucket=None
+    ):
+        """
+        Stores a backup archive as deduplicated chunks, then uploads its index.
+
+        Only the chunks the store does not hold yet are compressed and uploaded, so
+        the transfer follows the data changed since the previous backups. Like
+        `upload_backup`, only the provider client and the (prefetched) server settings
+        are used.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+            f_content (io.RawIOBase): File-like object containing the archive.
+            file_name (str): Name of the index file.
+            codec (str): Compression of the new chunks ("none", "zlib" or "zstd").
+            level (int): Compression level (None for the codec default).
+            bucket (TokenBucket): Limits the upload bandwidth of the chunks, if set.
+
+        Returns:
+            dict: `upload_backup` values of the index, with the snapshot index in
+            "dedup" (its "store" and the "new_chunks" it uploaded included).
+        """
+        self.ensure_one()
+        if self.backup_type not in DEDUP_BACKUP_TYPES:
+            raise ValidationError(
+                f"The server {self.name} cannot store deduplicated backups."
+            )
+        store = parse_backup_name(file_name)[0]
+        location = self.get_chunks_location(store)
+        # Chunks are laid out like the incremental filestore blobs
+        existing = self.list_filestore_blobs(client, location)
+        folders = set()
+
+        def put_chunk(chunk_hash, data):
+            if bucket:
+                bucket.consume(len(data))
+            self._put_chunk(client, location, chunk_hash, data, folders)
+
+        index = store_chunks(f_content, put_chunk, existing, codec, level)
+        new_chunks = index.pop("new_chunks")
+        index["store"] = f"{CHUNKS_FOLDER}/{store}/"
+        values = self.upload_backup(
+            client, io.BytesIO(json.dumps(index).encode()), file_name
+        )
+        values["dedup"] = dict(index, new_chunks=new_chunks)
+        _logger.info(
+            "Deduplicated backup %s on %s: %s chunks, %s new (%s bytes stored)",
+            file_name,
+            self.name,
+            len(index["chunks"]),
+            len(new_chunks),
+            sum(new_chunks.values()),
+        )
+        return values
+
+    def _put_chunk(self, client, location, chunk_hash, data, folders):
+        """
+        Writes one chunk to a chunk store, under a temporary name until complete.
+
+        Args:
+            folders (set): Folders known to exist, updated with the created ones.
+        """
+        chunk_folder = f"{location}{chunk_hash[:2]}"
+        chunk_path = f"{chunk_folder}/{chunk_hash}"
+
+        if self.backup_type == "local":
+            os.makedirs(chunk_folder, exist_ok=True)
+            with open(f"{chunk_path}.part", "wb") as file:
+                file.write(data)
+            os.replace(f"{chunk_path}.part", chunk_path)
+            return
+
+        self._sftp_makedirs(client, chunk_folder, folders)
+        with client.open(f"{chunk_path}.part", "wb") as remote_file:
+            remote_file.set_pipelined(True)
+            remote_file.write(data)
+        attributes = client.stat(f"{chunk_path}.part")
+        if attributes.st_size != len(data):
+            raise IOError(f"size mismatch in put!  {attributes.st_size} != {len(data)}")
+        client.posix_rename(f"{chunk_path}.part", chunk_path)
+
+    @staticmethod
+    def _sftp_makedirs(sftp, folder, folders):
+        """
+        Creates a remote folder and its missing parents, like `os.makedirs`.
+
+        SFTP `mkdir` only creates the last component of a path: the first chunk of a
+        store creates the "chunks" folder, the store and the chunk sub-folder.
+
+        Args:
+            sftp (paramiko.SFTPClient): Connected SFTP client.
+            folder (str): Folder to create.
+            folders (set): Folders known to exist, updated with the created ones.
+        """
+        missing = []
+        while folder and folder not in folders:
+            try:
+                sftp.stat(folder)
+            except IOError:
+                missing.append(folder)
+                folder = posixpath.dirname(folder)
+                continue
+            folders.add(folder)
+            break
+        for path in reversed(missing):
+            sftp.mkdir(path)
+            folders.add(path)
+
+    def _get_chunk(self, client, location, chunk_hash):
+        """Returns the stored content of a chunk."""
+        chunk_path = f"{location}{chunk_hash[:2]}/{chunk_hash}"
+        if self.backup_type == "local":
+            with open(chunk_path, "rb") as file:
+                return file.read()
+        with client.open(chunk_path, "rb") as remote_file:
+            remote_file.prefetch()
+            return remote_file.read()
+
+    def read_dedup_index(self, client, backup):
+        """
+        Downloads the index of a deduplicated backup.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+            backup (dict): Backup returned by `list_backups` (or
+                `BackupArtifact._to_backup`).
+
+        Returns:
+            dict: Snapshot index, see `tools.dedup.store_chunks`.
+        """
+        self.ensure_one()
+        buffer = io.BytesIO()
+        self.download_backup(client, backup, buffer)
+        return json.loads(buffer.getvalue())
+
+    def download_dedup_backup(self, client, backup, target):
+        """
+        Reassembles the archive of a deduplicated backup from its chunks.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+            backup (dict): Backup returned by `list_backups` (or
+                `BackupArtifact._to_backup`).
+            target (io.RawIOBase): Writable file-like object receiving the archive.
+
+        Returns:
+            int: Size of the archive.
+        """
+        self.ensure_one()
+        index = self.read_dedup_index(client, backup)
+        location = self.get_destination_path() + index["store"]
+        try:
+            return reassemble_chunks(
+                index,
+                lambda chunk_hash: self._get_chunk(client, location, chunk_hash),
+                target,
+            )
+        except (IOError, ValueError) as e:
+            raise ValidationError(f"The backup {backup['name']} cannot be rebuilt: {e}")
+
+    def delete_chunks(self, client, location, chunk_hashes):
+        """
+        Deletes chunks no longer referenced by any backup from a chunk store.
+
+        Args:
+            client (object): Connected provider client (None for Local servers).
+            location (str): Chunk store returned by `get_chunks_location`.
+            chunk_hashes (iterable): Hashes of the chunks to delete.
+        """
+        self.ensure_one()
+        for chunk_hash in chunk_hashes:
+            chunk_path = f"{location}{chunk_hash[:2]}/{chunk_hash}"
+            try:
+                if self.backup_type == "local":
+                    os.remove(chunk_path)
+                else:
+                    client.remove(chunk_path)
+            except IOError as e:
+                _logger.warning("Chunk %s could not be deleted: %s", chunk_path, e)
+
+    def drive_upload_chunks(self, request, retries, on_session=None):
+        """
+        Executes a resumable Google Drive upload request chunk by chunk.
+
+        Args:
+            request (googleapiclient.http.HttpRequest): Request with a resumable media.
+            retries (int): Attempts per chunk (with exponential backoff) on network or
+                server errors.
+            on_session (callable): Called with the resumable session URI once created.
+
+        Returns:
+            dict: Response of the request once the last chunk is uploaded.
+        """
+        session_uri = request.resumable_uri
+        response = None
+        while response is None:
+            status, response = request.next_chunk(num_retries=retries)
+            if on_session and request.resumable_uri != session_uri:
+                session_uri = request.resumable_uri
+                on_session(session_uri)
+            if status:
+                _logger.info(
+                    "Google Drive upload progress: %s bytes", status.resumable_progress
+                )
+        return response
+
+    def get_drive_file_media(self, f_content, m_type, chunk_size=None):
+        """
+        Returns a resumable media object for Google Drive file upload.
 
         Args:
             f_content (io.BytesIO): File-like object containing the file content.
             m_type (str): Mime type of the file.
+            chunk_size (int): Upload chunk size in bytes (library default if not set).
 
         Returns:
-            MediaIoBaseUpload: Media upload object.
+            MediaUpload: Media upload object (`StreamMediaUpload` for non-seekable streams).
         """
-        from googleapiclient.http import MediaIoBaseUpload
+        from googleapiclient.http import DEFAULT_CHUNK_SIZE, MediaIoBaseUpload
 
-        return MediaIoBaseUpload(f_content, mimetype=m_type, resumable=True)
+        chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+        if not f_content.seekable():
+            from ..tools.drive import StreamMediaUpload
+
+            return StreamMediaUpload(f_content, m_type, chunksize=chunk_size)
+        return MediaIoBaseUpload(
+            f_content, mimetype=m_type, chunksize=chunk_size, resumable=True
+        )
 
     def provider_authenticate(self):
         """Authenticate with the backup provider and return the service object.
 
+        The clients are cached per server and credentials (see `_get_provider_cache_key`)
+        so consecutive runs and tests reuse the discovery document and access token.
+
         Returns:
             object: Service object for the backup provider.
         """
         self.ensure_one()
-        credentials_data = None
         backup_type = self.backup_type
 
         # Validate type
         if backup_type not in ("drive", "dropbox"):
             raise ValidationError("Error, Invalid backup type specified.")
 
+        cache_key = self._get_provider_cache_key()
+        if backup_type == "drive":
+            # The credentials (holding the access token) are shared, but the Google API
+            # client is not thread-safe (httplib2): each thread gets its own one
+            creds = provider_clients.get(cache_key, self._get_provider_credentials)
+            return provider_clients.get(
+                cache_key + (threading.get_ident(),),
+                lambda: self._build_provider_service(creds),
+            )
+        return provider_clients.get(
+            cache_key,
+            lambda: self._build_provider_service(self._get_provider_credentials()),
+        )
+
+    def _get_provider_cache_key(self):
+        """
+        Returns the provider client cache key of the server.
+
+        The credentials are hashed into the key, so a client built with outdated
+        credentials is never reused.
+        """
+        if self.backup_type == "drive":
+            credentials = (
+                self.drive_credentials_type,
+                self.drive_credentials_file,
+                self.drive_credentials_input,
+            )
+        else:
+            credentials = (
+                self.dropbox_app_key,
+                self.dropbox_app_secret,
+                self.dropbox_app_token,
+            )
+        digest = hashlib.sha256()
+        for value in credentials:
+            digest.update(value if isinstance(value, bytes) else str(value).encode())
+            digest.update(b"\0")
+        return self.env.cr.dbname, self.id, self.backup_type, digest.hexdigest()
+
+    def _get_provider_credentials(self):
+        """
+        Reads and validates the credentials of the backup provider.
+
+        Returns:
+            object: Service account credentials for Google Drive, tuple with the APP
+            key, secret and refresh token for Dropbox.
+        """
+        credentials_data = None
+        backup_type = self.backup_type
+
         # If Google Drive Backup Type
         if backup_type == "drive":
             # File Upload
@@ -470,6 +1955,16 @@ class BackupServer(models.Model):
                     raise ValidationError(
                         "Error, No valid or empty credentials text input"
                     )
+            try:
+                from google.oauth2 import service_account
+
+                return service_account.Credentials.from_service_account_info(
+                    credentials_data, scopes=SCOPES
+                )
+            except Exception as e:
+                raise ValidationError(
+                    f"Failed to initialize {backup_type} service. Error: {e}"
+                )
         else:
             if (
                 self.dropbox_app_key
@@ -486,23 +1981,39 @@ class BackupServer(models.Model):
                     "Error: Missing or empty credentials. Please ensure that all the following "
                     "credentials are set: APP Key, Secret, and Token."
                 )
-        # Get Service
+        return credentials_data
+
+    def _build_provider_service(self, credentials):
+        """
+        Builds the service object of the backup provider.
+
+        Args:
+            credentials (object): Value returned by `_get_provider_credentials`.
+
+        Returns:
+            object: Service object for the backup provider.
+        """
+        backup_type = self.backup_type
         try:
             if backup_type == "drive":
-                from google.oauth2 import service_account
                 from googleapiclient.discovery import build
 
-                creds = service_account.Credentials.from_service_account_info(
-                    credentials_data, scopes=SCOPES
+                # Use the discovery document shipped with the library instead of
+                # downloading it on each build
+                service = build(
+                    "drive",
+                    "v3",
+                    credentials=credentials,
+                    static_discovery=True,
+                    cache_discovery=False,
                 )
-                service = build("drive", "v3", credentials=creds)
             else:
                 import dropbox
 
                 service = dropbox.Dropbox(
-                    app_key=credentials_data[0],
-                    app_secret=credentials_data[1],
-                    oauth2_refresh_token=credentials_data[2],
+                    app_key=credentials[0],
+                    app_secret=credentials[1],
+                    oauth2_refresh_token=credentials[2],
                 )
         except Exception as e:
             raise ValidationError(
@@ -530,13 +2041,18 @@ class BackupServer(models.Model):
         # Test SFTP Connection
         if self.backup_type == "sftp":
             try:
-                sftp, transport = self.establish_sftp_connection()
-                # Close SFTP Connection
-                sftp.close()
-                transport.close()
+                with self.sftp_session() as sftp:
+                    # Measure the upload throughput with the current transfer settings
+                    try:
+                        throughput = self.measure_sftp_throughput(sftp)
+                        throughput_msg = f"Upload throughput: {throughput:.2f} MB/s."
+                    except Exception as e:
+                        throughput_msg = (
+                            f"The upload throughput could not be measured: {e}"
+                        )
                 # Provide a successful test result values
                 result_type = "success"
-                result_msg = "The SFTP connection was successful."
+                result_msg = f"The SFTP connection was successful.\n{throughput_msg}"
                 _logger.info(result_msg)
 
             except AuthenticationException as auth_error:
@@ -648,15 +2164,10 @@ class BackupServer(models.Model):
         # Test SFTP File transfer
         elif backup_type == "sftp":
             try:
-                # Get SFTP Connection Params
-                sftp, transport = self.establish_sftp_connection()
-
                 # Upload the file to the server
-                with sftp.file(file_path, "w") as f:
-                    f.write(file_content)
-                # Close SFTP Connection
-                sftp.close()
-                transport.close()
+                with self.sftp_session() as sftp:
+                    with sftp.file(file_path, "w") as f:
+                        f.write(file_content)
                 # Provide a successful test result values
                 result_type = "success"
                 result_msg = "The SFTP file transference was successful."
@@ -679,40 +2190,15 @@ class BackupServer(models.Model):
                     "Error: Parent Folder ID not found. Please provide a valid parent folder ID."
                 )
             try:
-                # Ensure file_content is encoded to bytes
-                file_content_bytes = (
-                    file_content.encode("utf-8")
-                    if isinstance(file_content, str)
-                    else file_content
-                )
-                # Create a file-like object from the byte content
-                media = self.get_drive_file_media(
-                    io.BytesIO(file_content_bytes), "application/txt"
-                )
-                # Get the current UTC time in ISO format
-                current_time = datetime.now(timezone.utc).isoformat()
-
-                # Fill file metadata
-                file_metadata = {
-                    "name": f_name,
-                    "parents": [self.parent_folder],
-                    "description": "Uploaded from Odoo",
-                    "mimeType": "application/txt",
-                    "createdTime": current_time,
-                    "modifiedTime": current_time,
-                }
-                # Get Google Drive Service
-                service = self.provider_authenticate()
-                # Create the file
-                file = (
-                    service.files()
-                    .create(body=file_metadata, media_body=media, fields="id")
-                    .execute()
-                )
+                # Upload the file like a backup: streamed in resumable chunks
+                with io.BytesIO(file_content.encode("utf-8")) as file_content_stream:
+                    file = self.upload_backup(
+                        self.provider_authenticate(), file_content_stream, f_name
+                    )
 
                 # Provide a successful test result values
                 result_type = "success"
-                result_msg = f"The Google Drive test file transference was successful.\nThe file ID is: {file['id']}"
+                result_msg = f"The Google Drive test file transference was successful.\nThe file ID is: {file['provider_file_id']}"
                 _logger.info(result_msg)
 
             except Exception as e:
@@ -723,21 +2209,15 @@ class BackupServer(models.Model):
         # Test Google Drive File transfer
         elif backup_type == "dropbox":
             try:
-                # Ensure file_content is encoded to bytes
-                file_content_bytes = (
-                    file_content.encode("utf-8")
-                    if isinstance(file_content, str)
-                    else file_content
-                )
-                # Get a Dropbox client
-                dbx = self.provider_authenticate()
-                # Upload the file content to Dropbox
-                with io.BytesIO(file_content_bytes) as file_content_stream:
-                    file = dbx.files_upload(file_content_stream.read(), file_path)
+                # Upload the file like a backup, through a bounded buffer
+                with io.BytesIO(file_content.encode("utf-8")) as file_content_stream:
+                    file = self.upload_backup(
+                        self.provider_authenticate(), file_content_stream, f_name
+                    )
 
                 # Provide a successful test result values
                 result_type = "success"
-                result_msg = f"The Dropbox test file transference was successful.\nThe file ID is: {file.id}"
+                result_msg = f"The Dropbox test file transference was successful.\nThe file ID is: {file['provider_file_id']}"
                 _logger.info(result_msg)
 
             except Exception as e:
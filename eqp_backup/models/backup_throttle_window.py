@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+from odoo import api, models, fields
+from odoo.exceptions import ValidationError
+
+IO_PRIORITY_SELECTION = [
+    ("normal", "Normal"),
+    ("low", "Low (best-effort, lowest level)"),
+    ("idle", "Idle (only when the disk is free)"),
+]
+
+
+class BackupThrottleWindow(models.Model):
+    """Daily time windows tightening the resource limits of a backup record."""
+
+    _name = "backup.throttle.window"
+    _description = "Backup Record Throttle Windows"
+    _order = "hour_from, id"
+
+    record_id = fields.Many2one(
+        "backup.record",
+        string="Backup Record",
+        required=True,
+        index=True,
+        ondelete="cascade",
+    )
+    hour_from = fields.Float(
+        string="From",
+        required=True,
+        help="Start of the window, in the time zone of the record responsible user.",
+    )
+    hour_to = fields.Float(
+        string="To",
+        required=True,
+        help="End of the window (before the start for windows spanning midnight).",
+    )
+    upload_bandwidth = fields.Float(
+        string="Upload Bandwidth (MB/s)",
+        help="Bandwidth limit of the uploads during the window (0 keeps the record "
+        "limit).",
+    )
+    compression_threads = fields.Integer(
+        string="Compression Threads",
+        help="Maximum compression threads of the backups started during the window "
+        "(0 keeps the record limit).",
+    )
+    cpu_nice = fields.Integer(
+        string="CPU Niceness",
+        help="Niceness (0-19) of the backups started during the window, if higher than "
+        "the record one.",
+    )
+    io_priority = fields.Selection(
+        IO_PRIORITY_SELECTION,
+        string="I/O Priority",
+        help="I/O priority of the backups started during the window, if lower than the "
+        "record one.",
+    )
+
+    _sql_constraints = [
+        (
+            "check_hours",
+            "CHECK(hour_from >= 0 AND hour_from <= 24 "
+            "AND hour_to >= 0 AND hour_to <= 24)",
+            "The window hours must be between 00:00 and 24:00.",
+        ),
+        (
+            "check_limits",
+            "CHECK(upload_bandwidth >= 0 AND compression_threads >= 0)",
+            "The window limits cannot be negative.",
+        ),
+    ]
+
+    @api.constrains("cpu_nice")
+    def _check_cpu_nice(self):
+        for window in self:
+            if not 0 <= window.cpu_nice <= 19:
+                raise ValidationError("The CPU Niceness must be between 0 and 19.")
+
+    def _get_limits(self):
+        """Return the window limits as a `tools.throttle.tighten_limits` dict."""
+        self.ensure_one()
+        return {
+            "upload_bandwidth": self.upload_bandwidth,
+            "compression_threads": self.compression_threads,
+            "cpu_nice": self.cpu_nice,
+            "io_priority": self.io_priority,
+        }
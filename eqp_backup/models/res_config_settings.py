@@ -32,3 +32,24 @@ class ResConfigSettings(models.TransientModel):
     eqp_backup_failure_email_address = fields.Char(
         related="company_id.eqp_backup_failure_email_address", readonly=False
     )
+    eqp_backup_max_workers = fields.Integer(
+        string="Backup Workers",
+        default=2,
+        config_parameter="eqp_backup.max_workers",
+        help="Maximum number of backup worker processes running at the same time on "
+        "each Odoo host (for the records using the Backup Worker execution mode).",
+    )
+    eqp_backup_spool_dir = fields.Char(
+        string="Spool Directory",
+        config_parameter="eqp_backup.spool_dir",
+        help="Folder receiving the backups spooled before their upload and the "
+        "temporary dump files (default: '<data_dir>/eqp_backup/spool'). Avoid small "
+        "tmpfs mounts such as /tmp: the backups check its free space before starting.",
+    )
+    eqp_backup_execution_retention_days = fields.Integer(
+        string="Execution History (Days)",
+        default=90,
+        config_parameter="eqp_backup.execution_retention_days",
+        help="Number of days the backup executions are kept in the history. "
+        "Put '0' to keep them forever.",
+    )
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+from . import test_archive
+from . import test_archive_zstd
+from . import test_backup_chunk
+from . import test_backup_job
+from . import test_catalog
+from . import test_checksum
+from . import test_client_cache
+from . import test_dedup
+from . import test_drive
+from . import test_dropbox
+from . import test_dump
+from . import test_execution
+from . import test_filestore
+from . import test_memory
+from . import test_pipe
+from . import test_preflight
+from . import test_restore
+from . import test_restore_database
+from . import test_restore_drill
+from . import test_retention
+from . import test_retention_server
+from . import test_sftp
+from . import test_sftp_pool
+from . import test_throttle
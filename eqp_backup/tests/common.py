@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import io
+import tempfile
+
+from odoo.tests.common import TransactionCase
+
+from ..tools.metrics import ResourceMonitor, current_rss
+
+# Size of the streams transferred by the memory tests: much larger than any buffer
+LARGE_STREAM_SIZE = 256 * 1024 * 1024
+# Largest growth of the resident memory allowed while transferring a large stream
+MAX_RSS_GROWTH = 64 * 1024 * 1024
+# Seconds between two samples of the resident memory
+RSS_SAMPLE_INTERVAL = 0.01
+
+
+class BackupCase(TransactionCase):
+    """Backup record of the test database, stored on a Local server in a temp folder."""
+
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.backup_dir = temp_dir.name
+        self.server = self.env["backup.server"].create(
+            {
+                "name": "Test Server",
+                "backup_type": "local",
+                "destination_path": self.backup_dir,
+                "state": "confirmed",
+            }
+        )
+        self.record = self.env["backup.record"].create(
+            {
+                "name": "Test Backup",
+                "db_name": self.env.cr.dbname,
+                "frequency": "days",
+                "server_id": self.server.id,
+                "state": "confirmed",
+            }
+        )
+
+
+class GeneratedReader(io.RawIOBase):
+    """Readable stream of `size` bytes repeating a pattern, never held in memory."""
+
+    def __init__(self, size, pattern=b"eqp_backup\n" * 1024):
+        super().__init__()
+        self.remaining = size
+        self.pattern = pattern
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast("B")
+        count = min(len(view), self.remaining)
+        written = 0
+        while written < count:
+            offset = self.position % len(self.pattern)
+            length = min(count - written, len(self.pattern) - offset)
+            view[written : written + length] = self.pattern[offset : offset + length]
+            written += length
+            self.position += length
+        self.remaining -= count
+        return count
+
+
+class NullWriter(io.RawIOBase):
+    """Writable stream discarding the data, only counting it."""
+
+    def __init__(self):
+        super().__init__()
+        self.bytes_written = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        size = memoryview(data).nbytes
+        self.bytes_written += size
+        return size
+
+
+def run_measuring_rss(function):
+    """Run `function`, sampling the resident memory of the process meanwhile.
+
+    Returns:
+        tuple: Result of `function` and peak growth of the resident memory in bytes.
+    """
+    rss_before = current_rss()
+    with ResourceMonitor([], interval=RSS_SAMPLE_INTERVAL) as monitor:
+        result = function()
+    return result, monitor.peak_rss - rss_before
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import io
+import os
+import tarfile
+import tempfile
+import zipfile
+
+from odoo.tests.common import BaseCase
+
+from ..tools.archive import (
+    StreamingTarWriter,
+    StreamingZipWriter,
+    is_incompressible,
+    open_archive_writer,
+)
+
+
+class UnseekableWriter(io.RawIOBase):
+    """Writable stream that cannot seek nor tell, like a pipe or an upload."""
+
+    def __init__(self):
+        super().__init__()
+        self.buffer = io.BytesIO()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+
+class TestStreamingZipWriter(BaseCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.filestore = temp_dir.name
+        self.files = {
+            "ab/ab12": os.urandom(100_000),
+            "cd/cd34": b"attachment" * 1000,
+            "empty": b"",
+        }
+        for relative_path, data in {**self.files, "ab/cache.pyc": b"ignored"}.items():
+            path = os.path.join(self.filestore, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(data)
+
+    def test_unseekable_round_trip(self):
+        output = UnseekableWriter()
+        dump = os.urandom(3 * 1024 * 1024)
+        with StreamingZipWriter(output) as archive:
+            archive.add_stream(io.BytesIO(dump), "dump.sql")
+            archive.add_tree(self.filestore, "filestore")
+            archive.add_bytes('{"version": "17.0"}', "manifest.json")
+
+        with zipfile.ZipFile(io.BytesIO(output.buffer.getvalue())) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(
+                zip_file.namelist(),
+                [
+                    "dump.sql",
+                    "filestore/empty",
+                    "filestore/ab/ab12",
+                    "filestore/cd/cd34",
+                    "manifest.json",
+                ],
+            )
+            self.assertEqual(zip_file.read("dump.sql"), dump)
+            for relative_path, data in self.files.items():
+                self.assertEqual(zip_file.read(f"filestore/{relative_path}"), data)
+            self.assertEqual(zip_file.read("manifest.json"), b'{"version": "17.0"}')
+        self.assertEqual(archive.members, 5)
+        self.assertEqual(archive.bytes_in, len(dump) + 110_000 + 19)
+
+    def test_seekable_output(self):
+        with tempfile.TemporaryFile() as output:
+            with StreamingZipWriter(output) as archive:
+                archive.add_file(os.path.join(self.filestore, "ab/ab12"), "ab12")
+            output.seek(0)
+            with zipfile.ZipFile(output) as zip_file:
+                self.assertEqual(zip_file.read("ab12"), self.files["ab/ab12"])
+
+    def test_incompressible_members_stored(self):
+        png_path = os.path.join(self.filestore, "ef/ef56")
+        os.makedirs(os.path.dirname(png_path))
+        with open(png_path, "wb") as file:
+            file.write(b"\x89PNG\r\n\x1a\n" + b"\x00" * 10_000)
+        output = UnseekableWriter()
+        with StreamingZipWriter(output) as archive:
+            archive.add_stream(io.BytesIO(b"SELECT 1;\n" * 1000), "dump.sql", text=True)
+            archive.add_tree(self.filestore, "filestore")
+
+        self.assertEqual(archive.stored_members, 2)
+        with zipfile.ZipFile(io.BytesIO(output.buffer.getvalue())) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            compression = {
+                info.filename: info.compress_type for info in zip_file.infolist()
+            }
+        self.assertEqual(compression["filestore/ab/ab12"], zipfile.ZIP_STORED)
+        self.assertEqual(compression["filestore/ef/ef56"], zipfile.ZIP_STORED)
+        self.assertEqual(compression["filestore/cd/cd34"], zipfile.ZIP_DEFLATED)
+        self.assertEqual(compression["dump.sql"], zipfile.ZIP_DEFLATED)
+
+
+class TestIsIncompressible(BaseCase):
+    def test_signatures(self):
+        self.assertTrue(is_incompressible(b"\xff\xd8\xff\xe0" + b"\x00" * 100))
+        self.assertTrue(is_incompressible(b"PK\x03\x04" + b"\x00" * 100))
+        self.assertTrue(is_incompressible(b"RIFF\x00\x00\x00\x00WEBPVP8 "))
+        self.assertTrue(is_incompressible(b"\x00\x00\x00\x18ftypmp42"))
+
+    def test_trial_compression(self):
+        self.assertTrue(is_incompressible(os.urandom(16 * 1024)))
+        self.assertFalse(is_incompressible(b"%PDF-1.7\n" + b"stream" * 4096))
+        # Too small to be worth a trial
+        self.assertFalse(is_incompressible(os.urandom(1024)))
+
+
+class TestStreamingTarWriter(BaseCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.filestore = temp_dir.name
+        os.makedirs(os.path.join(self.filestore, "ab"))
+        with open(os.path.join(self.filestore, "ab/ab12"), "wb") as file:
+            file.write(b"attachment")
+
+    def test_native_archive(self):
+        output = UnseekableWriter()
+        dump = os.urandom(250_000)
+        with StreamingTarWriter(output, part_size=100_000) as archive:
+            archive.add_stream(io.BytesIO(dump), "dump.dump")
+            archive.add_tree(self.filestore, "filestore")
+            archive.add_bytes('{"version": "17.0"}', "manifest.json")
+        self.assertEqual(archive.describe()["codec"], "native")
+        self.assertEqual(archive.members, 5)
+        self.assertEqual(archive.bytes_in, len(dump) + 10 + 19)
+
+        output.buffer.seek(0)
+        with tarfile.open(fileobj=output.buffer, mode="r:") as tar_file:
+            self.assertEqual(
+                [(member.name, member.size) for member in tar_file.getmembers()],
+                [
+                    ("dump.dump.000000", 100_000),
+                    ("dump.dump.000001", 100_000),
+                    ("dump.dump.000002", 50_000),
+                    ("filestore/ab/ab12", 10),
+                    ("manifest.json", 19),
+                ],
+            )
+            # The parts concatenated in name order give the dump back
+            parts = sorted(
+                name for name in tar_file.getnames() if name.startswith("dump.dump.")
+            )
+            restored = b"".join(tar_file.extractfile(name).read() for name in parts)
+        self.assertEqual(restored, dump)
+
+    def test_empty_stream(self):
+        output = io.BytesIO()
+        with open_archive_writer(output, "native") as archive:
+            archive.add_stream(io.BytesIO(), "dump.dump")
+        output.seek(0)
+        with tarfile.open(fileobj=output, mode="r:") as tar_file:
+            self.assertEqual(
+                [(member.name, member.size) for member in tar_file.getmembers()],
+                [("dump.dump.000000", 0)],
+            )
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import io
+import os
+import tarfile
+import tempfile
+
+from odoo.tests.common import BaseCase
+
+from ..tools.archive import StreamingTarZstdWriter
+from ..tools.restore import BackupExtractor
+
+PART_SIZE = 64 * 1024
+
+
+class TestTarZstdWriter(BaseCase):
+    def setUp(self):
+        super().setUp()
+        try:
+            import zstandard
+        except ImportError:
+            self.skipTest("The zstandard package is not installed.")
+        self.zstandard = zstandard
+
+    def _write(self, members):
+        output = io.BytesIO()
+        with StreamingTarZstdWriter(output, threads=1, part_size=PART_SIZE) as archive:
+            for name, data in members:
+                archive.add_stream(io.BytesIO(data), name)
+            archive.add_bytes('{"db_name": "test"}', "manifest.json")
+        return output.getvalue()
+
+    def test_stream_parts(self):
+        dump = os.urandom(PART_SIZE * 2 + 100)
+        data = self._write([("dump.sql", dump)])
+        reader = self.zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data))
+        with tarfile.open(fileobj=reader, mode="r|") as archive:
+            members = [(member.name, member.size) for member in archive]
+        # Streams are never spooled: they are split into parts read in memory
+        self.assertEqual(
+            members,
+            [
+                ("dump.sql.000000", PART_SIZE),
+                ("dump.sql.000001", PART_SIZE),
+                ("dump.sql.000002", 100),
+                ("manifest.json", 19),
+            ],
+        )
+
+    def test_restore_parts(self):
+        dump = os.urandom(PART_SIZE * 3)
+        data = self._write([("dump.sql", dump)])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            extractor = BackupExtractor(temp_dir, os.path.join(temp_dir, "filestore"))
+            extractor.extract_stream(io.BytesIO(data), "tar.zst")
+            self.assertEqual(extractor.dump_kind, "sql")
+            self.assertEqual(extractor.manifest, {"db_name": "test"})
+            with open(extractor.dump_path, "rb") as file:
+                self.assertEqual(file.read(), dump)
+
+    def test_empty_stream(self):
+        data = self._write([("dump.sql", b"")])
+        reader = self.zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data))
+        with tarfile.open(fileobj=reader, mode="r|") as archive:
+            self.assertEqual(archive.next().name, "dump.sql.000000")
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import io
+import os
+import tempfile
+
+from odoo.tests.common import TransactionCase, tagged
+
+from .test_dedup import generate_dump
+
+INDEX_NAME = "Backup_test_db_2024-01-0%d_00.00.00.idx"
+
+
+@tagged("post_install", "-at_install")
+class TestBackupChunk(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.server = self.env["backup.server"].create(
+            {
+                "name": "Chunk Store",
+                "backup_type": "local",
+                "destination_path": temp_dir.name,
+            }
+        )
+        self.chunk_model = self.env["backup.chunk"].sudo()
+
+    def _upload(self, data, day):
+        values = self.server.upload_dedup_backup(
+            None, io.BytesIO(data), INDEX_NAME % day
+        )
+        return values["dedup"]
+
+    def _chunk_path(self, chunk_hash):
+        location = self.server.get_chunks_location("test_db")
+        return f"{location}{chunk_hash[:2]}/{chunk_hash}"
+
+    def _ref_counts(self):
+        chunks = self.chunk_model.search([("server_id", "=", self.server.id)])
+        return {chunk.name: chunk.ref_count for chunk in chunks}
+
+    def test_references(self):
+        data = generate_dump(8 * 1024 * 1024)
+        first = self._upload(data, 1)
+        # The second backup only differs at its end
+        second = self._upload(data[: 6 * 1024 * 1024] + generate_dump(1024, 1), 2)
+        first_hashes = {chunk_hash for chunk_hash, _size in first["chunks"]}
+        second_hashes = {chunk_hash for chunk_hash, _size in second["chunks"]}
+        shared = first_hashes & second_hashes
+        self.assertTrue(shared)
+        self.assertTrue(second_hashes - first_hashes)
+        self.assertEqual(set(second["new_chunks"]), second_hashes - first_hashes)
+
+        self.chunk_model._add_references(self.server, first)
+        self.chunk_model._add_references(self.server, second)
+        counts = self._ref_counts()
+        self.assertEqual(set(counts), first_hashes | second_hashes)
+        for chunk_hash in shared:
+            self.assertEqual(counts[chunk_hash], 2)
+        for chunk_hash in first_hashes ^ second_hashes:
+            self.assertEqual(counts[chunk_hash], 1)
+
+        count, _freed = self.chunk_model._release_references(self.server, None, first)
+        self.assertEqual(count, len(first_hashes - second_hashes))
+        counts = self._ref_counts()
+        self.assertEqual(set(counts), second_hashes)
+        self.assertTrue(all(value == 1 for value in counts.values()))
+        for chunk_hash in first_hashes - second_hashes:
+            self.assertFalse(os.path.exists(self._chunk_path(chunk_hash)))
+        for chunk_hash in second_hashes:
+            self.assertTrue(os.path.exists(self._chunk_path(chunk_hash)))
+
+        self.chunk_model._release_references(self.server, None, second)
+        self.assertEqual(self._ref_counts(), {})
+        for chunk_hash in second_hashes:
+            self.assertFalse(os.path.exists(self._chunk_path(chunk_hash)))
+
+    def test_sftp_chunk_store_folders(self):
+        from ..benchmarks.fake_providers import provider_client
+        from ..benchmarks.fake_sftp import FakeSftpServer
+
+        with FakeSftpServer() as sftp_server:
+            self.server.write(
+                {
+                    "backup_type": "sftp",
+                    "destination_path": "/backups/odoo",
+                    "server_address": "127.0.0.1",
+                    "server_port": str(sftp_server.port),
+                    "server_user": sftp_server.username,
+                    "server_password": sftp_server.password,
+                }
+            )
+            self.addCleanup(self.server._invalidate_sftp_pool)
+            data = generate_dump(2 * 1024 * 1024)
+            with provider_client(self.server) as sftp:
+                values = self.server.upload_dedup_backup(
+                    sftp, io.BytesIO(data), INDEX_NAME % 1
+                )
+        # SFTP creates one folder at a time: every missing parent is created first
+        storage = sftp_server.storage
+        for folder in (
+            "/backups",
+            "/backups/odoo",
+            "/backups/odoo/chunks",
+            "/backups/odoo/chunks/test_db",
+        ):
+            self.assertIn(folder, storage.folders)
+        for chunk_hash, _size in values["dedup"]["chunks"]:
+            self.assertIn(self._chunk_path(chunk_hash), storage.files)
+        self.assertIn("/backups/odoo/" + INDEX_NAME % 1, storage.files)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import json
+import os
+import socket
+import subprocess
+import sys
+
+from unittest.mock import patch
+
+from odoo.tests.common import tagged
+
+from ..models import backup_job
+from ..tools.worker import CONFIG_ENVIRON
+from .common import BackupCase
+
+
+@tagged("post_install", "-at_install")
+class TestBackupJob(BackupCase):
+    def setUp(self):
+        super().setUp()
+        self.record.execution_mode = "worker"
+        self.job_model = self.env["backup.job"]
+
+    def test_worker_mode_enqueues(self):
+        record_model = self.env["backup.record"].with_context(manual_execution=True)
+        with patch.object(type(self.record), "_execute_backup") as execute_backup:
+            result_type, result_msg = record_model._scheduled_backup_process(
+                self.record.id
+            )
+            # A second execution while the first one is pending queues nothing
+            record_model._scheduled_backup_process(self.record.id)
+        # The backup itself only runs in the worker process
+        execute_backup.assert_not_called()
+        self.assertEqual(result_type, "info")
+        job = self.record.job_ids
+        self.assertEqual(len(job), 1)
+        self.assertIn(f"job {job.id}", result_msg)
+        self.assertEqual(job.state, "running")
+        self.assertEqual(job.host, socket.gethostname())
+
+    def test_server_concurrency(self):
+        other_record = self.env["backup.record"].create(
+            {
+                "name": "Other Backup",
+                "db_name": self.env.cr.dbname,
+                "frequency": "days",
+                "server_id": self.server.id,
+                "execution_mode": "worker",
+                "state": "confirmed",
+            }
+        )
+        first = self.job_model.enqueue(self.record)
+        second = self.job_model.enqueue(other_record)
+        self.assertEqual(first.state, "running")
+        # Max Concurrent Jobs of the server is 1
+        self.assertEqual(second.state, "queued")
+
+        first._finish("success", "Done")
+        self.assertEqual(self.job_model._dispatch(), second)
+        self.assertEqual(second.state, "running")
+
+    def test_dead_worker_failed(self):
+        job = self.job_model.enqueue(self.record)
+        process = subprocess.Popen([sys.executable, "-c", ""])
+        process.wait()
+        job.pid = process.pid
+        self.job_model._dispatch()
+        self.assertEqual(job.state, "failed")
+        self.assertEqual(job.result_type, "danger")
+        self.assertIn("stopped unexpectedly", self.record.last_execution_result)
+
+    def test_spawn_worker(self):
+        with patch.object(backup_job.subprocess, "Popen") as popen:
+            self.job_model._spawn_worker("test_db", 7)
+        args, kwargs = popen.call_args
+        self.assertEqual(
+            args[0],
+            [sys.executable, os.path.abspath(backup_job.WORKER_SCRIPT), "test_db", "7"],
+        )
+        # Detached from the Odoo process, with its configuration
+        self.assertTrue(kwargs["start_new_session"])
+        options = json.loads(kwargs["env"][CONFIG_ENVIRON])
+        self.assertIn("db_host", options)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import os
+import time
+
+from odoo.tests.common import tagged
+
+from .common import BackupCase
+
+
+@tagged("post_install", "-at_install")
+class TestBackupCatalog(BackupCase):
+    def setUp(self):
+        super().setUp()
+        self.artifact_model = self.env["backup.artifact"]
+
+    def _create_backup(self, day):
+        file_name = f"Backup_{self.record.db_name}_2024-01-0{day}_00.00.00.zip"
+        with open(os.path.join(self.backup_dir, file_name), "wb") as file:
+            file.write(b"backup")
+        return file_name
+
+    def _states(self):
+        artifacts = self.artifact_model.search([("record_id", "=", self.record.id)])
+        return {artifact.name: artifact.state for artifact in artifacts}
+
+    def test_reconcile(self):
+        first = self._create_backup(1)
+        second = self._create_backup(2)
+        self.assertEqual(
+            self.artifact_model.reconcile_record(self.record, None), (2, 0)
+        )
+        self.assertEqual(self._states(), {first: "present", second: "present"})
+
+        # A file removed outside Odoo is marked as missing
+        os.remove(os.path.join(self.backup_dir, first))
+        self.assertEqual(
+            self.artifact_model.reconcile_record(self.record, None), (0, 1)
+        )
+        self.assertEqual(self._states(), {first: "missing", second: "present"})
+
+        # And present again once it is back
+        self._create_backup(1)
+        self.assertEqual(
+            self.artifact_model.reconcile_record(self.record, None), (0, 0)
+        )
+        self.assertEqual(self._states(), {first: "present", second: "present"})
+
+    def test_register_artifact(self):
+        file_name = self._create_backup(1)
+        path = os.path.join(self.backup_dir, file_name)
+        artifact = self.record._register_artifact(
+            file_name, time.monotonic(), size=2 * 1024 * 1024, path=path
+        )
+        self.assertEqual(artifact.state, "present")
+        self.assertEqual(artifact.server_id, self.server)
+        self.assertEqual(artifact.size, 2)
+        self.assertEqual(artifact.path, path)
+        # A file uploaded again keeps its catalog entry
+        again = self.record._register_artifact(file_name, time.monotonic(), path=path)
+        self.assertEqual(again, artifact)
+        self.assertEqual(
+            self.artifact_model.reconcile_record(self.record, None), (0, 0)
+        )
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import hashlib
+import io
+import os
+import tempfile
+import time
+import zipfile
+
+from unittest.mock import patch
+
+from odoo.exceptions import ValidationError
+from odoo.tests.common import BaseCase, tagged
+
+from ..tools.checksum import (
+    DROPBOX_HASH_BLOCK_SIZE,
+    DropboxContentHasher,
+    HashingWriter,
+    find_corrupt_zip_member,
+)
+from .common import BackupCase
+
+
+class TestChecksumTools(BaseCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+
+    def test_hashing_writer(self):
+        output = io.BytesIO()
+        writer = HashingWriter(output, algorithms=("sha256", "md5"))
+        data = os.urandom(100_000)
+        writer.write(data[:1000])
+        writer.write(memoryview(data)[1000:])
+        self.assertFalse(writer.seekable())
+        self.assertEqual(output.getvalue(), data)
+        self.assertEqual(writer.size, len(data))
+        self.assertEqual(
+            writer.hexdigests(),
+            {
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "md5": hashlib.md5(data).hexdigest(),
+            },
+        )
+
+    def test_dropbox_content_hash(self):
+        data = os.urandom(DROPBOX_HASH_BLOCK_SIZE + 1000)
+        hasher = DropboxContentHasher()
+        # Updates not aligned with the 4 MB blocks
+        for start in range(0, len(data), 1_000_000):
+            hasher.update(data[start : start + 1_000_000])
+        block_digests = hashlib.sha256(data[:DROPBOX_HASH_BLOCK_SIZE]).digest()
+        block_digests += hashlib.sha256(data[DROPBOX_HASH_BLOCK_SIZE:]).digest()
+        self.assertEqual(hasher.hexdigest(), hashlib.sha256(block_digests).hexdigest())
+
+    def test_find_corrupt_zip_member(self):
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_STORED) as zip_file:
+            zip_file.writestr("dump.sql", b"SELECT 1;" * 100)
+            zip_file.writestr("manifest.json", b"{}")
+        data = output.getvalue()
+        path = os.path.join(self.temp_dir, "backup.zip")
+        with open(path, "wb") as file:
+            file.write(data)
+        self.assertIsNone(find_corrupt_zip_member(path))
+
+        # Flip a byte of the dump.sql content
+        offset = data.index(b"SELECT 1;") + 10
+        with open(path, "wb") as file:
+            file.write(data[:offset] + b"X" + data[offset + 1 :])
+        self.assertEqual(find_corrupt_zip_member(path), "dump.sql")
+
+        with open(path, "wb") as file:
+            file.write(b"not a zip file")
+        self.assertTrue(find_corrupt_zip_member(path))
+
+
+@tagged("post_install", "-at_install")
+class TestVerifyUpload(BackupCase):
+    def setUp(self):
+        super().setUp()
+        self.data = os.urandom(10_000)
+        self.stats = {
+            "checksums": {
+                "sha256": hashlib.sha256(self.data).hexdigest(),
+                "md5": hashlib.md5(self.data).hexdigest(),
+            },
+            "backup_size": len(self.data),
+        }
+        file_name = f"Backup_{self.record.db_name}_2024-01-01_00.00.00.tar.zst"
+        self.values = {
+            "name": file_name,
+            "path": os.path.join(self.backup_dir, file_name),
+            "size": len(self.data),
+        }
+
+    def _register(self, remote_checksum):
+        with patch.object(
+            type(self.server), "get_remote_checksum", return_value=remote_checksum
+        ):
+            return self.record._register_uploaded_backup(
+                self.server, None, self.values, time.monotonic(), self.stats
+            )
+
+    def test_checksum_verified(self):
+        artifact = self._register(("md5", hashlib.md5(self.data).hexdigest()))
+        self.assertEqual(artifact.integrity_state, "verified")
+        self.assertEqual(artifact.checksum, self.stats["checksums"]["sha256"])
+        self.assertEqual(artifact.checksum_type, "sha256")
+
+    def test_checksum_mismatch(self):
+        with self.assertRaisesRegex(ValidationError, "integrity check"):
+            self._register(("md5", hashlib.md5(b"corrupted").hexdigest()))
+        # Cataloged anyway, so the corrupt upload can be found
+        artifact = self.env["backup.artifact"].search(
+            [("server_id", "=", self.server.id), ("name", "=", self.values["name"])]
+        )
+        self.assertEqual(artifact.integrity_state, "mismatch")
+        self.assertIn("does not match", artifact.integrity_msg)
+
+    def test_size_check(self):
+        # Without checksum from the destination, the size is compared
+        self.assertEqual(self._register((None, None)).integrity_state, "size")
+        self.values["size"] -= 1
+        with self.assertRaises(ValidationError):
+            self._register((None, None))
+
+    def test_local_zip_crc(self):
+        file_name = f"Backup_{self.record.db_name}_2024-01-01_00.00.00.zip"
+        path = os.path.join(self.backup_dir, file_name)
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as zip_file:
+            zip_file.writestr("dump.sql", self.data)
+        self.values.update(name=file_name, path=path, size=os.path.getsize(path))
+        artifact = self._register((None, None))
+        self.assertEqual(artifact.integrity_state, "verified")
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+from unittest.mock import patch
+
+from odoo.tests.common import BaseCase, TransactionCase, tagged
+
+from ..tools.client_cache import ClientCache
+
+
+class TestClientCache(BaseCase):
+    def test_reuse_until_ttl(self):
+        cache = ClientCache(ttl=3600)
+        clients = iter(["first", "second"])
+        self.assertEqual(cache.get(("db", 1), lambda: next(clients)), "first")
+        self.assertEqual(cache.get(("db", 1), lambda: next(clients)), "first")
+        # Expired clients are built again
+        cache.ttl = 0
+        self.assertEqual(cache.get(("db", 1), lambda: next(clients)), "second")
+
+    def test_errors_not_cached(self):
+        cache = ClientCache()
+
+        def failing():
+            raise ConnectionError("token refresh failed")
+
+        with self.assertRaises(ConnectionError):
+            cache.get(("db", 1), failing)
+        self.assertEqual(cache.get(("db", 1), lambda: "client"), "client")
+
+    def test_invalidate(self):
+        cache = ClientCache()
+        cache.get(("db", 1), lambda: "server 1")
+        cache.get(("db", 2), lambda: "server 2")
+        cache.invalidate(lambda key: key[1] == 1)
+        self.assertEqual(cache.get(("db", 1), lambda: "rebuilt"), "rebuilt")
+        self.assertEqual(cache.get(("db", 2), lambda: "rebuilt"), "server 2")
+
+
+@tagged("post_install", "-at_install")
+class TestProviderClients(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.server = self.env["backup.server"].create(
+            {
+                "name": "Dropbox",
+                "backup_type": "dropbox",
+                "dropbox_app_key": "key",
+                "dropbox_app_secret": "secret",
+                "dropbox_app_token": "token",
+            }
+        )
+        self.addCleanup(self.server._invalidate_provider_clients)
+        self.built = []
+
+        def build(server, credentials):
+            self.built.append(credentials)
+            return object()
+
+        patcher = patch.object(type(self.server), "_build_provider_service", build)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_client_reused(self):
+        client = self.server.provider_authenticate()
+        self.assertIs(self.server.provider_authenticate(), client)
+        self.assertEqual(self.built, [("key", "secret", "token")])
+
+    def test_new_credentials(self):
+        client = self.server.provider_authenticate()
+        self.server.write({"dropbox_app_token": "new token"})
+        self.assertIsNot(self.server.provider_authenticate(), client)
+        self.assertEqual(self.built[-1], ("key", "secret", "new token"))
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import hashlib
+import io
+import random
+
+from odoo.tests.common import BaseCase
+
+from ..tools.dedup import (
+    compress_chunk,
+    decompress_chunk,
+    find_chunk_boundary,
+    iter_chunks,
+    reassemble_chunks,
+    store_chunks,
+)
+
+# Small chunk sizes, so a few MB of data are cut into many chunks
+SIZES = {"min_size": 4 * 1024, "avg_size": 16 * 1024, "max_size": 64 * 1024}
+
+
+def generate_dump(size, seed=0):
+    """Return `size` bytes of SQL-like lines that never repeat."""
+    generator = random.Random(seed)
+    lines = []
+    length = 0
+    while length < size:
+        value = generator.getrandbits(generator.randint(8, 512))
+        line = b"%d\t%x\n" % (len(lines), value)
+        lines.append(line)
+        length += len(line)
+    return b"".join(lines)[:size]
+
+
+def chunk_hashes(data):
+    return [
+        hashlib.sha256(chunk).hexdigest()
+        for chunk in iter_chunks(io.BytesIO(data), **SIZES)
+    ]
+
+
+class TestDedup(BaseCase):
+    def test_chunk_sizes(self):
+        data = generate_dump(4 * 1024 * 1024)
+        chunks = list(iter_chunks(io.BytesIO(data), **SIZES))
+        self.assertEqual(b"".join(chunks), data)
+        for chunk in chunks[:-1]:
+            self.assertGreater(len(chunk), SIZES["min_size"])
+            self.assertLessEqual(len(chunk), SIZES["max_size"])
+        average = len(data) / len(chunks)
+        self.assertGreater(average, SIZES["avg_size"] / 2)
+        self.assertLess(average, SIZES["avg_size"] * 2)
+
+    def test_boundaries_stable_after_insertion(self):
+        data = generate_dump(4 * 1024 * 1024)
+        position = data.index(b"\n", 100 * 1024) + 1
+        edited = data[:position] + b"123\tinserted row\n" + data[position:]
+        before = chunk_hashes(data)
+        after = chunk_hashes(edited)
+        # Only the chunks around the insertion change
+        self.assertLessEqual(len(set(after) - set(before)), 2)
+        # The cuts before and after the insertion fall on the same places
+        self.assertEqual(before[-20:], after[-20:])
+
+    def test_forced_cut(self):
+        # Without line feeds, chunks are cut at the maximum size
+        data = b"x" * (SIZES["max_size"] * 2 + 10)
+        self.assertEqual(find_chunk_boundary(data, **SIZES), SIZES["max_size"])
+        self.assertEqual(
+            [len(chunk) for chunk in iter_chunks(io.BytesIO(data), **SIZES)],
+            [SIZES["max_size"], SIZES["max_size"], 10],
+        )
+        # The end of the stream is never cut again
+        self.assertEqual(find_chunk_boundary(b"abc\n" * 10, **SIZES), 40)
+
+    def test_compress_round_trip(self):
+        data = generate_dump(100 * 1024)
+        codecs = ["none", "zlib"]
+        try:
+            import zstandard  # noqa: F401
+
+            codecs.append("zstd")
+        except ImportError:
+            pass
+        for codec in codecs:
+            stored = compress_chunk(data, codec)
+            self.assertEqual(decompress_chunk(stored), data, codec)
+        with self.assertRaises(ValueError):
+            decompress_chunk(b"?" + data)
+
+    def test_store_and_reassemble(self):
+        data = generate_dump(10 * 1024 * 1024)
+        store = {}
+        existing = set()
+        index = store_chunks(io.BytesIO(data), store.__setitem__, existing)
+        self.assertEqual(index["size"], len(data))
+        self.assertEqual(index["sha256"], hashlib.sha256(data).hexdigest())
+        self.assertEqual(set(index["new_chunks"]), set(store))
+        self.assertEqual(existing, set(store))
+
+        target = io.BytesIO()
+        self.assertEqual(reassemble_chunks(index, store.__getitem__, target), len(data))
+        self.assertEqual(target.getvalue(), data)
+
+        # A second backup of the same data stores no new chunk
+        index = store_chunks(io.BytesIO(data), store.__setitem__, existing)
+        self.assertEqual(index["new_chunks"], {})
+
+    def test_reassemble_corrupt_chunk(self):
+        data = generate_dump(2 * 1024 * 1024)
+        store = {}
+        index = store_chunks(io.BytesIO(data), store.__setitem__, set())
+        chunk_hash = index["chunks"][0][0]
+        store[chunk_hash] = compress_chunk(b"corrupt", "none")
+        with self.assertRaises(ValueError):
+            reassemble_chunks(index, store.__getitem__, io.BytesIO())
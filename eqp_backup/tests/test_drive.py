@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import io
+import json
+import os
+
+from odoo.tests.common import TransactionCase, tagged
+
+SESSION_URI = "https://www.googleapis.com/upload/drive/v3/files?upload_id=session"
+CHUNK_SIZE = 256 * 1024
+
+
+@tagged("post_install", "-at_install")
+class TestDriveUpload(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        try:
+            from googleapiclient import http
+        except ImportError:
+            self.skipTest("The google-api-python-client package is not installed.")
+        self.http = http
+        self.server = self.env["backup.server"].new(
+            {"name": "Drive", "backup_type": "drive"}
+        )
+        self.data = os.urandom(2 * CHUNK_SIZE + 1000)
+
+    def _request(self, responses, session_uri=None):
+        """Return a resumable upload request answered by `responses`, and its log."""
+        sent = []
+
+        class RecordingHttp(self.http.HttpMockSequence):
+            def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+                sent.append((method, (headers or {}).get("Content-Range")))
+                return super().request(uri, method, body, headers, **kwargs)
+
+        media = self.http.MediaIoBaseUpload(
+            io.BytesIO(self.data),
+            "application/zip",
+            chunksize=CHUNK_SIZE,
+            resumable=True,
+        )
+        request = self.http.HttpRequest(
+            RecordingHttp(responses),
+            lambda response, content: json.loads(content),
+            "https://www.googleapis.com/upload/drive/v3/files?uploadType=resumable",
+            method="POST",
+            resumable=media,
+        )
+        # Do not wait between the retries
+        request._sleep = lambda seconds: None
+        if session_uri:
+            request.resumable_uri = session_uri
+            request._in_error_state = True
+        return request, sent
+
+    def test_chunk_retries(self):
+        request, sent = self._request(
+            [
+                ({"status": "200", "location": SESSION_URI}, ""),
+                ({"status": "308", "range": "bytes=0-262143"}, ""),
+                # A server error is retried with the same chunk
+                ({"status": "503"}, ""),
+                ({"status": "308", "range": "bytes=0-524287"}, ""),
+                ({"status": "200"}, '{"id": "file_id"}'),
+            ]
+        )
+        sessions = []
+        response = self.server.drive_upload_chunks(request, 3, sessions.append)
+        self.assertEqual(response, {"id": "file_id"})
+        self.assertEqual(sessions, [SESSION_URI])
+        size = len(self.data)
+        self.assertEqual(
+            [content_range for _method, content_range in sent[1:]],
+            [
+                f"bytes 0-262143/{size}",
+                f"bytes 262144-524287/{size}",
+                f"bytes 262144-524287/{size}",
+                f"bytes 524288-{size - 1}/{size}",
+            ],
+        )
+
+    def test_retries_exhausted(self):
+        request, _sent = self._request(
+            [
+                ({"status": "200", "location": SESSION_URI}, ""),
+                ({"status": "503"}, ""),
+                ({"status": "503"}, ""),
+            ]
+        )
+        with self.assertRaises(self.http.HttpError):
+            self.server.drive_upload_chunks(request, 1)
+
+    def test_resume_confirmed_offset(self):
+        # A resumed session first asks Google Drive for the confirmed offset
+        request, sent = self._request(
+            [
+                ({"status": "308", "range": "bytes=0-524287"}, ""),
+                ({"status": "200"}, '{"id": "file_id"}'),
+            ],
+            session_uri=SESSION_URI,
+        )
+        response = self.server.drive_upload_chunks(request, 3)
+        self.assertEqual(response, {"id": "file_id"})
+        size = len(self.data)
+        self.assertEqual(
+            sent,
+            [("PUT", f"bytes */{size}"), ("PUT", f"bytes 524288-{size - 1}/{size}")],
+        )
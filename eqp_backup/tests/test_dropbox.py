@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from odoo.tests.common import TransactionCase, tagged
+
+from .test_pipe import ShortReader
+
+MB = 1024 * 1024
+
+
+class FakeDropbox:
+    """Dropbox client keeping the appended chunks of its upload session in memory."""
+
+    def __init__(self, fail_at_offset=None):
+        self.lock = threading.Lock()
+        self.chunks = {}
+        self.session_type = None
+        self.fail_at_offset = fail_at_offset
+        self.closed = False
+
+    def clone(self, session=None):
+        return self
+
+    def files_upload(self, data, path):
+        self.chunks = {0: data}
+        return SimpleNamespace(path_display=path, size=len(data))
+
+    def files_upload_session_start(self, data, session_type=None):
+        self.session_type = session_type
+        self.chunks = {0: data} if data else {}
+        return SimpleNamespace(session_id="session")
+
+    def files_upload_session_append_v2(self, data, cursor, close=False):
+        # Let the concurrent appends overlap
+        time.sleep(0.01)
+        if cursor.offset == self.fail_at_offset:
+            raise OSError("connection reset")
+        with self.lock:
+            # Dropbox rejects the appends processed after the closing one
+            if self.closed:
+                raise OSError("session closed")
+            self.chunks[cursor.offset] = data
+            self.closed = close
+
+    def files_upload_session_finish(self, data, cursor, commit):
+        content = self.content() + data
+        assert len(content) == cursor.offset + len(data), "missing chunk"
+        return SimpleNamespace(path_display=commit.path, size=len(content))
+
+    def content(self):
+        return b"".join(self.chunks[offset] for offset in sorted(self.chunks))
+
+    def chunk_sizes(self):
+        return [len(self.chunks[offset]) for offset in sorted(self.chunks)]
+
+
+@tagged("post_install", "-at_install")
+class TestDropboxUpload(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        try:
+            import dropbox  # noqa: F401
+        except ImportError:
+            self.skipTest("The dropbox package is not installed.")
+        self.server = self.env["backup.server"].new(
+            {"name": "Dropbox", "backup_type": "dropbox"}
+        )
+
+    def test_single_request(self):
+        dbx = FakeDropbox()
+        data = os.urandom(1000)
+        result = self.server.dropbox_upload(dbx, ShortReader(data, 100), "/b.zip", 0)
+        self.assertEqual(result.size, 1000)
+        self.assertEqual(dbx.content(), data)
+
+    def test_sequential_session(self):
+        dbx = FakeDropbox()
+        data = os.urandom(2 * MB + 100)
+        # Short reads of the source still produce full-size chunks
+        result = self.server.dropbox_upload(dbx, ShortReader(data, 65536), "/b.zip", 1)
+        self.assertEqual(result.size, len(data))
+        self.assertEqual(dbx.content(), data)
+        self.assertEqual(dbx.chunk_sizes(), [MB, MB, 100])
+
+    def test_concurrent_session(self):
+        import dropbox
+
+        dbx = FakeDropbox()
+        data = os.urandom(4 * 4 * MB + 100)
+        result = self.server.dropbox_upload(
+            dbx, ShortReader(data, MB), "/b.zip", 1, workers=3
+        )
+        self.assertEqual(result.size, len(data))
+        self.assertEqual(dbx.content(), data)
+        self.assertEqual(dbx.session_type, dropbox.files.UploadSessionType.concurrent)
+        # Concurrent sessions take chunks multiple of 4 MB, except the last one
+        self.assertEqual(dbx.chunk_sizes(), [4 * MB] * 4 + [100])
+        self.assertTrue(dbx.closed)
+
+    def test_concurrent_failure(self):
+        dbx = FakeDropbox(fail_at_offset=4 * MB)
+        data = os.urandom(4 * 4 * MB)
+        with self.assertRaisesRegex(OSError, "connection reset"):
+            self.server.dropbox_upload(
+                dbx, ShortReader(data, MB), "/b.zip", 4, workers=2
+            )
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import json
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+from odoo.tests.common import BaseCase, TransactionCase, tagged
+
+from ..models.backup_record import _run_timed_pg_dump, dump_db
+
+
+def fake_pg_dump(messages, return_code=0):
+    """Return a command printing `messages` on stderr like a verbose pg_dump."""
+    script = (
+        "import sys, time\n"
+        f"for line in {messages!r}:\n"
+        "    sys.stderr.write(line + '\\n')\n"
+        "    sys.stderr.flush()\n"
+        "    time.sleep(0.02)\n"
+        f"sys.exit({return_code})\n"
+    )
+    return [sys.executable, "-c", script]
+
+
+class TestTimedPgDump(BaseCase):
+    def test_parallel_timings(self):
+        cmd = fake_pg_dump(
+            [
+                'pg_dump: dumping contents of table "public.res_partner"',
+                'pg_dump: dumping contents of table "public.ir_attachment"',
+                "pg_dump: finished item 3401 TABLE DATA res_partner",
+                "pg_dump: finished item 3388 TABLE DATA ir_attachment",
+            ]
+        )
+        timings = _run_timed_pg_dump(cmd, None)
+        self.assertEqual(set(timings), {"res_partner", "ir_attachment"})
+        self.assertGreater(timings["res_partner"], 0)
+
+    def test_sequential_timings(self):
+        # A single job never reports finished items: tables end when the next starts
+        cmd = fake_pg_dump(
+            [
+                'pg_dump: dumping contents of table "public.res_partner"',
+                'pg_dump: dumping contents of table "public.res_users"',
+                'pg_dump: dumping contents of table "public.ir_attachment"',
+            ]
+        )
+        timings = _run_timed_pg_dump(cmd, None, sequential=True)
+        self.assertEqual(set(timings), {"res_partner", "res_users", "ir_attachment"})
+
+    def test_failed_dump(self):
+        cmd = fake_pg_dump(['pg_dump: error: database "missing" does not exist'], 1)
+        with self.assertRaises(subprocess.CalledProcessError) as error:
+            _run_timed_pg_dump(cmd, None)
+        self.assertIn('database "missing" does not exist', error.exception.stderr)
+
+
+@tagged("post_install", "-at_install")
+class TestDirectoryDump(TransactionCase):
+    def test_directory_dump(self):
+        with tempfile.TemporaryFile() as stream:
+            dump_db(
+                self.env.cr.dbname, stream, "zip", dump_format="directory", dump_jobs=2
+            )
+            with zipfile.ZipFile(stream) as zip_file:
+                names = zip_file.namelist()
+                manifest = json.loads(zip_file.read("manifest.json"))
+        self.assertIn("dump/toc.dat", names)
+        self.assertNotIn("dump.sql", names)
+        self.assertEqual(manifest["dump_format"], "directory")
+        self.assertEqual(manifest["dump_jobs"], 2)
+        self.assertIn("res_partner", manifest["dump_table_timings"])
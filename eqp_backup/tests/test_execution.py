@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import os
+import shutil
+import tempfile
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests.common import BaseCase, tagged
+
+from ..tools import metrics
+from ..tools.metrics import ResourceMonitor
+from .common import BackupCase
+
+MB = 1024 * 1024
+
+
+class TestResourceMonitor(BaseCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+
+    def test_one_sample_per_file_system(self):
+        sub_dir = os.path.join(self.temp_dir, "spool")
+        os.mkdir(sub_dir)
+        missing_dir = os.path.join(self.temp_dir, "missing")
+        monitor = ResourceMonitor([self.temp_dir, sub_dir, missing_dir])
+        self.assertEqual(monitor.paths, [self.temp_dir])
+
+    def test_peak_disk(self):
+        usage = shutil.disk_usage(self.temp_dir)
+        free_space = [1000 * MB, 1000 * MB, 400 * MB, 900 * MB, 1000 * MB]
+        with patch.object(
+            metrics.shutil,
+            "disk_usage",
+            side_effect=[usage._replace(free=free) for free in free_space],
+        ):
+            # Free space at start, first sample, two samples and the last one on stop
+            monitor = ResourceMonitor([self.temp_dir], interval=3600).start()
+            monitor.sample()
+            monitor.sample()
+            monitor.stop()
+        self.assertEqual(monitor.peak_disk, 600 * MB)
+        self.assertGreater(monitor.peak_rss, 0)
+
+
+@tagged("post_install", "-at_install")
+class TestBackupExecution(BackupCase):
+    def test_execution_logged(self):
+        def run_backup(record, archive_stats):
+            archive_stats.update(
+                codec="zip_deflate",
+                bytes_in=8 * MB,
+                bytes_out=2 * MB,
+                dump_duration=1.5,
+                archive_duration=0.5,
+                upload_duration=2.0,
+            )
+            return "success", "Local Backup process executed successfully."
+
+        with patch.object(
+            type(self.record), "_run_backup", autospec=True, side_effect=run_backup
+        ):
+            result = self.record._execute_backup()
+
+        self.assertEqual(result[0], "success")
+        execution = self.record.execution_ids
+        self.assertEqual(len(execution), 1)
+        self.assertEqual(execution.result_type, "success")
+        self.assertEqual(execution.server_id, self.server)
+        self.assertEqual(execution.codec, "zip_deflate")
+        self.assertEqual(execution.destination_count, 1)
+        self.assertEqual(execution.size_in, 8)
+        self.assertEqual(execution.size_out, 2)
+        self.assertEqual(execution.compression_ratio, 4)
+        self.assertEqual(execution.dump_duration, 1.5)
+        self.assertEqual(execution.upload_duration, 2)
+        self.assertEqual(execution.prune_duration, 0)
+        self.assertGreater(execution.peak_rss, 0)
+
+    def test_prune_history(self):
+        execution_model = self.env["backup.execution"]
+        now = fields.Datetime.now()
+        old, recent = execution_model.create(
+            [
+                {
+                    "record_id": self.record.id,
+                    "server_id": self.server.id,
+                    "date_start": now - timedelta(days=days),
+                    "result_type": "success",
+                }
+                for days in (100, 10)
+            ]
+        )
+        execution_model._cron_prune()
+        self.assertFalse(old.exists())
+        self.assertTrue(recent.exists())
+
+        # 0 keeps the executions forever
+        self.env["ir.config_parameter"].set_param(
+            "eqp_backup.execution_retention_days", 0
+        )
+        recent.date_start = now - timedelta(days=1000)
+        execution_model._cron_prune()
+        self.assertTrue(recent.exists())
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import hashlib
+import os
+import tempfile
+
+from unittest.mock import patch
+
+from odoo.tests.common import tagged
+from odoo.tools import config
+
+from ..models.backup_record import filestore_snapshot
+from .common import BackupCase
+
+
+@tagged("post_install", "-at_install")
+class TestIncrementalFilestore(BackupCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.filestore = temp_dir.name
+        patcher = patch.object(config, "filestore", lambda db_name: self.filestore)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.record.filestore_mode = "incremental"
+
+    def _add_file(self, relative_path, data):
+        path = os.path.join(self.filestore, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(data)
+
+    def _add_attachment(self, data):
+        sha1 = hashlib.sha1(data).hexdigest()
+        self._add_file(f"{sha1[:2]}/{sha1}", data)
+        return sha1
+
+    def _blob_path(self, blob_hash):
+        return os.path.join(self.backup_dir, "blobs", blob_hash[:2], blob_hash)
+
+    def test_snapshot(self):
+        sha1 = self._add_attachment(b"attachment")
+        self._add_file("checklist/file", b"attachment")
+        self._add_file("checklist/cache.pyc", b"ignored")
+
+        snapshot, sources = filestore_snapshot(self.record.db_name)
+        # Identical contents share the same blob, named by their sha1
+        self.assertEqual(
+            snapshot["files"], {f"{sha1[:2]}/{sha1}": sha1, "checklist/file": sha1}
+        )
+        self.assertEqual(list(sources), [sha1])
+
+    def test_blobs_uploaded_once(self):
+        first = self._add_attachment(b"first attachment")
+        snapshot = self.record._upload_filestore_blobs(None)
+        self.assertEqual(snapshot["files"], {f"{first[:2]}/{first}": first})
+        with open(self._blob_path(first), "rb") as file:
+            self.assertEqual(file.read(), b"first attachment")
+
+        # The next run only uploads the new file: the stored blob is left untouched
+        with open(self._blob_path(first), "wb") as file:
+            file.write(b"stored")
+        second = self._add_attachment(b"second attachment")
+        snapshot = self.record._upload_filestore_blobs(None)
+        self.assertEqual(set(snapshot["files"].values()), {first, second})
+        with open(self._blob_path(first), "rb") as file:
+            self.assertEqual(file.read(), b"stored")
+        self.assertTrue(os.path.isfile(self._blob_path(second)))
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+from odoo.tests.common import BaseCase, TransactionCase, tagged
+
+from ..tools.pipe import ChunkReader, copy_stream, run_pipeline
+from .common import (
+    LARGE_STREAM_SIZE,
+    MAX_RSS_GROWTH,
+    GeneratedReader,
+    NullWriter,
+    run_measuring_rss,
+)
+
+MB = 1024 * 1024
+
+
+class MemoryBoundMixin:
+    def assertMemoryBound(self, function):
+        """Run `function` and check the resident memory stayed bounded meanwhile.
+
+        Returns:
+            object: Result of `function`.
+        """
+        result, growth = run_measuring_rss(function)
+        self.assertLess(
+            growth,
+            MAX_RSS_GROWTH,
+            f"Transferring {LARGE_STREAM_SIZE // MB} MB grew the resident memory by "
+            f"{growth // MB} MB",
+        )
+        return result
+
+
+@tagged("post_install", "-at_install")
+class TestStreamMemory(MemoryBoundMixin, BaseCase):
+    def test_pipeline(self):
+        def produce(writer):
+            copy_stream(GeneratedReader(LARGE_STREAM_SIZE), writer)
+
+        def consume(reader):
+            target = NullWriter()
+            copy_stream(reader, target)
+            return target.bytes_written
+
+        transferred = self.assertMemoryBound(
+            lambda: run_pipeline(produce, consume, 8 * MB)
+        )
+        self.assertEqual(transferred, LARGE_STREAM_SIZE)
+
+    def test_chunk_reader(self):
+        def read_chunks():
+            reader = ChunkReader(GeneratedReader(LARGE_STREAM_SIZE), 16 * MB)
+            size = 0
+            while chunk := reader.read_chunk():
+                size += len(chunk)
+            return size
+
+        self.assertEqual(self.assertMemoryBound(read_chunks), LARGE_STREAM_SIZE)
+
+    def test_copy_stream(self):
+        target = NullWriter()
+        copied = self.assertMemoryBound(
+            lambda: copy_stream(GeneratedReader(LARGE_STREAM_SIZE), target)
+        )
+        self.assertEqual(copied, LARGE_STREAM_SIZE)
+        self.assertEqual(target.bytes_written, LARGE_STREAM_SIZE)
+
+    def test_drive_stream_upload(self):
+        try:
+            from googleapiclient.discovery import build
+        except ImportError:
+            self.skipTest("The google-api-python-client package is not installed.")
+        from ..benchmarks.fake_providers import FakeDriveHttp
+        from ..tools.drive import StreamMediaUpload
+
+        http = FakeDriveHttp()
+        service = build(
+            "drive", "v3", http=http, static_discovery=True, cache_discovery=False
+        )
+
+        def upload():
+            media = StreamMediaUpload(
+                GeneratedReader(LARGE_STREAM_SIZE),
+                "application/octet-stream",
+                chunksize=8 * MB,
+            )
+            request = service.files().create(
+                body={"name": "memory.tar"}, media_body=media
+            )
+            response = None
+            while response is None:
+                _status, response = request.next_chunk()
+            return response
+
+        response = self.assertMemoryBound(upload)
+        self.assertEqual(int(response["size"]), LARGE_STREAM_SIZE)
+
+
+@tagged("post_install", "-at_install")
+class TestDropboxMemory(MemoryBoundMixin, TransactionCase):
+    def setUp(self):
+        super().setUp()
+        try:
+            import dropbox  # noqa: F401
+        except ImportError:
+            self.skipTest("The dropbox package is not installed.")
+        self.server = self.env["backup.server"].new(
+            {"name": "Memory", "backup_type": "dropbox"}
+        )
+
+    def _upload(self, workers, chunk_size=8):
+        from ..benchmarks.fake_providers import provider_client
+
+        with provider_client(self.server) as dbx:
+            adapter = dbx._session.adapters["https://"]
+            metadata = self.assertMemoryBound(
+                lambda: self.server.dropbox_upload(
+                    dbx,
+                    GeneratedReader(LARGE_STREAM_SIZE),
+                    "/memory/Backup.tar",
+                    chunk_size=chunk_size,
+                    workers=workers,
+                )
+            )
+        self.assertEqual(metadata.size, LARGE_STREAM_SIZE)
+        return adapter
+
+    def test_sequential_upload(self):
+        adapter = self._upload(workers=1)
+        # Start, one append per chunk but the first, finish
+        self.assertEqual(adapter.requests, LARGE_STREAM_SIZE // (8 * MB) + 1)
+
+    def test_concurrent_upload(self):
+        # Up to one chunk per worker is held in memory: keep them at the 4 MB minimum
+        adapter = self._upload(workers=4, chunk_size=4)
+        # Start, one append per chunk, finish
+        self.assertEqual(adapter.requests, LARGE_STREAM_SIZE // (4 * MB) + 2)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import hashlib
+import io
+import os
+
+from odoo.tests.common import BaseCase
+
+from ..tools.pipe import (
+    ChunkReader,
+    RingBufferPipe,
+    copy_stream,
+    read_full,
+    readinto_full,
+    run_fanout,
+    run_pipeline,
+)
+from .common import GeneratedReader, NullWriter
+
+
+class ShortReader(io.RawIOBase):
+    """Readable stream returning at most `step` bytes per read, like a socket."""
+
+    def __init__(self, data, step):
+        super().__init__()
+        self.source = io.BytesIO(data)
+        self.step = step
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.source.read(min(len(buffer), self.step))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+class TestPipe(BaseCase):
+    def test_pipeline_transfers_all_data(self):
+        data = os.urandom(3 * 1024 * 1024 + 17)
+
+        def produce(stream):
+            for start in range(0, len(data), 100_000):
+                stream.write(data[start : start + 100_000])
+
+        def consume(stream):
+            digest = hashlib.sha256()
+            while chunk := stream.read(65536):
+                digest.update(chunk)
+            return digest.hexdigest()
+
+        # The ring is much smaller than the data: both sides wait for each other
+        result = run_pipeline(produce, consume, 4096)
+        self.assertEqual(result, hashlib.sha256(data).hexdigest())
+
+    def test_pipeline_producer_error(self):
+        def produce(stream):
+            stream.write(b"partial")
+            raise RuntimeError("dump failed")
+
+        def consume(stream):
+            return stream.read()
+
+        with self.assertRaisesRegex(RuntimeError, "dump failed"):
+            run_pipeline(produce, consume, 1024)
+
+    def test_pipeline_consumer_error(self):
+        def produce(stream):
+            # Never returns if the failed consumer left it blocked on a full ring
+            while True:
+                stream.write(b"x" * 1024)
+
+        def consume(stream):
+            stream.read(10)
+            raise ValueError("upload failed")
+
+        with self.assertRaisesRegex(ValueError, "upload failed"):
+            run_pipeline(produce, consume, 1024)
+
+    def test_pipe_write_after_close_read(self):
+        pipe = RingBufferPipe(16)
+        pipe.close_read()
+        with self.assertRaises(BrokenPipeError):
+            pipe.write(b"data")
+
+    def test_pipe_capacity(self):
+        with self.assertRaises(ValueError):
+            RingBufferPipe(0)
+
+    def test_fanout_feeds_every_consumer(self):
+        data = os.urandom(512 * 1024)
+
+        def produce(stream):
+            stream.write(data)
+
+        def consume(stream):
+            return stream.read()
+
+        outcomes = run_fanout(produce, [consume, consume, consume], 1000)
+        self.assertEqual(outcomes, [(data, None)] * 3)
+
+    def test_fanout_isolates_failed_consumer(self):
+        def produce(stream):
+            for _index in range(100):
+                stream.write(b"y" * 1000)
+
+        def failing(stream):
+            stream.read(10)
+            raise OSError("server unreachable")
+
+        def consume(stream):
+            return len(stream.read())
+
+        outcomes = run_fanout(produce, [failing, consume], 512)
+        self.assertIsNone(outcomes[0][0])
+        self.assertIsInstance(outcomes[0][1], OSError)
+        self.assertEqual(outcomes[1], (100_000, None))
+
+    def test_fanout_every_consumer_failed(self):
+        def produce(stream):
+            while True:
+                stream.write(b"z" * 100)
+
+        def failing(stream):
+            raise OSError("server unreachable")
+
+        outcomes = run_fanout(produce, [failing, failing], 256)
+        self.assertTrue(all(error for _result, error in outcomes))
+
+    def test_fanout_producer_error(self):
+        def produce(stream):
+            raise RuntimeError("dump failed")
+
+        def consume(stream):
+            return stream.read()
+
+        with self.assertRaisesRegex(RuntimeError, "dump failed"):
+            run_fanout(produce, [consume], 256)
+
+    def test_readinto_full_short_reads(self):
+        data = bytes(range(256)) * 10
+        buffer = bytearray(1000)
+        stream = ShortReader(data, 7)
+        self.assertEqual(readinto_full(stream, buffer), 1000)
+        self.assertEqual(bytes(buffer), data[:1000])
+        self.assertEqual(read_full(stream, 5000), data[1000:])
+        self.assertEqual(read_full(stream, 10), b"")
+
+    def test_chunk_reader(self):
+        data = os.urandom(10_000)
+        reader = ChunkReader(ShortReader(data, 333), 4096)
+        chunks = []
+        while chunk := reader.read_chunk():
+            chunks.append(chunk.tobytes())
+        self.assertEqual([len(chunk) for chunk in chunks], [4096, 4096, 1808])
+        self.assertEqual(b"".join(chunks), data)
+
+    def test_copy_stream(self):
+        target = NullWriter()
+        copied = copy_stream(GeneratedReader(5_000_001), target, buffer_size=65536)
+        self.assertEqual(copied, 5_000_001)
+        self.assertEqual(target.bytes_written, 5_000_001)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import shutil
+
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.exceptions import ValidationError
+from odoo.tests.common import tagged
+
+from ..models import backup_record
+from .common import BackupCase
+
+GB = 1024 * 1024 * 1024
+
+
+@tagged("post_install", "-at_install")
+class TestPreflightCheck(BackupCase):
+    def setUp(self):
+        super().setUp()
+        self.record.write(
+            {"type": "db", "backup_format": "plain", "compression": "zip_deflate"}
+        )
+        self.estimate = {"db": 10 * GB, "filestore": 0, "archive": 4 * GB}
+        patcher = patch.object(
+            type(self.record), "_estimate_backup_size", return_value=self.estimate
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _patch_free_space(self, free):
+        usage = shutil.disk_usage(self.backup_dir)._replace(free=free)
+        return patch.object(backup_record.shutil, "disk_usage", return_value=usage)
+
+    def test_spool_too_small(self):
+        # pg_dump writes the whole directory dump before it is archived
+        self.record.backup_format = "directory"
+        with self._patch_free_space(5 * GB):
+            with self.assertRaisesRegex(ValidationError, "spool directory"):
+                self.record._preflight_check()
+
+    def test_server_too_small(self):
+        # Streamed to the Local server: nothing is spooled
+        with self._patch_free_space(4 * GB):
+            with self.assertRaisesRegex(ValidationError, "server Test Server"):
+                self.record._preflight_check()
+        with self._patch_free_space(5 * GB):
+            self.record._preflight_check()
+
+    def test_refused_before_dump(self):
+        with self._patch_free_space(GB), patch.object(
+            backup_record, "_create_archive"
+        ) as create_archive:
+            result_type, result_msg = self.record._run_backup({})
+        self.assertEqual(result_type, "danger")
+        self.assertIn("Preflight Check Failed", result_msg)
+        create_archive.assert_not_called()
+
+
+@tagged("post_install", "-at_install")
+class TestEstimateBackupSize(BackupCase):
+    def test_last_compression_ratio(self):
+        self.record.write({"type": "db", "compression": "zip_deflate"})
+        self.env.cr.execute("SELECT pg_database_size(%s)", [self.record.db_name])
+        db_size = self.env.cr.fetchone()[0]
+        self.assertEqual(self.record._estimate_backup_size()["archive"], db_size)
+
+        self.env["backup.execution"].create(
+            {
+                "record_id": self.record.id,
+                "server_id": self.server.id,
+                "date_start": fields.Datetime.now(),
+                "result_type": "success",
+                "compression_ratio": 4,
+            }
+        )
+        estimate = self.record._estimate_backup_size()
+        self.assertEqual(
+            estimate, {"db": db_size, "filestore": 0, "archive": db_size // 4}
+        )
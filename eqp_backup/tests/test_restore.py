@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import io
+import json
+import os
+import tarfile
+import tempfile
+import zipfile
+
+from odoo.tests.common import BaseCase
+
+from ..tools.restore import BackupExtractor
+
+MANIFEST = {"db_name": "test", "version": "17.0"}
+SNAPSHOT = {"files": {"ab/abcdef": 3}}
+
+
+def build_members(dump=None):
+    """Return the members of a backup archive, in the order of the backup records."""
+    members = list(dump or [("dump.sql", b"CREATE TABLE test();\n")])
+    members += [
+        ("manifest.json", json.dumps(MANIFEST).encode()),
+        ("filestore.json", json.dumps(SNAPSHOT).encode()),
+        ("filestore/ab/abcdef", b"abc"),
+        ("filestore/cd/cdef01", b"x" * 5000),
+    ]
+    return members
+
+
+def build_tar(members):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+class TestBackupExtractor(BaseCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        self.dump_dir = os.path.join(self.temp_dir, "dump")
+        self.filestore_dir = os.path.join(self.temp_dir, "filestore")
+        os.makedirs(self.dump_dir)
+        self.events = []
+
+    def _extractor(self, workers=1):
+        def on_dump(kind, path):
+            # The filestore is not extracted yet when the dump is handed over
+            self.events.append((kind, path, os.path.exists(self.filestore_dir)))
+
+        return BackupExtractor(
+            self.dump_dir, self.filestore_dir, on_dump=on_dump, workers=workers
+        )
+
+    def _read(self, path):
+        with open(path, "rb") as file:
+            return file.read()
+
+    def _assert_extracted(self, extractor, kind="sql", dump=b"CREATE TABLE test();\n"):
+        self.assertEqual(extractor.dump_kind, kind)
+        self.assertEqual(self._read(extractor.dump_path), dump)
+        self.assertEqual(self.events, [(kind, extractor.dump_path, False)])
+        self.assertEqual(extractor.manifest, MANIFEST)
+        self.assertEqual(extractor.snapshot, SNAPSHOT)
+        self.assertEqual((extractor.files, extractor.filestore_bytes), (2, 5003))
+        self.assertEqual(
+            self._read(os.path.join(self.filestore_dir, "ab", "abcdef")), b"abc"
+        )
+
+    def test_extract_tar(self):
+        stream = io.BytesIO(build_tar(build_members()))
+        extractor = self._extractor().extract_stream(stream, "tar")
+        self._assert_extracted(extractor)
+
+    def test_extract_tar_zst(self):
+        try:
+            import zstandard
+        except ImportError:
+            self.skipTest("The zstandard package is not installed.")
+        data = zstandard.ZstdCompressor().compress(build_tar(build_members()))
+        extractor = self._extractor().extract_stream(io.BytesIO(data), "tar.zst")
+        self._assert_extracted(extractor)
+
+    def test_extract_zip(self):
+        path = os.path.join(self.temp_dir, "backup.zip")
+        with zipfile.ZipFile(path, "w") as archive:
+            for name, data in build_members():
+                archive.writestr(name, data)
+        extractor = self._extractor(workers=2).extract_zip(path)
+        self._assert_extracted(extractor)
+
+    def test_custom_dump_parts(self):
+        parts = [
+            ("dump.dump.000000", b"PGDMP"),
+            ("dump.dump.000001", b"-part2"),
+            ("dump.dump.000002", b"-part3"),
+        ]
+        stream = io.BytesIO(build_tar(build_members(parts)))
+        extractor = self._extractor().extract_stream(stream, "tar")
+        self._assert_extracted(extractor, "custom", b"PGDMP-part2-part3")
+
+    def test_custom_dump_parts_zip(self):
+        path = os.path.join(self.temp_dir, "backup.zip")
+        # The parts are sorted back into order
+        parts = [("dump.dump.000001", b"-part2"), ("dump.dump.000000", b"PGDMP")]
+        with zipfile.ZipFile(path, "w") as archive:
+            for name, data in build_members(parts):
+                archive.writestr(name, data)
+        extractor = self._extractor().extract_zip(path)
+        self._assert_extracted(extractor, "custom", b"PGDMP-part2")
+
+    def test_native_dump(self):
+        stream = io.BytesIO(b"PGDMP-native")
+        extractor = self._extractor().extract_stream(stream, "dump")
+        self.assertEqual(extractor.dump_kind, "custom")
+        self.assertEqual(self._read(extractor.dump_path), b"PGDMP-native")
+        self.assertEqual(len(self.events), 1)
+
+    def test_several_dumps(self):
+        dump = [("dump.sql", b"SELECT 1;"), ("dump.dump.000000", b"PGDMP")]
+        stream = io.BytesIO(build_tar(build_members(dump)))
+        with self.assertRaises(ValueError):
+            self._extractor().extract_stream(stream, "tar")
+
+    def test_unsafe_member(self):
+        members = build_members() + [("filestore/../../escaped", b"evil")]
+        stream = io.BytesIO(build_tar(members))
+        with self.assertRaises(ValueError):
+            self._extractor().extract_stream(stream, "tar")
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "escaped")))
+
+    def test_zip_from_stream(self):
+        with self.assertRaises(ValueError):
+            self._extractor().extract_stream(io.BytesIO(), "zip")
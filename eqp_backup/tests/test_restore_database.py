@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import os
+import zipfile
+
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.exceptions import ValidationError
+from odoo.service import db
+from odoo.tests.common import tagged
+from odoo.tools import config
+
+from .common import BackupCase
+
+
+@tagged("post_install", "-at_install")
+class TestRestoreDatabase(BackupCase):
+    def setUp(self):
+        super().setUp()
+        self.db_name = f"{self.env.cr.dbname}_restore_test"
+        self.addCleanup(self._drop_restored_database)
+        # Hardened servers disable the database manager
+        patcher = patch.dict(config.options, {"list_db": False})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _drop_restored_database(self):
+        if db.exp_db_exist(self.db_name):
+            with patch.dict(config.options, {"list_db": True}):
+                db.exp_drop(self.db_name)
+
+    def _create_artifact(self):
+        file_name = f"Backup_{self.record.db_name}_2024-01-01_00.00.00.zip"
+        path = os.path.join(self.backup_dir, file_name)
+        # A sound archive, but without database dump
+        with zipfile.ZipFile(path, "w") as zip_file:
+            zip_file.writestr("manifest.json", "{}")
+        return self.env["backup.artifact"].create(
+            {
+                "name": file_name,
+                "record_id": self.record.id,
+                "server_id": self.server.id,
+                "db_name": self.record.db_name,
+                "type": "full",
+                "date": fields.Datetime.now(),
+                "path": path,
+            }
+        )
+
+    def test_failed_restore_dropped(self):
+        artifact = self._create_artifact()
+        with self.assertRaisesRegex(ValidationError, "holds no database dump"):
+            artifact._restore(self.db_name)
+        self.assertFalse(db.exp_db_exist(self.db_name))
+
+    def test_dead_restore_job_cleaned_up(self):
+        artifact = self._create_artifact()
+        job = self.env["backup.job"].create(
+            {
+                "record_id": self.record.id,
+                "kind": "restore",
+                "artifact_id": artifact.id,
+                "restore_db_name": self.db_name,
+            }
+        )
+        db._create_empty_database(self.db_name)
+        job._clean_up()
+        self.assertFalse(db.exp_db_exist(self.db_name))
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.service import db
+from odoo.tests.common import tagged
+from odoo.tools import config
+
+from ..models.backup_artifact import drop_database
+from ..models.backup_record import DRILL_DB_PREFIX
+from .common import BackupCase
+
+
+@tagged("post_install", "-at_install")
+class TestRestoreDrill(BackupCase):
+    def _create_artifact(self, name, server, days_ago=0, **values):
+        return self.env["backup.artifact"].create(
+            dict(
+                {
+                    "name": name,
+                    "record_id": self.record.id,
+                    "server_id": server.id,
+                    "db_name": self.record.db_name,
+                    "type": "full",
+                    "date": fields.Datetime.now() - timedelta(days=days_ago),
+                },
+                **values,
+            )
+        )
+
+    def test_drill_queries(self):
+        self.record.drill_queries = (
+            "-- Users\nSELECT count(*) FROM res_users\n\n  SELECT 1  \n"
+        )
+        self.assertEqual(
+            self.record._get_drill_queries(),
+            ["SELECT count(*) FROM res_users", "SELECT 1"],
+        )
+
+    def test_sanity_queries(self):
+        self.record.drill_queries = "\n".join(
+            [
+                "SELECT count(*) FROM res_users",
+                "SELECT count(*) FROM res_users WHERE id < 0",
+                "SELECT count(*) FROM eqp_backup_missing_table",
+            ]
+        )
+        failures = self.record._run_sanity_queries(self.env.cr.dbname)
+        self.assertEqual(len(failures), 2)
+        self.assertTrue(failures[0].startswith("SELECT count(*) FROM res_users WHERE"))
+        self.assertIn("returned (0,)", failures[0])
+        self.assertTrue(
+            failures[1].startswith("SELECT count(*) FROM eqp_backup_missing")
+        )
+
+    def test_drill_artifact(self):
+        other_server = self.server.copy({"name": "Other Server"})
+        name = f"Backup_{self.record.db_name}_2024-01-0{{}}_00.00.00.zip"
+        self._create_artifact(name.format(1), self.server, days_ago=2)
+        # Filestore backups and corrupt uploads hold no database to restore
+        self._create_artifact(name.format(4), self.server, type="fs")
+        self._create_artifact(name.format(3), self.server, integrity_state="mismatch")
+        latest_other = self._create_artifact(name.format(2), other_server, days_ago=1)
+        self.assertEqual(self.record._get_drill_artifact(), latest_other)
+        # The copy of the record server is preferred
+        latest_main = self._create_artifact(name.format(2), self.server, days_ago=1)
+        self.assertEqual(self.record._get_drill_artifact(), latest_main)
+
+    def test_rto_baseline(self):
+        self.assertEqual(self.record._get_rto_baseline(), 0)
+        for duration, result_type in [
+            (10, "success"),
+            (30, "warning"),
+            (20, "success"),
+            (99, "danger"),
+        ]:
+            self.env["backup.execution"].create(
+                {
+                    "kind": "restore_drill",
+                    "record_id": self.record.id,
+                    "server_id": self.server.id,
+                    "date_start": fields.Datetime.now(),
+                    "result_type": result_type,
+                    "duration": duration,
+                }
+            )
+        # Failed drills are ignored
+        self.assertEqual(self.record._get_rto_baseline(), 20)
+
+    def test_no_backup_to_restore(self):
+        result_type, result_msg = self.record._execute_restore_drill()
+        self.assertEqual(result_type, "danger")
+        self.assertIn("No stored backup", result_msg)
+        execution = self.record.execution_ids
+        self.assertEqual(execution.kind, "restore_drill")
+        self.assertEqual(execution.result_type, "danger")
+        self.assertEqual(execution.destination_count, 0)
+
+    def test_drop_drill_databases(self):
+        db_name = f"{DRILL_DB_PREFIX}{self.record.id}_20240101000000"
+        db._create_empty_database(db_name)
+        self.addCleanup(drop_database, db_name)
+        # Without the database manager, as on hardened servers
+        with patch.dict(config.options, {"list_db": False}):
+            self.record._drop_drill_databases()
+        self.assertFalse(db.exp_db_exist(db_name))
+        self.assertFalse(drop_database(db_name))
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+from datetime import datetime, timedelta
+
+from odoo.tests.common import BaseCase
+
+from ..tools.retention import parse_backup_name, select_backups_to_keep
+
+
+def make_backups(dates):
+    return [
+        {"name": f"Backup_db_{date:%Y-%m-%d_%H.%M.%S}.zip", "date": date}
+        for date in dates
+    ]
+
+
+class TestRetention(BaseCase):
+    def test_parse_backup_name(self):
+        self.assertEqual(
+            parse_backup_name("Backup_my_db_2024-03-01_02.30.00.tar.zst"),
+            ("my_db", datetime(2024, 3, 1, 2, 30), "tar.zst"),
+        )
+        for extension in ("zip", "tar", "dump"):
+            file_name = f"Backup_db_2024-03-01_02.30.00.{extension}"
+            self.assertEqual(parse_backup_name(file_name)[2], extension)
+        self.assertEqual(
+            parse_backup_name("Backup_db_2024-03-01_02.30.00.idx")[2], "idx"
+        )
+        for file_name in (
+            "Backup_db_2024-03-01_02.30.00.txt",
+            "Backup_db_2024-13-01_02.30.00.zip",
+            "backup.zip",
+            "Backup_db_2024-03-01_02.30.00.zip.part",
+        ):
+            self.assertIsNone(parse_backup_name(file_name), file_name)
+
+    def test_keep_last(self):
+        start = datetime(2024, 1, 1)
+        backups = make_backups(start + timedelta(hours=hour) for hour in range(10))
+        to_keep, to_delete = select_backups_to_keep(backups, keep_last=3)
+        self.assertEqual([backup["date"].hour for backup in to_keep], [9, 8, 7])
+        self.assertEqual(len(to_delete), 7)
+        # Both lists are sorted newest first
+        self.assertEqual(to_delete[0]["date"].hour, 6)
+
+    def test_keep_nothing(self):
+        backups = make_backups([datetime(2024, 1, 1), datetime(2024, 1, 2)])
+        to_keep, to_delete = select_backups_to_keep(backups)
+        self.assertEqual(to_keep, [])
+        self.assertEqual(len(to_delete), 2)
+
+    def test_grandfather_father_son(self):
+        # Four backups a day over 60 days
+        start = datetime(2024, 1, 1)
+        backups = make_backups(
+            start + timedelta(hours=6 * index) for index in range(4 * 60)
+        )
+        to_keep, to_delete = select_backups_to_keep(
+            backups, keep_last=2, daily=7, weekly=4, monthly=3
+        )
+        kept = {backup["date"] for backup in to_keep}
+        self.assertEqual(len(kept) + len(to_delete), len(backups))
+        # The latest backup of each of the last 7 days
+        last_day = datetime(2024, 2, 29, 18)
+        for days in range(7):
+            self.assertIn(last_day - timedelta(days=days), kept)
+        # The latest backup of January, the oldest month
+        self.assertIn(datetime(2024, 1, 31, 18), kept)
+        self.assertNotIn(datetime(2024, 1, 30, 18), kept)
+        # Rules overlap: 2 last + 7 days (1 shared) + 4 weeks + 3 months, at most
+        self.assertLessEqual(len(kept), 2 + 7 + 4 + 3)
+        self.assertGreaterEqual(len(kept), 9)
+
+    def test_hourly(self):
+        start = datetime(2024, 1, 1)
+        backups = make_backups(
+            start + timedelta(minutes=20 * index) for index in range(12)
+        )
+        to_keep, _to_delete = select_backups_to_keep(backups, hourly=2)
+        self.assertEqual(
+            [backup["date"] for backup in to_keep],
+            [datetime(2024, 1, 1, 3, 40), datetime(2024, 1, 1, 2, 40)],
+        )
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import os
+from types import SimpleNamespace
+
+from odoo.exceptions import ValidationError
+from odoo.tests.common import tagged
+
+from .common import BackupCase
+
+
+class FakeDriveBatch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append(request_id)
+
+    def execute(self):
+        self.service.batches.append(self.requests)
+        for request_id in self.requests:
+            error = "not found" if request_id in self.service.missing else None
+            self.callback(request_id, None, error and Exception(error))
+
+
+class FakeDriveService:
+    """Google Drive service recording the delete batch requests."""
+
+    def __init__(self, missing=()):
+        self.batches = []
+        self.missing = set(missing)
+
+    def new_batch_http_request(self, callback):
+        return FakeDriveBatch(self, callback)
+
+    def files(self):
+        return SimpleNamespace(delete=lambda fileId: fileId)
+
+
+@tagged("post_install", "-at_install")
+class TestServerRetention(BackupCase):
+    def _create_file(self, file_name):
+        path = os.path.join(self.backup_dir, file_name)
+        with open(path, "wb") as file:
+            file.write(b"backup")
+        return path
+
+    def test_list_and_delete_local_backups(self):
+        db_name = self.record.db_name
+        names = [f"Backup_{db_name}_2024-01-0{day}_00.00.00.zip" for day in (1, 2, 3)]
+        for file_name in names + [
+            f"Backup_other_{db_name}_2024-01-01_00.00.00.zip",
+            f"Backup_{db_name}_2024-01-01_00.00.00.zip.part",
+            "notes.txt",
+        ]:
+            self._create_file(file_name)
+
+        backups = self.server.list_backups(None, db_name)
+        self.assertEqual(sorted(backup["name"] for backup in backups), names)
+        self.assertEqual({backup["size"] for backup in backups}, {6})
+
+        to_delete = [backup for backup in backups if backup["name"] != names[2]]
+        # Backups already gone are ignored
+        os.remove(to_delete[0]["path"])
+        self.server.delete_backups(None, to_delete)
+        remaining = self.server.list_backups(None, db_name)
+        self.assertEqual([backup["name"] for backup in remaining], [names[2]])
+        self.assertTrue(os.path.exists(os.path.join(self.backup_dir, "notes.txt")))
+
+    def test_drive_batches(self):
+        self.server.backup_type = "drive"
+        service = FakeDriveService(missing={"Backup_db_7"})
+        backups = [{"name": f"Backup_db_{index}", "id": index} for index in range(250)]
+        with self.assertRaisesRegex(ValidationError, "Backup_db_7: not found"):
+            self.server.delete_backups(service, backups)
+        # Batch requests of at most 100 deletions
+        self.assertEqual([len(batch) for batch in service.batches], [100, 100, 50])
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import io
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase, tagged
+
+from .test_pipe import ShortReader
+
+REQUEST_SIZE = 32 * 1024
+
+
+class FakeRemoteFile:
+    """Remote file of `FakeSftp`, recording the size of every write request."""
+
+    def __init__(self, sftp, path, mode):
+        self.sftp = sftp
+        self.path = path
+        self.position = 0
+        self.pipelined = False
+        if "w" in mode:
+            sftp.files[path] = bytearray()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def set_pipelined(self, pipelined=True):
+        self.pipelined = pipelined
+
+    def seek(self, offset):
+        self.position = offset
+
+    def write(self, data):
+        data = bytes(data)
+        with self.sftp.lock:
+            content = self.sftp.files[self.path]
+            if len(content) < self.position:
+                content.extend(bytes(self.position - len(content)))
+            content[self.position : self.position + len(data)] = data
+            self.sftp.writes.append((self.pipelined, self.MAX_REQUEST_SIZE, len(data)))
+        self.position += len(data)
+
+
+class FakeSftp:
+    """In-memory SFTP client. Its extra channels share the same files."""
+
+    def __init__(self, shared=None):
+        self.lock = shared.lock if shared else threading.Lock()
+        self.files = shared.files if shared else {}
+        self.writes = shared.writes if shared else []
+        self.channels = shared.channels if shared else []
+
+    def open(self, path, mode="r", bufsize=-1):
+        return FakeRemoteFile(self, path, mode)
+
+    def stat(self, path):
+        return SimpleNamespace(st_size=len(self.files[path]))
+
+    def putfo(self, f_content, path):
+        self.files[path] = bytearray(f_content.read())
+        return self.stat(path)
+
+    def get_channel(self):
+        return SimpleNamespace(get_transport=lambda: None)
+
+    def open_channel(self):
+        channel = FakeSftp(self)
+        self.channels.append(channel)
+        return channel
+
+    def close(self):
+        pass
+
+
+@tagged("post_install", "-at_install")
+class TestSftpUpload(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.sftp = FakeSftp()
+        self.data = os.urandom(1024 * 1024 + 5)
+
+    def _server(self, transfer_mode, streams=4, free_sessions=10):
+        server = self.env["backup.server"].new(
+            {
+                "name": "SFTP",
+                "backup_type": "sftp",
+                "sftp_transfer_mode": transfer_mode,
+                "sftp_request_size": REQUEST_SIZE // 1024,
+                "sftp_parallel_streams": streams,
+            }
+        )
+
+        @contextmanager
+        def sftp_session(server, timeout=None):
+            # The pool only lends the sessions left under the server cap
+            if len(self.sftp.channels) >= free_sessions:
+                raise TimeoutError()
+            yield self.sftp.open_channel()
+
+        patcher = patch.object(type(server), "sftp_session", sftp_session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return server
+
+    def test_standard_upload(self):
+        server = self._server("standard")
+        attributes = server.sftp_upload(self.sftp, io.BytesIO(self.data), "/b.zip")
+        self.assertEqual(attributes.st_size, len(self.data))
+        self.assertEqual(self.sftp.files["/b.zip"], self.data)
+
+    def test_pipelined_upload(self):
+        server = self._server("pipelined")
+        stream = ShortReader(self.data, 100_000)
+        attributes = server.sftp_upload(self.sftp, stream, "/b.zip")
+        self.assertEqual(attributes.st_size, len(self.data))
+        self.assertEqual(self.sftp.files["/b.zip"], self.data)
+        for pipelined, request_size, size in self.sftp.writes:
+            self.assertTrue(pipelined)
+            self.assertEqual(request_size, REQUEST_SIZE)
+            self.assertLessEqual(size, REQUEST_SIZE * 8)
+
+    def test_parallel_upload(self):
+        server = self._server("parallel")
+        with tempfile.TemporaryFile() as backup:
+            backup.write(self.data)
+            backup.seek(0)
+            attributes = server.sftp_upload(self.sftp, backup, "/b.zip")
+        self.assertEqual(attributes.st_size, len(self.data))
+        self.assertEqual(self.sftp.files["/b.zip"], self.data)
+        # One range per channel: the caller's one and 3 borrowed from the pool
+        self.assertEqual(len(self.sftp.channels), 3)
+
+    def test_parallel_upload_free_sessions(self):
+        # Only the sessions free right now are used, the upload never waits for more
+        server = self._server("parallel", free_sessions=1)
+        with tempfile.TemporaryFile() as backup:
+            backup.write(self.data)
+            backup.seek(0)
+            server.sftp_upload(self.sftp, backup, "/b.zip")
+        self.assertEqual(self.sftp.files["/b.zip"], self.data)
+        self.assertEqual(len(self.sftp.channels), 1)
+
+    def test_parallel_streamed_backup(self):
+        # A stream cannot be read by offset: it falls back to pipelined writes
+        server = self._server("parallel")
+        server.sftp_upload(self.sftp, io.BytesIO(self.data), "/b.zip")
+        self.assertEqual(self.sftp.files["/b.zip"], self.data)
+        self.assertEqual(self.sftp.channels, [])
+
+    def test_size_mismatch(self):
+        server = self._server("pipelined")
+        self.sftp.stat = lambda path: SimpleNamespace(st_size=0)
+        with self.assertRaises(IOError):
+            server.sftp_upload(self.sftp, io.BytesIO(self.data), "/b.zip")
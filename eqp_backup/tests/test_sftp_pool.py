@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import threading
+import time
+
+from odoo.tests.common import BaseCase
+
+from ..tools.sftp_pool import SftpTransportPool
+
+KEY = ("sftp.example.com", 22, "odoo")
+
+
+class FakeTransport:
+    def __init__(self):
+        self.active = True
+        self.closed = False
+
+    def is_active(self):
+        return self.active and not self.closed
+
+    def is_authenticated(self):
+        return True
+
+    def send_ignore(self):
+        if not self.is_active():
+            raise EOFError()
+
+    def close(self):
+        self.closed = True
+
+
+class FakeChannel:
+    def __init__(self, transport):
+        self.transport = transport
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestSftpPool(BaseCase):
+    def setUp(self):
+        super().setUp()
+        self.pool = SftpTransportPool()
+        self.addCleanup(self.pool.close_all)
+        self.transports = []
+
+    def connect(self):
+        transport = FakeTransport()
+        self.transports.append(transport)
+        return transport
+
+    def borrow(self, max_channels=2, timeout=5, key=KEY):
+        return self.pool.borrow(key, self.connect, FakeChannel, max_channels, timeout)
+
+    def test_transport_reused(self):
+        with self.borrow() as first:
+            pass
+        with self.borrow() as second:
+            pass
+        self.assertEqual(len(self.transports), 1)
+        self.assertIs(first.transport, second.transport)
+        # Channels are closed when returned, the transport is kept
+        self.assertTrue(first.closed)
+        self.assertFalse(self.transports[0].closed)
+        with self.borrow(key=("other.example.com", 22, "odoo")):
+            pass
+        self.assertEqual(len(self.transports), 2)
+
+    def test_channel_cap(self):
+        with self.borrow(max_channels=1):
+            with self.assertRaises(TimeoutError):
+                with self.borrow(max_channels=1, timeout=0.05):
+                    pass
+
+    def test_channel_cap_waits(self):
+        borrowed = threading.Event()
+
+        def hold():
+            with self.borrow(max_channels=1):
+                borrowed.set()
+                time.sleep(0.2)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        borrowed.wait()
+        started = time.monotonic()
+        with self.borrow(max_channels=1):
+            self.assertGreater(time.monotonic() - started, 0.1)
+        thread.join()
+        self.assertEqual(len(self.transports), 1)
+
+    def test_stale_transport_replaced(self):
+        with self.borrow():
+            pass
+        self.transports[0].active = False
+        with self.borrow() as channel:
+            self.assertIs(channel.transport, self.transports[1])
+        self.assertTrue(self.transports[0].closed)
+
+    def test_idle_transport_closed(self):
+        self.pool.idle_timeout = 0
+        with self.borrow():
+            pass
+        time.sleep(0.01)
+        self.pool.evict_idle()
+        self.assertTrue(self.transports[0].closed)
+
+    def test_invalidate_borrowed_transport(self):
+        with self.borrow():
+            self.pool.invalidate(lambda key: key == KEY)
+            # The borrower can finish with it
+            self.assertFalse(self.transports[0].closed)
+        self.assertTrue(self.transports[0].closed)
+        with self.borrow():
+            pass
+        self.assertEqual(len(self.transports), 2)
+
+    def test_broken_transport_retired(self):
+        with self.assertRaises(OSError):
+            with self.borrow():
+                self.transports[0].active = False
+                raise OSError("connection lost")
+        self.assertTrue(self.transports[0].closed)
+        with self.borrow():
+            pass
+        self.assertEqual(len(self.transports), 2)
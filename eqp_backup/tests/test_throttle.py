@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import io
+import time
+
+from odoo.tests.common import BaseCase
+
+from ..tools.throttle import (
+    ThrottledReader,
+    TokenBucket,
+    limits_at,
+    throttle_command,
+    tighten_limits,
+    window_contains,
+)
+
+BASE_LIMITS = {
+    "upload_bandwidth": 0,
+    "compression_threads": 8,
+    "cpu_nice": 0,
+    "io_priority": "normal",
+}
+
+
+class TestThrottle(BaseCase):
+    def test_window_contains(self):
+        self.assertTrue(window_contains(8, 18, 8))
+        self.assertFalse(window_contains(8, 18, 18))
+        # Windows may span midnight
+        self.assertTrue(window_contains(22, 6, 23.5))
+        self.assertTrue(window_contains(22, 6, 2))
+        self.assertFalse(window_contains(22, 6, 12))
+
+    def test_tighten_limits(self):
+        merged = tighten_limits(
+            BASE_LIMITS,
+            {"upload_bandwidth": 5, "compression_threads": 0, "io_priority": "idle"},
+        )
+        # 0 means unlimited: the set value wins
+        self.assertEqual(merged["upload_bandwidth"], 5)
+        self.assertEqual(merged["compression_threads"], 8)
+        self.assertEqual(merged["io_priority"], "idle")
+        merged = tighten_limits(
+            merged, {"upload_bandwidth": 10, "cpu_nice": 10, "io_priority": "low"}
+        )
+        self.assertEqual(merged["upload_bandwidth"], 5)
+        self.assertEqual(merged["cpu_nice"], 10)
+        self.assertEqual(merged["io_priority"], "idle")
+
+    def test_limits_at(self):
+        windows = [
+            (8, 18, {"upload_bandwidth": 2, "cpu_nice": 5}),
+            (12, 14, {"upload_bandwidth": 1, "compression_threads": 2}),
+        ]
+        self.assertEqual(limits_at(BASE_LIMITS, windows, 7.5), BASE_LIMITS)
+        limits = limits_at(BASE_LIMITS, windows, 9)
+        self.assertEqual((limits["upload_bandwidth"], limits["cpu_nice"]), (2, 5))
+        # Overlapping windows: the most restrictive value of each limit applies
+        limits = limits_at(BASE_LIMITS, windows, 13)
+        self.assertEqual(limits["upload_bandwidth"], 1)
+        self.assertEqual(limits["compression_threads"], 2)
+        self.assertEqual(limits["cpu_nice"], 5)
+
+    def test_throttle_command(self):
+        self.assertEqual(throttle_command(["pg_dump", "db"]), ["pg_dump", "db"])
+        command = throttle_command(["pg_dump"], cpu_nice=10, io_priority="idle")
+        self.assertEqual(command[-1], "pg_dump")
+
+    def test_token_bucket_rate(self):
+        bucket = TokenBucket(1024 * 1024, burst_seconds=0.1)
+        started = time.monotonic()
+        # The first burst is free, the rest is sent at 1 MB/s
+        bucket.consume(300 * 1024)
+        elapsed = time.monotonic() - started
+        self.assertGreater(elapsed, 0.15)
+        self.assertLess(elapsed, 2)
+
+    def test_token_bucket_unlimited(self):
+        bucket = TokenBucket(0)
+        started = time.monotonic()
+        bucket.consume(1024**3)
+        self.assertLess(time.monotonic() - started, 0.1)
+
+    def test_token_bucket_rate_schedule(self):
+        rates = iter([0, 512 * 1024])
+        bucket = TokenBucket(lambda: next(rates), burst_seconds=0.1)
+        bucket.consume(1024**3)
+        self.assertEqual(bucket._rate, 0)
+
+    def test_throttled_reader(self):
+        consumed = []
+
+        class Bucket:
+            def consume(self, size):
+                consumed.append(size)
+
+        reader = ThrottledReader(io.BytesIO(b"x" * 1000), Bucket())
+        self.assertEqual(len(reader.read(600)), 600)
+        self.assertEqual(len(reader.read()), 400)
+        self.assertEqual(sum(consumed), 1000)
+        # The file descriptor of the wrapped stream is hidden
+        with self.assertRaises((AttributeError, OSError)):
+            reader.fileno()
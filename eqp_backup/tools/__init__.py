@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+
+from . import archive
+from . import checksum
+from . import client_cache
+from . import dedup
+from . import metrics
+from . import pipe
+from . import restore
+from . import retention
+from . import sftp_pool
+from . import throttle
@@ -0,0 +1,524 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import io
+import os
+import time
+import shutil
+import zlib
+import tarfile
+import zipfile
+
+from .pipe import ChunkReader
+
+# Size of the blocks copied from the sources into the archive members
+COPY_BUFFER_SIZE = 1024 * 1024
+# Same exclusions applied by `odoo.tools.osutil.zip_dir`
+IGNORED_EXTENSIONS = (".pyc", ".pyo", ".swp", ".DS_Store")
+# Streams of unknown size are added to TAR archives in parts of this size, each one
+# read in memory
+SPOOL_MAX_MEMORY = 64 * 1024 * 1024
+
+# Archive codecs: file extension of the archives they produce
+ARCHIVE_EXTENSIONS = {
+    "zip_store": "zip",
+    "zip_deflate": "zip",
+    "tar_zstd": "tar.zst",
+    "native": "tar",
+}
+# Extension of the Native database-only backups: the pg_dump custom format output
+NATIVE_DUMP_EXTENSION = "dump"
+# Deflate level of the members known to be plain text (e.g. the SQL dump)
+TEXT_COMPRESS_LEVEL = 9
+# Bytes read from the start of a file to decide whether it is worth compressing
+SNIFF_SIZE = 64 * 1024
+# Smaller files are always compressed: a trial would cost as much as compressing them
+MIN_TRIAL_SIZE = 4 * 1024
+# Files whose sample does not shrink below this ratio are stored uncompressed
+INCOMPRESSIBLE_RATIO = 0.9
+# Signatures of formats which are already compressed (images, office documents, archives)
+COMPRESSED_SIGNATURES = (
+    b"\xff\xd8\xff",  # JPEG
+    b"\x89PNG\r\n\x1a\n",  # PNG
+    b"GIF87a",
+    b"GIF89a",
+    b"PK\x03\x04",  # ZIP, XLSX, DOCX, ODT...
+    b"\x1f\x8b",  # gzip (e.g. directory-format pg_dump tables)
+    b"BZh",
+    b"\xfd7zXZ\x00",
+    b"\x28\xb5\x2f\xfd",  # zstd
+    b"7z\xbc\xaf\x27\x1c",
+    b"Rar!\x1a\x07",
+    b"ID3",  # MP3
+    b"OggS",
+    b"\x1a\x45\xdf\xa3",  # Matroska, WebM
+)
+
+
+def is_incompressible(head):
+    """Tell whether compressing a file starting with `head` would be a waste of CPU.
+
+    Known compressed formats are recognized by their signature; for the others, the
+    sample is compressed at the fastest level to estimate the achievable ratio.
+
+    Args:
+        head (bytes): First bytes of the file (up to `SNIFF_SIZE`).
+
+    Returns:
+        bool: True if the file should be stored without compression.
+    """
+    if head.startswith(COMPRESSED_SIGNATURES):
+        return True
+    # RIFF containers (WEBP, AVI) and ISO media (MP4, MOV, HEIC)
+    if head[:4] == b"RIFF" and head[8:12] in (b"WEBP", b"AVI "):
+        return True
+    if head[4:8] == b"ftyp":
+        return True
+    if len(head) < MIN_TRIAL_SIZE:
+        return False
+    return len(zlib.compress(head, 1)) > len(head) * INCOMPRESSIBLE_RATIO
+
+
+# MIME type of the archives, by file extension
+ARCHIVE_MIMETYPES = {
+    "zip": "application/zip",
+    "tar.zst": "application/zstd",
+    "tar": "application/x-tar",
+    NATIVE_DUMP_EXTENSION: "application/octet-stream",
+}
+# Default compression level of each codec
+DEFAULT_LEVELS = {
+    "zip_store": None,
+    "zip_deflate": 6,
+    "tar_zstd": 3,
+    "native": None,
+}
+
+
+class CountingWriter:
+    """Write-only wrapper counting the bytes written to the underlying stream.
+
+    It is not seekable, so archive writers always use streaming-friendly layouts.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.bytes_written = 0
+
+    def write(self, data):
+        written = self.stream.write(data)
+        written = len(data) if written is None else written
+        self.bytes_written += written
+        return written
+
+    def tell(self):
+        return self.bytes_written
+
+    def flush(self):
+        self.stream.flush()
+
+    def seekable(self):
+        return False
+
+
+def open_archive_writer(stream, codec="zip_deflate", level=None, threads=0):
+    """Return the archive writer of a codec.
+
+    Args:
+        stream (io.RawIOBase): Writable file-like object receiving the archive.
+        codec (str): One of `ARCHIVE_EXTENSIONS` keys.
+        level (int): Compression level (None or 0 for the codec default).
+        threads (int): Compression threads for zstd (0 for one per CPU core).
+
+    Returns:
+        StreamingZipWriter | StreamingTarWriter: The archive writer.
+    """
+    level = level or DEFAULT_LEVELS.get(codec)
+    if codec == "native":
+        return StreamingTarWriter(stream, level=level)
+    if codec == "tar_zstd":
+        return StreamingTarZstdWriter(stream, level=level, threads=threads)
+    if codec == "zip_store":
+        return StreamingZipWriter(stream, compression=zipfile.ZIP_STORED)
+    return StreamingZipWriter(
+        stream,
+        compresslevel=level,
+        text_compresslevel=max(level, TEXT_COMPRESS_LEVEL),
+    )
+
+
+class StreamingZipWriter:
+    """Write a ZIP archive member by member straight into a file-like object.
+
+    Sources are read in place and copied block by block into their archive member, so
+    nothing is staged on disk before being compressed. The output stream does not
+    need to be seekable (ZIP data descriptors are used in that case).
+
+    When compressing, files which are already compressed (pictures, PDF, office
+    documents...) are detected from their first bytes and stored as is, while members
+    flagged as text are compressed at `text_compresslevel`.
+    """
+
+    codec = "zip"
+
+    def __init__(
+        self,
+        stream,
+        compression=zipfile.ZIP_DEFLATED,
+        compresslevel=None,
+        text_compresslevel=None,
+    ):
+        """
+        Args:
+            stream (io.RawIOBase): Writable file-like object receiving the archive.
+            compression (int): Default `zipfile` compression method for the members.
+            compresslevel (int): Default compression level for the members.
+            text_compresslevel (int): Compression level of the text members.
+        """
+        self.stream = stream
+        self.output = CountingWriter(stream)
+        self.zip_file = zipfile.ZipFile(
+            self.output,
+            "w",
+            compression=compression,
+            compresslevel=compresslevel,
+            allowZip64=True,
+        )
+        self.text_compresslevel = text_compresslevel or compresslevel
+        self.members = 0
+        self.stored_members = 0
+        self.bytes_in = 0
+
+    @property
+    def bytes_out(self):
+        """Size of the archive written so far."""
+        return self.output.bytes_written
+
+    def describe(self):
+        """Return the compression settings, as recorded in the backup manifest."""
+        compression = self.zip_file.compression
+        if compression == zipfile.ZIP_STORED:
+            return {"codec": "zip_store", "level": None, "threads": 1}
+        return {
+            "codec": "zip_deflate",
+            "level": self.zip_file.compresslevel,
+            "text_level": self.text_compresslevel,
+            "threads": 1,
+            "store_incompressible": True,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Write the central directory. The underlying stream is left open."""
+        self.zip_file.close()
+
+    def add_file(self, path, arcname):
+        """Add a file from the disk, reading it in place.
+
+        Args:
+            path (str): Path of the source file.
+            arcname (str): Name of the member inside the archive.
+        """
+        zip_info = self._member_info(arcname, path)
+        with open(path, "rb") as source:
+            head = b""
+            if zip_info.compress_type != zipfile.ZIP_STORED:
+                head = source.read(SNIFF_SIZE)
+                if is_incompressible(head):
+                    zip_info.compress_type = zipfile.ZIP_STORED
+                    self.stored_members += 1
+            self._copy_member(source, zip_info, head=head)
+
+    def add_tree(self, root, prefix):
+        """Add every regular file found below `root`, keeping the relative layout.
+
+        Args:
+            root (str): Directory to walk.
+            prefix (str): Archive folder receiving the files (e.g. "filestore").
+        """
+        root = os.path.normpath(root)
+        for dir_path, dir_names, file_names in os.walk(root):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                base_name, ext = os.path.splitext(file_name)
+                if (ext or base_name) in IGNORED_EXTENSIONS:
+                    continue
+                path = os.path.join(dir_path, file_name)
+                if not os.path.isfile(path):
+                    continue
+                relative_path = os.path.relpath(path, root).replace(os.sep, "/")
+                self.add_file(path, f"{prefix}/{relative_path}")
+
+    def add_stream(self, source, arcname, text=False):
+        """Add a member whose content is read from a file-like object until EOF.
+
+        The final size is unknown beforehand (e.g. a `pg_dump` pipe), so the member is
+        always written with ZIP64 extensions.
+
+        Args:
+            source (io.RawIOBase): Readable file-like object.
+            arcname (str): Name of the member inside the archive.
+            text (bool): The content is plain text (e.g. an SQL dump).
+        """
+        zip_info = self._member_info(arcname, text=text)
+        self._copy_member(source, zip_info, force_zip64=True)
+
+    def add_bytes(self, data, arcname):
+        """Add a text member from an in-memory value (e.g. the manifest).
+
+        Args:
+            data (bytes | str): Content of the member.
+            arcname (str): Name of the member inside the archive.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        zip_info = self._member_info(arcname, text=True)
+        self.zip_file.writestr(zip_info, data)
+        self.members += 1
+        self.bytes_in += len(data)
+
+    def _member_info(self, arcname, path=None, text=False):
+        if path:
+            zip_info = zipfile.ZipInfo.from_file(path, arcname)
+        else:
+            zip_info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+            zip_info.external_attr = 0o644 << 16
+        zip_info.compress_type = self.zip_file.compression
+        zip_info._compresslevel = (
+            self.text_compresslevel if text else self.zip_file.compresslevel
+        )
+        return zip_info
+
+    def _copy_member(self, source, zip_info, force_zip64=False, head=b""):
+        with self.zip_file.open(zip_info, "w", force_zip64=force_zip64) as member:
+            if head:
+                member.write(head)
+            shutil.copyfileobj(source, member, COPY_BUFFER_SIZE)
+        self.members += 1
+        self.bytes_in += zip_info.file_size
+
+
+class _ViewReader:
+    """Readable file-like object returning slices of a memory view (no copy)."""
+
+    def __init__(self, view):
+        self.view = view
+        self.offset = 0
+
+    def read(self, size=-1):
+        end = len(self.view) if size < 0 else self.offset + size
+        data = self.view[self.offset : end]
+        self.offset += len(data)
+        return data
+
+
+class StreamingTarWriter:
+    """Write an uncompressed TAR archive straight into a file-like object.
+
+    Used by the Native format, whose members are compressed by their producer (the
+    pg_dump custom format) or usually already compressed (the filestore). It exposes
+    the same interface as `StreamingZipWriter`.
+
+    TAR headers hold the member size: streams of unknown size are split into parts of
+    at most `SPOOL_MAX_MEMORY` bytes, read in memory one at a time, named
+    `<arcname>.000000`, `<arcname>.000001`... Concatenating the parts in name order
+    restores the stream (e.g. `cat dump.dump.* > dump.dump`).
+    """
+
+    codec = "tar"
+
+    def __init__(self, stream, level=None, part_size=SPOOL_MAX_MEMORY):
+        """
+        Args:
+            stream (io.RawIOBase): Writable file-like object receiving the archive.
+            level (int): Compression level applied by the producer of the database
+                dump (the archive itself is not compressed).
+            part_size (int): Maximum size of the parts of the streamed members.
+        """
+        self.stream = stream
+        self.level = level
+        self.part_size = part_size
+        self.output = CountingWriter(stream)
+        self.tar_file = self._open_tar(self.output)
+        self.members = 0
+        self.stored_members = 0
+        self.bytes_in = 0
+
+    @staticmethod
+    def _open_tar(fileobj):
+        return tarfile.open(
+            fileobj=fileobj,
+            mode="w|",
+            format=tarfile.PAX_FORMAT,
+            bufsize=COPY_BUFFER_SIZE,
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def bytes_out(self):
+        """Size of the archive written so far."""
+        return self.output.bytes_written
+
+    def describe(self):
+        """Return the compression settings, as recorded in the backup manifest."""
+        return {"codec": "native", "level": self.level, "threads": 1}
+
+    def close(self):
+        """Finish the TAR archive. The underlying stream is left open."""
+        self.tar_file.close()
+
+    def add_file(self, path, arcname):
+        """Add a file from the disk, reading it in place.
+
+        Args:
+            path (str): Path of the source file.
+            arcname (str): Name of the member inside the archive.
+        """
+        tar_info = self.tar_file.gettarinfo(path, arcname)
+        tar_info.uid = tar_info.gid = 0
+        tar_info.uname = tar_info.gname = ""
+        with open(path, "rb") as source:
+            self._add_member(tar_info, source)
+
+    def add_tree(self, root, prefix):
+        """Add every regular file found below `root`, keeping the relative layout.
+
+        Args:
+            root (str): Directory to walk.
+            prefix (str): Archive folder receiving the files (e.g. "filestore").
+        """
+        root = os.path.normpath(root)
+        for dir_path, dir_names, file_names in os.walk(root):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                base_name, ext = os.path.splitext(file_name)
+                if (ext or base_name) in IGNORED_EXTENSIONS:
+                    continue
+                path = os.path.join(dir_path, file_name)
+                if not os.path.isfile(path):
+                    continue
+                relative_path = os.path.relpath(path, root).replace(os.sep, "/")
+                self.add_file(path, f"{prefix}/{relative_path}")
+
+    def add_stream(self, source, arcname, text=False):
+        """Add the content of a file-like object, read until EOF, as numbered parts.
+
+        Args:
+            source (io.RawIOBase): Readable file-like object.
+            arcname (str): Name of the member inside the archive, suffixed by the part
+                number.
+            text (bool): Unused, the archive is not compressed.
+        """
+        reader = ChunkReader(source, self.part_size)
+        part = 0
+        while True:
+            chunk = reader.read_chunk()
+            # An empty stream still gets its first (empty) part
+            if not chunk and part:
+                return
+            tar_info = self._member_info(f"{arcname}.{part:06d}", len(chunk))
+            self._add_member(tar_info, _ViewReader(chunk))
+            part += 1
+
+    def add_bytes(self, data, arcname):
+        """Add a member from an in-memory value (e.g. the manifest).
+
+        Args:
+            data (bytes | str): Content of the member.
+            arcname (str): Name of the member inside the archive.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        tar_info = self._member_info(arcname, len(data))
+        self._add_member(tar_info, io.BytesIO(data))
+
+    def _member_info(self, arcname, size):
+        tar_info = tarfile.TarInfo(arcname)
+        tar_info.size = size
+        tar_info.mtime = int(time.time())
+        tar_info.mode = 0o644
+        return tar_info
+
+    def _add_member(self, tar_info, source):
+        self.tar_file.addfile(tar_info, source)
+        self.members += 1
+        self.bytes_in += tar_info.size
+
+
+class StreamingTarZstdWriter(StreamingTarWriter):
+    """Write a zstd compressed TAR archive straight into a file-like object.
+
+    Unlike ZIP members, the whole archive is compressed as a single zstd frame, split
+    across several compression threads. Requires the `zstandard` package. Streams are
+    added as numbered parts, like with `StreamingTarWriter`, so nothing is spooled.
+    """
+
+    codec = "tar.zst"
+
+    def __init__(self, stream, level=3, threads=0, part_size=SPOOL_MAX_MEMORY):
+        """
+        Args:
+            stream (io.RawIOBase): Writable file-like object receiving the archive.
+            level (int): zstd compression level (1-22).
+            threads (int): Compression threads (0 for one per CPU core).
+            part_size (int): Maximum size of the parts of the streamed members.
+        """
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(
+                "The zstd compression requires the zstandard package.\n"
+                "Please install it by running: `sudo pip3 install zstandard`"
+            )
+        self.stream = stream
+        self.level = level
+        self.part_size = part_size
+        self.threads = threads or os.cpu_count() or 1
+        self.output = CountingWriter(stream)
+        compressor = zstandard.ZstdCompressor(
+            level=level, threads=self.threads if self.threads > 1 else 0
+        )
+        self.zstd_writer = compressor.stream_writer(self.output, closefd=False)
+        self.tar_file = self._open_tar(self.zstd_writer)
+        self.members = 0
+        self.stored_members = 0
+        self.bytes_in = 0
+
+    def describe(self):
+        """Return the compression settings, as recorded in the backup manifest."""
+        return {"codec": "tar_zstd", "level": self.level, "threads": self.threads}
+
+    def close(self):
+        """Finish the TAR archive and the zstd frame. The underlying stream is left open."""
+        self.tar_file.close()
+        self.zstd_writer.close()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import hashlib
+import zipfile
+
+# Block size of the Dropbox content hash
+DROPBOX_HASH_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+class DropboxContentHasher:
+    """hashlib-like computation of the Dropbox `content_hash` of a file.
+
+    The content hash is the SHA-256 of the concatenated SHA-256 digests of each 4 MB
+    block of the file, see https://www.dropbox.com/developers/reference/content-hash.
+    """
+
+    name = "dropbox"
+
+    def __init__(self):
+        self._overall = hashlib.sha256()
+        self._block = hashlib.sha256()
+        self._block_size = 0
+
+    def update(self, data):
+        view = memoryview(data).cast("B")
+        while view:
+            take = min(len(view), DROPBOX_HASH_BLOCK_SIZE - self._block_size)
+            self._block.update(view[:take])
+            self._block_size += take
+            view = view[take:]
+            if self._block_size == DROPBOX_HASH_BLOCK_SIZE:
+                self._overall.update(self._block.digest())
+                self._block = hashlib.sha256()
+                self._block_size = 0
+
+    def hexdigest(self):
+        overall = self._overall.copy()
+        if self._block_size:
+            overall.update(self._block.digest())
+        return overall.hexdigest()
+
+
+def new_hasher(algorithm):
+    """Return a hasher of a `hashlib` algorithm, or of the "dropbox" content hash."""
+    if algorithm == DropboxContentHasher.name:
+        return DropboxContentHasher()
+    return hashlib.new(algorithm)
+
+
+class HashingWriter:
+    """Write-only file object hashing the data written to the wrapped stream.
+
+    The backup is hashed while it is generated, so that its checksums cost no second
+    read. The writer is not seekable: an archive writer seeking back to patch a header
+    would make the checksums wrong, so it writes a streamed archive instead.
+    """
+
+    def __init__(self, raw, algorithms=("sha256",)):
+        """
+        Args:
+            raw (io.RawIOBase): Stream receiving the data.
+            algorithms (iterable): `new_hasher` algorithms to compute.
+        """
+        self.raw = raw
+        self.hashers = {algorithm: new_hasher(algorithm) for algorithm in algorithms}
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def write(self, data):
+        written = self.raw.write(data)
+        view = memoryview(data).cast("B")
+        if written is not None:
+            view = view[:written]
+        for hasher in self.hashers.values():
+            hasher.update(view)
+        self.size += len(view)
+        return len(view)
+
+    def flush(self):
+        if hasattr(self.raw, "flush"):
+            self.raw.flush()
+
+    def hexdigests(self):
+        """Return the hexadecimal digest of each algorithm."""
+        return {
+            algorithm: hasher.hexdigest() for algorithm, hasher in self.hashers.items()
+        }
+
+
+def find_corrupt_zip_member(path):
+    """Check the CRC-32 of every member of a ZIP archive, reading it once.
+
+    Returns:
+        str: Name of the first corrupt member (or the reason the archive cannot be
+        read), None if the archive is sound.
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return archive.testzip()
+    except zipfile.BadZipFile as e:
+        return str(e)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import threading
+import time
+
+# Seconds a provider client is reused before being rebuilt
+CLIENT_TTL = 3600
+
+
+class ClientCache:
+    """Thread-safe cache of provider clients with a time to live.
+
+    Building an API client may download a discovery document, parse credentials or
+    fetch an access token; the cached client keeps its token and refreshes it by itself
+    when it expires, so it can be reused by every run until the TTL elapses.
+    """
+
+    def __init__(self, ttl=CLIENT_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, factory):
+        """Return the cached client of `key`, building it with `factory` if needed.
+
+        Args:
+            key (tuple): Cache key; its first items identify the owner (see `invalidate`).
+            factory (callable): Builds a new client; errors are not cached.
+
+        Returns:
+            object: The client.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < self.ttl:
+                return entry[1]
+        client = factory()
+        with self._lock:
+            self._entries[key] = (now, client)
+            self._evict_expired(now)
+        return client
+
+    def invalidate(self, predicate):
+        """Forget the clients whose key matches `predicate`."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def _evict_expired(self, now):
+        for key in [
+            key for key, entry in self._entries.items() if now - entry[0] >= self.ttl
+        ]:
+            del self._entries[key]
+
+
+# Shared by every backup server of the worker process
+provider_clients = ClientCache()
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""Deduplicating chunk store of the backup archives.
+
+The archive stream is cut into content-defined chunks: a cut only depends on the
+bytes around it, so an insertion or a deletion in the archive only changes the
+chunks around it and the following cuts fall back on the same places. Each chunk is
+named by the SHA-256 of its content and stored once, compressed on its own; a
+backup is then a small index listing the chunks to concatenate.
+
+The cuts are looked for after line feeds, which are found at C speed, instead of at
+every byte with a pure Python rolling hash. A line feed ends a chunk when the CRC-32
+of the bytes before it is below a threshold proportional to the length of its line,
+so the average chunk size does not depend on how long the lines are (SQL dumps) or
+how often a line feed shows up (compressed files, about every 256 bytes).
+"""
+
+import hashlib
+import zlib
+
+from .pipe import read_full
+
+# Extension of the index of a deduplicated backup
+DEDUP_INDEX_EXTENSION = "idx"
+# Format of the archive cut into chunks: an uncompressed ZIP, which keeps the
+# unchanged data of two backups identical (compression is done per chunk)
+DEDUP_ARCHIVE_CODEC = "zip_store"
+DEDUP_INDEX_VERSION = "1"
+# Chunk sizes: cuts are only looked for after CHUNK_MIN_SIZE bytes and forced at
+# CHUNK_MAX_SIZE bytes, they happen every CHUNK_AVG_SIZE bytes on average
+CHUNK_MIN_SIZE = 256 * 1024
+CHUNK_AVG_SIZE = 1024 * 1024
+CHUNK_MAX_SIZE = 8 * 1024 * 1024
+# Bytes before a line feed deciding whether it ends a chunk
+CHUNK_WINDOW = 64
+# First byte of a stored chunk: compression of the rest of it. Chunks are shared by
+# backups made with different settings, each one tells how it was compressed
+CHUNK_CODECS = {"none": b"N", "zlib": b"Z", "zstd": b"S"}
+DEFAULT_CHUNK_LEVELS = {"none": None, "zlib": 6, "zstd": 3}
+
+
+def find_chunk_boundary(
+    buffer, min_size=CHUNK_MIN_SIZE, avg_size=CHUNK_AVG_SIZE, max_size=CHUNK_MAX_SIZE
+):
+    """Return the size of the chunk starting at the beginning of `buffer`.
+
+    Args:
+        buffer (bytes | bytearray): Data to cut, holding at least `max_size` bytes
+            unless it is the end of the stream.
+
+    Returns:
+        int: Length of the first chunk (the whole buffer if no cut is found in it).
+    """
+    size = len(buffer)
+    limit = min(size, max_size)
+    if size <= min_size:
+        return size
+    view = memoryview(buffer)
+    line_start = buffer.rfind(b"\n", 0, min_size) + 1
+    position = min_size
+    while True:
+        line_feed = buffer.find(b"\n", position, limit)
+        if line_feed < 0:
+            return limit
+        end = line_feed + 1
+        threshold = ((end - line_start) << 32) // (avg_size - min_size)
+        if zlib.crc32(view[max(end - CHUNK_WINDOW, 0) : end]) < threshold:
+            return end
+        line_start = position = end
+
+
+def iter_chunks(
+    stream, min_size=CHUNK_MIN_SIZE, avg_size=CHUNK_AVG_SIZE, max_size=CHUNK_MAX_SIZE
+):
+    """Cut a stream into content-defined chunks.
+
+    Args:
+        stream (io.RawIOBase): Readable file-like object.
+
+    Yields:
+        bytes: The successive chunks of the stream.
+    """
+    buffer = bytearray()
+    eof = False
+    while True:
+        while not eof and len(buffer) < max_size:
+            data = read_full(stream, max_size)
+            eof = len(data) < max_size
+            buffer += data
+        if not buffer:
+            return
+        cut = find_chunk_boundary(buffer, min_size, avg_size, max_size)
+        yield bytes(buffer[:cut])
+        del buffer[:cut]
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "The zstd compression requires the zstandard package.\n"
+            "Please install it by running: `sudo pip3 install zstandard`"
+        )
+    return zstandard
+
+
+def compress_chunk(data, codec="zlib", level=None):
+    """Return a chunk as stored: its codec tag followed by its compressed content."""
+    level = level or DEFAULT_CHUNK_LEVELS[codec]
+    if codec == "zlib":
+        data = zlib.compress(data, level)
+    elif codec == "zstd":
+        data = _zstandard().ZstdCompressor(level=level).compress(data)
+    return CHUNK_CODECS[codec] + data
+
+
+def decompress_chunk(data):
+    """Return the content of a stored chunk, whatever its compression."""
+    tag, payload = data[:1], data[1:]
+    if tag == CHUNK_CODECS["zlib"]:
+        return zlib.decompress(payload)
+    if tag == CHUNK_CODECS["zstd"]:
+        return _zstandard().ZstdDecompressor().decompress(payload)
+    if tag == CHUNK_CODECS["none"]:
+        return bytes(payload)
+    raise ValueError(f"Unknown chunk compression {tag!r}")
+
+
+def store_chunks(stream, put_chunk, existing, codec="zlib", level=None):
+    """Cut a stream into chunks and store the ones missing from the chunk store.
+
+    Args:
+        stream (io.RawIOBase): Readable file-like object with the archive.
+        put_chunk (callable): Stores a chunk, called with its hash and its stored
+            (tagged and compressed) content.
+        existing (set): Hashes of the chunks already stored, updated with the new ones.
+        codec (str): Compression of the new chunks ("none", "zlib" or "zstd").
+        level (int): Compression level (None for the codec default).
+
+    Returns:
+        dict: Snapshot index: archive "size" and "sha256", and the "chunks" to
+        concatenate as [hash, size] pairs. Its "new_chunks" entry maps the hash of the
+        chunks stored by this call to their stored size.
+    """
+    archive_hash = hashlib.sha256()
+    chunks = []
+    new_chunks = {}
+    size = 0
+    for chunk in iter_chunks(stream):
+        archive_hash.update(chunk)
+        chunk_hash = hashlib.sha256(chunk).hexdigest()
+        if chunk_hash not in existing:
+            stored = compress_chunk(chunk, codec, level)
+            put_chunk(chunk_hash, stored)
+            existing.add(chunk_hash)
+            new_chunks[chunk_hash] = len(stored)
+        chunks.append([chunk_hash, len(chunk)])
+        size += len(chunk)
+    return {
+        "odoo_dedup_index": DEDUP_INDEX_VERSION,
+        "format": "zip",
+        "size": size,
+        "sha256": archive_hash.hexdigest(),
+        "chunks": chunks,
+        "new_chunks": new_chunks,
+    }
+
+
+def reassemble_chunks(index, get_chunk, target):
+    """Write the archive of a snapshot index by concatenating its chunks.
+
+    Every chunk is checked against its hash, and the whole archive against the
+    SHA-256 of the index.
+
+    Args:
+        index (dict): Snapshot index returned by `store_chunks`.
+        get_chunk (callable): Returns the stored content of a chunk from its hash.
+        target (io.RawIOBase): Writable file-like object receiving the archive.
+
+    Returns:
+        int: Size of the archive.
+
+    Raises:
+        ValueError: If a chunk or the archive does not match its hash.
+    """
+    archive_hash = hashlib.sha256()
+    size = 0
+    for chunk_hash, chunk_size in index["chunks"]:
+        chunk = decompress_chunk(get_chunk(chunk_hash))
+        if len(chunk) != chunk_size or hashlib.sha256(chunk).hexdigest() != chunk_hash:
+            raise ValueError(f"The chunk {chunk_hash} is corrupt.")
+        target.write(chunk)
+        archive_hash.update(chunk)
+        size += chunk_size
+    if archive_hash.hexdigest() != index["sha256"]:
+        raise ValueError("The reassembled archive does not match its SHA-256.")
+    return size
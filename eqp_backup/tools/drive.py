@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+
+# This module requires `google-api-python-client`: import it lazily, only when the
+# Google Drive backup type is used.
+from googleapiclient.http import DEFAULT_CHUNK_SIZE, MediaUpload
+
+from .pipe import readinto_full
+
+
+class StreamMediaUpload(MediaUpload):
+    """Resumable Google Drive media reading a non-seekable stream of unknown size.
+
+    `MediaIoBaseUpload` seeks to the end of its file object to compute the upload size,
+    which is impossible on a pipe. This media keeps only the current chunk in memory, in
+    a buffer allocated once, which is enough to replay it when the chunk upload is
+    retried.
+    """
+
+    def __init__(self, fd, mimetype, chunksize=DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            fd (io.RawIOBase): Readable stream with the content to upload.
+            mimetype (str): Mime type of the content.
+            chunksize (int): Size of the uploaded chunks (multiple of 256 KB).
+        """
+        super().__init__()
+        self._fd = fd
+        self._mimetype = mimetype
+        self._chunksize = chunksize
+        # Preallocated chunk buffer, reused by every chunk of the upload
+        self._buffer = bytearray(chunksize)
+        self._view = memoryview(self._buffer)
+        self._buffer_offset = 0
+        self._buffered = 0
+
+    def chunksize(self):
+        return self._chunksize
+
+    def mimetype(self):
+        return self._mimetype
+
+    def size(self):
+        # Unknown size: the upload is finished by the first short chunk
+        return None
+
+    def resumable(self):
+        return True
+
+    def has_stream(self):
+        return False
+
+    def getbytes(self, begin, length):
+        """Return `length` bytes starting at `begin` (or fewer once EOF is reached).
+
+        The returned view on the chunk buffer is only valid until the next call.
+        """
+        skip = begin - self._buffer_offset
+        if skip < 0 or skip > self._buffered or length > len(self._buffer):
+            raise ValueError(
+                f"Cannot read {length} bytes at position {begin} from a stream "
+                f"buffered at {self._buffer_offset}-"
+                f"{self._buffer_offset + self._buffered}."
+            )
+        # Drop the bytes already confirmed by Google Drive, keeping the rest in front
+        if skip:
+            kept = self._buffered - skip
+            self._view[:kept] = self._view[skip : self._buffered].tobytes()
+            self._buffered = kept
+            self._buffer_offset = begin
+        if self._buffered < length:
+            self._buffered += readinto_full(
+                self._fd, self._view[self._buffered : length]
+            )
+        return self._view[: min(length, self._buffered)]
+
+
+def resume_upload_request(request, session_uri):
+    """Make an upload request continue the resumable session `session_uri`.
+
+    The first `next_chunk` call then asks Google Drive for the offset it confirmed,
+    instead of starting a new session or sending the first chunk again.
+
+    google-api-python-client offers no public way to do it: this relies on the private
+    `HttpRequest._in_error_state` flag, whose handling by `next_chunk` is unchanged
+    from version 1.7 up to 2.201 at least. Check it when upgrading the library.
+
+    Args:
+        request (googleapiclient.http.HttpRequest): Resumable upload request.
+        session_uri (str): URI of the resumable session left unfinished.
+    """
+    request.resumable_uri = session_uri
+    request._in_error_state = True
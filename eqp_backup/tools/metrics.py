@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import os
+import shutil
+import logging
+import resource
+import threading
+
+_logger = logging.getLogger(__name__)
+
+# Seconds between two samples of the resource usage
+SAMPLE_INTERVAL = 0.5
+
+
+def current_rss():
+    """Return the resident memory of the current process in bytes."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Without procfs, fall back to the peak of the process lifetime (KB on Linux)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ResourceMonitor:
+    """Sample the memory and temporary disk usage of a backup from a thread.
+
+    The temporary disk usage is measured as the drop of the free space of the
+    monitored folders since the monitor started: anonymous temporary files cannot
+    be listed, and it also accounts for the spooled archives.
+    """
+
+    def __init__(self, paths, interval=SAMPLE_INTERVAL):
+        """
+        Args:
+            paths (list): Folders holding the temporary files (one sample per file
+                system).
+            interval (float): Seconds between two samples.
+        """
+        self.interval = interval
+        self.paths = []
+        devices = set()
+        for path in paths:
+            try:
+                device = os.stat(path).st_dev
+            except OSError:
+                continue
+            if device not in devices:
+                devices.add(device)
+                self.paths.append(path)
+        self.peak_rss = 0
+        self.peak_disk = 0
+        self._free_at_start = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _free_space(self, path):
+        try:
+            return shutil.disk_usage(path).free
+        except OSError:
+            return None
+
+    def sample(self):
+        """Take one sample of the memory and disk usage."""
+        self.peak_rss = max(self.peak_rss, current_rss())
+        used = 0
+        for path, free_at_start in self._free_at_start.items():
+            free = self._free_space(path)
+            if free is not None and free_at_start is not None:
+                used += max(free_at_start - free, 0)
+        self.peak_disk = max(self.peak_disk, used)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                _logger.debug("Resource sampling failed: %s", e)
+
+    def start(self):
+        """Record the initial free space and start sampling in a thread."""
+        self._free_at_start = {path: self._free_space(path) for path in self.paths}
+        self.sample()
+        self._thread = threading.Thread(
+            target=self._run, name="eqp_backup_monitor", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the sampling thread, after a last sample."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.sample()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import io
+import logging
+import threading
+
+_logger = logging.getLogger(__name__)
+
+
+class RingBufferPipe:
+    """Bounded in-memory byte pipe between one producer and one consumer thread.
+
+    The producer blocks while the ring is full and the consumer blocks while it is
+    empty, so memory use never exceeds `capacity` whatever the size of the transferred
+    data. A failure on either side is propagated to the other one.
+    """
+
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity (int): Size of the ring buffer in bytes.
+        """
+        if capacity <= 0:
+            raise ValueError("The pipe capacity must be greater than 0.")
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._capacity = capacity
+        self._start = 0
+        self._size = 0
+        self._write_closed = False
+        self._read_closed = False
+        self._error = None
+        self._condition = threading.Condition()
+        self.bytes_transferred = 0
+
+    def write(self, data):
+        """Copy `data` into the ring, blocking until the consumer makes room.
+
+        Raises:
+            BrokenPipeError: If the consumer side was closed or aborted.
+        """
+        view = memoryview(data).cast("B")
+        written = 0
+        with self._condition:
+            while written < len(view):
+                while self._size == self._capacity and not self._read_closed:
+                    self._condition.wait()
+                if self._read_closed:
+                    raise BrokenPipeError("The pipe consumer is closed.")
+                end = (self._start + self._size) % self._capacity
+                count = min(
+                    len(view) - written,
+                    self._capacity - self._size,
+                    self._capacity - end,
+                )
+                self._view[end : end + count] = view[written : written + count]
+                self._size += count
+                written += count
+                self._condition.notify_all()
+        return written
+
+    def readinto(self, target):
+        """Move up to `len(target)` bytes into `target`, blocking while the ring is empty.
+
+        Returns:
+            int: Number of bytes read, 0 once the producer closed the pipe.
+
+        Raises:
+            Exception: The error the producer aborted the pipe with.
+        """
+        view = memoryview(target).cast("B")
+        with self._condition:
+            while not self._size and not self._write_closed and not self._error:
+                self._condition.wait()
+            if self._error:
+                raise self._error
+            if not self._size:
+                return 0
+            count = min(len(view), self._size, self._capacity - self._start)
+            view[:count] = self._view[self._start : self._start + count]
+            self._start = (self._start + count) % self._capacity
+            self._size -= count
+            self.bytes_transferred += count
+            self._condition.notify_all()
+        return count
+
+    def close_write(self):
+        """Signal the end of the data to the consumer."""
+        with self._condition:
+            self._write_closed = True
+            self._condition.notify_all()
+
+    def close_read(self):
+        """Stop consuming; any further write raises `BrokenPipeError`."""
+        with self._condition:
+            self._read_closed = True
+            self._condition.notify_all()
+
+    def abort(self, error):
+        """Fail the pipe: the consumer will get `error` on its next read."""
+        with self._condition:
+            self._error = error
+            self._read_closed = True
+            self._condition.notify_all()
+
+
+class PipeWriter(io.RawIOBase):
+    """Write-only, non-seekable file object feeding a `RingBufferPipe`."""
+
+    def __init__(self, pipe):
+        super().__init__()
+        self.pipe = pipe
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.pipe.write(data)
+
+    def close(self):
+        if not self.closed:
+            self.pipe.close_write()
+        super().close()
+
+
+class PipeReader(io.RawIOBase):
+    """Read-only, non-seekable file object draining a `RingBufferPipe`."""
+
+    def __init__(self, pipe):
+        super().__init__()
+        self.pipe = pipe
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        return self.pipe.readinto(target)
+
+    def close(self):
+        if not self.closed:
+            self.pipe.close_read()
+        super().close()
+
+
+def run_pipeline(produce, consume, capacity):
+    """Run `produce` and `consume` concurrently, connected by a bounded pipe.
+
+    The producer runs in a background thread and receives a writable stream; the
+    consumer runs in the calling thread (so it can keep using the ORM) and receives a
+    readable stream with the produced bytes.
+
+    Args:
+        produce (callable): Called with a `PipeWriter`; writes the data and returns.
+        consume (callable): Called with a `PipeReader`; reads until EOF.
+        capacity (int): Size of the ring buffer in bytes.
+
+    Returns:
+        object: The value returned by `consume`.
+
+    Raises:
+        Exception: The first error raised by either side.
+    """
+    pipe = RingBufferPipe(capacity)
+    producer_errors = []
+
+    def _producer():
+        writer = PipeWriter(pipe)
+        try:
+            produce(writer)
+        except BaseException as e:
+            producer_errors.append(e)
+            # Abort before closing so the consumer never mistakes a failure for EOF
+            pipe.abort(e)
+        finally:
+            writer.close()
+
+    thread = threading.Thread(target=_producer, name="eqp_backup_producer", daemon=True)
+    thread.start()
+    try:
+        with PipeReader(pipe) as reader:
+            result = consume(reader)
+            # Drain any trailing bytes so the producer is never left blocked
+            while reader.read(io.DEFAULT_BUFFER_SIZE):
+                pass
+    except BaseException:
+        pipe.close_read()
+        thread.join()
+        # Report the producer failure first: the consumer one is usually its consequence
+        if producer_errors and not isinstance(producer_errors[0], BrokenPipeError):
+            raise producer_errors[0]
+        raise
+    thread.join()
+    if producer_errors:
+        raise producer_errors[0]
+    _logger.debug("Pipeline transferred %s bytes", pipe.bytes_transferred)
+    return result
+
+
+class TeeWriter(io.RawIOBase):
+    """Write-only file object copying every write to several `RingBufferPipe`.
+
+    A pipe whose consumer stopped is dropped, so one failed consumer does not stop the
+    others; writing only fails once every consumer stopped.
+    """
+
+    def __init__(self, pipes):
+        super().__init__()
+        self.pipes = list(pipes)
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        for pipe in list(self.pipes):
+            try:
+                pipe.write(data)
+            except BrokenPipeError:
+                self.pipes.remove(pipe)
+        if not self.pipes:
+            raise BrokenPipeError("Every pipe consumer is closed.")
+        return len(data)
+
+
+def run_fanout(produce, consumers, capacity):
+    """Run `produce` once and feed its output to several consumers concurrently.
+
+    Each consumer runs in its own thread with its own bounded pipe; the producer waits
+    for the slowest one. Unlike `run_pipeline`, a consumer failure does not stop the
+    others: the errors are returned per consumer.
+
+    Args:
+        produce (callable): Called with a writable stream; writes the data and returns.
+        consumers (list): Callables, each called with a readable stream (in a thread).
+        capacity (int): Size of each ring buffer in bytes.
+
+    Returns:
+        list: One (result, error) tuple per consumer, error being None on success.
+
+    Raises:
+        Exception: The error raised by the producer (every consumer is aborted).
+    """
+    pipes = [RingBufferPipe(capacity) for _consume in consumers]
+    outcomes = [(None, None)] * len(consumers)
+
+    def _consumer(index, consume):
+        pipe = pipes[index]
+        try:
+            with PipeReader(pipe) as reader:
+                result = consume(reader)
+                outcomes[index] = (result, None)
+        except BaseException as e:
+            outcomes[index] = (None, e)
+        finally:
+            pipe.close_read()
+
+    threads = [
+        threading.Thread(
+            target=_consumer,
+            args=(index, consume),
+            name=f"eqp_backup_consumer_{index}",
+            daemon=True,
+        )
+        for index, consume in enumerate(consumers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    writer = TeeWriter(pipes)
+    try:
+        produce(writer)
+    except BaseException as e:
+        for pipe in pipes:
+            pipe.abort(e)
+        for thread in threads:
+            thread.join()
+        # Every consumer failed: report the first consumer error rather than the tee one
+        if isinstance(e, BrokenPipeError) and all(error for _r, error in outcomes):
+            return outcomes
+        raise
+    finally:
+        for pipe in pipes:
+            pipe.close_write()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def readinto_full(stream, buffer):
+    """Fill `buffer` from `stream`, only stopping short at EOF.
+
+    Pipes and sockets may return short reads before the end of the data; some upload
+    APIs require exact chunk sizes. The data is read in place, without allocating.
+
+    Args:
+        stream (io.RawIOBase): Readable file-like object.
+        buffer (bytearray | memoryview): Writable buffer to fill.
+
+    Returns:
+        int: Number of bytes read (0 at EOF).
+    """
+    view = memoryview(buffer).cast("B")
+    size = len(view)
+    count = 0
+    while count < size:
+        read = stream.readinto(view[count:])
+        if not read:
+            break
+        count += read
+    return count
+
+
+def read_full(stream, size):
+    """Read `size` bytes from `stream`, only returning less at EOF.
+
+    Args:
+        stream (io.RawIOBase): Readable file-like object.
+        size (int): Number of bytes to read.
+
+    Returns:
+        bytes: The data read (empty at EOF).
+    """
+    buffer = bytearray(size)
+    count = readinto_full(stream, buffer)
+    del buffer[count:]
+    return bytes(buffer)
+
+
+class ChunkReader:
+    """Reads a stream in fixed-size chunks into a single preallocated buffer.
+
+    Each chunk is a view on the same buffer, valid until the next one is read, so
+    reading a stream of any size only ever uses `chunk_size` bytes.
+    """
+
+    def __init__(self, stream, chunk_size):
+        """
+        Args:
+            stream (io.RawIOBase): Readable file-like object.
+            chunk_size (int): Size of the chunks in bytes.
+        """
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self._view = memoryview(bytearray(chunk_size))
+
+    def read_chunk(self):
+        """Return a view on the next chunk (shorter at EOF, empty once exhausted)."""
+        return self._view[: readinto_full(self.stream, self._view)]
+
+
+def copy_stream(source, target, buffer_size=1024 * 1024):
+    """Copy `source` to `target` through one reused buffer.
+
+    Unlike `shutil.copyfileobj`, no bytes object is allocated per block.
+
+    Args:
+        source (io.RawIOBase): Readable file-like object.
+        target (io.RawIOBase): Writable file-like object.
+        buffer_size (int): Size of the copy buffer in bytes.
+
+    Returns:
+        int: Number of bytes copied.
+    """
+    reader = ChunkReader(source, buffer_size)
+    copied = 0
+    while True:
+        chunk = reader.read_chunk()
+        if not chunk:
+            return copied
+        target.write(chunk)
+        copied += len(chunk)
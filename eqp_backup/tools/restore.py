@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""Extraction of the backup archives for their restore.
+
+TAR archives (zstd compressed or not) and Native dumps are extracted in a single pass
+over a stream, e.g. while they are downloaded. ZIP archives keep their directory at
+the end, so they are extracted from a file, their filestore in parallel.
+
+The database dump is the first member of the archives produced by the backup records:
+it is extracted first and handed over to `on_dump`, so the database can be restored in
+the background while the filestore is still being extracted.
+"""
+
+import json
+import os
+import re
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from .archive import COPY_BUFFER_SIZE, NATIVE_DUMP_EXTENSION
+from .pipe import copy_stream
+
+# Parts of a dump streamed into a TAR archive: custom-format in the Native archives,
+# plain SQL in the zstd ones
+DUMP_PART = re.compile(r"^dump\.(sql|dump)\.\d{6}$")
+# Path of the extracted dump of each kind, relative to the dump folder
+DUMP_PATHS = {"sql": "dump.sql", "custom": "dump.dump", "directory": "dump"}
+FILESTORE_PREFIX = "filestore/"
+
+
+def dump_member_kind(name):
+    """Return the dump kind ("sql", "custom" or "directory") of an archive member.
+
+    Returns:
+        str: Dump kind, None if the member is not part of the database dump.
+    """
+    if name == "dump.sql":
+        return "sql"
+    part = DUMP_PART.match(name)
+    if part:
+        return "sql" if part.group(1) == "sql" else "custom"
+    if name.startswith("dump/"):
+        return "directory"
+    return None
+
+
+def member_path(root, relative_path):
+    """Return the path of an archive member below `root`.
+
+    Raises:
+        ValueError: The member path escapes `root` (e.g. "../../etc/passwd").
+    """
+    root = os.path.abspath(root)
+    path = os.path.abspath(os.path.join(root, relative_path))
+    if os.path.commonpath([root, path]) != root or path == root:
+        raise ValueError(f"Unsafe archive member: {relative_path}")
+    return path
+
+
+def _write_member(source, path):
+    """Write an archive member to `path`, returning its size."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as target:
+        return copy_stream(source, target, COPY_BUFFER_SIZE)
+
+
+class BackupExtractor:
+    """Extract a backup archive into a dump folder and a filestore folder.
+
+    Only the known members are extracted: the database dump, the manifests and the
+    filestore files. Once the extraction is done, the `manifest` (database manifest),
+    `snapshot` (incremental filestore manifest), `dump_kind`, `dump_path`, `files`
+    and `filestore_bytes` attributes describe what was extracted.
+    """
+
+    def __init__(self, dump_dir, filestore_dir, on_dump=None, workers=1):
+        """
+        Args:
+            dump_dir (str): Folder receiving the database dump.
+            filestore_dir (str): Folder receiving the filestore files.
+            on_dump (callable): Called with the dump kind and path as soon as the dump
+                is extracted, before the filestore.
+            workers (int): Threads extracting the filestore of the ZIP archives.
+        """
+        self.dump_dir = dump_dir
+        self.filestore_dir = filestore_dir
+        self.on_dump = on_dump
+        self.workers = max(workers, 1)
+        self.manifest = None
+        self.snapshot = None
+        self.dump_kind = None
+        self.dump_path = None
+        self.files = 0
+        self.filestore_bytes = 0
+        self._dump_notified = False
+
+    def extract_stream(self, stream, extension):
+        """Extract a backup read sequentially from a stream.
+
+        Args:
+            stream (io.RawIOBase): Readable file-like object with the backup.
+            extension (str): Backup extension ("tar", "tar.zst" or "dump").
+
+        Returns:
+            BackupExtractor: self.
+        """
+        if extension == NATIVE_DUMP_EXTENSION:
+            self._set_dump_kind("custom")
+            _write_member(stream, self.dump_path)
+        elif extension == "tar.zst":
+            try:
+                import zstandard
+            except ImportError:
+                raise ImportError(
+                    "The zstd decompression requires the zstandard package.\n"
+                    "Please install it by running: `sudo pip3 install zstandard`"
+                )
+            decompressor = zstandard.ZstdDecompressor()
+            with decompressor.stream_reader(
+                stream, read_size=COPY_BUFFER_SIZE, closefd=False
+            ) as reader:
+                self._extract_tar(reader)
+        elif extension == "tar":
+            self._extract_tar(stream)
+        else:
+            raise ValueError(f"'{extension}' backups cannot be extracted from a stream.")
+        self._notify_dump()
+        return self
+
+    def extract_zip(self, path):
+        """Extract a ZIP backup, its filestore files with `workers` threads.
+
+        Args:
+            path (str): Path of the ZIP archive.
+
+        Returns:
+            BackupExtractor: self.
+        """
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+            # Sorting keeps the custom-format dump parts in order
+            for name in sorted(names):
+                kind = dump_member_kind(name)
+                if not kind or name.endswith("/"):
+                    continue
+                self._set_dump_kind(kind)
+                with archive.open(name) as source:
+                    self._write_dump_member(source, name)
+            self._notify_dump()
+            if "manifest.json" in names:
+                self.manifest = json.loads(archive.read("manifest.json"))
+            if "filestore.json" in names:
+                self.snapshot = json.loads(archive.read("filestore.json"))
+
+        filestore_names = [
+            name
+            for name in names
+            if name.startswith(FILESTORE_PREFIX) and not name.endswith("/")
+        ]
+
+        def extract_files(names):
+            files = size = 0
+            with zipfile.ZipFile(path) as archive:
+                for name in names:
+                    with archive.open(name) as source:
+                        size += _write_member(source, self._filestore_path(name))
+                    files += 1
+            return files, size
+
+        batches = [filestore_names[index :: self.workers] for index in range(self.workers)]
+        with ThreadPoolExecutor(
+            self.workers, thread_name_prefix="eqp_backup_restore"
+        ) as pool:
+            for files, size in pool.map(extract_files, batches):
+                self.files += files
+                self.filestore_bytes += size
+        return self
+
+    def _extract_tar(self, stream):
+        dump_parts = None
+        try:
+            with tarfile.open(
+                fileobj=stream, mode="r|", bufsize=COPY_BUFFER_SIZE
+            ) as archive:
+                for member in archive:
+                    if not member.isfile():
+                        continue
+                    name = member.name
+                    source = archive.extractfile(member)
+                    kind = dump_member_kind(name)
+                    if kind:
+                        self._set_dump_kind(kind)
+                        if DUMP_PART.match(name):
+                            # The parts follow each other: concatenate them
+                            dump_parts = dump_parts or open(self.dump_path, "ab")
+                            copy_stream(source, dump_parts, COPY_BUFFER_SIZE)
+                        else:
+                            self._write_dump_member(source, name)
+                        continue
+                    if dump_parts:
+                        dump_parts.close()
+                        dump_parts = None
+                    self._notify_dump()
+                    if name == "manifest.json":
+                        self.manifest = json.load(source)
+                    elif name == "filestore.json":
+                        self.snapshot = json.load(source)
+                    elif name.startswith(FILESTORE_PREFIX):
+                        size = _write_member(source, self._filestore_path(name))
+                        self.files += 1
+                        self.filestore_bytes += size
+        finally:
+            if dump_parts:
+                dump_parts.close()
+
+    def _set_dump_kind(self, kind):
+        if self.dump_kind and self.dump_kind != kind:
+            raise ValueError("The backup holds several database dumps.")
+        if not self.dump_kind:
+            self.dump_kind = kind
+            self.dump_path = os.path.join(self.dump_dir, DUMP_PATHS[kind])
+            if kind == "custom":
+                # Parts of a ZIP archive are appended one by one
+                open(self.dump_path, "wb").close()
+
+    def _write_dump_member(self, source, name):
+        if self.dump_kind == "custom":
+            with open(self.dump_path, "ab") as target:
+                copy_stream(source, target, COPY_BUFFER_SIZE)
+        else:
+            _write_member(source, member_path(self.dump_dir, name))
+
+    def _filestore_path(self, name):
+        return member_path(self.filestore_dir, name[len(FILESTORE_PREFIX) :])
+
+    def _notify_dump(self):
+        """Hand the dump over to `on_dump` once it is completely extracted."""
+        if self.dump_kind and not self._dump_notified:
+            self._dump_notified = True
+            if self.on_dump:
+                self.on_dump(self.dump_kind, self.dump_path)
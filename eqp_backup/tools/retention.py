@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import re
+from datetime import datetime
+
+# Name given to the backups by `BackupServer.get_file_path_details`
+BACKUP_NAME_PATTERN = re.compile(
+    r"^Backup_(?P<name>.+)_(?P<date>\d{4}-\d{2}-\d{2}_\d{2}\.\d{2}\.\d{2})\.(?P<extension>[\w.]+)$"
+)
+BACKUP_DATE_FORMAT = "%Y-%m-%d_%H.%M.%S"
+# Extensions of the backup archives subject to retention (idx: deduplicated backups)
+BACKUP_EXTENSIONS = ("zip", "tar.zst", "tar", "dump", "idx")
+
+# Grandfather-father-son periods: name and key of the period a date belongs to
+GFS_PERIODS = (
+    ("hourly", lambda date: (date.year, date.month, date.day, date.hour)),
+    ("daily", lambda date: (date.year, date.month, date.day)),
+    ("weekly", lambda date: date.isocalendar()[:2]),
+    ("monthly", lambda date: (date.year, date.month)),
+)
+
+
+def parse_backup_name(file_name):
+    """Split a backup file name into its database name, date and extension.
+
+    Args:
+        file_name (str): File name (without folder).
+
+    Returns:
+        tuple: (name, datetime, extension), or None if it is not a backup archive.
+    """
+    match = BACKUP_NAME_PATTERN.match(file_name)
+    if not match or match.group("extension") not in BACKUP_EXTENSIONS:
+        return None
+    try:
+        date = datetime.strptime(match.group("date"), BACKUP_DATE_FORMAT)
+    except ValueError:
+        return None
+    return match.group("name"), date, match.group("extension")
+
+
+def select_backups_to_keep(backups, keep_last=0, **keep_periods):
+    """Apply a retention policy to a list of backups.
+
+    The `keep_last` most recent backups are kept, plus the most recent backup of each
+    of the last N hours, days, ISO weeks and months containing backups (the
+    grandfather-father-son scheme). A backup may satisfy several rules at once.
+
+    Args:
+        backups (list): Dicts with at least "name" and "date" keys.
+        keep_last (int): Number of most recent backups to keep.
+        **keep_periods (int): `hourly`, `daily`, `weekly` and `monthly` counts.
+
+    Returns:
+        tuple: (backups to keep, backups to delete), both sorted newest first.
+    """
+    backups = sorted(backups, key=lambda backup: backup["date"], reverse=True)
+    kept = set(range(min(max(keep_last, 0), len(backups))))
+
+    for period, period_key in GFS_PERIODS:
+        count = keep_periods.get(period) or 0
+        seen_periods = set()
+        for index, backup in enumerate(backups):
+            if len(seen_periods) >= count:
+                break
+            key = period_key(backup["date"])
+            if key not in seen_periods:
+                # Backups are sorted newest first: this is the latest of its period
+                seen_periods.add(key)
+                kept.add(index)
+
+    to_keep = [backup for index, backup in enumerate(backups) if index in kept]
+    to_delete = [backup for index, backup in enumerate(backups) if index not in kept]
+    return to_keep, to_delete
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import atexit
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+_logger = logging.getLogger(__name__)
+
+# Seconds an unused transport is kept open before being closed
+IDLE_TIMEOUT = 300
+# Seconds a borrower waits for a free channel before giving up
+BORROW_TIMEOUT = 600
+
+
+class _PoolEntry:
+    """Authenticated transport shared by every borrower of the same key."""
+
+    def __init__(self, transport, max_channels):
+        self.transport = transport
+        self.max_channels = max_channels
+        self.channels = threading.BoundedSemaphore(max_channels)
+        self.borrowers = 0
+        self.last_used = time.monotonic()
+        # Removed from the pool: closed as soon as the last borrower returns it
+        self.retired = False
+
+    def is_healthy(self):
+        """Check that the transport is still connected and authenticated.
+
+        An SSH "ignore" message is sent so a connection silently dropped by the peer
+        (or a NAT) is detected before it is handed to a borrower.
+        """
+        transport = self.transport
+        if not (transport.is_active() and transport.is_authenticated()):
+            return False
+        try:
+            transport.send_ignore()
+        except Exception:
+            return False
+        return True
+
+    def close(self):
+        try:
+            self.transport.close()
+        except Exception as e:
+            _logger.debug("Error closing pooled SFTP transport: %s", e)
+
+
+class SftpTransportPool:
+    """Process-level pool of authenticated SSH transports.
+
+    SSH multiplexes channels over one connection, so a single transport is kept per
+    key and every borrower opens its own SFTP channel on it. This saves the key
+    exchange and authentication round trips of a new connection for each backup or
+    connection test. The number of channels open at the same time on a transport is
+    capped, and transports left unused for `IDLE_TIMEOUT` seconds are closed.
+    """
+
+    def __init__(self, idle_timeout=IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def borrow(self, key, connect, open_channel, max_channels, timeout=BORROW_TIMEOUT):
+        """Lend an SFTP channel on the pooled transport of `key`.
+
+        Args:
+            key (tuple): Identifies the connection (server and credentials).
+            connect (callable): Returns a new authenticated transport.
+            open_channel (callable): Opens an SFTP client on a transport.
+            max_channels (int): Maximum channels borrowed at once on the transport.
+            timeout (float): Seconds to wait for a free channel.
+
+        Yields:
+            paramiko.SFTPClient: SFTP client closed when the block exits.
+
+        Raises:
+            TimeoutError: If no channel becomes free within `timeout` seconds.
+        """
+        self.evict_idle()
+        entry = self._acquire(key, connect, max_channels)
+        try:
+            if not entry.channels.acquire(timeout=timeout):
+                raise TimeoutError(
+                    f"No SFTP channel became available within {timeout} seconds "
+                    f"({entry.max_channels} channels already in use)."
+                )
+            try:
+                sftp = open_channel(entry.transport)
+                try:
+                    yield sftp
+                finally:
+                    sftp.close()
+            finally:
+                entry.channels.release()
+        except Exception:
+            # Do not hand a broken connection to the next borrower
+            if not entry.is_healthy():
+                self._retire(key, entry)
+            raise
+        finally:
+            with self._lock:
+                entry.borrowers -= 1
+                entry.last_used = time.monotonic()
+                close = entry.retired and not entry.borrowers
+            if close:
+                entry.close()
+
+    def _acquire(self, key, connect, max_channels):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and not entry.is_healthy():
+                _logger.info("Dropping stale pooled SFTP transport %s", key[:2])
+                self._entries.pop(key)
+                entry.retired = True
+                if not entry.borrowers:
+                    entry.close()
+                entry = None
+            if entry and entry.max_channels != max_channels and not entry.borrowers:
+                # The channel cap changed: rebuild the entry with the new limit
+                entry.channels = threading.BoundedSemaphore(max_channels)
+                entry.max_channels = max_channels
+            if entry:
+                entry.borrowers += 1
+                return entry
+
+        # Connect outside the lock so other keys are not blocked by a slow handshake
+        transport = connect()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.is_healthy():
+                # Another thread connected meanwhile: keep a single transport per key
+                transport.close()
+            else:
+                entry = self._entries[key] = _PoolEntry(transport, max_channels)
+            entry.borrowers += 1
+            return entry
+
+    def _retire(self, key, entry):
+        with self._lock:
+            if self._entries.get(key) is entry:
+                self._entries.pop(key)
+            entry.retired = True
+
+    def evict_idle(self):
+        """Close the transports nobody borrowed for `idle_timeout` seconds."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                (key, entry)
+                for key, entry in self._entries.items()
+                if not entry.borrowers and now - entry.last_used > self.idle_timeout
+            ]
+            for key, _entry in expired:
+                self._entries.pop(key)
+        for key, entry in expired:
+            _logger.debug("Closing idle pooled SFTP transport %s", key[:2])
+            entry.close()
+
+    def invalidate(self, predicate):
+        """Close the unused transports whose key matches `predicate`.
+
+        Transports currently borrowed are only removed from the pool, so their
+        borrowers can finish; they are closed when the last one returns them.
+        """
+        with self._lock:
+            matching = [
+                (key, entry) for key, entry in self._entries.items() if predicate(key)
+            ]
+            idle = []
+            for key, entry in matching:
+                self._entries.pop(key)
+                entry.retired = True
+                if not entry.borrowers:
+                    idle.append(entry)
+        for entry in idle:
+            entry.close()
+
+    def close_all(self):
+        """Close every pooled transport."""
+        self.invalidate(lambda key: True)
+
+
+# Shared by every backup server of the worker process
+sftp_pool = SftpTransportPool()
+atexit.register(sftp_pool.close_all)
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import io
+import shutil
+import logging
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+# `ionice` arguments of each I/O priority, from the least to the most restrictive
+IO_PRIORITIES = {
+    "normal": [],
+    "low": ["-c", "2", "-n", "7"],
+    "idle": ["-c", "3"],
+}
+# Largest sleep of a throttled read, so rate changes are applied quickly
+MAX_THROTTLE_WAIT = 1.0
+# Rate schedules are evaluated at most once per interval (seconds)
+RATE_REFRESH_INTERVAL = 1.0
+
+
+def throttle_command(cmd, cpu_nice=0, io_priority="normal"):
+    """Prefix a command so it runs with a lower CPU and I/O priority.
+
+    The `nice` and `ionice` tools replace themselves by the command, so the process
+    ID stays the one of the started process. A missing tool is only logged.
+
+    Args:
+        cmd (list): Command to run.
+        cpu_nice (int): Niceness added to the command (0-19).
+        io_priority (str): Key of `IO_PRIORITIES`.
+
+    Returns:
+        list: The prefixed command.
+    """
+    prefix = []
+    if io_priority and IO_PRIORITIES.get(io_priority):
+        ionice = shutil.which("ionice")
+        if ionice:
+            prefix += [ionice] + IO_PRIORITIES[io_priority]
+        else:
+            _logger.warning("'ionice' not found: the I/O priority is not lowered")
+    if cpu_nice:
+        nice = shutil.which("nice")
+        if nice:
+            prefix += [nice, "-n", str(cpu_nice)]
+        else:
+            _logger.warning("'nice' not found: the CPU priority is not lowered")
+    return prefix + list(cmd)
+
+
+def window_contains(hour_from, hour_to, hour):
+    """Tell if an hour of the day is inside a window, which may span midnight."""
+    if hour_from <= hour_to:
+        return hour_from <= hour < hour_to
+    return hour >= hour_from or hour < hour_to
+
+
+def tighten_limits(limits, overrides):
+    """Merge limits, keeping the most restrictive value of each one.
+
+    Bandwidth and thread limits set to 0 mean unlimited; a higher niceness and a
+    later `IO_PRIORITIES` key are more restrictive.
+
+    Args:
+        limits (dict): "upload_bandwidth", "compression_threads", "cpu_nice" and
+            "io_priority" limits.
+        overrides (dict): Limits to apply on top of `limits` (unset ones are ignored).
+
+    Returns:
+        dict: The merged limits.
+    """
+    merged = dict(limits)
+    for key in ("upload_bandwidth", "compression_threads"):
+        values = [value for value in (merged.get(key), overrides.get(key)) if value]
+        merged[key] = min(values) if values else 0
+    merged["cpu_nice"] = max(
+        merged.get("cpu_nice") or 0, overrides.get("cpu_nice") or 0
+    )
+    priorities = list(IO_PRIORITIES)
+    merged["io_priority"] = max(
+        merged.get("io_priority") or "normal",
+        overrides.get("io_priority") or "normal",
+        key=priorities.index,
+    )
+    return merged
+
+
+def limits_at(limits, windows, hour):
+    """Return the limits in force at an hour of the day.
+
+    Args:
+        limits (dict): Limits applying all day (see `tighten_limits`).
+        windows (list): (hour from, hour to, limits) tuples tightening the limits.
+        hour (float): Hour of the day (e.g. 13.5 for 13:30).
+
+    Returns:
+        dict: The limits, tightened by the windows containing `hour`.
+    """
+    for hour_from, hour_to, window_limits in windows:
+        if window_contains(hour_from, hour_to, hour):
+            limits = tighten_limits(limits, window_limits)
+    return limits
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the throughput shared by several streams.
+
+    Every stream takes tokens (bytes) from the same bucket, so the limit applies to
+    their total throughput. The rate may be a callable, evaluated again every
+    `RATE_REFRESH_INTERVAL` seconds, so that the limit follows a schedule.
+    """
+
+    def __init__(self, rate, burst_seconds=1.0):
+        """
+        Args:
+            rate (float|callable): Bytes per second (0 for unlimited), or a callable
+                returning it.
+            burst_seconds (float): Seconds of throughput that may be sent at once.
+        """
+        self._rate_source = rate
+        self._burst_seconds = burst_seconds
+        self._lock = threading.Lock()
+        self._rate = 0
+        self._rate_checked = None
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+
+    def _refresh_rate(self, now):
+        if not callable(self._rate_source):
+            self._rate = self._rate_source
+        elif (
+            self._rate_checked is None
+            or now - self._rate_checked >= RATE_REFRESH_INTERVAL
+        ):
+            self._rate = self._rate_source()
+            self._rate_checked = now
+
+    def consume(self, size):
+        """Take `size` bytes worth of tokens, sleeping while the bucket is in debt."""
+        while size > 0:
+            with self._lock:
+                now = time.monotonic()
+                self._refresh_rate(now)
+                rate = self._rate
+                if rate <= 0:
+                    self._tokens = 0.0
+                    self._updated = now
+                    return
+                burst = rate * self._burst_seconds
+                self._tokens = min(burst, self._tokens + (now - self._updated) * rate)
+                self._updated = now
+                # Take at most one burst at a time so rate changes apply mid-read
+                taken = min(size, burst)
+                self._tokens -= taken
+                wait = -self._tokens / rate if self._tokens < 0 else 0
+            size -= taken
+            if wait > 0:
+                time.sleep(min(wait, MAX_THROTTLE_WAIT))
+
+
+class ThrottledReader(io.RawIOBase):
+    """Readable file object taking from a `TokenBucket` the bytes it returns.
+
+    Seeking is delegated to the wrapped stream, but its file descriptor is hidden so
+    that the data is never read around the throttle (e.g. by positional reads).
+    """
+
+    def __init__(self, raw, bucket):
+        super().__init__()
+        self.raw = raw
+        self.bucket = bucket
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self.raw.seekable()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self.raw.seek(offset, whence)
+
+    def tell(self):
+        return self.raw.tell()
+
+    def readinto(self, buffer):
+        if hasattr(self.raw, "readinto"):
+            count = self.raw.readinto(buffer)
+        else:
+            data = self.raw.read(len(buffer))
+            count = len(data)
+            buffer[:count] = data
+        if count:
+            self.bucket.consume(count)
+        return count
+
+    def close(self):
+        if not self.closed:
+            self.raw.close()
+        super().close()
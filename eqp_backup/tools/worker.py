@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""Backup worker: executes one `backup.job` in a dedicated process.
+
+The process is started by `backup.job` (see `BackupJob._spawn_worker`) with the same
+Python interpreter as the Odoo server, so backups are not bound to the time and memory
+limits of the Odoo workers and never hold a cron thread.
+
+Usage: python worker.py <database> <job id>
+
+The Odoo configuration of the parent process is passed as JSON in the
+`EQP_BACKUP_WORKER_CONFIG` environment variable.
+"""
+
+import json
+import os
+import sys
+
+CONFIG_ENVIRON = "EQP_BACKUP_WORKER_CONFIG"
+
+
+def main(argv):
+    db_name, job_id = argv[1], int(argv[2])
+    options = json.loads(os.environ.pop(CONFIG_ENVIRON, "{}"))
+
+    import odoo
+    from odoo.tools import config
+
+    config.parse_config([])
+    config.options.update(options)
+    odoo.netsvc.init_logger()
+
+    registry = odoo.modules.registry.Registry(db_name)
+    with registry.cursor() as cr:
+        env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {})
+        env["backup.job"].browse(job_id)._execute()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -1,3 +1,4 @@
 # -*- coding: utf-8 -*-
 
 from . import backup_dropbox_token_assignment_wizard
+from . import backup_restore_wizard
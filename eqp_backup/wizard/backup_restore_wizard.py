@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    EQP Solutions
+#
+#    Copyright (C) 2024-TODAY EQP Solutions (<https://www.eqpsolutions.com>)
+#    Author: EQP Solutions (<info@eqpsolutions.com>)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import os
+
+from odoo import api, fields, models
+from odoo.exceptions import ValidationError
+
+# Default number of restore jobs, bounded so a restore does not starve the server
+DEFAULT_RESTORE_JOBS = 4
+
+
+class BackupRestoreWizard(models.TransientModel):
+    """
+    This model represents a wizard restoring a backup artifact into a new database.
+
+    The restore is queued for a backup worker, which streams the backup from the
+    server storing it and reports the time to restore once the new database is ready.
+    """
+
+    _name = "backup.restore.wizard"
+    _description = "Backup Restore"
+
+    artifact_id = fields.Many2one(
+        "backup.artifact",
+        string="Backup",
+        required=True,
+        domain=[("state", "=", "present"), ("type", "!=", "fs")],
+    )
+    server_id = fields.Many2one(related="artifact_id.server_id")
+    db_name = fields.Char(
+        string="New Database Name",
+        required=True,
+        compute="_compute_db_name",
+        store=True,
+        readonly=False,
+        help="Name of the database created by the restore. It must not exist yet.",
+    )
+    jobs = fields.Integer(
+        string="Restore Jobs",
+        default=lambda self: min(os.cpu_count() or 1, DEFAULT_RESTORE_JOBS),
+        help="Parallel jobs of pg_restore, also used to extract the filestore of the "
+        "ZIP archives. Plain SQL dumps are always restored in one session.",
+    )
+    new_uuid = fields.Boolean(
+        string="Generate a New UUID",
+        default=True,
+        help="Give the new database its own UUID, as a copy of the original one.",
+    )
+    neutralize = fields.Boolean(
+        string="Neutralize",
+        default=True,
+        help="Disable the outgoing mail servers, the scheduled actions and the other "
+        "features which could act on behalf of the original database.",
+    )
+    state = fields.Selection(
+        [("draft", "Draft"), ("done", "Done")], default="draft", readonly=True
+    )
+    job_id = fields.Many2one("backup.job", string="Restore Job", readonly=True)
+    result_msg = fields.Text(string="Result", readonly=True)
+
+    @api.depends("artifact_id")
+    def _compute_db_name(self):
+        for wizard in self:
+            artifact = wizard.artifact_id
+            if artifact and not wizard.db_name:
+                date = fields.Datetime.context_timestamp(wizard, artifact.date)
+                wizard.db_name = f"{artifact.db_name}_restore_{date:%Y%m%d_%H%M%S}"
+
+    def action_restore(self):
+        """
+        Queues the restore of the selected backup into the new database.
+
+        Returns:
+            dict: Action reopening the wizard with the queued job.
+
+        Raises:
+            ValidationError: If the backup cannot be restored into the database.
+        """
+        self.ensure_one()
+        if self.jobs < 1:
+            raise ValidationError("The number of restore jobs must be at least 1.")
+        job = self.env["backup.job"].enqueue_restore(
+            self.artifact_id, self.db_name, self.jobs, self.new_uuid, self.neutralize
+        )
+        self.write(
+            {
+                "state": "done",
+                "job_id": job.id,
+                "result_msg": (
+                    f"The restore into {self.db_name} was queued (job {job.id}): a "
+                    "backup worker runs it, and its result is posted on the backup "
+                    "record once the new database is ready."
+                ),
+            }
+        )
+        return {
+            "type": "ir.actions.act_window",
+            "name": "Restore Backup",
+            "res_model": self._name,
+            "res_id": self.id,
+            "view_mode": "form",
+            "target": "new",
+        }